@@ -15,6 +15,7 @@ from typing import TYPE_CHECKING
 from autogen_agentchat.agents import AssistantAgent
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 
+from app.agents.model_client import build_model_client
 from app.core.logging_config import get_logger
 
 if TYPE_CHECKING:
@@ -39,8 +40,10 @@ class BaseAgent(ABC):
         name: Unique identifier for the agent
         description: Human-readable agent description
         system_message: Agent's system prompt
-        model: LLM model identifier
+        model: LLM model identifier, unless settings.model_routes routes
+            the agent's calls to another
         api_key: API key for model access
+        base_url: OpenAI-compatible endpoint (None for the OpenAI default)
     """
 
     def __init__(
@@ -52,6 +55,7 @@ class BaseAgent(ABC):
         api_key: str,
         tools: list[FunctionTool] | None = None,
         reflect_on_tool_use: bool = False,
+        base_url: str | None = None,
     ) -> None:
         """
         Initialize the base agent.
@@ -64,6 +68,7 @@ class BaseAgent(ABC):
             api_key: OpenAI API key
             tools: List of tools available to the agent
             reflect_on_tool_use: Whether agent reflects after tool use
+            base_url: OpenAI-compatible endpoint (None for the OpenAI default)
         """
         self.name = name
         self.description = description
@@ -72,6 +77,7 @@ class BaseAgent(ABC):
         self.api_key = api_key
         self.tools = tools or []
         self.reflect_on_tool_use = reflect_on_tool_use
+        self.base_url = base_url or None
 
         self._agent: AssistantAgent | None = None
         self._llm_client: OpenAIChatCompletionClient | None = None
@@ -96,17 +102,22 @@ class BaseAgent(ABC):
     # BUILD METHODS
     # ===============================================================
 
-    def _build_llm_client(self) -> OpenAIChatCompletionClient:
+    def _build_llm_client(self, stage: str | None = None) -> OpenAIChatCompletionClient:
         """
         Build the LLM client for this agent.
 
+        The client follows the stage's route in settings.model_routes, if
+        it has one, with the routed model's fallback (see
+        build_model_client).
+
+        Args:
+            stage: Role the calls are routed and recorded under (defaults to
+                the agent name)
+
         Returns:
             OpenAIChatCompletionClient: Configured LLM client
         """
-        return OpenAIChatCompletionClient(
-            model=self.model,
-            api_key=self.api_key,
-        )
+        return build_model_client(stage or self.name, self.model, self.api_key, self.base_url)
 
     def build(self) -> AssistantAgent:
         """
@@ -49,6 +49,7 @@ class CriticAgent(BaseAgent):
         self,
         model: str,
         api_key: str,
+        base_url: str | None = None,
     ) -> None:
         """
         Initialize the critic agent.
@@ -56,6 +57,7 @@ class CriticAgent(BaseAgent):
         Args:
             model: LLM model to use
             api_key: OpenAI API key
+            base_url: OpenAI-compatible endpoint (None for the OpenAI default)
         """
         super().__init__(
             name="critic",
@@ -65,6 +67,7 @@ class CriticAgent(BaseAgent):
             api_key=api_key,
             tools=[],
             reflect_on_tool_use=False,
+            base_url=base_url,
         )
 
         logger.debug("CriticAgent initialized")
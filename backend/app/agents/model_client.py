@@ -0,0 +1,283 @@
+"""
+model_client.py
+===============
+Instrumented OpenAI chat completion client.
+
+Wraps AutoGen's OpenAIChatCompletionClient so every model call made
+by an agent (or the team selector) is timed and its token usage is
+recorded against the running review. When a replay session is bound,
+calls are also captured to, or answered from, a review recording. Calls
+stop as soon as the review they run for is cancelled.
+
+Each role (the planner, the team selector and each agent) can be routed
+to a model and endpoint of its own (see build_model_client): the short,
+latency-sensitive selector and planner calls go to a fast model while
+synthesis keeps the review's. A call that times out or is rate limited
+(429) is retried once on the model's fallback, if it has one.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import AsyncGenerator
+from typing import TYPE_CHECKING, Any
+
+import openai
+from autogen_core.models import CreateResult
+from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+from app.config.settings import get_settings
+from app.core.exceptions import AgentError, ConfigurationError
+from app.core.logging_config import get_logger
+from app.core.metrics import LLM_CALL_DURATION, LLM_FALLBACKS, LLM_TOKENS
+from app.core.replay import ReviewRecorder, ReviewReplayer, get_replay_session
+from app.core.resilience import cancellable
+from app.core.tracing import start_span
+from app.core.usage import get_usage_tracker
+
+if TYPE_CHECKING:
+    from app.config.settings import ModelEndpoint, Settings
+
+logger = get_logger(__name__)
+
+# Failures a call is retried on the fallback model for
+FALLBACK_ERRORS = (openai.APITimeoutError, openai.RateLimitError)
+
+
+# ===============================================================
+# INSTRUMENTED CLIENT
+# ===============================================================
+
+
+class InstrumentedChatCompletionClient(OpenAIChatCompletionClient):
+    """
+    OpenAIChatCompletionClient that reports per-call usage.
+
+    Attributes:
+        stage: Label the calls are recorded under (agent name or "selector")
+        fallback: Client a call is retried on when this model times out or
+            is rate limited
+    """
+
+    def __init__(self, stage: str, fallback: InstrumentedChatCompletionClient | None = None, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.stage = stage
+        self.model = kwargs["model"]
+        self.fallback = fallback
+
+    async def create(self, *args: Any, **kwargs: Any) -> CreateResult:
+        """Run a completion and record its usage and wall time."""
+        start = time.perf_counter()
+        session = get_replay_session()
+        request = _request_payload(args, kwargs) if session is not None else None
+        with start_span(f"llm.{self.stage}", model=self.model) as span:
+            try:
+                if isinstance(session, ReviewReplayer):
+                    result = await cancellable(self._replay(session, request))
+                else:
+                    result = await cancellable(super().create(*args, **kwargs))
+            except Exception as e:
+                self._record(start, None, error=True)
+                self._capture(session, request, start, None, e)
+                if not self._falls_back(e):
+                    raise
+                if span is not None:
+                    span.attributes["fallback"] = self.fallback.model
+            else:
+                self._record(start, result)
+                self._capture(session, request, start, result)
+                if span is not None:
+                    span.attributes["prompt_tokens"] = result.usage.prompt_tokens
+                    span.attributes["completion_tokens"] = result.usage.completion_tokens
+                return result
+        return await self.fallback.create(*args, **kwargs)
+
+    async def create_stream(self, *args: Any, **kwargs: Any) -> AsyncGenerator[str | CreateResult, None]:
+        """Stream a completion and record usage from the final CreateResult."""
+        start = time.perf_counter()
+        session = get_replay_session()
+        request = _request_payload(args, kwargs) if session is not None else None
+        streamed = False
+        with start_span(f"llm.{self.stage}", model=self.model, stream=True):
+            try:
+                if isinstance(session, ReviewReplayer):
+                    result = await self._replay(session, request)
+                    if isinstance(result.content, str):
+                        yield result.content
+                    self._record(start, result)
+                    yield result
+                    return
+                async for chunk in super().create_stream(*args, **kwargs):
+                    if isinstance(chunk, CreateResult):
+                        self._record(start, chunk)
+                        self._capture(session, request, start, chunk)
+                    streamed = True
+                    yield chunk
+                return
+            except Exception as e:
+                self._record(start, None, error=True)
+                self._capture(session, request, start, None, e)
+                # Chunks already yielded cannot be taken back
+                if streamed or not self._falls_back(e):
+                    raise
+        async for chunk in self.fallback.create_stream(*args, **kwargs):
+            yield chunk
+
+    async def _replay(self, replayer: ReviewReplayer, request: dict[str, Any]) -> CreateResult:
+        """Answer the call from the bound recording."""
+        entry = await replayer.take("llm", self.stage, request)
+        if entry.error:
+            # Keep the recorded error's type, so a recorded fallback replays too
+            raise AgentError(entry.error, agent_name=self.stage, details={"error_type": entry.error.split(":", 1)[0]})
+        return CreateResult.model_validate(entry.response)
+
+    def _falls_back(self, error: Exception) -> bool:
+        """Whether a failed call is retried on the fallback model (and counted as such)."""
+        if self.fallback is None:
+            return False
+        if isinstance(error, AgentError):
+            error_type = error.details.get("error_type")
+        else:
+            error_type = type(error).__name__ if isinstance(error, FALLBACK_ERRORS) else None
+        if error_type not in {e.__name__ for e in FALLBACK_ERRORS}:
+            return False
+        reason = "timeout" if error_type == openai.APITimeoutError.__name__ else "rate_limited"
+        LLM_FALLBACKS.labels(self.stage, self.model, reason).inc()
+        logger.warning(f"{self.stage}: {self.model} {reason.replace('_', ' ')}; retrying on {self.fallback.model}")
+        return True
+
+    def _capture(
+        self,
+        session: ReviewRecorder | ReviewReplayer | None,
+        request: dict[str, Any] | None,
+        start: float,
+        result: CreateResult | None,
+        error: Exception | None = None,
+    ) -> None:
+        """Add the call to the bound recording, if one is being made."""
+        if not isinstance(session, ReviewRecorder):
+            return
+        session.record(
+            "llm",
+            self.stage,
+            request,
+            result.model_dump(mode="json") if result is not None else None,
+            start,
+            error=f"{type(error).__name__}: {error}" if error else None,
+        )
+
+    def _record(self, start: float, result: CreateResult | None, error: bool = False) -> None:
+        """Export the call to metrics and the usage tracker bound to this review."""
+        elapsed = time.perf_counter() - start
+        usage = result.usage if result is not None else None
+        prompt_tokens = usage.prompt_tokens if usage else 0
+        completion_tokens = usage.completion_tokens if usage else 0
+
+        LLM_CALL_DURATION.labels(self.stage, self.model).observe(elapsed)
+        LLM_TOKENS.labels(self.stage, "prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(self.stage, "completion").inc(completion_tokens)
+
+        tracker = get_usage_tracker()
+        if tracker is None:
+            return
+        tracker.record_llm_call(
+            stage=self.stage,
+            model=self.model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            duration_ms=elapsed * 1000,
+            error=error,
+        )
+
+
+# ===============================================================
+# ROUTING
+# ===============================================================
+
+
+def build_model_client(
+    stage: str,
+    model: str,
+    api_key: str,
+    base_url: str | None = None,
+    settings: Settings | None = None,
+) -> InstrumentedChatCompletionClient:
+    """
+    Client for one role's calls, routed by settings.model_routes.
+
+    Args:
+        stage: The role (agent name, "selector" or "planner"); also the
+            label usage is recorded under
+        model: Model for roles without a route (the review's model)
+        api_key: OpenAI API key, for models without an endpoint in
+            settings.model_endpoints
+        base_url: Base URL for models without an endpoint in settings.model_endpoints
+        settings: Routing settings (defaults to the application's)
+
+    Returns:
+        InstrumentedChatCompletionClient: Client for the role's model, with
+            its fallback chain from settings.model_fallbacks
+
+    Raises:
+        ConfigurationError: A routed model's endpoint names an API key
+            variable that is not set
+    """
+    settings = settings or get_settings()
+    return _routed_client(stage, settings.model_routes.get(stage) or model, api_key, base_url, settings, set())
+
+
+def _routed_client(
+    stage: str,
+    model: str,
+    api_key: str,
+    base_url: str | None,
+    settings: Settings,
+    seen: set[str],
+) -> InstrumentedChatCompletionClient:
+    seen = seen | {model}
+    fallback_model = settings.model_fallbacks.get(model)
+    fallback = None
+    if fallback_model and fallback_model not in seen:
+        fallback = _routed_client(stage, fallback_model, api_key, base_url, settings, seen)
+
+    client_kwargs: dict[str, Any] = {"model": model, "api_key": api_key}
+    endpoint = settings.model_endpoints.get(model)
+    if endpoint is not None:
+        client_kwargs.update(_endpoint_kwargs(model, endpoint))
+    elif base_url:
+        client_kwargs["base_url"] = base_url
+    if settings.llm_timeout_seconds:
+        client_kwargs["timeout"] = settings.llm_timeout_seconds
+    if fallback is not None:
+        # The fallback is the retry: waiting out a 429 here would cost more than switching
+        client_kwargs["max_retries"] = 0
+    return InstrumentedChatCompletionClient(stage=stage, fallback=fallback, **client_kwargs)
+
+
+def _endpoint_kwargs(model: str, endpoint: ModelEndpoint) -> dict[str, Any]:
+    """Client arguments for a model served by an endpoint of its own."""
+    if endpoint.api_key_env:
+        api_key = os.environ.get(endpoint.api_key_env)
+        if not api_key:
+            raise ConfigurationError(
+                f"{endpoint.api_key_env} is not set; it holds the API key for {model}",
+                config_key="model_endpoints",
+            )
+    else:
+        # An empty key would make the client fall back to OPENAI_API_KEY
+        api_key = "unused"
+    kwargs: dict[str, Any] = {"base_url": endpoint.base_url, "api_key": api_key}
+    if endpoint.model_info is not None:
+        kwargs["model_info"] = endpoint.model_info
+    return kwargs
+
+
+def _request_payload(args: tuple[Any, ...], kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Serializable view of a create() call: the messages and offered tool names."""
+    messages = args[0] if args else kwargs.get("messages", [])
+    tools = kwargs.get("tools") or []
+    return {
+        "messages": [m.model_dump(mode="json") for m in messages],
+        "tools": sorted(t["name"] if isinstance(t, dict) else t.name for t in tools),
+    }
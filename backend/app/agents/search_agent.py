@@ -3,8 +3,9 @@ search_agent.py
 ===============
 Search agent for crafting queries and fetching from multiple sources.
 
-Searches academic papers (arXiv, Semantic Scholar) and the general web
-(Tavily), with the ability to read full web pages for deeper context.
+Searches papers earlier reviews collected (local corpus), academic
+papers (arXiv, Semantic Scholar) and the general web (Tavily), with the
+ability to read full web pages for deeper context.
 """
 
 from __future__ import annotations
@@ -12,8 +13,11 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from app.agents.base import BaseAgent
+from app.config.settings import get_settings
 from app.core.logging_config import get_logger
 from app.tools.arxiv_tool import ArxivSearchTool
+from app.tools.local_corpus_tool import LocalCorpusSearchTool
+from app.tools.pdf_reader_tool import PdfReaderTool
 from app.tools.semantic_scholar_tool import SemanticScholarTool
 from app.tools.tavily_tool import TavilySearchTool
 from app.tools.web_reader_tool import WebReaderTool
@@ -29,20 +33,25 @@ class SearchAgent(BaseAgent):
     Agent specialized in searching multiple sources for research material.
 
     Uses arXiv and Semantic Scholar for academic papers, Tavily for
-    general web search, and a web reader to extract full page content.
+    general web search, and web and PDF readers to extract full content.
     """
 
     DEFAULT_SYSTEM_MESSAGE = (
         "You are an expert research assistant specialized in deep research.\n\n"
-        "You have four tools:\n"
-        "1. arxiv_search — for preprints and cutting-edge academic research\n"
-        "2. semantic_scholar_search — for peer-reviewed papers and broader academic coverage\n"
-        "3. web_search — for blogs, documentation, news articles, and general web sources\n"
-        "4. read_webpage — to read the full content of a specific URL\n\n"
+        "You have these tools:\n"
+        "1. local_corpus_search — papers earlier reviews already collected; instant, try it first\n"
+        "2. arxiv_search — for preprints and cutting-edge academic research\n"
+        "3. semantic_scholar_search — for peer-reviewed papers and broader academic coverage\n"
+        "4. web_search — for blogs, documentation, news articles, and general web sources\n"
+        "5. read_webpage — to read the full content of a specific URL\n"
+        "6. read_pdf — to read the full text of a paper from its pdf_url\n\n"
         "When given a topic or sub-queries:\n"
-        "1. Search academic sources (arxiv + semantic scholar) for foundational papers\n"
+        "1. Search academic sources (local corpus first, then arxiv + semantic scholar) for "
+        "foundational papers\n"
         "2. Search the web for recent articles, blog posts, and documentation\n"
-        "3. Use read_webpage on the most promising URLs to get deeper content\n"
+        "3. Use read_webpage on the most promising URLs to get deeper content, passing the "
+        "sub-query as `query` so it returns the most relevant passages; use read_pdf the "
+        "same way on the pdf_url of key papers whose abstract is not enough\n"
         "4. Combine all results, remove duplicates, and return the top sources as JSON\n\n"
         "Each source should include: title, url/pdf_url, authors (if available), "
         "date (if available), and a brief summary of key findings.\n"
@@ -56,15 +65,25 @@ class SearchAgent(BaseAgent):
         tavily_api_key: str = "",
         arxiv_tool: ArxivSearchTool | None = None,
         semantic_scholar_tool: SemanticScholarTool | None = None,
+        base_url: str | None = None,
+        local_corpus_tool: LocalCorpusSearchTool | None = None,
     ) -> None:
         self.arxiv_tool = arxiv_tool or ArxivSearchTool()
         self.semantic_scholar_tool = semantic_scholar_tool or SemanticScholarTool()
         self.web_reader_tool = WebReaderTool()
-
-        tools = [
+        self.pdf_reader_tool = PdfReaderTool()
+
+        self.local_corpus_tool: LocalCorpusSearchTool | None = None
+        tools = []
+        # Only add the local corpus if it is enabled
+        if get_settings().local_corpus_enabled:
+            self.local_corpus_tool = local_corpus_tool or LocalCorpusSearchTool()
+            tools.append(self.local_corpus_tool.as_function_tool())
+        tools += [
             self.arxiv_tool.as_function_tool(),
             self.semantic_scholar_tool.as_function_tool(),
             self.web_reader_tool.as_function_tool(),
+            self.pdf_reader_tool.as_function_tool(),
         ]
 
         # Only add Tavily if API key is provided
@@ -80,6 +99,7 @@ class SearchAgent(BaseAgent):
             api_key=api_key,
             tools=tools,
             reflect_on_tool_use=True,
+            base_url=base_url,
         )
 
         logger.debug("SearchAgent initialized with academic + web tools")
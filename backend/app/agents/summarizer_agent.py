@@ -51,6 +51,7 @@ class SummarizerAgent(BaseAgent):
         self,
         model: str,
         api_key: str,
+        base_url: str | None = None,
     ) -> None:
         """
         Initialize the summarizer agent.
@@ -58,6 +59,7 @@ class SummarizerAgent(BaseAgent):
         Args:
             model: LLM model to use
             api_key: OpenAI API key
+            base_url: OpenAI-compatible endpoint (None for the OpenAI default)
         """
         super().__init__(
             name="summarizer",
@@ -67,6 +69,7 @@ class SummarizerAgent(BaseAgent):
             api_key=api_key,
             tools=[],
             reflect_on_tool_use=False,
+            base_url=base_url,
         )
 
         logger.debug("SummarizerAgent initialized")
@@ -6,6 +6,8 @@ from collections import defaultdict
 from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from app.config.settings import get_backend_settings
+
 # -- Per-IP rate limiter (dependency, NOT middleware — avoids greenlet issues) --
 _RATE_WINDOW = 60
 _RATE_LIMIT = 5
@@ -86,3 +88,11 @@ async def get_current_user_from_query(
     if not user:
         raise _CREDENTIALS_EXCEPTION
     return user
+
+
+async def get_current_admin(current_user: UserORM = Depends(get_current_user)) -> UserORM:
+    """Require the authenticated user to be listed in ADMIN_EMAILS."""
+    admin_emails = {e.lower().strip() for e in get_backend_settings().admin_emails}
+    if current_user.email.lower() not in admin_emails:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required.")
+    return current_user
@@ -0,0 +1,28 @@
+"""Admin endpoints — cross-review operational views"""
+
+import logging
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_admin
+from app.db.database import get_db
+from app.db.models import UserORM
+from app.db.review_repository import ReviewRepository
+from app.models.responses import StageLatencyResponse
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+logger = logging.getLogger(__name__)
+
+
+@router.get("/metrics/stages", response_model=list[StageLatencyResponse])
+async def stage_metrics(
+    days: int = Query(default=7, ge=1, le=90, description="Look-back window in days"),
+    current_user: UserORM = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+):
+    """p50/p95 latency, average tokens and cost per stage across all reviews."""
+    repo = ReviewRepository(db)
+    rows = await repo.stage_latency_percentiles(since=datetime.utcnow() - timedelta(days=days))
+    return [StageLatencyResponse(**row) for row in rows]
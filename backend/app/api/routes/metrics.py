@@ -0,0 +1,39 @@
+"""Prometheus metrics endpoint"""
+
+import logging
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import func, select
+
+from app.config.settings import get_backend_settings
+from app.core.metrics import REGISTRY, REVIEWS_QUEUED
+from app.db.database import async_session_factory
+from app.db.models import ReviewORM
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+settings = get_backend_settings()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Expose operational metrics in the Prometheus text format."""
+    await _refresh_queued_reviews()
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+async def _refresh_queued_reviews() -> None:
+    """Count pending reviews created within the session TTL (older ones were abandoned)."""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.session_ttl_seconds)
+    try:
+        async with async_session_factory() as db:
+            result = await db.execute(
+                select(func.count())
+                .select_from(ReviewORM)
+                .where(ReviewORM.status == "pending", ReviewORM.created_at >= cutoff)
+            )
+            REVIEWS_QUEUED.set(result.scalar_one())
+    except Exception as e:
+        logger.warning(f"Could not count queued reviews: {e}")
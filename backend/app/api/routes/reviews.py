@@ -1,5 +1,6 @@
 """Review management endpoints"""
 
+import asyncio
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -7,11 +8,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import check_rate_limit, get_current_user
 from app.config.settings import get_settings
+from app.core.tracing import build_waterfall, get_span_exporter
 from app.db.database import get_db
 from app.db.models import UserORM
-from app.db.review_repository import ReviewRepository, orm_to_response
+from app.db.review_repository import (
+    ReviewRepository,
+    metrics_to_response,
+    orm_to_response,
+)
 from app.models.requests import CreateReviewRequest
-from app.models.responses import ReviewResponse
+from app.models.responses import (
+    ReviewMetricsResponse,
+    ReviewResponse,
+    TraceResponse,
+    TraceSpanResponse,
+)
+from app.services.review_runner import get_review_runner
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -32,6 +44,7 @@ async def create_review(
         papers_limit=settings.papers_per_review,
         model=settings.default_model,
         user_id=str(current_user.id),
+        refresh_cached=request.refresh,
     )
     logger.info(f"User {current_user.email} created review {review.id}")
     return orm_to_response(review)
@@ -51,6 +64,83 @@ async def get_review(
     return orm_to_response(review)
 
 
+@router.post("/reviews/{review_id}/refresh", response_model=ReviewResponse, status_code=202,
+             dependencies=[Depends(check_rate_limit)])
+async def refresh_review(
+    review_id: str,
+    current_user: UserORM = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Add papers published since a completed review ran; runs in the background (must belong to current user)."""
+    repo = ReviewRepository(db)
+    review = await repo.get_review(review_id, user_id=str(current_user.id))
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+    runner = get_review_runner()
+    if review.status != "completed" or runner.is_running(str(review.id)):
+        raise HTTPException(status_code=409, detail="Only completed reviews that are not running can be refreshed")
+    runner.refresh(str(review.id))
+    logger.info(f"User {current_user.email} refreshed review {review.id}")
+    return orm_to_response(review)
+
+
+@router.post("/reviews/{review_id}/cancel", response_model=ReviewResponse)
+async def cancel_review(
+    review_id: str,
+    current_user: UserORM = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stop a pending or running review; it ends with the cancelled status (must belong to current user)."""
+    repo = ReviewRepository(db)
+    review = await repo.get_review(review_id, user_id=str(current_user.id))
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+    stopped = await get_review_runner().cancel(str(review.id))
+    # Also covers reviews no run here holds, e.g. interrupted ones waiting to resume
+    cancelled = await repo.cancel_review(str(review.id))
+    if not (stopped or cancelled):
+        raise HTTPException(status_code=409, detail="Only pending or running reviews can be cancelled")
+    logger.info(f"User {current_user.email} cancelled review {review.id}")
+    db.expire_all()
+    return orm_to_response(await repo.get_review(review_id, user_id=str(current_user.id)))
+
+
+@router.get("/reviews/{review_id}/metrics", response_model=ReviewMetricsResponse)
+async def get_review_metrics(
+    review_id: str,
+    current_user: UserORM = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Token, cost and latency accounting for a review (must belong to current user)."""
+    repo = ReviewRepository(db)
+    review = await repo.get_review(review_id, user_id=str(current_user.id))
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+    metrics = await repo.get_metrics(review_id)
+    return metrics_to_response(str(review.id), metrics)
+
+
+@router.get("/reviews/{review_id}/trace", response_model=TraceResponse)
+async def get_review_trace(
+    review_id: str,
+    current_user: UserORM = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Span waterfall for a review (must belong to current user)."""
+    repo = ReviewRepository(db)
+    review = await repo.get_review(review_id, user_id=str(current_user.id))
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+    # Exporters read files (and may wait for pending writes), so off the event loop
+    spans = build_waterfall(await asyncio.to_thread(get_span_exporter().load, str(review.id)))
+    duration_ms = max((s["offset_ms"] + s["duration_ms"] for s in spans), default=0.0)
+    return TraceResponse(
+        trace_id=str(review.id),
+        duration_ms=duration_ms,
+        spans=[TraceSpanResponse(**s) for s in spans],
+    )
+
+
 @router.delete("/reviews/{review_id}", status_code=204)
 async def delete_review(
     review_id: str,
@@ -3,82 +3,115 @@
 import json
 import logging
 from collections.abc import AsyncGenerator
+from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header
 from sse_starlette.sse import EventSourceResponse
 
 from app.api.deps import get_current_user_from_query
 from app.config.settings import get_settings
+from app.core.metrics import SSE_CONNECTIONS_OPEN
 from app.db.database import async_session_factory
-from app.db.models import UserORM
+from app.db.models import ReviewORM, UserORM
 from app.db.review_repository import ReviewRepository
-from app.services import ReviewService
+from app.services.review_runner import get_review_runner
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
-async def review_event_generator(review_id: str, user_id: str) -> AsyncGenerator:
+TERMINAL_EVENTS = ("complete", "error", "cancelled")
+
+
+async def review_event_generator(review_id: str, user_id: str, last_event_id: int | None = None) -> AsyncGenerator:
     """
     Generate SSE events for a review.
-    Opens its own DB session because SSE generators outlive the
-    normal FastAPI request/response Depends lifecycle.
+
+    The review runs in the background (see ReviewRunner); the first
+    stream for a pending review starts it and every stream follows it.
+    Each event carries its index as the SSE id, so a reconnecting
+    EventSource (which sends Last-Event-ID) picks up where it stopped.
+    A review that has already finished gets its outcome as a single event.
     """
     async with async_session_factory() as db:
-        repo = ReviewRepository(db)
-
         # Enforce ownership — user can only stream their own reviews
-        review = await repo.get_review(review_id, user_id=user_id)
-        if not review:
-            yield {
-                "event": "error",
-                "data": json.dumps({"error": "Review not found", "review_id": review_id}),
-            }
-            return
-
-        topic = review.topic
-        papers_limit = review.papers_limit or settings.papers_per_review
-        model = review.model or settings.default_model
-
-        logger.info(f"SSE stream started: review={review_id} user={user_id}")
-
-        try:
-            review_service = ReviewService(db)
-            async for message_data in review_service.start_review(
-                session_id=str(review.id),
-                topic=topic,
-                papers_limit=papers_limit,
-                model=model,
-            ):
-                if message_data.get("type") == "complete":
-                    yield {"event": "complete", "data": json.dumps(message_data)}
-                    break
-                elif message_data.get("type") == "error":
-                    yield {"event": "error", "data": json.dumps(message_data)}
-                    break
-                else:
-                    yield {"event": "message", "data": json.dumps(message_data)}
-
-            logger.info(f"SSE stream completed: review={review_id}")
-
-        except Exception as e:
-            logger.error(f"SSE stream error review={review_id}: {e}", exc_info=True)
-            yield {
-                "event": "error",
-                "data": json.dumps({"error": str(e), "review_id": review_id}),
-            }
+        review = await ReviewRepository(db).get_review(review_id, user_id=user_id)
+    if not review:
+        yield {
+            "event": "error",
+            "data": json.dumps({"error": "Review not found", "review_id": review_id}),
+        }
+        return
+
+    runner = get_review_runner()
+    rid = str(review.id)
+    after = -1
+    if runner.is_running(rid):
+        after = last_event_id if last_event_id is not None else -1
+    elif review.status in ("pending", "in_progress"):
+        runner.start(
+            rid,
+            review.topic,
+            review.papers_limit or settings.papers_per_review,
+            review.model or settings.default_model,
+            reuse=True,
+            idle_cancel=True,
+        )
+    else:
+        yield _outcome_event(review)
+        return
+
+    logger.info(f"SSE stream started: review={review_id} user={user_id}")
+    async for index, message_data in runner.subscribe(rid, after=after):
+        kind = message_data.get("type")
+        if kind in TERMINAL_EVENTS:
+            yield {"event": kind, "id": str(index), "data": json.dumps(message_data)}
+            break
+        yield {"event": "message", "id": str(index), "data": json.dumps(message_data)}
+    logger.info(f"SSE stream completed: review={review_id}")
+
+
+def _outcome_event(review: ReviewORM) -> dict:
+    """The terminal event for a review that is no longer running."""
+    timestamp = (review.completed_at or datetime.utcnow()).isoformat()
+    if review.status == "completed":
+        return {
+            "event": "complete",
+            "data": json.dumps({"type": "complete", "session_id": str(review.id), "timestamp": timestamp}),
+        }
+    if review.status == "cancelled":
+        return {
+            "event": "cancelled",
+            "data": json.dumps({"type": "cancelled", "session_id": str(review.id), "timestamp": timestamp}),
+        }
+    return {
+        "event": "error",
+        "data": json.dumps({"type": "error", "error": "Review failed", "timestamp": timestamp}),
+    }
 
 
 @router.get("/reviews/{review_id}/stream")
 async def stream_review(
     review_id: str,
     current_user: UserORM = Depends(get_current_user_from_query),
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
 ):
     """
     Stream review progress via SSE.
     Auth: pass JWT as ?token=<access_token> (EventSource cannot send headers).
     """
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
     return EventSourceResponse(
-        review_event_generator(review_id, user_id=str(current_user.id))
+        _count_connection(review_event_generator(review_id, user_id=str(current_user.id), last_event_id=after))
     )
+
+
+async def _count_connection(events: AsyncGenerator) -> AsyncGenerator:
+    """Track the SSE stream in the open-connections gauge while it is consumed."""
+    SSE_CONNECTIONS_OPEN.inc()
+    try:
+        async for event in events:
+            yield event
+    finally:
+        SSE_CONNECTIONS_OPEN.dec()
@@ -0,0 +1,175 @@
+"""
+budget.py
+=========
+Per-review budgets for tokens, model calls, tool calls and wall time.
+
+A ReviewBudget is bound to the running review through a context
+variable (like the usage tracker it reads), so the team and the tool
+layer enforce the same limits:
+    - BudgetTermination stops the team once a limit is reached and the
+      summarizer has written a draft; until it has, LitRevTeam hands the
+      next turn to the summarizer, so the best draft so far is finalized
+      instead of the review ending empty-handed
+    - BaseTool refuses calls once any limit is reached, telling the
+      agent to write up what it has
+
+Wall time is the review deadline (settings.review_deadline_seconds, see
+resilience.use_deadline). Calls in flight when a limit is reached
+finish, and the closing summarizer turn is let through, so a review
+overruns its budget by at most one agent turn.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from autogen_agentchat.base import TerminatedException, TerminationCondition
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage, StopMessage
+
+from app.core.context import reset_context_var
+from app.core.logging_config import get_logger
+from app.core.metrics import REVIEW_BUDGET_STOPS
+from app.core.resilience import remaining_time
+from app.core.usage import UsageTracker, get_usage_tracker
+
+if TYPE_CHECKING:
+    from app.config.settings import Settings
+
+logger = get_logger(__name__)
+
+
+# ===============================================================
+# BUDGET
+# ===============================================================
+
+
+@dataclass(frozen=True)
+class ReviewBudget:
+    """
+    Limits on one review's usage; 0 leaves a limit off.
+
+    Attributes:
+        max_tokens: Prompt plus completion tokens across all model calls
+        max_llm_calls: Model calls, the team selector's and planner's included
+        max_tool_calls: Tool calls, the orchestrator's retrieval included
+    """
+
+    max_tokens: int = 0
+    max_llm_calls: int = 0
+    max_tool_calls: int = 0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> ReviewBudget:
+        return cls(
+            max_tokens=settings.review_max_tokens,
+            max_llm_calls=settings.review_max_llm_calls,
+            max_tool_calls=settings.review_max_tool_calls,
+        )
+
+    def exhausted(self, tracker: UsageTracker | None = None) -> str | None:
+        """
+        The first limit the review has reached, or None while it is within budget.
+
+        Args:
+            tracker: Usage to check (defaults to the review's bound tracker)
+
+        Returns:
+            str | None: "time", "tokens", "llm_calls" or "tool_calls"
+        """
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            return "time"
+        tracker = tracker or get_usage_tracker()
+        if tracker is None:
+            return None
+        totals = tracker.totals()
+        if self.max_tokens and totals["prompt_tokens"] + totals["completion_tokens"] >= self.max_tokens:
+            return "tokens"
+        if self.max_llm_calls and totals["llm_calls"] >= self.max_llm_calls:
+            return "llm_calls"
+        if self.max_tool_calls and totals["tool_calls"] >= self.max_tool_calls:
+            return "tool_calls"
+        return None
+
+    def describe(self, limit: str) -> str:
+        """A limit as the agents and the user are told about it."""
+        return {
+            "time": "time budget",
+            "tokens": f"budget of {self.max_tokens} tokens",
+            "llm_calls": f"budget of {self.max_llm_calls} model calls",
+            "tool_calls": f"budget of {self.max_tool_calls} tool calls",
+        }[limit]
+
+
+# ===============================================================
+# TEAM TERMINATION
+# ===============================================================
+
+
+class BudgetTermination(TerminationCondition):
+    """
+    Stops the team once the review's budget is spent and a draft exists.
+
+    Attributes:
+        draft_source: Name of the agent whose messages are drafts
+        has_draft: Whether that agent has spoken, counting turns taken
+            before the team's state was loaded
+        limit: The limit that stopped the team, once it has (kept
+            through reset, which the team calls as its run ends)
+    """
+
+    def __init__(self, draft_source: str, has_draft: bool = False) -> None:
+        self.draft_source = draft_source
+        self.has_draft = has_draft
+        self.limit: str | None = None
+        self._terminated = False
+
+    @property
+    def terminated(self) -> bool:
+        return self._terminated
+
+    async def __call__(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> StopMessage | None:
+        if self._terminated:
+            raise TerminatedException("Termination condition has already been reached")
+        if any(isinstance(m, BaseChatMessage) and m.source == self.draft_source for m in messages):
+            self.has_draft = True
+        budget = get_budget()
+        limit = budget.exhausted() if budget is not None else None
+        if limit is None or not self.has_draft:
+            self.limit = None
+            return None
+        self._terminated = True
+        self.limit = limit
+        REVIEW_BUDGET_STOPS.labels(limit).inc()
+        logger.info(f"Review stopped at its {budget.describe(limit)}")
+        return StopMessage(content=f"Review {budget.describe(limit)} reached", source="BudgetTermination")
+
+    async def reset(self) -> None:
+        # Drafts already written stay in the conversation
+        self._terminated = False
+
+
+# ===============================================================
+# CONTEXT BINDING
+# ===============================================================
+
+_current_budget: ContextVar[ReviewBudget | None] = ContextVar("review_budget", default=None)
+
+
+def get_budget() -> ReviewBudget | None:
+    """Return the budget bound to the current review, if any."""
+    return _current_budget.get()
+
+
+@contextmanager
+def use_budget(budget: ReviewBudget | None) -> Iterator[ReviewBudget | None]:
+    """Bind a budget for the duration of the block."""
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        reset_context_var(_current_budget, token)
@@ -0,0 +1,31 @@
+"""
+context.py
+==========
+Helpers for the context variables that bind a review's state.
+
+The tracker, budget, deadline, cancellation token, replay session and
+trace are each bound by a `use_*` context manager, usually from inside
+the orchestrator's async generators.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar, Token
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+def reset_context_var(var: ContextVar[T], token: Token[T]) -> None:
+    """
+    Restore `var` to its value before `token` was set.
+
+    An async generator closed from another context (by the event loop's
+    finalizer, or a consumer that stopped iterating) cannot reset a
+    variable it set; the value was only ever visible in its own context,
+    so it is left as it is.
+    """
+    try:
+        var.reset(token)
+    except ValueError:
+        pass
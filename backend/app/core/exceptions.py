@@ -146,3 +146,47 @@ if __name__ == "__main__":
         )
     except LitRevError as e:
         print(f"Caught: {e}")
+
+
+class ReplayError(LitRevError):
+    """
+    Raised when a replayed review makes a call the recording cannot answer.
+
+    Examples:
+        - More LLM calls for a stage than were recorded
+        - A tool that was never called during recording
+    """
+
+    def __init__(
+        self,
+        message: str,
+        kind: str | None = None,
+        name: str | None = None,
+        details: dict[str, Any] | None = None,
+    ) -> None:
+        details = details or {}
+        if kind:
+            details["kind"] = kind
+        if name:
+            details["name"] = name
+        super().__init__(message, details)
+
+
+class ReviewInterrupted(LitRevError):
+    """
+    Raised when a review stops at a checkpoint instead of finishing.
+
+    Examples:
+        - Graceful shutdown while the review is running
+    """
+
+    def __init__(
+        self,
+        message: str,
+        stage: str | None = None,
+        details: dict[str, Any] | None = None,
+    ) -> None:
+        details = details or {}
+        if stage:
+            details["stage"] = stage
+        super().__init__(message, details)
@@ -0,0 +1,369 @@
+"""
+metrics.py
+==========
+Lightweight Prometheus-style metrics for the API and review pipeline.
+
+Implements counters, gauges and histograms with labels and renders
+them in the Prometheus text exposition format. Label children are
+cached on first use, so recording on the hot path is a dict lookup
+plus a locked float update.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from collections.abc import Callable, Sequence
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+# ===============================================================
+# METRIC TYPES
+# ===============================================================
+
+
+class _Metric:
+    """Shared label handling for all metric types."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str, **kwargs: str):
+        """Return the child for a label combination, creating it on first use."""
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def _default(self):
+        """The unlabelled child, for metrics declared without labels."""
+        return self.labels()
+
+    def _format_labels(self, key: tuple[str, ...], extra: dict[str, str] | None = None) -> str:
+        pairs = list(zip(self.labelnames, key, strict=False))
+        if extra:
+            pairs.extend(extra.items())
+        if not pairs:
+            return ""
+        body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+        return "{" + body + "}"
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for key, child in list(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key: tuple[str, ...], child: object) -> list[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    """A single float guarded by a lock."""
+
+    __slots__ = ("value", "_lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def _render_child(self, key: tuple[str, ...], child: _Value) -> list[str]:
+        return [f"{self.name}{self._format_labels(key)} {child.value}"]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._function: Callable[[], float] | None = None
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the (unlabelled) value by calling function at scrape time."""
+        self._function = function
+
+    def render(self) -> list[str]:
+        if self._function is not None:
+            try:
+                self.set(self._function())
+            except Exception as e:
+                logger.debug(f"Gauge {self.name} callback failed: {e}")
+        return super().render()
+
+    def _render_child(self, key: tuple[str, ...], child: _Value) -> list[str]:
+        return [f"{self.name}{self._format_labels(key)} {child.value}"]
+
+
+class _HistogramValue:
+    """Bucket counts, sum and count for one label combination."""
+
+    __slots__ = ("upper_bounds", "counts", "sum", "_lock")
+
+    def __init__(self, upper_bounds: tuple[float, ...]) -> None:
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def _render_child(self, key: tuple[str, ...], child: _HistogramValue) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, child.counts, strict=False):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': _fmt(bound)})} {cumulative}")
+        cumulative += child.counts[-1]
+        lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': '+Inf'})} {cumulative}")
+        lines.append(f"{self.name}_sum{self._format_labels(key)} {child.sum}")
+        lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value))
+
+
+# ===============================================================
+# REGISTRY
+# ===============================================================
+
+
+class MetricsRegistry:
+    """Holds all metrics and renders them for scraping."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        if not metric.labelnames:
+            # Unlabelled metrics are exported as 0 before their first update
+            metric.labels()
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# ===============================================================
+# APPLICATION METRICS
+# ===============================================================
+
+HTTP_REQUEST_DURATION = histogram(
+    "litrev_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+SSE_CONNECTIONS_OPEN = gauge(
+    "litrev_sse_connections_open",
+    "Open review SSE streams",
+)
+REVIEWS_RUNNING = gauge(
+    "litrev_reviews_running",
+    "Reviews currently executing in this process",
+)
+REVIEWS_QUEUED = gauge(
+    "litrev_reviews_queued",
+    "Recently created reviews that have not started yet",
+)
+REVIEWS_CANCELLED = counter(
+    "litrev_reviews_cancelled_total",
+    "Running reviews cancelled, by reason (requested, abandoned)",
+    ["reason"],
+)
+REVIEW_BUDGET_STOPS = counter(
+    "litrev_review_budget_stops_total",
+    "Review teams stopped by their budget, by limit (time, tokens, llm_calls, tool_calls)",
+    ["limit"],
+)
+TOOL_CALL_DURATION = histogram(
+    "litrev_tool_call_duration_seconds",
+    "Tool call latency by source",
+    ["tool"],
+)
+TOOL_CALL_ERRORS = counter(
+    "litrev_tool_call_errors_total",
+    "Failed tool calls by source",
+    ["tool"],
+)
+OUTBOUND_QUEUE_WAIT = histogram(
+    "litrev_outbound_queue_wait_seconds",
+    "Time outbound requests waited for a per-host slot, by host policy",
+    ["host"],
+)
+OUTBOUND_THROTTLED = counter(
+    "litrev_outbound_throttled_total",
+    "Upstream 429/503 responses by host policy and status",
+    ["host", "status"],
+)
+TOOL_RETRIES = counter(
+    "litrev_tool_retries_total",
+    "Tool calls retried after a transient upstream failure",
+    ["tool"],
+)
+TOOL_CALLS_COALESCED = counter(
+    "litrev_tool_calls_coalesced_total",
+    "Tool calls answered by an identical call already in flight",
+    ["tool"],
+)
+TOOL_HEDGES = counter(
+    "litrev_tool_hedges_total",
+    "Slow tool calls by hedging outcome (won, lost, skipped, failed)",
+    ["tool", "outcome"],
+)
+TOOL_HEDGE_SAVED = histogram(
+    "litrev_tool_hedge_saved_seconds",
+    "How much sooner a winning hedge answered than the call it hedged",
+    ["tool"],
+)
+CIRCUIT_STATE = gauge(
+    "litrev_circuit_state",
+    "Circuit breaker state per source (0 closed, 1 half-open, 2 open)",
+    ["source"],
+)
+LLM_CALL_DURATION = histogram(
+    "litrev_llm_call_duration_seconds",
+    "Model call latency by agent",
+    ["agent", "model"],
+)
+LLM_TOKENS = counter(
+    "litrev_llm_tokens_total",
+    "Tokens used by agent and direction",
+    ["agent", "type"],
+)
+LLM_FALLBACKS = counter(
+    "litrev_llm_fallbacks_total",
+    "Model calls retried on the fallback model, by agent, failed model and reason (timeout, rate_limited)",
+    ["agent", "model", "reason"],
+)
+DB_POOL_CHECKED_OUT = gauge(
+    "litrev_db_pool_checked_out",
+    "Database connections currently checked out of the pool",
+)
+CACHE_REQUESTS = counter(
+    "litrev_cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"],
+)
+
+
+def record_cache_lookup(cache: str, hit: bool, revalidated: bool = False) -> None:
+    """
+    Count a cache lookup; hit rate is (hits + revalidated) / all lookups.
+
+    A revalidated lookup served a stale entry after the origin confirmed
+    it (HTTP 304): a request was made, but nothing was transferred.
+    """
+    result = "revalidated" if revalidated else "hit" if hit else "miss"
+    CACHE_REQUESTS.labels(cache, result).inc()
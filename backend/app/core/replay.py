@@ -0,0 +1,246 @@
+"""
+replay.py
+=========
+Record and replay of a review's LLM and tool I/O.
+
+A ReviewRecorder bound to a review captures every model request and
+response and every tool call with its result and timing; save() writes
+them as a gzipped JSON-lines file. A ReviewReplayer loaded from that
+file answers the same calls from the recording instead of the network,
+sleeping for the recorded duration divided by `speed` (0 skips the
+delay), so optimizations can be compared on identical inputs.
+
+Like the usage tracker, the active session is bound through a context
+variable and picked up by InstrumentedChatCompletionClient and BaseTool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Literal
+
+from app.core.context import reset_context_var
+from app.core.exceptions import ReplayError
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+FORMAT_VERSION = 1
+
+
+# ===============================================================
+# ENTRIES
+# ===============================================================
+
+
+@dataclass
+class ReplayEntry:
+    """
+    One recorded call.
+
+    Attributes:
+        kind: "llm" or "tool"
+        name: Agent stage for LLM calls, tool name for tool calls
+        key: Fingerprint of the request, used to match calls on replay
+        offset_ms: Start of the call relative to the start of the recording
+        duration_ms: Wall time of the call
+        request: Serialized request (messages, or tool arguments)
+        response: Serialized response (CreateResult, or tool result)
+        error: Error message if the call raised
+    """
+
+    kind: Literal["llm", "tool"]
+    name: str
+    key: str
+    offset_ms: float
+    duration_ms: float
+    request: Any
+    response: Any = None
+    error: str | None = None
+
+
+def request_key(kind: str, name: str, request: Any) -> str:
+    """Stable fingerprint of a call; identical inputs replay identical outputs."""
+    payload = json.dumps([kind, name, request], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+# ===============================================================
+# RECORDER
+# ===============================================================
+
+
+class ReviewRecorder:
+    """
+    Collects the calls made during one review.
+
+    Attributes:
+        metadata: Review parameters stored in the file header (topic, num_papers, ...)
+        entries: Calls in completion order
+    """
+
+    def __init__(self, **metadata: Any) -> None:
+        self.metadata = metadata
+        self.entries: list[ReplayEntry] = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        kind: Literal["llm", "tool"],
+        name: str,
+        request: Any,
+        response: Any,
+        started: float,
+        error: str | None = None,
+    ) -> None:
+        """
+        Record a finished call.
+
+        Args:
+            kind: "llm" or "tool"
+            name: Agent stage or tool name
+            request: JSON-serializable request
+            response: JSON-serializable response (None on error)
+            started: time.perf_counter() value when the call began
+            error: Error message if the call raised
+        """
+        now = time.perf_counter()
+        entry = ReplayEntry(
+            kind=kind,
+            name=name,
+            key=request_key(kind, name, request),
+            offset_ms=(started - self._start) * 1000,
+            duration_ms=(now - started) * 1000,
+            request=request,
+            response=response,
+            error=error,
+        )
+        with self._lock:
+            self.entries.append(entry)
+
+    def save(self, path: str | Path) -> Path:
+        """Write the recording as gzipped JSON lines: a header, then one entry per line."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = {
+            "version": FORMAT_VERSION,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            **self.metadata,
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps(header, default=str) + "\n")
+            for entry in self.entries:
+                f.write(json.dumps(asdict(entry), default=str, separators=(",", ":")) + "\n")
+        logger.info(f"Saved review recording with {len(self.entries)} calls to {path}")
+        return path
+
+
+# ===============================================================
+# REPLAYER
+# ===============================================================
+
+
+class ReviewReplayer:
+    """
+    Serves recorded responses back to the agents and tools.
+
+    Calls are matched by request fingerprint within their (kind, name)
+    queue; if a request differs from the recording (e.g. a prompt was
+    changed) the next unused entry of that queue is used instead and
+    counted in `mismatches`.
+
+    Attributes:
+        metadata: Header of the recording (topic, num_papers, ...)
+        entries: Recorded calls in start order
+        speed: Timing multiplier; 1.0 replays recorded durations, 0 replays instantly
+        mismatches: Calls answered by position rather than by fingerprint
+    """
+
+    def __init__(self, metadata: dict[str, Any], entries: list[ReplayEntry], speed: float = 1.0) -> None:
+        self.metadata = metadata
+        self.entries = entries
+        self.speed = speed
+        self.mismatches = 0
+        self._pending: dict[tuple[str, str], list[ReplayEntry]] = {}
+        for entry in entries:
+            self._pending.setdefault((entry.kind, entry.name), []).append(entry)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str | Path, speed: float = 1.0) -> ReviewReplayer:
+        """Read a recording written by ReviewRecorder.save."""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            metadata = json.loads(f.readline())
+            if metadata.get("version") != FORMAT_VERSION:
+                raise ReplayError(f"Unsupported recording version in {path}: {metadata.get('version')}")
+            entries = [ReplayEntry(**json.loads(line)) for line in f if line.strip()]
+        # Calls are saved in completion order; replay them in start order
+        entries.sort(key=lambda e: e.offset_ms)
+        return cls(metadata, entries, speed)
+
+    def fork(self) -> ReviewReplayer:
+        """A fresh replayer over the same recording, for replaying it again."""
+        return ReviewReplayer(self.metadata, self.entries, self.speed)
+
+    @property
+    def remaining(self) -> int:
+        return sum(len(queue) for queue in self._pending.values())
+
+    async def take(self, kind: Literal["llm", "tool"], name: str, request: Any) -> ReplayEntry:
+        """
+        Claim the recorded entry for a call and wait out its recorded duration.
+
+        Raises:
+            ReplayError: If the recording has no (further) calls for this kind and name
+        """
+        key = request_key(kind, name, request)
+        with self._lock:
+            queue = self._pending.get((kind, name))
+            if not queue:
+                raise ReplayError(f"No recorded {kind} call left for {name}", kind=kind, name=name)
+            index = next((i for i, e in enumerate(queue) if e.key == key), None)
+            if index is None:
+                self.mismatches += 1
+                logger.debug(f"Replay mismatch for {kind} {name}; using next recorded call")
+                index = 0
+            entry = queue.pop(index)
+
+        if self.speed > 0:
+            await asyncio.sleep(entry.duration_ms / 1000 / self.speed)
+        return entry
+
+
+# ===============================================================
+# CONTEXT PROPAGATION
+# ===============================================================
+
+ReplaySession = ReviewRecorder | ReviewReplayer
+
+_current_session: ContextVar[ReplaySession | None] = ContextVar("replay_session", default=None)
+
+
+def get_replay_session() -> ReplaySession | None:
+    """Return the recorder or replayer bound to the current review, if any."""
+    return _current_session.get()
+
+
+@contextmanager
+def use_replay_session(session: ReplaySession | None) -> Iterator[ReplaySession | None]:
+    """Bind a recorder or replayer for the duration of the block."""
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        reset_context_var(_current_session, token)
@@ -0,0 +1,266 @@
+"""
+resilience.py
+=============
+Deadlines, cancellation, retry policies and circuit breakers for upstream calls.
+
+A review's deadline is bound through a context variable (like the usage
+tracker), so every tool call it makes, including calls running in tool
+threads, can see how much time is left and cap its retries, queueing
+and socket timeouts accordingly. A review's cancellation token is bound
+the same way: model and tool calls awaited through cancellable() stop
+as soon as the review is cancelled, even inside AutoGen's runtime, and
+a cancelled review has no time left for new retries. RetryPolicy retries transient failures
+with full-jitter exponential backoff. CircuitBreaker tracks the recent
+error rate of one source and fails calls fast while the source is down,
+instead of letting every review wait out its timeouts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from autogen_core import CancellationToken
+
+from app.config.settings import get_settings
+from app.core.context import reset_context_var
+from app.core.logging_config import get_logger
+from app.core.metrics import CIRCUIT_STATE
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+# ===============================================================
+# DEADLINES
+# ===============================================================
+
+_deadline: ContextVar[float | None] = ContextVar("review_deadline", default=None)
+
+
+@contextmanager
+def use_deadline(seconds: float | None) -> Iterator[None]:
+    """
+    Bind a deadline `seconds` from now for the enclosed calls.
+
+    A nested deadline never extends an outer one; None or 0 leaves the
+    current deadline (if any) in place.
+    """
+    if not seconds:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(deadline, outer))
+    try:
+        yield
+    finally:
+        reset_context_var(_deadline, token)
+
+
+def remaining_time() -> float | None:
+    """Seconds left before the current deadline (0 once cancelled), or None when there is none."""
+    token = _cancellation.get()
+    if token is not None and token.is_cancelled():
+        return 0.0
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def bounded_timeout(timeout: float) -> float:
+    """timeout, shortened to the time left before the deadline (never below 0)."""
+    remaining = remaining_time()
+    return timeout if remaining is None else max(min(timeout, remaining), 0.0)
+
+
+# ===============================================================
+# CANCELLATION
+# ===============================================================
+
+_cancellation: ContextVar[CancellationToken | None] = ContextVar("review_cancellation", default=None)
+
+
+@contextmanager
+def use_cancellation(token: CancellationToken) -> Iterator[CancellationToken]:
+    """Bind a cancellation token for the enclosed calls."""
+    reset = _cancellation.set(token)
+    try:
+        yield token
+    finally:
+        reset_context_var(_cancellation, reset)
+
+
+async def cancellable(awaitable: Awaitable[T]) -> T:
+    """
+    Await `awaitable`, cancelling it when the bound token is cancelled.
+
+    Cancelling a review's task does not reach calls made inside AutoGen's
+    runtime, which runs agents in tasks of its own; linking those calls
+    to the review's token does.
+    """
+    token = _cancellation.get()
+    if token is None:
+        return await awaitable
+    future = asyncio.ensure_future(awaitable)
+    token.link_future(future)
+    return await future
+
+
+def shared_call(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    func, run with no review's deadline or cancellation token bound.
+
+    For calls several reviews wait on (see single_flight.py): the review
+    that happened to start the call running out of time, or being
+    cancelled, must not fail it for the others. Each review bounds only
+    its own wait instead.
+    """
+
+    @functools.wraps(func)
+    def call(*args: Any, **kwargs: Any) -> T:
+        deadline = _deadline.set(None)
+        cancellation = _cancellation.set(None)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            reset_context_var(_cancellation, cancellation)
+            reset_context_var(_deadline, deadline)
+
+    return call
+
+
+# ===============================================================
+# RETRY POLICY
+# ===============================================================
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    How often and how patiently to retry a transient failure.
+
+    Attributes:
+        attempts: Total tries, including the first
+        base_delay: Backoff ceiling for the first retry, in seconds
+        max_delay: Backoff ceiling for any retry
+    """
+
+    attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def delay(self, retry: int) -> float:
+        """Full-jitter backoff before retry number `retry` (0-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+
+# ===============================================================
+# CIRCUIT BREAKER
+# ===============================================================
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker for one upstream source.
+
+    Closed: calls pass and their outcomes fill a sliding window. Once the
+    window holds min_calls outcomes and the failure rate reaches
+    failure_rate, the breaker opens and rejects calls for open_seconds.
+    It then lets a single trial call through (half-open); success closes
+    it, failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        min_calls: int = 5,
+        window: int = 20,
+        open_seconds: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.state = self.CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.labels(name).set(0)
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    return False
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self._trial_running:
+                    return False
+                self._trial_running = True
+            return True
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a trial call through."""
+        return max(self.open_seconds - (time.monotonic() - self._opened_at), 0.0)
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of an allowed call."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trial_running = False
+                if success:
+                    self._outcomes.clear()
+                    self._set_state(self.CLOSED)
+                else:
+                    self._open()
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._set_state(self.OPEN)
+        logger.warning(f"Circuit for {self.name} opened; failing fast for {self.open_seconds:.0f}s")
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_STATE.labels(self.name).set({self.CLOSED: 0, self.HALF_OPEN: 1, self.OPEN: 2}[state])
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Process-wide breaker for a source, configured from settings."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                settings = get_settings()
+                breaker = _breakers[name] = CircuitBreaker(
+                    name,
+                    failure_rate=settings.breaker_failure_rate,
+                    min_calls=settings.breaker_min_calls,
+                    window=settings.breaker_window,
+                    open_seconds=settings.breaker_open_seconds,
+                )
+    return breaker
@@ -0,0 +1,103 @@
+"""
+topics.py
+=========
+Topic normalization for recognizing near-identical review requests.
+
+Case, word order, plurals, stopwords and framing phrases at the start
+or end of the topic ("a survey of", "recent advances in", "state of the
+art", ": a review") are ignored, and common abbreviations are expanded,
+so "LLM agents" and "Large language model agents: a survey" normalize to
+the same words and share one fingerprint. Words like "review" or "state"
+inside a topic are kept: "code review automation" is not "code
+automation".
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "which with we our their these those can how what when where who why".split()
+)
+
+ABBREVIATIONS = {
+    "llm": "large language model",
+    "lm": "language model",
+    "vlm": "vision language model",
+    "gnn": "graph neural network",
+    "cnn": "convolutional neural network",
+    "rnn": "recurrent neural network",
+    "gan": "generative adversarial network",
+    "vae": "variational autoencoder",
+    "vit": "vision transformer",
+    "rag": "retrieval augmented generation",
+    "rl": "reinforcement learning",
+    "rlhf": "reinforcement learning human feedback",
+    "nlp": "natural language processing",
+    "cv": "computer vision",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+}
+
+# Phrases that frame a topic without changing what it is about, stripped
+# only where they frame it: "a survey of X", "X: a review", "X survey".
+# A bare trailing "review" is kept ("code review", "peer review").
+_FRAME = r"(?:(?:systematic|comprehensive|brief) )?(?:literature review|survey|review|overview|introduction)s?"
+_BARE_FRAME = r"(?:literature review|survey|overview)s?"
+_ADVANCES = r"(?:(?:recent )?(?:advances|progress|developments)|(?:the )?state of the art)"
+LEADING_FRAME = re.compile(rf"^(?:(?:a|an|the) )?(?:{_FRAME}|{_ADVANCES}) (?:of|on|in|for|to) ")
+TRAILING_FRAME = re.compile(
+    rf"(?: ?[:,(\-–—] ?(?:(?:a|an|the) )?(?:{_FRAME}|{_ADVANCES})\)?"
+    rf"| (?:a|an) {_FRAME}"
+    rf"| (?:{_BARE_FRAME}|{_ADVANCES}))$"
+)
+
+
+def _singular(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def normalize_topic(topic: str) -> str:
+    """
+    Canonical form of a topic: its distinct content words, singular and sorted.
+
+    Examples:
+        "LLM agents" -> "agent language large model"
+        "A survey of large language model agents" -> "agent language large model"
+    """
+    return " ".join(sorted(_content_words(_strip_framing(topic)) or _content_words(topic)))
+
+
+def _strip_framing(topic: str) -> str:
+    """The topic without framing phrases at its start or end."""
+    text = " ".join(topic.lower().split())
+    while True:
+        stripped = TRAILING_FRAME.sub("", LEADING_FRAME.sub("", text)).strip()
+        if stripped == text:
+            return text
+        text = stripped
+
+
+def _content_words(text: str) -> set[str]:
+    words: set[str] = set()
+    for token in WORD_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        token = _singular(token)
+        expanded = ABBREVIATIONS.get(token, token)
+        words.update(_singular(word) for word in expanded.split())
+    return words
+
+
+def topic_fingerprint(topic: str) -> str:
+    """Stable hash of the normalized topic, stored on each review."""
+    return hashlib.sha256(normalize_topic(topic).encode("utf-8")).hexdigest()
@@ -0,0 +1,343 @@
+"""
+tracing.py
+==========
+Span-based tracing for the review pipeline.
+
+Spans are tracked through context variables, so nesting follows the
+async call chain — including the orchestrator's async generators and
+the tasks AutoGen spawns from them. Finished spans are handed to a
+pluggable SpanExporter; the default JSON-file exporter works offline
+and lets the API rebuild a per-review waterfall.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import importlib
+import json
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from app.config.settings import get_settings
+from app.core.context import reset_context_var
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# ===============================================================
+# SPAN
+# ===============================================================
+
+
+@dataclass
+class Span:
+    """
+    A timed unit of work within a trace.
+
+    Attributes:
+        trace_id: Trace the span belongs to (the review id)
+        span_id: Unique span identifier
+        parent_id: Enclosing span, None for the root
+        name: Operation name, e.g. "review.plan" or "tool.arxiv_search"
+        start: Wall-clock start (epoch seconds)
+        end: Wall-clock end (epoch seconds), None while open
+        attributes: Free-form metadata
+        status: "ok" or "error"
+    """
+
+    trace_id: str
+    name: str
+    parent_id: str | None = None
+    span_id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    start: float = field(default_factory=time.time)
+    end: float | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.time()
+        return (end - self.start) * 1000
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+# ===============================================================
+# EXPORTERS
+# ===============================================================
+
+
+class SpanExporter(ABC):
+    """Destination for finished spans."""
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """Receive one finished span."""
+
+    def load(self, trace_id: str) -> list[dict[str, Any]]:
+        """Return stored spans for a trace. Exporters that cannot read back return []."""
+        return []
+
+
+class NoopSpanExporter(SpanExporter):
+    """Discards spans; used when tracing is disabled."""
+
+    def export(self, span: Span) -> None:
+        pass
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """
+    Appends spans as JSON lines to one file per trace.
+
+    Finished spans are buffered per trace and written once the trace's
+    root span ends, on a writer thread, so tracing adds no file I/O to
+    the event loop. load() also returns the spans still buffered, so a
+    running review's waterfall is complete.
+
+    Attributes:
+        directory: Where trace files are written
+        max_traces: Oldest trace files beyond this count are deleted
+        max_buffered: Spans a trace buffers before they are written
+            without waiting for its root span
+    """
+
+    def __init__(self, directory: str | Path, max_traces: int = 1000, max_buffered: int = 1000) -> None:
+        self.directory = Path(directory)
+        self.max_traces = max_traces
+        self.max_buffered = max_buffered
+        self._lock = threading.Lock()
+        self._buffered: dict[str, list[str]] = {}
+        # One worker, so writes land in the order spans finished
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="span-export")
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, trace_id: str) -> Path:
+        safe = "".join(c for c in trace_id if c.isalnum() or c in "-_")
+        return self.directory / f"{safe}.jsonl"
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            lines = self._buffered.setdefault(span.trace_id, [])
+            lines.append(line)
+            if span.parent_id is not None and len(lines) < self.max_buffered:
+                return
+            del self._buffered[span.trace_id]
+        self._writer.submit(self._write, span.trace_id, lines)
+
+    def flush(self) -> None:
+        """Wait until every span handed to the writer is on disk."""
+        self._writer.submit(lambda: None).result()
+
+    def load(self, trace_id: str) -> list[dict[str, Any]]:
+        self.flush()
+        with self._lock:
+            lines = list(self._buffered.get(trace_id, []))
+        path = self._path(trace_id)
+        if path.exists():
+            with path.open(encoding="utf-8") as f:
+                lines = list(f) + lines
+        return [json.loads(line) for line in lines if line.strip()]
+
+    def _write(self, trace_id: str, lines: list[str]) -> None:
+        path = self._path(trace_id)
+        try:
+            is_new = not path.exists()
+            with path.open("a", encoding="utf-8") as f:
+                f.writelines(lines)
+            if is_new:
+                self._prune()
+        except OSError as e:
+            logger.warning(f"Could not write {len(lines)} spans of trace {trace_id}: {e}")
+
+    def _prune(self) -> None:
+        files = sorted(self.directory.glob("*.jsonl"), key=lambda p: p.stat().st_mtime)
+        for stale in files[: max(0, len(files) - self.max_traces)]:
+            stale.unlink(missing_ok=True)
+
+
+def _build_exporter(name: str, directory: str) -> SpanExporter:
+    """Resolve the configured exporter: "none", "jsonfile", or a dotted class path."""
+    if name == "none":
+        return NoopSpanExporter()
+    if name == "jsonfile":
+        return JsonFileSpanExporter(directory)
+    module_name, _, class_name = name.rpartition(".")
+    exporter_cls = getattr(importlib.import_module(module_name), class_name)
+    return exporter_cls()
+
+
+_exporter: SpanExporter | None = None
+
+
+def get_span_exporter() -> SpanExporter:
+    """Get or create the process-wide span exporter from settings."""
+    global _exporter
+    if _exporter is None:
+        settings = get_settings()
+        try:
+            _exporter = _build_exporter(settings.tracing_exporter, settings.tracing_dir)
+        except Exception as e:
+            logger.warning(f"Tracing exporter {settings.tracing_exporter!r} unavailable, disabling: {e}")
+            _exporter = NoopSpanExporter()
+    return _exporter
+
+
+def set_span_exporter(exporter: SpanExporter | None) -> None:
+    """Replace the process-wide span exporter; None restores the configured one."""
+    global _exporter
+    _exporter = exporter
+
+
+# ===============================================================
+# CONTEXT PROPAGATION
+# ===============================================================
+
+_current_trace_id: ContextVar[str | None] = ContextVar("trace_id", default=None)
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def trace(trace_id: str | None) -> Iterator[None]:
+    """Bind a trace id; spans opened inside the block belong to it."""
+    token = _current_trace_id.set(trace_id)
+    span_token = _current_span.set(None)
+    try:
+        yield
+    finally:
+        reset_context_var(_current_span, span_token)
+        reset_context_var(_current_trace_id, token)
+
+
+def current_trace_id() -> str | None:
+    return _current_trace_id.get()
+
+
+@contextmanager
+def start_span(name: str, **attributes: Any) -> Iterator[Span | None]:
+    """
+    Open a span as a child of the current one.
+
+    Outside a trace this is a no-op yielding None, so instrumented code
+    paths cost nothing when no review is being traced.
+    """
+    trace_id = _current_trace_id.get()
+    if trace_id is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    span = Span(
+        trace_id=trace_id,
+        name=name,
+        parent_id=parent.span_id if parent else None,
+        attributes=attributes,
+    )
+    token = _current_span.set(span)
+    try:
+        yield span
+    except (GeneratorExit, asyncio.CancelledError):
+        span.status = "cancelled"
+        raise
+    except BaseException as e:
+        span.status = "error"
+        span.attributes["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        span.end = time.time()
+        reset_context_var(_current_span, token)
+        _export(span)
+
+
+def record_span(name: str, start: float, end: float, **attributes: Any) -> None:
+    """Record an already-finished span under the current one (e.g. a team turn seen after the fact)."""
+    trace_id = _current_trace_id.get()
+    if trace_id is None:
+        return
+    parent = _current_span.get()
+    _export(
+        Span(
+            trace_id=trace_id,
+            name=name,
+            parent_id=parent.span_id if parent else None,
+            start=start,
+            end=end,
+            attributes=attributes,
+        )
+    )
+
+
+def traced(name: str) -> Callable:
+    """Decorator opening a span around an async function."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with start_span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _export(span: Span) -> None:
+    try:
+        get_span_exporter().export(span)
+    except Exception as e:
+        logger.debug(f"Span export failed for {span.name}: {e}")
+
+
+# ===============================================================
+# WATERFALL
+# ===============================================================
+
+
+def build_waterfall(spans: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Order spans depth-first under their parents with offsets from trace start.
+
+    Returns:
+        List of span dicts with added depth and offset_ms keys
+    """
+    if not spans:
+        return []
+
+    trace_start = min(s["start"] for s in spans)
+    by_parent: dict[str | None, list[dict[str, Any]]] = {}
+    known = {s["span_id"] for s in spans}
+    for s in spans:
+        # Spans whose parent was never exported are shown as roots
+        parent = s.get("parent_id") if s.get("parent_id") in known else None
+        by_parent.setdefault(parent, []).append(s)
+
+    ordered: list[dict[str, Any]] = []
+
+    def visit(parent_id: str | None, depth: int) -> None:
+        for s in sorted(by_parent.get(parent_id, []), key=lambda x: x["start"]):
+            end = s.get("end") or s["start"]
+            ordered.append(
+                {
+                    **s,
+                    "depth": depth,
+                    "offset_ms": (s["start"] - trace_start) * 1000,
+                    "duration_ms": (end - s["start"]) * 1000,
+                }
+            )
+            visit(s["span_id"], depth + 1)
+
+    visit(None, 0)
+    return ordered
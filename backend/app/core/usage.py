@@ -0,0 +1,174 @@
+"""
+usage.py
+========
+Per-review token, cost and latency accounting.
+
+A UsageTracker is bound to the running review through a context
+variable, so the LLM client wrapper and the tool layer can record
+calls without the tracker being threaded through every constructor.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Literal
+
+from app.core.context import reset_context_var
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# USD per 1M tokens as (prompt, completion). Unknown models are costed at 0.
+MODEL_PRICING: dict[str, tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+
+# ===============================================================
+# RECORDS
+# ===============================================================
+
+
+@dataclass
+class UsageRecord:
+    """
+    A single LLM call or tool call made during a review.
+
+    Attributes:
+        stage: Agent name for LLM calls, tool name for tool calls
+        kind: "llm" or "tool"
+        name: Model identifier for LLM calls, tool name for tool calls
+        prompt_tokens: Prompt tokens reported by the model client
+        completion_tokens: Completion tokens reported by the model client
+        duration_ms: Wall time of the call
+        payload_bytes: Size of the tool result handed back to the LLM
+        cost_usd: Estimated cost of the call
+        error: Whether the call raised
+        started_at: When the call started
+    """
+
+    stage: str
+    kind: Literal["llm", "tool"]
+    name: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    duration_ms: float = 0.0
+    payload_bytes: int = 0
+    cost_usd: float = 0.0
+    error: bool = False
+    started_at: datetime = field(default_factory=datetime.utcnow)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimate the USD cost of a model call from MODEL_PRICING.
+
+    Dated model snapshots (e.g. gpt-4o-mini-2024-07-18) are priced
+    as their base model.
+    """
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        base = next((m for m in sorted(MODEL_PRICING, key=len, reverse=True) if model.startswith(m)), None)
+        pricing = MODEL_PRICING.get(base, (0.0, 0.0)) if base else (0.0, 0.0)
+    prompt_price, completion_price = pricing
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+# ===============================================================
+# TRACKER
+# ===============================================================
+
+
+class UsageTracker:
+    """
+    Collects UsageRecords for one review.
+
+    Records are kept in memory and flushed to the database by the
+    caller in a single write once the review finishes.
+    """
+
+    def __init__(self) -> None:
+        self.records: list[UsageRecord] = []
+
+    def record_llm_call(
+        self,
+        stage: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        duration_ms: float,
+        error: bool = False,
+    ) -> UsageRecord:
+        """Record one model client call."""
+        record = UsageRecord(
+            stage=stage,
+            kind="llm",
+            name=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            duration_ms=duration_ms,
+            cost_usd=estimate_cost(model, prompt_tokens, completion_tokens),
+            error=error,
+        )
+        self.records.append(record)
+        return record
+
+    def record_tool_call(
+        self,
+        tool_name: str,
+        duration_ms: float,
+        payload_bytes: int,
+        error: bool = False,
+    ) -> UsageRecord:
+        """Record one tool invocation."""
+        record = UsageRecord(
+            stage=tool_name,
+            kind="tool",
+            name=tool_name,
+            duration_ms=duration_ms,
+            payload_bytes=payload_bytes,
+            error=error,
+        )
+        self.records.append(record)
+        return record
+
+    def totals(self) -> dict[str, float]:
+        """Summed tokens, cost and call counts across all records."""
+        llm = [r for r in self.records if r.kind == "llm"]
+        return {
+            "prompt_tokens": sum(r.prompt_tokens for r in llm),
+            "completion_tokens": sum(r.completion_tokens for r in llm),
+            "cost_usd": sum(r.cost_usd for r in llm),
+            "llm_calls": len(llm),
+            "tool_calls": len(self.records) - len(llm),
+        }
+
+
+# ===============================================================
+# CONTEXT BINDING
+# ===============================================================
+
+_current_tracker: ContextVar[UsageTracker | None] = ContextVar("usage_tracker", default=None)
+
+
+def get_usage_tracker() -> UsageTracker | None:
+    """Return the tracker bound to the current review, if any."""
+    return _current_tracker.get()
+
+
+@contextmanager
+def track_usage(tracker: UsageTracker | None) -> Iterator[UsageTracker | None]:
+    """Bind a tracker for the duration of the block."""
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        reset_context_var(_current_tracker, token)
@@ -1,7 +1,16 @@
 """Database package"""
 
 from app.db.database import async_session_factory, engine, get_db
-from app.db.models import Base, MessageORM, PaperORM, ReviewORM
+from app.db.models import (
+    Base,
+    MessageORM,
+    PaperORM,
+    ReviewCheckpointORM,
+    ReviewMetricORM,
+    ReviewORM,
+    ReviewPaperORM,
+)
+from app.db.paper_repository import PaperRepository, normalize_paper_id
 from app.db.review_repository import ReviewRepository
 
 __all__ = [
@@ -9,7 +18,12 @@ __all__ = [
     "ReviewORM",
     "MessageORM",
     "PaperORM",
+    "ReviewPaperORM",
+    "ReviewMetricORM",
+    "ReviewCheckpointORM",
     "ReviewRepository",
+    "PaperRepository",
+    "normalize_paper_id",
     "engine",
     "async_session_factory",
     "get_db",
@@ -3,6 +3,7 @@ from collections.abc import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config.settings import get_backend_settings
+from app.core.metrics import DB_POOL_CHECKED_OUT
 
 settings = get_backend_settings()
 
@@ -10,6 +11,8 @@ engine = create_async_engine(settings.database_url, echo=False, pool_size=10, ma
 
 async_session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+DB_POOL_CHECKED_OUT.set_function(engine.pool.checkedout)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """FastAPI dependency that yields a DB session."""
@@ -1,9 +1,26 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import ARRAY, UUID
-from sqlalchemy.orm import DeclarativeBase, relationship
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Computed,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR, UUID
+from sqlalchemy.orm import DeclarativeBase, deferred, relationship
+
+# Full-text document of a catalog paper: title terms rank above abstract terms
+PAPER_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(summary, '')), 'B')"
+)
 
 
 class Base(DeclarativeBase):
@@ -33,11 +50,22 @@ class ReviewORM(Base):
     model = Column(String(50), default="gpt-4o-mini")
     created_at = Column(DateTime, default=datetime.utcnow)
     completed_at = Column(DateTime, nullable=True)
+    # Topic cache: normalized-topic hash, the review whose results were reused,
+    # and whether a reused review should also be re-run in the background
+    topic_fingerprint = Column(String(64), nullable=True, index=True)
+    reused_from = Column(UUID(as_uuid=True), ForeignKey("reviews.id", ondelete="SET NULL"), nullable=True)
+    refresh_cached = Column(Boolean, default=False)
 
     # Relationships
     user = relationship("UserORM", back_populates="reviews")
     messages = relationship("MessageORM", back_populates="review", cascade="all, delete-orphan")
-    papers = relationship("PaperORM", back_populates="review", cascade="all, delete-orphan")
+    papers = relationship(
+        "ReviewPaperORM", back_populates="review", cascade="all, delete-orphan", order_by="ReviewPaperORM.rank"
+    )
+    metrics = relationship("ReviewMetricORM", back_populates="review", cascade="all, delete-orphan")
+    checkpoint = relationship(
+        "ReviewCheckpointORM", back_populates="review", cascade="all, delete-orphan", uselist=False
+    )
 
 
 class MessageORM(Base):
@@ -54,14 +82,72 @@ class MessageORM(Base):
 
 
 class PaperORM(Base):
-    __tablename__ = "papers"
+    """A paper in the shared catalog, stored once however many reviews include it."""
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    review_id = Column(UUID(as_uuid=True), ForeignKey("reviews.id", ondelete="CASCADE"))
+    __tablename__ = "papers_catalog"
+
+    # Normalized id, e.g. "arxiv:2106.15928" (see app.db.paper_repository)
+    id = Column(String(255), primary_key=True)
     title = Column(String(500), nullable=False)
     authors = Column(ARRAY(String), default=[])
     published = Column(String(20))
     summary = Column(Text)
     pdf_url = Column(String(500))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Maintained by Postgres; only local corpus search reads it
+    search_vector = deferred(Column(TSVECTOR, Computed(PAPER_SEARCH_VECTOR, persisted=True)))
+
+    reviews = relationship("ReviewPaperORM", back_populates="paper")
+
+    __table_args__ = (Index("ix_papers_catalog_search", "search_vector", postgresql_using="gin"),)
+
+
+class ReviewPaperORM(Base):
+    """A catalog paper's place in one review."""
+
+    __tablename__ = "review_papers"
+
+    review_id = Column(UUID(as_uuid=True), ForeignKey("reviews.id", ondelete="CASCADE"), primary_key=True)
+    paper_id = Column(String(255), ForeignKey("papers_catalog.id"), primary_key=True, index=True)
+    rank = Column(Integer, nullable=False)
+    relevance = Column(Float, nullable=True)
 
     review = relationship("ReviewORM", back_populates="papers")
+    paper = relationship("PaperORM", back_populates="reviews")
+
+
+class ReviewMetricORM(Base):
+    """One LLM call or tool call made while running a review."""
+
+    __tablename__ = "review_metrics"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    review_id = Column(UUID(as_uuid=True), ForeignKey("reviews.id", ondelete="CASCADE"), index=True)
+    stage = Column(String(100), nullable=False, index=True)
+    kind = Column(String(20), nullable=False)
+    name = Column(String(100), nullable=False)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    duration_ms = Column(Float, default=0.0)
+    payload_bytes = Column(Integer, default=0)
+    cost_usd = Column(Float, default=0.0)
+    error = Column(Boolean, default=False)
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    review = relationship("ReviewORM", back_populates="metrics")
+
+
+class ReviewCheckpointORM(Base):
+    """Latest resumable state of a running review, replaced at each stage boundary."""
+
+    __tablename__ = "review_checkpoints"
+
+    review_id = Column(UUID(as_uuid=True), ForeignKey("reviews.id", ondelete="CASCADE"), primary_key=True)
+    stage = Column(String(20), nullable=False)
+    data = Column(JSONB, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    # Renewed by the process running the review; others only resume it once this has passed
+    lease_expires_at = Column(DateTime)
+
+    review = relationship("ReviewORM", back_populates="checkpoint")
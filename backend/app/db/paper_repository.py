@@ -0,0 +1,171 @@
+"""Shared paper catalog operations"""
+
+import hashlib
+import re
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import and_, case, func, or_, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.tracing import traced
+from app.db.models import PaperORM, ReviewPaperORM
+
+# Rows per multi-row INSERT, well under Postgres' 32767 bind parameters
+INSERT_CHUNK = 1000
+
+_ARXIV_URL = re.compile(r"arxiv\.org/(?:abs|pdf)/(.+?)(?:\.pdf)?/?(?:[?#].*)?$", re.IGNORECASE)
+_DOI_URL = re.compile(r"doi\.org/(10\.[^?#\s]+)", re.IGNORECASE)
+_VERSION_SUFFIX = re.compile(r"v\d+$")
+
+_CATALOG_FIELDS = ("title", "authors", "published", "summary", "pdf_url")
+
+# What the tools write when a source has no value; stored as NULL
+PLACEHOLDERS = ("", "Unknown", "No abstract available.")
+
+
+def normalize_paper_id(paper: Mapping[str, Any]) -> str:
+    """
+    Stable catalog id for a paper, whichever source it came from.
+
+    The arXiv id wins (from "arxiv_id", "external_ids" or an arxiv.org
+    URL, version suffix dropped), then the DOI, then the Semantic Scholar
+    paper id. Papers with none of these are keyed by a hash of their
+    case- and punctuation-folded title.
+
+    Examples:
+        {"pdf_url": "https://arxiv.org/pdf/2106.15928v2.pdf"} -> "arxiv:2106.15928"
+        {"external_ids": {"DOI": "10.1145/3292500"}} -> "doi:10.1145/3292500"
+    """
+    external = paper.get("external_ids") or {}
+    arxiv_id = paper.get("arxiv_id") or external.get("ArXiv")
+    doi = paper.get("doi") or external.get("DOI")
+    for key in ("pdf_url", "url"):
+        url = paper.get(key) or ""
+        if not arxiv_id and (match := _ARXIV_URL.search(url)):
+            arxiv_id = match.group(1)
+        if not doi and (match := _DOI_URL.search(url)):
+            doi = match.group(1)
+
+    if arxiv_id:
+        return f"arxiv:{_VERSION_SUFFIX.sub('', arxiv_id.strip()).lower()}"
+    if doi:
+        return f"doi:{doi.strip().lower()}"
+    if paper.get("paper_id"):
+        return f"s2:{paper['paper_id']}"
+    title = " ".join(re.findall(r"\w+", (paper.get("title") or "").casefold()))
+    return f"title:{hashlib.sha256(title.encode('utf-8')).hexdigest()[:32]}"
+
+
+def catalog_row(paper_id: str, paper: Mapping[str, Any]) -> dict[str, Any]:
+    """A paper's catalog columns, with placeholder values as None."""
+
+    def value(field: str) -> Any:
+        found = paper.get(field)
+        return None if found in PLACEHOLDERS else found
+
+    return {
+        "id": paper_id,
+        "title": paper["title"],
+        "authors": list(paper.get("authors") or []),
+        "published": value("published"),
+        "summary": value("summary"),
+        "pdf_url": value("pdf_url"),
+    }
+
+
+def _missing(column: Any) -> Any:
+    """Whether a catalog column holds no real value yet."""
+    if column.key == "authors":
+        return or_(column.is_(None), func.cardinality(column) == 0)
+    return or_(column.is_(None), column.in_(PLACEHOLDERS))
+
+
+def _chunks(rows: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+    return [rows[i : i + INSERT_CHUNK] for i in range(0, len(rows), INSERT_CHUNK)]
+
+
+class PaperRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @traced("db.upsert_papers")
+    async def upsert_papers(self, papers: Sequence[Mapping[str, Any]]) -> list[str]:
+        """
+        Add papers to the catalog, filling in fields existing rows lack.
+
+        The catalog is shared, so a field already set is never
+        overwritten: one review's paraphrased summary or unresolved date
+        must not change every other review's copy of the paper. Does not
+        commit, so callers can link the papers in the same transaction.
+        Rows are only rewritten when a field is actually filled, so
+        re-adding a popular paper costs no write.
+
+        Returns:
+            list[str]: Catalog id of each paper, in input order
+        """
+        paper_ids = [normalize_paper_id(paper) for paper in papers]
+        rows: dict[str, dict[str, Any]] = {}
+        for paper_id, paper in zip(paper_ids, papers, strict=True):
+            rows.setdefault(paper_id, catalog_row(paper_id, paper))
+
+        for chunk in _chunks(list(rows.values())):
+            stmt = insert(PaperORM).values(chunk)
+            columns = {f: getattr(PaperORM, f) for f in _CATALOG_FIELDS}
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[PaperORM.id],
+                set_={
+                    **{f: case((_missing(col), stmt.excluded[f]), else_=col) for f, col in columns.items()},
+                    "updated_at": datetime.utcnow(),
+                },
+                where=or_(
+                    *(and_(_missing(col), ~_missing(stmt.excluded[f])) for f, col in columns.items())
+                ),
+            )
+            await self.db.execute(stmt)
+        return paper_ids
+
+    @traced("db.get_papers")
+    async def get_papers(self, paper_ids: Sequence[str]) -> list[PaperORM]:
+        """Catalog rows for the given ids, in the given order; unknown ids are skipped."""
+        if not paper_ids:
+            return []
+        result = await self.db.execute(select(PaperORM).where(PaperORM.id.in_(list(paper_ids))))
+        found = {paper.id: paper for paper in result.scalars()}
+        return [found[pid] for pid in paper_ids if pid in found]
+
+
+async def migrate_legacy_papers(conn: AsyncConnection) -> int:
+    """
+    Move papers stored per review by earlier versions into the catalog.
+
+    The old "papers" table is renamed to "papers_legacy" afterwards
+    rather than dropped, so this runs once and the data can still be
+    inspected. Returns the number of legacy rows read.
+    """
+    if await conn.scalar(text("SELECT to_regclass('papers')")) is None:
+        return 0
+    result = await conn.execute(
+        text("SELECT review_id, title, authors, published, summary, pdf_url FROM papers WHERE review_id IS NOT NULL")
+    )
+    rows = result.mappings().all()
+
+    catalog: dict[str, dict[str, Any]] = {}
+    links: dict[tuple[Any, str], dict[str, Any]] = {}
+    ranks: dict[Any, int] = {}
+    for row in rows:
+        paper_id = normalize_paper_id(row)
+        catalog.setdefault(paper_id, catalog_row(paper_id, row))
+        key = (row["review_id"], paper_id)
+        if key not in links:
+            rank = ranks[row["review_id"]] = ranks.get(row["review_id"], -1) + 1
+            links[key] = {"review_id": row["review_id"], "paper_id": paper_id, "rank": rank}
+
+    for chunk in _chunks(list(catalog.values())):
+        await conn.execute(insert(PaperORM).values(chunk).on_conflict_do_nothing())
+    for chunk in _chunks(list(links.values())):
+        await conn.execute(insert(ReviewPaperORM).values(chunk).on_conflict_do_nothing())
+    await conn.execute(text("ALTER TABLE papers RENAME TO papers_legacy"))
+    return len(rows)
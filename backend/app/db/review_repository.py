@@ -1,16 +1,32 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select
+from pydantic_core import to_jsonable_python
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.db.models import MessageORM, PaperORM, ReviewORM
+from app.core.topics import topic_fingerprint
+from app.core.tracing import traced
+from app.core.usage import UsageRecord
+from app.db.models import (
+    MessageORM,
+    ReviewCheckpointORM,
+    ReviewMetricORM,
+    ReviewORM,
+    ReviewPaperORM,
+)
+from app.db.paper_repository import PaperRepository
 from app.models.responses import (
     MessageResponse,
+    MetricRecordResponse,
     PaperResponse,
+    ReviewMetricsResponse,
     ReviewResponse,
     ReviewStatus,
+    StageMetricsResponse,
 )
 
 
@@ -35,35 +51,98 @@ def orm_to_response(review: ReviewORM) -> ReviewResponse:
         ],
         papers=[
             PaperResponse(
-                title=p.title,
-                authors=p.authors or [],
-                published=p.published or "",
-                summary=p.summary or "",
-                pdf_url=p.pdf_url or "",
+                id=link.paper.id,
+                title=link.paper.title,
+                authors=link.paper.authors or [],
+                published=link.paper.published or "",
+                summary=link.paper.summary or "",
+                pdf_url=link.paper.pdf_url or "",
             )
-            for p in (review.papers or [])
+            for link in (review.papers or [])
         ],
         created_at=review.created_at,
         completed_at=review.completed_at,
+        reused_from=str(review.reused_from) if review.reused_from else None,
+    )
+
+
+def metrics_to_response(review_id: str, metrics: list[ReviewMetricORM]) -> ReviewMetricsResponse:
+    """Roll a review's metric rows up into per-stage totals."""
+    stages: dict[tuple[str, str], StageMetricsResponse] = {}
+    for m in metrics:
+        stage = stages.setdefault((m.stage, m.kind), StageMetricsResponse(stage=m.stage, kind=m.kind, calls=0))
+        stage.calls += 1
+        stage.errors += int(bool(m.error))
+        stage.prompt_tokens += m.prompt_tokens or 0
+        stage.completion_tokens += m.completion_tokens or 0
+        stage.cost_usd += m.cost_usd or 0.0
+        stage.total_ms += m.duration_ms or 0.0
+        stage.payload_bytes += m.payload_bytes or 0
+
+    wall_time_ms = 0.0
+    if metrics:
+        first = min(m.started_at for m in metrics)
+        last = max(m.started_at + timedelta(milliseconds=m.duration_ms or 0.0) for m in metrics)
+        wall_time_ms = (last - first).total_seconds() * 1000
+
+    llm = [m for m in metrics if m.kind == "llm"]
+    return ReviewMetricsResponse(
+        review_id=review_id,
+        prompt_tokens=sum(m.prompt_tokens or 0 for m in llm),
+        completion_tokens=sum(m.completion_tokens or 0 for m in llm),
+        cost_usd=sum(m.cost_usd or 0.0 for m in llm),
+        llm_calls=len(llm),
+        tool_calls=len(metrics) - len(llm),
+        wall_time_ms=wall_time_ms,
+        stages=sorted(stages.values(), key=lambda s: s.total_ms, reverse=True),
+        records=[
+            MetricRecordResponse(
+                stage=m.stage,
+                kind=m.kind,
+                name=m.name,
+                prompt_tokens=m.prompt_tokens or 0,
+                completion_tokens=m.completion_tokens or 0,
+                duration_ms=m.duration_ms or 0.0,
+                payload_bytes=m.payload_bytes or 0,
+                cost_usd=m.cost_usd or 0.0,
+                error=bool(m.error),
+                started_at=m.started_at,
+            )
+            for m in metrics
+        ],
     )
 
 
+def _relevance(paper: dict) -> float | None:
+    """A relevance score the agent attached to a paper, if any."""
+    value = paper.get("relevance")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return None
+
+
 class ReviewRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def create_review(self, topic: str, papers_limit: int, model: str, user_id: str) -> ReviewORM:
+    @traced("db.create_review")
+    async def create_review(
+        self, topic: str, papers_limit: int, model: str, user_id: str, refresh_cached: bool = False
+    ) -> ReviewORM:
         review = ReviewORM(
             topic=topic,
             papers_limit=papers_limit,
             model=model,
             user_id=UUID(str(user_id)),
+            topic_fingerprint=topic_fingerprint(topic),
+            refresh_cached=refresh_cached,
         )
         self.db.add(review)
         await self.db.commit()
         # Re-fetch with relationships eagerly loaded so orm_to_response can access them
         return await self.get_review(str(review.id))
 
+    @traced("db.get_review")
     async def get_review(self, review_id: str, user_id: str | None = None) -> ReviewORM | None:
         """Fetch review by ID. If user_id is given, also enforce ownership."""
         try:
@@ -72,7 +151,10 @@ class ReviewRepository:
             return None
         stmt = (
             select(ReviewORM)
-            .options(selectinload(ReviewORM.messages), selectinload(ReviewORM.papers))
+            .options(
+                selectinload(ReviewORM.messages),
+                selectinload(ReviewORM.papers).selectinload(ReviewPaperORM.paper),
+            )
             .where(ReviewORM.id == uid)
         )
         if user_id:
@@ -80,6 +162,65 @@ class ReviewRepository:
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    @traced("db.find_reusable_review")
+    async def find_reusable_review(
+        self, fingerprint: str, completed_after: datetime, exclude_id: str | None = None
+    ) -> ReviewORM | None:
+        """
+        Newest completed review with this topic fingerprint, finished after `completed_after`.
+
+        Only reviews that actually ran count: a reused review is never
+        reused again, so results cannot outlive the TTL by being copied.
+        """
+        stmt = (
+            select(ReviewORM)
+            .options(
+                selectinload(ReviewORM.messages),
+                selectinload(ReviewORM.papers).selectinload(ReviewPaperORM.paper),
+            )
+            .where(
+                ReviewORM.topic_fingerprint == fingerprint,
+                ReviewORM.status == "completed",
+                ReviewORM.reused_from.is_(None),
+                ReviewORM.completed_at >= completed_after,
+            )
+            .order_by(ReviewORM.completed_at.desc())
+            .limit(1)
+        )
+        if exclude_id:
+            stmt = stmt.where(ReviewORM.id != UUID(str(exclude_id)))
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @traced("db.reuse_results")
+    async def reuse_results(self, source: ReviewORM, review_id: str) -> list[MessageORM]:
+        """
+        Complete a review with another review's papers and final summary, in one commit.
+
+        Returns:
+            list[MessageORM]: The messages copied into the review
+        """
+        rid = UUID(str(review_id))
+        self.db.add_all(
+            ReviewPaperORM(review_id=rid, paper_id=link.paper_id, rank=link.rank, relevance=link.relevance)
+            for link in source.papers
+        )
+        summaries = sorted((m for m in source.messages if m.message_type == "summary"), key=lambda m: m.timestamp)
+        copied = [
+            MessageORM(review_id=rid, source=m.source, content=m.content, message_type=m.message_type)
+            for m in summaries[-1:]
+        ]
+        self.db.add_all(copied)
+
+        review = await self.db.get(ReviewORM, rid)
+        if review is not None:
+            review.reused_from = source.id
+            review.status = "completed"
+            review.completed_at = datetime.utcnow()
+        await self.db.commit()
+        return copied
+
+    @traced("db.update_status")
     async def update_status(self, review_id: str, status: str) -> None:
         review = await self.get_review(review_id)
         if review:
@@ -88,6 +229,33 @@ class ReviewRepository:
                 review.completed_at = datetime.utcnow()
             await self.db.commit()
 
+    @traced("db.cancel_review")
+    async def cancel_review(self, review_id: str) -> bool:
+        """
+        Mark a pending or in-progress review cancelled and drop its checkpoint.
+
+        Conditional, so a review that finished first keeps its outcome and
+        repeated cancels are harmless.
+
+        Returns:
+            bool: Whether the review was cancelled by this call
+        """
+        rid = UUID(str(review_id))
+        stmt = (
+            update(ReviewORM)
+            .where(ReviewORM.id == rid, ReviewORM.status.in_(("pending", "in_progress")))
+            .values(status="cancelled", completed_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        cancelled = bool(result.rowcount)
+        if cancelled:
+            await self.db.execute(delete(ReviewCheckpointORM).where(ReviewCheckpointORM.review_id == rid))
+            self.db.add(MessageORM(review_id=rid, source="system", content="Review cancelled.", message_type="system"))
+        await self.db.commit()
+        return cancelled
+
+    @traced("db.add_message")
     async def add_message(self, review_id: str, source: str, content: str, message_type: str = "system") -> None:
         msg = MessageORM(
             review_id=UUID(str(review_id)),
@@ -98,18 +266,160 @@ class ReviewRepository:
         self.db.add(msg)
         await self.db.commit()
 
-    async def add_paper(self, review_id: str, title: str, authors: list, published: str, summary: str, pdf_url: str) -> None:
-        paper = PaperORM(
+    @traced("db.replace_summary")
+    async def replace_summary(self, review_id: str, content: str) -> None:
+        """Rewrite the review's latest summary in place, or add one if it has none."""
+        rid = UUID(str(review_id))
+        stmt = (
+            select(MessageORM)
+            .where(MessageORM.review_id == rid, MessageORM.message_type == "summary")
+            .order_by(MessageORM.timestamp.desc())
+            .limit(1)
+        )
+        msg = (await self.db.execute(stmt)).scalar_one_or_none()
+        if msg is None:
+            self.db.add(MessageORM(review_id=rid, source="summarizer", content=content, message_type="summary"))
+        else:
+            msg.content = content
+            msg.timestamp = datetime.utcnow()
+        await self.db.commit()
+
+    @traced("db.add_papers")
+    async def add_papers(self, review_id: str, papers: list[dict]) -> None:
+        """
+        Link papers to a review, adding them to the shared catalog, in one commit.
+
+        New papers are ranked after those the review already has, in the
+        given order; a paper the review already includes keeps its rank
+        and only takes a new relevance if one is given.
+        """
+        if not papers:
+            return
+        rid = UUID(str(review_id))
+        paper_ids = await PaperRepository(self.db).upsert_papers(papers)
+
+        last_rank = await self.db.scalar(select(func.max(ReviewPaperORM.rank)).where(ReviewPaperORM.review_id == rid))
+        next_rank = -1 if last_rank is None else last_rank
+        links: dict[str, dict] = {}
+        for paper_id, paper in zip(paper_ids, papers, strict=True):
+            if paper_id not in links:
+                next_rank += 1
+                links[paper_id] = {
+                    "review_id": rid,
+                    "paper_id": paper_id,
+                    "rank": next_rank,
+                    "relevance": _relevance(paper),
+                }
+        stmt = insert(ReviewPaperORM).values(list(links.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ReviewPaperORM.review_id, ReviewPaperORM.paper_id],
+            set_={"relevance": func.coalesce(stmt.excluded.relevance, ReviewPaperORM.relevance)},
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    @traced("db.save_checkpoint")
+    async def save_checkpoint(self, review_id: str, stage: str, data: dict[str, Any], lease_seconds: float) -> None:
+        """
+        Replace the review's checkpoint; data may hold datetimes and pydantic models.
+
+        The checkpoint is leased to the caller for lease_seconds, so no
+        other process resumes the review while it is running.
+        """
+        now = datetime.utcnow()
+        stmt = insert(ReviewCheckpointORM).values(
             review_id=UUID(str(review_id)),
-            title=title,
-            authors=authors,
-            published=published,
-            summary=summary,
-            pdf_url=pdf_url,
+            stage=stage,
+            data=to_jsonable_python(data),
+            updated_at=now,
+            lease_expires_at=now + timedelta(seconds=lease_seconds),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ReviewCheckpointORM.review_id],
+            set_={
+                "stage": stmt.excluded.stage,
+                "data": stmt.excluded.data,
+                "updated_at": now,
+                "lease_expires_at": stmt.excluded.lease_expires_at,
+            },
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    @traced("db.get_checkpoint")
+    async def get_checkpoint(self, review_id: str) -> dict[str, Any] | None:
+        stmt = select(ReviewCheckpointORM.data).where(ReviewCheckpointORM.review_id == UUID(str(review_id)))
+        return await self.db.scalar(stmt)
+
+    @traced("db.delete_checkpoint")
+    async def delete_checkpoint(self, review_id: str) -> None:
+        stmt = delete(ReviewCheckpointORM).where(ReviewCheckpointORM.review_id == UUID(str(review_id)))
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    @traced("db.claim_resumable_reviews")
+    async def claim_resumable_reviews(self, checkpointed_after: datetime, lease_until: datetime) -> list[ReviewORM]:
+        """
+        Lease the checkpoints of interrupted reviews and return those reviews, oldest first.
+
+        A review is interrupted when it is in progress, checkpointed after
+        `checkpointed_after` and its checkpoint's lease has lapsed. The
+        lease is taken in one conditional UPDATE, so when several
+        processes claim at once each review goes to exactly one of them.
+        """
+        now = datetime.utcnow()
+        stmt = (
+            update(ReviewCheckpointORM)
+            .where(
+                ReviewCheckpointORM.review_id == ReviewORM.id,
+                ReviewORM.status == "in_progress",
+                ReviewCheckpointORM.updated_at >= checkpointed_after,
+                or_(ReviewCheckpointORM.lease_expires_at.is_(None), ReviewCheckpointORM.lease_expires_at < now),
+            )
+            # Keep updated_at: it is when the review last made progress
+            .values(lease_expires_at=lease_until, updated_at=ReviewCheckpointORM.updated_at)
+            .returning(ReviewCheckpointORM.review_id)
+        )
+        claimed = list((await self.db.execute(stmt)).scalars())
+        await self.db.commit()
+        if not claimed:
+            return []
+        result = await self.db.execute(
+            select(ReviewORM)
+            .join(ReviewCheckpointORM)
+            .where(ReviewORM.id.in_(claimed))
+            .order_by(ReviewCheckpointORM.updated_at)
+        )
+        return list(result.scalars())
+
+    @traced("db.next_checkpoint_lease_expiry")
+    async def next_checkpoint_lease_expiry(self, checkpointed_after: datetime) -> datetime | None:
+        """When the first lease on an in-progress review's recent checkpoint lapses, if any is held."""
+        stmt = (
+            select(func.min(ReviewCheckpointORM.lease_expires_at))
+            .join(ReviewORM)
+            .where(
+                ReviewORM.status == "in_progress",
+                ReviewCheckpointORM.updated_at >= checkpointed_after,
+                ReviewCheckpointORM.lease_expires_at >= datetime.utcnow(),
+            )
+        )
+        return await self.db.scalar(stmt)
+
+    @traced("db.renew_checkpoint_leases")
+    async def renew_checkpoint_leases(self, review_ids: list[str], lease_until: datetime | None) -> None:
+        """Extend the leases on these reviews' checkpoints; None releases them."""
+        if not review_ids:
+            return
+        stmt = (
+            update(ReviewCheckpointORM)
+            .where(ReviewCheckpointORM.review_id.in_([UUID(str(rid)) for rid in review_ids]))
+            .values(lease_expires_at=lease_until, updated_at=ReviewCheckpointORM.updated_at)
         )
-        self.db.add(paper)
+        await self.db.execute(stmt)
         await self.db.commit()
 
+    @traced("db.delete_review")
     async def delete_review(self, review_id: str, user_id: str) -> bool:
         review = await self.get_review(review_id, user_id=user_id)
         if review:
@@ -118,6 +428,7 @@ class ReviewRepository:
             return True
         return False
 
+    @traced("db.list_reviews")
     async def list_reviews(self, user_id: str, limit: int = 20, offset: int = 0) -> list[ReviewORM]:
         """List reviews for a specific user only."""
         stmt = (
@@ -129,3 +440,61 @@ class ReviewRepository:
         )
         result = await self.db.execute(stmt)
         return list(result.scalars().all())
+
+    @traced("db.add_metrics")
+    async def add_metrics(self, review_id: str, records: list[UsageRecord]) -> None:
+        """Persist the usage records collected for a review in one commit."""
+        if not records:
+            return
+        rid = UUID(str(review_id))
+        self.db.add_all(
+            ReviewMetricORM(
+                review_id=rid,
+                stage=r.stage,
+                kind=r.kind,
+                name=r.name,
+                prompt_tokens=r.prompt_tokens,
+                completion_tokens=r.completion_tokens,
+                duration_ms=r.duration_ms,
+                payload_bytes=r.payload_bytes,
+                cost_usd=r.cost_usd,
+                error=r.error,
+                started_at=r.started_at,
+            )
+            for r in records
+        )
+        await self.db.commit()
+
+    @traced("db.get_metrics")
+    async def get_metrics(self, review_id: str) -> list[ReviewMetricORM]:
+        """Metric rows for a review, in call order."""
+        stmt = (
+            select(ReviewMetricORM)
+            .where(ReviewMetricORM.review_id == UUID(str(review_id)))
+            .order_by(ReviewMetricORM.started_at)
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
+    @traced("db.stage_latency_percentiles")
+    async def stage_latency_percentiles(self, since: datetime | None = None) -> list[dict]:
+        """p50/p95 call latency and average tokens per stage across all reviews."""
+        duration = ReviewMetricORM.duration_ms
+        stmt = (
+            select(
+                ReviewMetricORM.stage,
+                ReviewMetricORM.kind,
+                func.count().label("calls"),
+                func.percentile_cont(0.5).within_group(duration.asc()).label("p50_ms"),
+                func.percentile_cont(0.95).within_group(duration.asc()).label("p95_ms"),
+                func.avg(ReviewMetricORM.prompt_tokens).label("avg_prompt_tokens"),
+                func.avg(ReviewMetricORM.completion_tokens).label("avg_completion_tokens"),
+                func.sum(ReviewMetricORM.cost_usd).label("cost_usd"),
+            )
+            .group_by(ReviewMetricORM.stage, ReviewMetricORM.kind)
+            .order_by(ReviewMetricORM.stage)
+        )
+        if since is not None:
+            stmt = stmt.where(ReviewMetricORM.started_at >= since)
+        result = await self.db.execute(stmt)
+        return [dict(row._mapping) for row in result]
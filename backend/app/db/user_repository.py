@@ -6,6 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.auth import hash_password
+from app.core.tracing import traced
 from app.db.models import UserORM
 
 
@@ -13,6 +14,7 @@ class UserRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @traced("db.create_user")
     async def create_user(self, email: str, password: str, full_name: str | None = None) -> UserORM:
         user = UserORM(
             email=email.lower().strip(),
@@ -24,11 +26,13 @@ class UserRepository:
         await self.db.refresh(user)
         return user
 
+    @traced("db.get_by_email")
     async def get_by_email(self, email: str) -> UserORM | None:
         stmt = select(UserORM).where(UserORM.email == email.lower().strip())
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    @traced("db.get_by_id")
     async def get_by_id(self, user_id: str) -> UserORM | None:
         try:
             uid = UUID(str(user_id))
@@ -9,10 +9,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.api.routes import auth, health, reviews, stream
+from app.api.middleware import RequestMetricsMiddleware
+from app.api.routes import admin, auth, health, metrics, reviews, stream
 from app.config.settings import get_backend_settings
 from app.db.database import engine
-from app.db.models import Base
+from app.db.models import PAPER_SEARCH_VECTOR, Base
+from app.db.paper_repository import migrate_legacy_papers
+from app.services.review_runner import get_review_runner
+from app.tools.pdf_reader_tool import shutdown_pdf_executor
 
 
 # Configure logging
@@ -39,16 +43,21 @@ app.add_middleware(
     allow_headers=settings.cors_allow_headers,
 )
 
+# Pure ASGI as well — records latency per route template for /metrics
+app.add_middleware(RequestMetricsMiddleware)
+
 # Include routers
 app.include_router(health.router, tags=["Health"])
+app.include_router(metrics.router, tags=["Metrics"])
 app.include_router(auth.router, prefix="/api/v1", tags=["Auth"])
 app.include_router(reviews.router, prefix="/api/v1", tags=["Reviews"])
 app.include_router(stream.router, prefix="/api/v1", tags=["Streaming"])
+app.include_router(admin.router, prefix="/api/v1", tags=["Admin"])
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Create DB tables and log config on startup."""
+    """Create DB tables, log config and resume interrupted reviews on startup."""
     from sqlalchemy import text
 
     logger.info(f"Starting {settings.api_title} v{settings.api_version}")
@@ -64,13 +73,50 @@ async def startup_event():
             )
         except Exception:
             pass  # column already exists with correct type
+        # Topic cache columns for reviews created before the topic cache
+        await conn.execute(
+            text("ALTER TABLE reviews ADD COLUMN IF NOT EXISTS topic_fingerprint VARCHAR(64)")
+        )
+        await conn.execute(
+            text(
+                "ALTER TABLE reviews ADD COLUMN IF NOT EXISTS reused_from UUID "
+                "REFERENCES reviews (id) ON DELETE SET NULL"
+            )
+        )
+        await conn.execute(
+            text("ALTER TABLE review_checkpoints ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP")
+        )
+        await conn.execute(
+            text("ALTER TABLE reviews ADD COLUMN IF NOT EXISTS refresh_cached BOOLEAN DEFAULT FALSE")
+        )
+        await conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_reviews_topic_fingerprint ON reviews (topic_fingerprint)")
+        )
+        # Full-text search column for catalogs created before local corpus search
+        await conn.execute(
+            text(
+                "ALTER TABLE papers_catalog ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({PAPER_SEARCH_VECTOR}) STORED"
+            )
+        )
+        await conn.execute(
+            text("CREATE INDEX IF NOT EXISTS ix_papers_catalog_search ON papers_catalog USING gin (search_vector)")
+        )
+        # Move per-review paper rows from before the shared catalog existed
+        moved = await migrate_legacy_papers(conn)
+        if moved:
+            logger.info(f"Moved {moved} legacy paper rows into papers_catalog")
     logger.info("Database connected and tables ready")
+    if settings.checkpoint_enabled:
+        await get_review_runner().resume_interrupted()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Dispose DB engine on shutdown."""
+    """Checkpoint and stop running reviews, then dispose DB engine and PDF workers on shutdown."""
     logger.info("Shutting down Literature Review Assistant API")
+    await get_review_runner().shutdown(grace=settings.shutdown_grace_seconds)
+    shutdown_pdf_executor()
     await engine.dispose()
 
 
@@ -112,6 +112,10 @@ class CreateReviewRequest(BaseModel):
         description="Research topic to review",
         examples=["graph neural networks", "renewable energy storage"],
     )
+    refresh: bool = Field(
+        default=False,
+        description="If a recent review of the same topic is reused, also run a fresh one in the background",
+    )
 
     @field_validator("topic")
     @classmethod
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 from enum import Enum
-from typing import Literal
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -14,6 +14,7 @@ class ReviewStatus(str, Enum):
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 
 class MessageResponse(BaseModel):
@@ -40,6 +41,7 @@ class MessageResponse(BaseModel):
 class PaperResponse(BaseModel):
     """Paper metadata response"""
 
+    id: str = Field("", description="Catalog id, e.g. arxiv:2401.12345")
     title: str
     authors: list[str]
     published: str = Field(..., description="Publication date (YYYY-MM-DD)")
@@ -49,6 +51,7 @@ class PaperResponse(BaseModel):
     class Config:
         json_schema_extra = {
             "example": {
+                "id": "arxiv:2401.12345",
                 "title": "Graph Neural Networks: A Practical Introduction",
                 "authors": ["John Doe", "Jane Smith"],
                 "published": "2024-01-15",
@@ -68,6 +71,7 @@ class ReviewResponse(BaseModel):
     papers: list[PaperResponse] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     completed_at: datetime | None = None
+    reused_from: str | None = Field(None, description="Review whose results were reused for this topic, if any")
 
     class Config:
         json_schema_extra = {
@@ -83,6 +87,7 @@ class ReviewResponse(BaseModel):
                 "papers": [],
                 "created_at": "2025-02-10T10:00:00Z",
                 "completed_at": "2025-02-10T10:05:00Z",
+                "reused_from": None,
             }
         }
 
@@ -118,3 +123,80 @@ class HealthResponse(BaseModel):
                 "timestamp": "2025-02-10T10:00:00Z",
             }
         }
+
+
+class MetricRecordResponse(BaseModel):
+    """A single recorded LLM call or tool call"""
+
+    stage: str = Field(..., description="Agent name for LLM calls, tool name for tool calls")
+    kind: Literal["llm", "tool"]
+    name: str = Field(..., description="Model or tool identifier")
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    duration_ms: float = 0.0
+    payload_bytes: int = 0
+    cost_usd: float = 0.0
+    error: bool = False
+    started_at: datetime
+
+
+class StageMetricsResponse(BaseModel):
+    """Totals for one stage of a single review"""
+
+    stage: str
+    kind: Literal["llm", "tool"]
+    calls: int
+    errors: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    total_ms: float = 0.0
+    payload_bytes: int = 0
+
+
+class ReviewMetricsResponse(BaseModel):
+    """Token, cost and latency accounting for a review"""
+
+    review_id: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    llm_calls: int = 0
+    tool_calls: int = 0
+    wall_time_ms: float = Field(default=0.0, description="First call start to last call end")
+    stages: list[StageMetricsResponse] = Field(default_factory=list)
+    records: list[MetricRecordResponse] = Field(default_factory=list)
+
+
+class StageLatencyResponse(BaseModel):
+    """Per-stage latency percentiles across all reviews"""
+
+    stage: str
+    kind: Literal["llm", "tool"]
+    calls: int
+    p50_ms: float
+    p95_ms: float
+    avg_prompt_tokens: float = 0.0
+    avg_completion_tokens: float = 0.0
+    cost_usd: float = 0.0
+
+
+class TraceSpanResponse(BaseModel):
+    """One span of a review trace, positioned for a waterfall view"""
+
+    span_id: str
+    parent_id: str | None = None
+    name: str
+    depth: int = Field(..., description="Nesting level under the root span")
+    offset_ms: float = Field(..., description="Start relative to the first span")
+    duration_ms: float
+    status: str = "ok"
+    attributes: dict[str, Any] = Field(default_factory=dict)
+
+
+class TraceResponse(BaseModel):
+    """Per-review span waterfall"""
+
+    trace_id: str
+    duration_ms: float = 0.0
+    spans: list[TraceSpanResponse] = Field(default_factory=list)
@@ -10,20 +10,37 @@ from __future__ import annotations
 
 import json
 import re
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Awaitable, Callable, Mapping
+from datetime import datetime, timedelta
+from typing import Any
 
 from autogen_agentchat.conditions import MaxMessageTermination
 from autogen_agentchat.messages import TextMessage
 from autogen_agentchat.teams import RoundRobinGroupChat
 
 from app.agents.planner_agent import PlannerAgent
+from app.agents.summarizer_agent import SummarizerAgent
 from app.config.settings import Settings, get_settings
-from app.core.exceptions import ConfigurationError
+from app.core.budget import ReviewBudget, get_budget, use_budget
+from app.core.exceptions import AgentError, ConfigurationError, ReviewInterrupted
 from app.core.logging_config import get_logger, setup_logging
+from app.core.replay import ReplaySession, use_replay_session
+from app.core.resilience import use_deadline
+from app.core.tracing import start_span, trace
+from app.core.usage import UsageTracker, track_usage
+from app.orchestrator.retrieval import (
+    CandidateRetriever,
+    format_candidates,
+    new_candidates,
+    parse_sub_queries,
+)
 from app.teams.litrev_team import LitRevTeam
 
 logger = get_logger(__name__)
 
+# Saves a checkpoint: called with the stage just finished and the review's resumable state
+Checkpointer = Callable[[str, dict[str, Any]], Awaitable[None]]
+
 
 # ===============================================================
 # OUTPUT GUARDRAIL
@@ -53,8 +70,19 @@ class LitRevOrchestrator:
 
     Workflow:
         1. PlannerAgent decomposes the topic into sub-queries.
-        2. LitRevTeam (SelectorGroupChat: Search → Summarize → Critic) runs.
-        3. Output guardrails validate the final review.
+        2. Candidate papers for all sub-queries are retrieved from the
+           local corpus, then in one or two combined arXiv requests for
+           what it misses, and expanded through the citation graph.
+        3. LitRevTeam (SelectorGroupChat: Search → Summarize → Critic) runs.
+        4. Output guardrails validate the final review.
+
+    With a checkpoint callback, the plan, the candidates and task, and the
+    team's state after every turn are saved as they are produced, and a
+    review interrupted by a restart resumes from the last of them.
+
+    refresh_review() brings a completed review up to date instead: only
+    papers published since it ran are retrieved, and only those are
+    written up and merged into the existing review.
     """
 
     def __init__(
@@ -73,26 +101,89 @@ class LitRevOrchestrator:
                 config_key="OPENAI_API_KEY",
             )
 
+        self._team: LitRevTeam | None = None
+        self._interrupted = False
+
         logger.info(f"LitRevOrchestrator initialized with model={self.model}")
 
+    def interrupt(self) -> None:
+        """
+        Stop the running review at its next checkpoint (graceful shutdown).
+
+        Planning and retrieval finish first; the team stops once the agent
+        speaking now finishes its turn. run_review then saves a final
+        checkpoint and raises ReviewInterrupted.
+        """
+        self._interrupted = True
+        if self._team is not None:
+            self._team.stop()
+
     async def run_review(
         self,
         topic: str,
         num_papers: int = 5,
+        usage_tracker: UsageTracker | None = None,
+        trace_id: str | None = None,
+        replay_session: ReplaySession | None = None,
+        checkpoint: Checkpointer | None = None,
+        resume_from: dict[str, Any] | None = None,
     ) -> AsyncGenerator[str, None]:
         """
         Run a deep research review on the given topic with progress events.
+
+        Args:
+            topic: Research topic
+            num_papers: Requested number of papers
+            usage_tracker: Collects per-call token, cost and latency records
+            trace_id: Trace to record spans under (typically the review id)
+            replay_session: ReviewRecorder to capture LLM and tool I/O, or
+                ReviewReplayer to answer it from a recording
+            checkpoint: Called with (stage, data) after planning, after
+                retrieval and after every team turn
+            resume_from: The data of the review's last checkpoint; stages
+                it covers are skipped and the team continues from its state
+
+        Raises:
+            ReviewInterrupted: interrupt() was called; the last checkpoint
+                holds everything needed to resume
         """
+        with (
+            track_usage(usage_tracker),
+            use_replay_session(replay_session),
+            use_deadline(self.settings.review_deadline_seconds),
+            use_budget(ReviewBudget.from_settings(self.settings)),
+            trace(trace_id),
+            start_span("review", topic=topic, resumed=resume_from is not None),
+        ):
+            async for event in self._run_review(topic, num_papers, checkpoint, resume_from or {}):
+                yield event
+
+    async def _run_review(
+        self,
+        topic: str,
+        num_papers: int,
+        checkpoint: Checkpointer | None,
+        resume_from: dict[str, Any],
+    ) -> AsyncGenerator[str, None]:
+        """Planning, team execution and guardrail stages of run_review."""
         papers_limit = self.settings.papers_per_review
-        logger.info(f"Starting review: topic='{topic}', papers={papers_limit}")
-
-        # Progress: planning
-        yield "progress: Planning research strategy..."
+        logger.info(f"Starting review: topic='{topic}', papers={papers_limit}, resumed={bool(resume_from)}")
+        state: dict[str, Any] = dict(resume_from)
 
         # Step 1: Plan
-        sub_queries_json = await self._plan_topic(topic)
+        if "plan" in state:
+            sub_queries_json = state["plan"]
+            yield f"progress: Resuming from the {state.get('stage', 'last')} checkpoint..."
+        else:
+            # Progress: planning
+            yield "progress: Planning research strategy..."
+            with start_span("review.plan"):
+                sub_queries_json = await self._plan_topic(topic)
+            if sub_queries_json:
+                yield f"planner: {sub_queries_json}"
+            state["plan"] = sub_queries_json
+            await self._checkpoint(checkpoint, "planned", state)
         if sub_queries_json:
-            yield f"planner: {sub_queries_json}"
             # Parse for progress display
             try:
                 queries = json.loads(sub_queries_json)
@@ -102,61 +193,231 @@ class LitRevOrchestrator:
         else:
             yield "progress: Searching academic and web sources..."
 
-        # Step 2: Build enriched task prompt
-        if sub_queries_json:
-            task_prompt = (
-                f"Research topic: '{topic}'\n"
-                f"Planned sub-queries: {sub_queries_json}\n"
-                f"Search for sources on each sub-query using ALL available tools "
-                f"(arxiv, semantic scholar, web search, and read key pages), "
-                f"combine and deduplicate results, then return the {papers_limit} "
-                f"most relevant sources."
-            )
+        # Steps 2-3: Retrieve candidates for all sub-queries at once and build the team's task
+        if "task" in state:
+            task_prompt = state["task"]
         else:
-            task_prompt = (
-                f"Conduct a deep research review on '{topic}'. "
-                f"Use all search tools (academic and web) and read key pages. "
-                f"Return {papers_limit} high-quality sources."
-            )
-
-        # Step 3: Run the multi-agent team
+            self._check_interrupted("planned")
+            results: dict[str, list[dict]] = {}
+            related: list[dict] = []
+            sub_queries = parse_sub_queries(sub_queries_json)
+            if sub_queries:
+                retriever = CandidateRetriever(self.settings)
+                with start_span("review.retrieve", sub_queries=len(sub_queries)):
+                    results = await retriever.retrieve(sub_queries)
+                with start_span("review.expand"):
+                    related = await retriever.expand(results)
+            task_prompt = self._task_prompt(topic, papers_limit, sub_queries_json, format_candidates(results, related))
+            state.update(candidates=results, related=related, task=task_prompt)
+            await self._checkpoint(checkpoint, "retrieved", state)
+            self._check_interrupted("retrieved")
+
+        # Step 4: Run the multi-agent team
         team = LitRevTeam(
             model=self.model,
             api_key=self.settings.openai_api_key,
             tavily_api_key=self.settings.tavily_api_key,
+            base_url=self.settings.openai_base_url,
         )
-
-        last_summarizer_msg = ""
-        async for msg in team.run_stream(task=task_prompt):
-            # Track summarizer output for guardrail check
-            if msg.startswith("summarizer:"):
-                last_summarizer_msg = msg.split(": ", 1)[1] if ": " in msg else ""
-
-            # Emit progress hints based on which agent is speaking
-            if msg.startswith("search_agent:"):
-                yield "progress: Searching and reading sources..."
-            elif msg.startswith("summarizer:"):
-                yield "progress: Writing research report..."
-            elif msg.startswith("critic:"):
-                yield "progress: Reviewing report quality..."
-
-            yield msg
-
-        # Step 4: Output guardrail — validate final review
+        task: str | None = task_prompt
+        if "team_state" in state:
+            await team.load_state(
+                state["team_state"], turns=state.get("turns", 0), has_draft=bool(state.get("summary"))
+            )
+            task = None
+        self._team = team
+
+        last_summarizer_msg = state.get("summary", "")
+        approved = False
+
+        async def on_turn(team_state: Mapping[str, Any]) -> None:
+            state.update(team_state=team_state, turns=team.turns, summary=last_summarizer_msg)
+            await self._checkpoint(checkpoint, "team", state)
+
+        with start_span("review.team", resumed=task is None):
+            async for msg in team.run_stream(task=task, on_turn=on_turn if checkpoint else None):
+                # Track summarizer output for guardrail check
+                if msg.startswith("summarizer:"):
+                    last_summarizer_msg = msg.split(": ", 1)[1] if ": " in msg else ""
+                approved = "APPROVED" in msg
+
+                # Emit progress hints based on which agent is speaking
+                if msg.startswith("search_agent:"):
+                    yield "progress: Searching and reading sources..."
+                elif msg.startswith("summarizer:"):
+                    yield "progress: Writing research report..."
+                elif msg.startswith("critic:"):
+                    yield "progress: Reviewing report quality..."
+
+                yield msg
+        self._team = None
+        budget = get_budget()
+        if team.budget_limit is not None and budget is not None:
+            yield f"system: Review {budget.describe(team.budget_limit)} reached; the latest draft is the final review."
+        if self._interrupted and not approved:
+            # The team has stopped, so its state is consistent
+            if checkpoint is not None:
+                await on_turn(await team.save_state())
+            self._check_interrupted("team")
+
+        # Step 5: Output guardrail — validate final review
         if last_summarizer_msg:
-            guardrail_error = validate_review_output(last_summarizer_msg)
+            with start_span("review.guardrail"):
+                guardrail_error = validate_review_output(last_summarizer_msg)
             if guardrail_error:
                 logger.warning(f"Output guardrail failed: {guardrail_error}")
                 yield f"guardrail: {guardrail_error}"
 
         logger.info(f"Review completed for topic: {topic}")
 
+    @staticmethod
+    def _task_prompt(topic: str, papers_limit: int, sub_queries_json: str | None, candidates: str) -> str:
+        """The team's task: the topic, the planned sub-queries and the retrieved candidates."""
+        if not sub_queries_json:
+            return (
+                f"Conduct a deep research review on '{topic}'. "
+                f"Use all search tools (academic and web) and read key pages. "
+                f"Return {papers_limit} high-quality sources."
+            )
+        task_prompt = (
+            f"Research topic: '{topic}'\n"
+            f"Planned sub-queries: {sub_queries_json}\n"
+            f"Search for sources on each sub-query using ALL available tools "
+            f"(arxiv, semantic scholar, web search, and read key pages), "
+            f"combine and deduplicate results, then return the {papers_limit} "
+            f"most relevant sources."
+        )
+        if candidates:
+            task_prompt += (
+                f"\nCandidates already retrieved per sub-query from earlier reviews and arXiv (do not "
+                f"repeat these arXiv searches; search other sources and read the strongest papers): {candidates}"
+            )
+        return task_prompt
+
+    async def _checkpoint(self, checkpoint: Checkpointer | None, stage: str, state: dict[str, Any]) -> None:
+        """Save a checkpoint; failing to save one never fails the review."""
+        if checkpoint is None:
+            return
+        try:
+            with start_span("review.checkpoint", stage=stage):
+                await checkpoint(stage, state)
+        except Exception as e:
+            logger.warning(f"Failed to save {stage} checkpoint: {e}")
+
+    def _check_interrupted(self, stage: str) -> None:
+        if self._interrupted:
+            logger.info(f"Review interrupted after stage: {stage}")
+            raise ReviewInterrupted("Review interrupted; it resumes from its last checkpoint", stage=stage)
+
+    async def refresh_review(
+        self,
+        topic: str,
+        sub_queries: list[str],
+        summary: str,
+        known_ids: set[str],
+        completed_at: datetime,
+        num_papers: int = 5,
+        usage_tracker: UsageTracker | None = None,
+        trace_id: str | None = None,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Update a completed review with papers published since it ran.
+
+        The review's own sub-queries are searched again, limited to papers
+        published since completed_at (less settings.refresh_lookback_hours),
+        and candidates already in the review are dropped. Only the new
+        papers are written up, so the cost follows the number of new
+        papers rather than the size of the review. Yields the new papers as
+        a search_agent message and the updated review as a summarizer
+        message; nothing but progress when there are no new papers.
+
+        Args:
+            topic: Research topic
+            sub_queries: The review's planned sub-queries (the topic if empty)
+            summary: The review's current final summary
+            known_ids: Catalog ids of the papers already in the review
+            completed_at: When the review last completed
+            num_papers: Most new papers to add
+            usage_tracker: Collects per-call token, cost and latency records
+            trace_id: Trace to record spans under (typically the review id)
+        """
+        with (
+            track_usage(usage_tracker),
+            use_deadline(self.settings.review_deadline_seconds),
+            use_budget(ReviewBudget.from_settings(self.settings)),
+            trace(trace_id),
+            start_span("refresh", topic=topic),
+        ):
+            async for event in self._refresh_review(topic, sub_queries, summary, known_ids, completed_at, num_papers):
+                yield event
+
+    async def _refresh_review(
+        self,
+        topic: str,
+        sub_queries: list[str],
+        summary: str,
+        known_ids: set[str],
+        completed_at: datetime,
+        num_papers: int,
+    ) -> AsyncGenerator[str, None]:
+        """Retrieval and write-up stages of refresh_review."""
+        since = completed_at - timedelta(hours=self.settings.refresh_lookback_hours)
+        yield f"progress: Searching for papers published since {since:%Y-%m-%d}..."
+
+        retriever = CandidateRetriever(self.settings)
+        queries = sub_queries or [topic]
+        with start_span("refresh.retrieve", sub_queries=len(queries)):
+            results = await retriever.retrieve(queries, published_after=since)
+        papers = new_candidates(results, known_ids, num_papers)
+        if not papers:
+            logger.info(f"Refresh found no new papers for topic: {topic}")
+            yield f"progress: No new papers since {completed_at:%Y-%m-%d}."
+            return
+
+        yield f"progress: Adding {len(papers)} new papers to the review..."
+        with start_span("refresh.summarize", papers=len(papers)):
+            updated = await self._update_summary(topic, summary, papers)
+        guardrail_error = validate_review_output(updated)
+        if guardrail_error:
+            # Keep the review as it was rather than store a broken update
+            raise AgentError(f"Refreshed review failed validation: {guardrail_error}", agent_name="summarizer")
+
+        # Papers are only reported once the write-up succeeded, so a failed
+        # refresh leaves them for the next one
+        yield f"search_agent: {json.dumps(papers, ensure_ascii=False)}"
+        yield f"summarizer: {updated}"
+        logger.info(f"Refresh added {len(papers)} papers for topic: {topic}")
+
+    async def _update_summary(self, topic: str, summary: str, papers: list[dict]) -> str:
+        """Have the summarizer write up the new papers and merge them into the review."""
+        summarizer = SummarizerAgent(
+            model=self.model,
+            api_key=self.settings.openai_api_key,
+            base_url=self.settings.openai_base_url,
+        )
+        team = RoundRobinGroupChat(participants=[summarizer.build()], termination_condition=MaxMessageTermination(2))
+        task = (
+            f"Update this literature review on '{topic}' with {len(papers)} newly published papers. "
+            f"Write one bullet per new paper in the same format as the existing bullets and add them to "
+            f"the review; keep every existing bullet and revise the introduction and synthesis only where "
+            f"the new papers change them. Return the complete updated review.\n\n"
+            f"Current review:\n{summary or '(none yet)'}\n\n"
+            f"New papers: {format_candidates({'new papers': papers}, summary_chars=1000)}"
+        )
+
+        result = ""
+        async for msg in team.run_stream(task=task):
+            if isinstance(msg, TextMessage) and msg.source == "summarizer":
+                result = msg.content
+        return result
+
     async def _plan_topic(self, topic: str) -> str | None:
         """Run the PlannerAgent to decompose the topic into sub-queries."""
         try:
             planner = PlannerAgent(
                 model=self.model,
                 api_key=self.settings.openai_api_key,
+                base_url=self.settings.openai_base_url,
             )
             planner_team = RoundRobinGroupChat(
                 participants=[planner.build()],
@@ -0,0 +1,257 @@
+"""
+retrieval.py
+============
+Candidate retrieval stage between planning and the agent team.
+
+The planner's sub-queries are answered up front, first from the local
+corpus of papers earlier reviews retrieved (see
+app.tools.local_corpus_tool), then, for sub-queries it cannot fill, with
+as few upstream requests as possible (one or two combined arXiv
+requests instead of one search per sub-query). Papers fetched upstream
+are added to the local corpus. The top candidates are expanded through the
+citation graph (see app.tools.citation_graph) to pick up related papers
+that do not share the query's words; those on arXiv are completed from
+it (abstract, PDF link, date) with one id_list lookup. The candidates are handed to the
+search agent in its task so it can spend its tool calls on other
+sources and on reading the most promising papers.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Sequence
+from datetime import datetime
+from itertools import chain, zip_longest
+
+from app.config.settings import Settings, get_settings
+from app.core.logging_config import get_logger
+from app.db.paper_repository import normalize_paper_id
+from app.tools.arxiv_tool import ArxivSearchTool
+from app.tools.citation_graph import CitationCache, CitationExpander
+from app.tools.local_corpus_tool import LocalCorpusSearchTool
+from app.tools.semantic_scholar_tool import SemanticScholarTool
+
+logger = get_logger(__name__)
+
+
+def parse_sub_queries(planner_output: str | None) -> list[str]:
+    """The planner's sub-queries as a list of strings (empty if unparseable)."""
+    if not planner_output:
+        return []
+    try:
+        parsed = json.loads(planner_output)
+    except (json.JSONDecodeError, TypeError):
+        return []
+    if not isinstance(parsed, list):
+        return []
+    return [q.strip() for q in parsed if isinstance(q, str) and q.strip()]
+
+
+class CandidateRetriever:
+    """
+    Fetches candidate papers for a review's sub-queries.
+
+    Attributes:
+        per_query: Candidates wanted per sub-query
+        arxiv_tool: Tool the combined searches go through
+        local_tool: Local corpus searched before arXiv, None when disabled
+        expander: Citation-graph expansion, None when disabled
+    """
+
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        arxiv_tool: ArxivSearchTool | None = None,
+        semantic_scholar_tool: SemanticScholarTool | None = None,
+        local_tool: LocalCorpusSearchTool | None = None,
+    ) -> None:
+        self.settings = settings or get_settings()
+        self.per_query = self.settings.candidates_per_query
+        self.arxiv_tool = arxiv_tool or ArxivSearchTool()
+        self._search_many = self.arxiv_tool.as_instrumented(self.arxiv_tool.search_many, "arxiv_search_many")
+        self._fetch_ids = self.arxiv_tool.as_instrumented(self.arxiv_tool.fetch_ids, "arxiv_fetch_ids")
+
+        self.local_tool: LocalCorpusSearchTool | None = None
+        if self.settings.local_corpus_enabled:
+            self.local_tool = local_tool or LocalCorpusSearchTool()
+            self._search_local = self.local_tool.as_instrumented(
+                self.local_tool.search_many, "local_corpus_search_many"
+            )
+
+        self.expander: CitationExpander | None = None
+        if self.settings.citation_expansion_enabled:
+            s2_tool = semantic_scholar_tool or SemanticScholarTool()
+            self.expander = CitationExpander(
+                s2_tool,
+                cache=CitationCache(
+                    self.settings.citation_cache_dir,
+                    self.settings.citation_cache_max_mb * 1024 * 1024,
+                    self.settings.citation_cache_ttl_hours * 3600,
+                ),
+                depth=self.settings.citation_depth,
+                breadth=self.settings.citation_seeds,
+                min_overlap=self.settings.citation_min_overlap,
+                budget=self.settings.citation_budget_seconds,
+            )
+            # Batch requests inside already retry; the expansion as a whole does not
+            self._expand = s2_tool.as_instrumented(self.expander.expand, "citation_expansion", resilient=False)
+
+    async def retrieve(
+        self, queries: Sequence[str], published_after: datetime | None = None
+    ) -> dict[str, list[dict]]:
+        """
+        Candidates per sub-query, local matches first; empty when disabled or when retrieval fails.
+
+        Only sub-queries the local corpus cannot fill go to arXiv. A
+        failure here is not fatal: the search agent still has every tool
+        and simply starts with fewer candidates. With published_after,
+        only papers published since then are candidates (review refreshes).
+        """
+        if not queries or self.per_query <= 0:
+            return {}
+        queries = list(dict.fromkeys(queries))
+        local = await self._local(queries, published_after)
+        gaps = [q for q in queries if len(local.get(q, [])) < self.per_query]
+
+        upstream: dict[str, list[dict]] = {}
+        if gaps:
+            try:
+                # Only passed when set, so recordings of full reviews still replay
+                kwargs = {"published_after": published_after} if published_after else {}
+                upstream = await self._search_many(queries=gaps, max_results=self.per_query, **kwargs)
+            except Exception as e:
+                logger.warning(f"Candidate retrieval failed, continuing without arXiv candidates: {e}")
+            await self._remember(upstream)
+
+        results = {q: _merge(local.get(q, []), upstream.get(q, []), self.per_query) for q in queries}
+        if not any(results.values()):
+            return {}
+        logger.info(
+            f"Retrieved {sum(len(p) for p in local.values())} local and "
+            f"{sum(len(p) for p in upstream.values())} arXiv candidates for {len(queries)} sub-queries "
+            f"({len(queries) - len(gaps)} answered locally)"
+        )
+        return results
+
+    async def _local(self, queries: list[str], published_after: datetime | None = None) -> dict[str, list[dict]]:
+        """Local corpus matches per sub-query; empty when disabled or failing."""
+        if self.local_tool is None:
+            return {}
+        kwargs = {"published_after": published_after.date()} if published_after else {}
+        try:
+            return await self._search_local(queries=queries, max_results=self.per_query, **kwargs)
+        except Exception as e:
+            logger.warning(f"Local corpus search failed, using upstream sources only: {e}")
+            return {}
+
+    async def _remember(self, results: dict[str, list[dict]]) -> None:
+        """Add papers fetched upstream to the local corpus for later reviews."""
+        papers = [paper for found in results.values() for paper in found]
+        if self.local_tool is None or not papers:
+            return
+        try:
+            await self.local_tool.add(papers)
+        except Exception as e:
+            logger.warning(f"Could not add candidates to the local corpus: {e}")
+
+    async def expand(self, results: dict[str, list[dict]]) -> list[dict]:
+        """
+        Papers linked through citations to several of the top candidates.
+
+        Seeds are taken round-robin across sub-queries, so every sub-query
+        contributes its best papers. Related papers on arXiv are completed
+        from it (see _complete_from_arxiv). Never fails: expansion is
+        skipped when disabled, over its time budget or erroring.
+        """
+        if self.expander is None or not results:
+            return []
+        ranked = [p for p in chain.from_iterable(zip_longest(*results.values())) if p]
+        arxiv_ids = list(dict.fromkeys(p["arxiv_id"] for p in ranked if p.get("arxiv_id")))
+        seeds = [f"ARXIV:{arxiv_id}" for arxiv_id in arxiv_ids[: self.settings.citation_seeds]]
+        if not seeds:
+            return []
+        try:
+            related = await self._expand(seeds=seeds, limit=self.settings.citation_related)
+        except Exception as e:
+            logger.warning(f"Citation expansion failed, continuing without it: {e}")
+            return []
+        known = set(arxiv_ids)
+        related = [p for p in related if (p.get("external_ids") or {}).get("ArXiv") not in known]
+        return await self._complete_from_arxiv(related)
+
+    async def _complete_from_arxiv(self, papers: list[dict]) -> list[dict]:
+        """
+        Papers with an arXiv id, updated with arXiv's record in one id_list request.
+
+        Semantic Scholar often has no abstract or open PDF for a paper, and
+        only its year; arXiv has all three. Papers keep their Semantic
+        Scholar metadata when the lookup fails.
+        """
+        ids = [(p.get("external_ids") or {}).get("ArXiv") for p in papers]
+        if not any(ids):
+            return papers
+        try:
+            found = await self._fetch_ids(arxiv_ids=[arxiv_id for arxiv_id in ids if arxiv_id])
+        except Exception as e:
+            logger.warning(f"arXiv lookup of related papers failed, keeping Semantic Scholar metadata: {e}")
+            return papers
+        by_id = {paper["arxiv_id"]: paper for paper in found}
+        return [
+            {**paper, **by_id[arxiv_id]} if arxiv_id in by_id else paper
+            for paper, arxiv_id in zip(papers, ids, strict=True)
+        ]
+
+
+def new_candidates(results: dict[str, list[dict]], known_ids: set[str], limit: int) -> list[dict]:
+    """
+    Candidates whose catalog ids are not in known_ids, up to limit.
+
+    Taken round-robin across sub-queries like expansion seeds, so every
+    sub-query contributes its best new papers.
+    """
+    fresh: dict[str, dict] = {}
+    for paper in chain.from_iterable(zip_longest(*results.values())):
+        if paper is None or len(fresh) >= limit:
+            continue
+        paper_id = normalize_paper_id(paper)
+        if paper_id not in known_ids:
+            fresh.setdefault(paper_id, paper)
+    return list(fresh.values())
+
+
+def _merge(first: list[dict], then: list[dict], limit: int) -> list[dict]:
+    """Papers from `first`, then unseen ones from `then`, up to limit."""
+    merged: dict[str, dict] = {}
+    for paper in first + then:
+        merged.setdefault(normalize_paper_id(paper), paper)
+    return list(merged.values())[:limit]
+
+
+def format_candidates(
+    results: dict[str, list[dict]],
+    related: list[dict] | None = None,
+    summary_chars: int = 300,
+) -> str:
+    """
+    Candidates as compact JSON for the search agent's task, grouped by sub-query.
+
+    Papers found through the citation graph are listed under "related
+    through citations". Abstracts are clipped to summary_chars; the agent
+    can read the full paper with read_pdf when it needs more.
+    """
+    grouped = {
+        query: [_brief(paper, summary_chars) for paper in papers] for query, papers in results.items() if papers
+    }
+    if related:
+        grouped["related through citations"] = [_brief(paper, summary_chars) for paper in related]
+    return json.dumps(grouped, ensure_ascii=False) if grouped else ""
+
+
+def _brief(paper: dict, summary_chars: int) -> dict:
+    return {
+        "title": paper["title"],
+        "authors": paper["authors"][:3],
+        "published": paper["published"],
+        "pdf_url": paper["pdf_url"],
+        "summary": paper["summary"][:summary_chars],
+    }
@@ -0,0 +1,405 @@
+"""
+review_runner.py
+================
+Review runs, detached from the SSE streams that follow them.
+
+Every review runs here as a background task with its own database
+session; SSE streams only subscribe to its events (see subscribe), and a
+subscriber joining late is sent the run's earlier events first. Runs are
+started:
+    - by the first stream to open a pending review; such a run is
+      cancelled once no stream has followed it for
+      settings.review_idle_cancel_seconds
+    - for a fresh review after a topic-cache hit (see
+      ReviewService.start_review)
+    - for an incremental refresh of a completed review (see
+      ReviewService.refresh_review)
+    - on startup, for reviews interrupted by a restart, resumed from
+      their checkpoints (see resume_interrupted)
+
+Each run binds a cancellation token (see app.core.resilience), so a
+cancelled review stops its in-flight model and tool calls at once,
+including the ones AutoGen's runtime makes in tasks of its own, and ends
+with the cancelled status.
+
+Every running review also registers as interruptible, so shutdown can
+ask each one to stop at its next checkpoint before the remaining runs
+are cancelled (without marking them cancelled).
+
+Several API processes can share one database: a review's checkpoint is
+leased (settings.checkpoint_lease_seconds) to the process running it,
+which keeps renewing the lease, and a review is only resumed by the
+process that claims its lapsed lease (see resume_interrupted).
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from autogen_core import CancellationToken
+
+from app.config.settings import get_settings
+from app.core.logging_config import get_logger
+from app.core.metrics import REVIEWS_CANCELLED
+from app.core.resilience import use_cancellation
+from app.db.database import async_session_factory
+from app.db.review_repository import ReviewRepository
+
+if TYPE_CHECKING:
+    from app.services.review_service import ReviewService
+
+logger = get_logger(__name__)
+
+
+class ReviewChannel:
+    """
+    Events of one run, kept for late subscribers and broadcast to current ones.
+
+    Attributes:
+        events: Every event published so far; an event's index is its SSE id
+        closed: Whether the run has ended
+        subscribers: Streams following the run right now
+    """
+
+    def __init__(self) -> None:
+        self.events: list[dict[str, Any]] = []
+        self.closed = False
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+
+    def publish(self, event: dict[str, Any]) -> None:
+        self.events.append(event)
+        self._notify()
+
+    def close(self) -> None:
+        self.closed = True
+        self._notify()
+
+    async def follow(self, after: int = -1) -> AsyncGenerator[tuple[int, dict[str, Any]], None]:
+        """Events after index `after`, then new ones as they are published, until the run ends."""
+        index = after + 1
+        while True:
+            while index < len(self.events):
+                yield index, self.events[index]
+                index += 1
+            if self.closed:
+                return
+            await self._changed.wait()
+
+    def _notify(self) -> None:
+        # Wake everyone waiting now; later waits get a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+@dataclass
+class _Run:
+    channel: ReviewChannel
+    idle_cancel: bool
+    token: CancellationToken = field(default_factory=CancellationToken)
+    task: asyncio.Task | None = None
+    cancel_reason: str | None = None
+    idle_timer: asyncio.TimerHandle | None = None
+
+
+class ReviewRunner:
+    """Runs reviews in the background, and cancels and interrupts them."""
+
+    def __init__(self) -> None:
+        self._runs: dict[str, _Run] = {}
+        self._interrupts: dict[str, tuple[Callable[[], None], asyncio.Event]] = {}
+        self._lease_keeper: asyncio.Task | None = None
+        self._resume_retry: asyncio.Task | None = None
+
+    def start(
+        self,
+        review_id: str,
+        topic: str,
+        papers_limit: int,
+        model: str,
+        reuse: bool = False,
+        idle_cancel: bool = False,
+    ) -> asyncio.Task:
+        """
+        Run the review in the background; a review already running is not started twice.
+
+        Args:
+            reuse: Whether a cached review of the topic may answer this one
+            idle_cancel: Cancel the run once no stream has followed it for
+                settings.review_idle_cancel_seconds
+        """
+        return self._spawn(
+            review_id,
+            lambda service: service.start_review(
+                session_id=review_id, topic=topic, papers_limit=papers_limit, model=model, reuse=reuse
+            ),
+            idle_cancel=idle_cancel,
+        )
+
+    def refresh(self, review_id: str) -> asyncio.Task:
+        """Refresh a completed review in the background, unless it is already running."""
+        return self._spawn(review_id, lambda service: service.refresh_review(review_id))
+
+    def is_running(self, review_id: str) -> bool:
+        """Whether the review is running in this process."""
+        run = self._runs.get(review_id)
+        return (run is not None and not run.task.done()) or review_id in self._interrupts
+
+    def running(self) -> list[str]:
+        return [review_id for review_id, run in self._runs.items() if not run.task.done()]
+
+    async def subscribe(self, review_id: str, after: int = -1) -> AsyncGenerator[tuple[int, dict[str, Any]], None]:
+        """
+        Follow a run's events with their indexes, starting after index `after`.
+
+        Ends when the run does, or at once when the review is not running
+        here. While a run started with idle_cancel has no subscribers, its
+        idle countdown runs.
+
+        Args:
+            review_id: Review to follow
+            after: Index of the last event already seen (-1 for all)
+        """
+        run = self._runs.get(review_id)
+        if run is None:
+            return
+        run.channel.subscribers += 1
+        if run.idle_timer is not None:
+            run.idle_timer.cancel()
+            run.idle_timer = None
+        try:
+            async for item in run.channel.follow(after):
+                yield item
+        finally:
+            run.channel.subscribers -= 1
+            if run.channel.subscribers == 0 and run.idle_cancel and not run.task.done():
+                self._start_idle_countdown(review_id, run)
+
+    async def cancel(self, review_id: str) -> bool:
+        """
+        Cancel a review running here and wait a moment for it to stop.
+
+        The run marks the review cancelled as it stops (see _run).
+
+        Returns:
+            bool: False when the review is not running here
+        """
+        run = self._runs.get(review_id)
+        if run is None or run.task.done():
+            return False
+        self._cancel(review_id, run, "requested")
+        await asyncio.wait([run.task], timeout=get_settings().review_cancel_wait_seconds)
+        return True
+
+    async def resume_interrupted(self) -> list[str]:
+        """
+        Claim in-progress reviews with a recent, unleased checkpoint and resume them in the background.
+
+        Reviews another process is running keep their leases renewed and
+        are left alone. Leases still held, for instance by a process that
+        has just died, are claimed again once the first of them lapses.
+
+        Returns:
+            list[str]: Ids of the reviews resumed
+        """
+        settings = get_settings()
+        now = datetime.utcnow()
+        since = now - timedelta(hours=settings.checkpoint_resume_max_age_hours)
+        async with async_session_factory() as db:
+            repo = ReviewRepository(db)
+            reviews = await repo.claim_resumable_reviews(
+                checkpointed_after=since, lease_until=now + timedelta(seconds=settings.checkpoint_lease_seconds)
+            )
+            retry_at = await repo.next_checkpoint_lease_expiry(checkpointed_after=since)
+        if retry_at is not None and (self._resume_retry is None or self._resume_retry.done()):
+            delay = (retry_at - datetime.utcnow()).total_seconds()
+            self._resume_retry = asyncio.create_task(self._resume_later(delay), name="resume-interrupted")
+        for review in reviews:
+            self.start(
+                str(review.id),
+                review.topic,
+                review.papers_limit or settings.papers_per_review,
+                review.model or settings.default_model,
+            )
+        if reviews:
+            logger.info(f"Resuming {len(reviews)} interrupted reviews from their checkpoints")
+        return [str(review.id) for review in reviews]
+
+    @contextmanager
+    def interruptible(self, review_id: str, interrupt: Callable[[], None]) -> Iterator[None]:
+        """Register a running review's interrupt for shutdown while the block runs."""
+        done = asyncio.Event()
+        self._interrupts[review_id] = (interrupt, done)
+        try:
+            yield
+        finally:
+            if self._interrupts.get(review_id, (None, None))[1] is done:
+                del self._interrupts[review_id]
+            done.set()
+
+    async def shutdown(self, grace: float = 0.0) -> None:
+        """
+        Interrupt running reviews, then cancel the runs left and wait for them to stop.
+
+        Reviews stopped here keep their status, so they resume on the next start.
+
+        Args:
+            grace: Seconds to wait for interrupted reviews to save a final
+                checkpoint before their runs are cancelled
+        """
+        running = list(self._interrupts.values())
+        for interrupt, _ in running:
+            interrupt()
+        if running and grace > 0:
+            waits = [asyncio.create_task(done.wait()) for _, done in running]
+            _, pending = await asyncio.wait(waits, timeout=grace)
+            for wait in pending:
+                wait.cancel()
+            if pending:
+                logger.warning(f"{len(pending)} reviews did not reach a checkpoint within {grace}s")
+
+        for task in (self._resume_retry, self._lease_keeper):
+            if task is not None:
+                task.cancel()
+        review_ids = list(self._runs)
+        runs = list(self._runs.values())
+        for run in runs:
+            run.token.cancel()
+            run.task.cancel()
+        await asyncio.gather(*(run.task for run in runs), return_exceptions=True)
+        if not review_ids:
+            return
+        # Hand the reviews stopped here straight to whichever process starts next
+        try:
+            async with async_session_factory() as db:
+                await ReviewRepository(db).renew_checkpoint_leases(review_ids, lease_until=None)
+        except Exception as e:
+            logger.warning(f"Failed to release checkpoint leases: {e}")
+
+    def _spawn(
+        self,
+        review_id: str,
+        events: Callable[[ReviewService], AsyncGenerator[dict[str, Any], None]],
+        idle_cancel: bool = False,
+    ) -> asyncio.Task:
+        run = self._runs.get(review_id)
+        if run is not None and not run.task.done():
+            return run.task
+        run = _Run(channel=ReviewChannel(), idle_cancel=idle_cancel)
+        run.task = asyncio.create_task(self._run(review_id, run, events), name=f"review-{review_id}")
+        self._runs[review_id] = run
+        run.task.add_done_callback(lambda _: self._forget(review_id, run))
+        if get_settings().checkpoint_enabled and (self._lease_keeper is None or self._lease_keeper.done()):
+            self._lease_keeper = asyncio.create_task(self._keep_leases(), name="checkpoint-leases")
+        return run.task
+
+    async def _keep_leases(self) -> None:
+        """Renew the checkpoint leases of the reviews running here, until none are."""
+        lease = get_settings().checkpoint_lease_seconds
+        while True:
+            await asyncio.sleep(lease / 3)
+            running = self.running()
+            if not running:
+                return
+            try:
+                async with async_session_factory() as db:
+                    await ReviewRepository(db).renew_checkpoint_leases(
+                        running, lease_until=datetime.utcnow() + timedelta(seconds=lease)
+                    )
+            except Exception as e:
+                logger.warning(f"Failed to renew checkpoint leases: {e}")
+
+    async def _resume_later(self, delay: float) -> None:
+        """Claim interrupted reviews again once the leases seen held have lapsed."""
+        await asyncio.sleep(max(delay, 0.0) + 1.0)
+        self._resume_retry = None
+        try:
+            await self.resume_interrupted()
+        except Exception as e:
+            logger.warning(f"Failed to resume interrupted reviews: {e}")
+
+    def _forget(self, review_id: str, run: _Run) -> None:
+        if run.idle_timer is not None:
+            run.idle_timer.cancel()
+        if self._runs.get(review_id) is run:
+            del self._runs[review_id]
+
+    def _cancel(self, review_id: str, run: _Run, reason: str) -> None:
+        """Stop the run's in-flight calls and the run itself; the run records the cancellation."""
+        if run.cancel_reason is not None:
+            return
+        logger.info(f"Cancelling review {review_id} ({reason})")
+        run.cancel_reason = reason
+        REVIEWS_CANCELLED.labels(reason).inc()
+        # Token first: once the task is cancelled, AutoGen waits for its runtime to go idle
+        run.token.cancel()
+        run.task.cancel()
+
+    def _start_idle_countdown(self, review_id: str, run: _Run) -> None:
+        grace = get_settings().review_idle_cancel_seconds
+        if grace <= 0:
+            return
+
+        def expire() -> None:
+            run.idle_timer = None
+            if run.channel.subscribers == 0 and not run.task.done():
+                self._cancel(review_id, run, "abandoned")
+
+        run.idle_timer = asyncio.get_running_loop().call_later(grace, expire)
+
+    async def _run(
+        self,
+        review_id: str,
+        run: _Run,
+        events: Callable[[ReviewService], AsyncGenerator[dict[str, Any], None]],
+    ) -> None:
+        from app.services.review_service import ReviewService
+
+        logger.info(f"Background run started: review={review_id}")
+        try:
+            with use_cancellation(run.token):
+                async with async_session_factory() as db:
+                    async for event in events(ReviewService(db)):
+                        run.channel.publish(event)
+        except asyncio.CancelledError:
+            if run.cancel_reason is not None:
+                await self._finish_cancelled(review_id, run)
+            raise
+        except Exception as e:
+            logger.error(f"Background run failed: review={review_id}: {e}", exc_info=True)
+            run.channel.publish({"type": "error", "error": str(e), "timestamp": datetime.utcnow().isoformat()})
+        finally:
+            run.channel.close()
+        logger.info(f"Background run finished: review={review_id}")
+
+    async def _finish_cancelled(self, review_id: str, run: _Run) -> None:
+        """Give a cancelled review its terminal status and tell its subscribers."""
+        try:
+            async with async_session_factory() as db:
+                await ReviewRepository(db).cancel_review(review_id)
+        except Exception as e:
+            logger.warning(f"Failed to mark review {review_id} cancelled: {e}")
+        run.channel.publish(
+            {
+                "type": "cancelled",
+                "session_id": review_id,
+                "reason": run.cancel_reason,
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+        )
+
+
+_runner: ReviewRunner | None = None
+
+
+def get_review_runner() -> ReviewRunner:
+    """Process-wide runner; created on first use from the event loop."""
+    global _runner
+    if _runner is None:
+        _runner = ReviewRunner()
+    return _runner
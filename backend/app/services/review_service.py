@@ -1,17 +1,26 @@
 """Review service wrapping AutoGen orchestrator"""
 
+import functools
 import json
 import logging
 import re
 from collections.abc import AsyncGenerator
-from datetime import datetime
+from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.exceptions import LitRevError
+from app.config.settings import get_settings
+from app.core.exceptions import LitRevError, ReviewInterrupted
+from app.core.metrics import REVIEWS_RUNNING, record_cache_lookup
+from app.core.replay import ReviewRecorder
+from app.core.topics import topic_fingerprint
+from app.core.usage import UsageTracker
 from app.db.review_repository import ReviewRepository
 from app.orchestrator.litrev_orchestrator import LitRevOrchestrator
+from app.orchestrator.retrieval import parse_sub_queries
+from app.services.review_runner import get_review_runner
 
 logger = logging.getLogger(__name__)
 
@@ -23,75 +32,125 @@ class ReviewService:
         self.repo = ReviewRepository(db)
 
     async def start_review(
-        self, session_id: str, topic: str, papers_limit: int, model: str = "gpt-4o-mini"
+        self,
+        session_id: str,
+        topic: str,
+        papers_limit: int,
+        model: str = "gpt-4o-mini",
+        reuse: bool = True,
     ) -> AsyncGenerator[dict[str, Any], None]:
         """
         Start a literature review and stream messages
 
+        A review with a checkpoint (one interrupted by a restart) resumes
+        from it. Otherwise a recent completed review of the same normalized
+        topic is reused instead of running the agents (see app.core.topics),
+        unless the topic cache is disabled or reuse is False.
+
         Args:
             session_id: Session ID for tracking
             topic: Research topic
             papers_limit: Number of papers to find
             model: LLM model to use
+            reuse: Whether a cached review of the topic may answer this one
 
         Yields:
             Dictionary with message data
         """
+        settings = get_settings()
+        resume_from = await self.repo.get_checkpoint(session_id) if settings.checkpoint_enabled else None
+        if resume_from is None and reuse and settings.topic_cache_enabled:
+            reused = await self._reuse_cached_review(session_id)
+            if reused is not None:
+                for message in reused:
+                    yield message
+                yield {
+                    "type": "complete",
+                    "session_id": session_id,
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+                return
+
+        usage_tracker = UsageTracker()
+        recording_dir = settings.recording_dir
+        recorder = (
+            ReviewRecorder(review_id=session_id, topic=topic, num_papers=papers_limit, model=model)
+            if recording_dir
+            else None
+        )
+        REVIEWS_RUNNING.inc()
         try:
             # Update status to in_progress
             await self.repo.update_status(session_id, "in_progress")
 
             logger.info(
-                f"Starting review {session_id}: topic='{topic}', papers={papers_limit}, model={model}"
+                f"{'Resuming' if resume_from else 'Starting'} review {session_id}: "
+                f"topic='{topic}', papers={papers_limit}, model={model}"
             )
 
             # Run AutoGen orchestrator
             orchestrator = LitRevOrchestrator(model=model)
-            async for message_str in orchestrator.run_review(
-                topic=topic, num_papers=papers_limit
-            ):
-                # Parse message in "source: content" format
-                parsed = self._parse_message(message_str)
-
-                if parsed:
-                    source = parsed["source"]
-                    content = parsed["content"]
-
-                    # Determine message type
-                    message_type = self._determine_message_type(source, content)
-
-                    # Progress and guardrail events are UI-only, don't store in DB
-                    if message_type in ("progress", "guardrail"):
+            checkpoint = (
+                functools.partial(
+                    self.repo.save_checkpoint, session_id, lease_seconds=settings.checkpoint_lease_seconds
+                )
+                if settings.checkpoint_enabled
+                else None
+            )
+            with get_review_runner().interruptible(session_id, orchestrator.interrupt):
+                events = orchestrator.run_review(
+                    topic=topic,
+                    num_papers=papers_limit,
+                    usage_tracker=usage_tracker,
+                    trace_id=session_id,
+                    replay_session=recorder,
+                    checkpoint=checkpoint,
+                    resume_from=resume_from,
+                )
+                async for message_str in events:
+                    # Parse message in "source: content" format
+                    parsed = self._parse_message(message_str)
+
+                    if parsed:
+                        source = parsed["source"]
+                        content = parsed["content"]
+
+                        # Determine message type
+                        message_type = self._determine_message_type(source, content)
+
+                        # Progress and guardrail events are UI-only, don't store in DB
+                        if message_type in ("progress", "guardrail"):
+                            yield {
+                                "source": source,
+                                "content": content,
+                                "timestamp": datetime.utcnow().isoformat(),
+                                "message_type": message_type,
+                            }
+                            continue
+
+                        # Store in database
+                        await self.repo.add_message(
+                            review_id=session_id,
+                            source=source,
+                            content=content,
+                            message_type=message_type,
+                        )
+
+                        # Extract papers if search agent message
+                        if source == "search_agent":
+                            await self._extract_papers(session_id, content)
+
+                        # Yield message for streaming
                         yield {
                             "source": source,
                             "content": content,
                             "timestamp": datetime.utcnow().isoformat(),
                             "message_type": message_type,
                         }
-                        continue
-
-                    # Store in database
-                    await self.repo.add_message(
-                        review_id=session_id,
-                        source=source,
-                        content=content,
-                        message_type=message_type,
-                    )
-
-                    # Extract papers if search agent message
-                    if source == "search_agent":
-                        await self._extract_papers(session_id, content)
-
-                    # Yield message for streaming
-                    yield {
-                        "source": source,
-                        "content": content,
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "message_type": message_type,
-                    }
 
             # Mark as completed
             await self.repo.update_status(session_id, "completed")
+            await self._discard_checkpoint(session_id)
             logger.info(f"Completed review {session_id}")
 
             # Yield completion event
@@ -101,9 +160,22 @@ class ReviewService:
                 "timestamp": datetime.utcnow().isoformat(),
             }
 
+        except ReviewInterrupted as e:
+            # Left in progress with its checkpoint, to resume on restart
+            logger.info(f"Review {session_id} interrupted: {e}")
+            note = "Review paused for a server restart; it resumes from its last checkpoint."
+            await self.repo.add_message(review_id=session_id, source="system", content=note, message_type="system")
+            yield {
+                "source": "system",
+                "content": note,
+                "timestamp": datetime.utcnow().isoformat(),
+                "message_type": "system",
+            }
+
         except LitRevError as e:
             logger.error(f"LitRevError in review {session_id}: {e}")
             await self.repo.update_status(session_id, "failed")
+            await self._discard_checkpoint(session_id)
             await self.repo.add_message(
                 review_id=session_id,
                 source="system",
@@ -119,6 +191,7 @@ class ReviewService:
         except Exception as e:
             logger.error(f"Unexpected error in review {session_id}: {e}", exc_info=True)
             await self.repo.update_status(session_id, "failed")
+            await self._discard_checkpoint(session_id)
             await self.repo.add_message(
                 review_id=session_id,
                 source="system",
@@ -131,6 +204,188 @@ class ReviewService:
                 "timestamp": datetime.utcnow().isoformat(),
             }
 
+        finally:
+            REVIEWS_RUNNING.dec()
+            await self._save_metrics(session_id, usage_tracker)
+            if recorder is not None:
+                self._save_recording(session_id, recorder, recording_dir)
+
+    async def refresh_review(self, session_id: str) -> AsyncGenerator[dict[str, Any], None]:
+        """
+        Update a completed review with papers published since it completed
+
+        The new papers are added to the review and its summary is
+        rewritten in place; completed_at then marks the refresh, so the
+        next one starts from there. On failure the review keeps its
+        previous results and completion time.
+
+        Args:
+            session_id: ID of a completed review
+
+        Yields:
+            Dictionary with message data
+        """
+        review = await self.repo.get_review(session_id)
+        if review is None or review.status != "completed" or review.completed_at is None:
+            yield {
+                "type": "error",
+                "error": "Only completed reviews can be refreshed",
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+            return
+
+        messages = sorted(review.messages, key=lambda m: m.timestamp)
+        planner_output = next((m.content for m in reversed(messages) if m.message_type == "planning"), None)
+        summary = next((m.content for m in reversed(messages) if m.message_type == "summary"), "")
+        known_ids = {link.paper_id for link in review.papers}
+        completed_at = review.completed_at
+
+        usage_tracker = UsageTracker()
+        REVIEWS_RUNNING.inc()
+        try:
+            logger.info(f"Refreshing review {session_id}: {len(known_ids)} papers, completed {completed_at}")
+            orchestrator = LitRevOrchestrator(model=review.model)
+            added = 0
+            async for message_str in orchestrator.refresh_review(
+                topic=review.topic,
+                sub_queries=parse_sub_queries(planner_output),
+                summary=summary,
+                known_ids=known_ids,
+                completed_at=completed_at,
+                num_papers=review.papers_limit,
+                usage_tracker=usage_tracker,
+                trace_id=session_id,
+            ):
+                parsed = self._parse_message(message_str)
+                source, content = parsed["source"], parsed["content"]
+                message_type = self._determine_message_type(source, content)
+
+                if message_type == "summary":
+                    await self.repo.replace_summary(session_id, content)
+                elif message_type != "progress":
+                    await self.repo.add_message(
+                        review_id=session_id, source=source, content=content, message_type=message_type
+                    )
+                    if source == "search_agent":
+                        added += await self._extract_papers(session_id, content)
+
+                yield {
+                    "source": source,
+                    "content": content,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "message_type": message_type,
+                }
+
+            note = f"Refreshed with {added} papers published since {completed_at:%Y-%m-%d}."
+            await self.repo.add_message(review_id=session_id, source="system", content=note, message_type="system")
+            await self.repo.update_status(session_id, "completed")
+            logger.info(f"Refreshed review {session_id}: {added} new papers")
+            yield {
+                "source": "system",
+                "content": note,
+                "timestamp": datetime.utcnow().isoformat(),
+                "message_type": "system",
+            }
+            yield {
+                "type": "complete",
+                "session_id": session_id,
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+
+        except Exception as e:
+            # The review is left completed with its previous results
+            logger.error(f"Refresh of review {session_id} failed: {e}", exc_info=not isinstance(e, LitRevError))
+            await self.repo.add_message(
+                review_id=session_id,
+                source="system",
+                content=f"Refresh failed: {str(e)}",
+                message_type="error",
+            )
+            yield {
+                "type": "error",
+                "error": str(e),
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+
+        finally:
+            REVIEWS_RUNNING.dec()
+            await self._save_metrics(session_id, usage_tracker)
+
+    async def _reuse_cached_review(self, session_id: str) -> list[dict[str, Any]] | None:
+        """
+        Complete the review from a recent review of the same topic, if there is one.
+
+        When the review asked for a refresh, a fresh review of the topic
+        is also started in the background for the same user.
+
+        Returns:
+            list | None: The messages to stream, or None on a cache miss
+        """
+        review = await self.repo.get_review(session_id)
+        if review is None:
+            return None
+        ttl = timedelta(hours=get_settings().topic_cache_ttl_hours)
+        source = await self.repo.find_reusable_review(
+            review.topic_fingerprint or topic_fingerprint(review.topic),
+            completed_after=datetime.utcnow() - ttl,
+            exclude_id=session_id,
+        )
+        record_cache_lookup("topic", hit=source is not None)
+        if source is None:
+            return None
+
+        copied = await self.repo.reuse_results(source, session_id)
+        age = datetime.utcnow() - source.completed_at
+        note = (
+            f"Reused the results of a review of '{source.topic}' completed "
+            f"{int(age.total_seconds() // 60)} minutes ago."
+        )
+        if review.refresh_cached:
+            fresh = await self.repo.create_review(
+                topic=review.topic,
+                papers_limit=review.papers_limit,
+                model=review.model,
+                user_id=str(review.user_id),
+            )
+            get_review_runner().start(str(fresh.id), fresh.topic, fresh.papers_limit, fresh.model)
+            note += f" A fresh review is running in the background as {fresh.id}."
+        await self.repo.add_message(review_id=session_id, source="system", content=note, message_type="system")
+        logger.info(f"Review {session_id} reused review {source.id}")
+
+        now = datetime.utcnow().isoformat()
+        return [{"source": "system", "content": note, "timestamp": now, "message_type": "system"}] + [
+            {"source": m.source, "content": m.content, "timestamp": now, "message_type": m.message_type}
+            for m in copied
+        ]
+
+    async def _discard_checkpoint(self, session_id: str) -> None:
+        """Drop the checkpoint of a review that finished either way; never fails the review."""
+        try:
+            await self.repo.delete_checkpoint(session_id)
+        except Exception as e:
+            logger.warning(f"Failed to delete checkpoint for review {session_id}: {e}")
+
+    async def _save_metrics(self, session_id: str, usage_tracker: UsageTracker) -> None:
+        """Persist usage records; accounting must never fail the review itself."""
+        try:
+            await self.repo.add_metrics(session_id, usage_tracker.records)
+            totals = usage_tracker.totals()
+            logger.info(
+                f"Review {session_id} usage: {totals['llm_calls']} LLM calls, "
+                f"{totals['tool_calls']} tool calls, "
+                f"{totals['prompt_tokens'] + totals['completion_tokens']} tokens, "
+                f"${totals['cost_usd']:.4f}"
+            )
+        except Exception as e:
+            logger.warning(f"Failed to save metrics for review {session_id}: {e}")
+
+    def _save_recording(self, session_id: str, recorder: ReviewRecorder, recording_dir: str) -> None:
+        """Write the review's LLM and tool I/O for later replay."""
+        try:
+            recorder.save(Path(recording_dir) / f"{session_id}.jsonl.gz")
+        except Exception as e:
+            logger.warning(f"Failed to save recording for review {session_id}: {e}")
+
     def _parse_message(self, message_str: str) -> dict[str, str]:
         """Parse message in 'source: content' format"""
         # Match pattern: "source: content"
@@ -158,33 +413,20 @@ class ReviewService:
             return "error"
         return "system"
 
-    async def _extract_papers(self, session_id: str, content: str) -> None:
-        """Extract paper information from search agent message"""
+    async def _extract_papers(self, session_id: str, content: str) -> int:
+        """Extract paper information from search agent message; returns how many papers were stored"""
         payload = self._parse_papers_payload(content)
         if not payload:
-            return
-
-        for paper in payload:
-            if not isinstance(paper, dict):
-                continue
-
-            title = paper.get("title")
-            authors = paper.get("authors")
-            published = paper.get("published")
-            summary = paper.get("summary")
-            pdf_url = paper.get("pdf_url")
-
-            if not all([title, authors, published, summary, pdf_url]):
-                continue
-
-            await self.repo.add_paper(
-                review_id=session_id,
-                title=title,
-                authors=authors,
-                published=published,
-                summary=summary,
-                pdf_url=pdf_url,
-            )
+            return 0
+
+        papers = [
+            paper
+            for paper in payload
+            if isinstance(paper, dict)
+            and all(paper.get(key) for key in ("title", "authors", "published", "summary", "pdf_url"))
+        ]
+        await self.repo.add_papers(review_id=session_id, papers=papers)
+        return len(papers)
 
     def _parse_papers_payload(self, content: str) -> list | None:
         """Parse a JSON payload of papers from an agent message."""
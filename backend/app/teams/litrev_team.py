@@ -5,22 +5,38 @@ Literature review team using SelectorGroupChat for dynamic agent routing.
 
 Uses AutoGen's SelectorGroupChat so the LLM dynamically picks which agent
 speaks next, enabling iterative search-summarize-critique loops.
+
+The team's state can be saved after every turn and loaded into a new
+team, which then continues the conversation where it stopped (see
+LitRevOrchestrator's checkpoints).
+
+Once the review's budget is spent (see app.core.budget), the next turn
+goes to the summarizer unless it has written a draft already, and the
+team stops with that draft as the review.
 """
 
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable, Mapping, Sequence
+from typing import Any
 
 from autogen_agentchat.agents import AssistantAgent
-from autogen_agentchat.conditions import MaxMessageTermination, TextMentionTermination
-from autogen_agentchat.messages import TextMessage
+from autogen_agentchat.conditions import (
+    ExternalTermination,
+    MaxMessageTermination,
+    TextMentionTermination,
+)
+from autogen_agentchat.messages import BaseAgentEvent, BaseChatMessage, TextMessage
 from autogen_agentchat.teams import SelectorGroupChat
 
 from app.agents.critic_agent import CriticAgent
 from app.agents.search_agent import SearchAgent
 from app.agents.summarizer_agent import SummarizerAgent
+from app.core.budget import BudgetTermination, get_budget
 from app.core.exceptions import TeamError
 from app.core.logging_config import get_logger
+from app.core.tracing import record_span
 from app.teams.base import BaseTeam
 
 logger = get_logger(__name__)
@@ -38,6 +54,8 @@ class LitRevTeam(BaseTeam):
     SELECTOR_PROMPT = (
         "You are the orchestrator of a research team. Given the conversation so far, "
         "pick the next agent to speak.\n\n"
+        "Roles:\n{roles}\n\n"
+        "Conversation so far:\n{history}\n\n"
         "Rules:\n"
         "- If no search has been done yet, pick search_agent.\n"
         "- If search results are available but no review has been written, pick summarizer.\n"
@@ -45,7 +63,8 @@ class LitRevTeam(BaseTeam):
         "- If the critic says coverage is lacking or more sources are needed, pick search_agent.\n"
         "- If the critic gave revision feedback (not about missing sources), pick summarizer.\n"
         "- If the critic said APPROVED, stop.\n"
-        "- Never pick the same agent twice in a row unless it's search_agent gathering more sources."
+        "- Never pick the same agent twice in a row unless it's search_agent gathering more sources.\n\n"
+        "Reply with exactly one name from {participants}."
     )
 
     def __init__(
@@ -54,6 +73,7 @@ class LitRevTeam(BaseTeam):
         api_key: str,
         tavily_api_key: str = "",
         max_turns: int = 12,
+        base_url: str | None = None,
     ) -> None:
         super().__init__(
             name="litrev_team",
@@ -64,11 +84,15 @@ class LitRevTeam(BaseTeam):
         self.api_key = api_key
 
         self._search_agent = SearchAgent(
-            model=model, api_key=api_key, tavily_api_key=tavily_api_key,
+            model=model, api_key=api_key, tavily_api_key=tavily_api_key, base_url=base_url,
         )
-        self._summarizer_agent = SummarizerAgent(model=model, api_key=api_key)
-        self._critic_agent = CriticAgent(model=model, api_key=api_key)
+        self._summarizer_agent = SummarizerAgent(model=model, api_key=api_key, base_url=base_url)
+        self._critic_agent = CriticAgent(model=model, api_key=api_key, base_url=base_url)
         self._team: SelectorGroupChat | None = None
+        self._stop = ExternalTermination()
+        self._budget_stop = BudgetTermination(draft_source="summarizer")
+        # Chat messages so far, including any taken before the state was loaded
+        self.turns = 0
 
         logger.debug(f"LitRevTeam initialized with model={model}")
 
@@ -85,30 +109,101 @@ class LitRevTeam(BaseTeam):
 
         participants = self._get_participants()
 
-        termination = TextMentionTermination("APPROVED") | MaxMessageTermination(self.max_turns)
+        termination = (
+            TextMentionTermination("APPROVED")
+            | MaxMessageTermination(max(self.max_turns - self.turns, 1))
+            | self._stop
+            | self._budget_stop
+        )
 
         self._team = SelectorGroupChat(
             participants=participants,
             termination_condition=termination,
-            model_client=self._search_agent._build_llm_client(),
+            model_client=self._search_agent._build_llm_client(stage="selector"),
             selector_prompt=self.SELECTOR_PROMPT,
+            selector_func=self._select_speaker,
         )
 
         logger.info(f"Built LitRevTeam (SelectorGroupChat) with {len(participants)} agents")
         return self._team
 
+    async def save_state(self) -> Mapping[str, Any]:
+        """The team's conversation and selector state (see SelectorGroupChat.save_state)."""
+        return await self.build().save_state()
+
+    @property
+    def budget_limit(self) -> str | None:
+        """The budget limit that stopped the team, if one did (see ReviewBudget.exhausted)."""
+        return self._budget_stop.limit
+
+    def _select_speaker(self, messages: Sequence[BaseAgentEvent | BaseChatMessage]) -> str | None:
+        """Hand the turn to the summarizer once the budget is spent; otherwise let the model pick."""
+        budget = get_budget()
+        if budget is not None and budget.exhausted() is not None:
+            return self._budget_stop.draft_source
+        return None
+
+    async def load_state(self, state: Mapping[str, Any], turns: int = 0, has_draft: bool = False) -> None:
+        """
+        Continue from saved state; run_stream(None) then picks up where it stopped.
+
+        Call on a new team, before it runs: the turn budget is fixed when
+        the team is built.
+
+        Args:
+            state: A save_state() result
+            turns: Chat messages already taken, counted against max_turns
+            has_draft: Whether the summarizer has written a draft already
+        """
+        self.turns = turns
+        self._budget_stop.has_draft = has_draft
+        await self.build().load_state(state)
+
+    def stop(self) -> None:
+        """Stop once the agent speaking now finishes its turn."""
+        self._stop.set()
+
     async def run_stream(
         self,
-        task: str,
+        task: str | None,
+        on_turn: Callable[[Mapping[str, Any]], Awaitable[None]] | None = None,
     ) -> AsyncGenerator[str, None]:
+        """
+        Run the team, or continue a loaded one when task is None.
+
+        Args:
+            task: The task prompt for the team
+            on_turn: Called with the team's state after each agent turn,
+                once that turn's message has been handed on
+        """
         team = self.build()
 
-        logger.info(f"Starting team execution: {task[:50]}...")
+        logger.info(f"Starting team execution: {(task or 'resumed')[:50]}...")
 
         try:
+            turn_start = time.time()
             async for msg in team.run_stream(task=task):
+                if isinstance(msg, BaseChatMessage) and msg.source != "user":
+                    # Agents run inside AutoGen's runtime, so a turn is only
+                    # observable here, once its final message arrives
+                    now = time.time()
+                    usage = msg.models_usage
+                    record_span(
+                        "team.turn",
+                        turn_start,
+                        now,
+                        agent=msg.source,
+                        prompt_tokens=usage.prompt_tokens if usage else 0,
+                        completion_tokens=usage.completion_tokens if usage else 0,
+                    )
+                    turn_start = now
+
+                if isinstance(msg, BaseChatMessage):
+                    self.turns += 1
                 if isinstance(msg, TextMessage):
                     yield f"{msg.source}: {msg.content}"
+                if on_turn is not None and isinstance(msg, BaseChatMessage) and msg.source != "user":
+                    await on_turn(await team.save_state())
 
         except Exception as e:
             logger.error(f"Team execution failed: {e}")
@@ -6,8 +6,18 @@ Tool classes for agent capabilities.
 
 from app.tools.arxiv_tool import ArxivSearchTool
 from app.tools.base import BaseTool
+from app.tools.local_corpus_tool import LocalCorpusSearchTool
+from app.tools.pdf_reader_tool import PdfReaderTool
 from app.tools.semantic_scholar_tool import SemanticScholarTool
 from app.tools.tavily_tool import TavilySearchTool
 from app.tools.web_reader_tool import WebReaderTool
 
-__all__ = ["BaseTool", "ArxivSearchTool", "SemanticScholarTool", "TavilySearchTool", "WebReaderTool"]
+__all__ = [
+    "BaseTool",
+    "ArxivSearchTool",
+    "LocalCorpusSearchTool",
+    "PdfReaderTool",
+    "SemanticScholarTool",
+    "TavilySearchTool",
+    "WebReaderTool",
+]
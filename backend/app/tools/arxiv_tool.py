@@ -5,20 +5,77 @@ arXiv search tool for fetching academic papers.
 
 Provides search functionality against the arXiv API with
 result formatting suitable for literature review tasks.
+
+Besides the agent-facing search, search_many() answers several planner
+sub-queries with one OR'd request and splits the results back out per
+sub-query, and fetch_ids() looks up known arXiv ids through id_list.
+search_many() can also be limited to papers submitted after a given
+time, which incremental review refreshes use.
+Every request asks for exactly as many results as it needs rather than
+the client's default page of 100.
 """
 
 from __future__ import annotations
 
-from collections.abc import Callable
+import functools
+import re
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from urllib.parse import urlsplit
 
 import arxiv
 
+from app.config.settings import get_settings
 from app.core.exceptions import ToolError
 from app.core.logging_config import get_logger
+from app.core.resilience import RetryPolicy
 from app.tools.base import BaseTool
+from app.tools.passages import tokenize
+from app.tools.scheduler import schedule_session
 
 logger = get_logger(__name__)
 
+# arXiv returns at most 2000 results per request
+MAX_PAGE_SIZE = 2000
+# Longest combined query sent in one request, in characters
+MAX_COMBINED_QUERY = 1500
+# Results requested per sub-query in a combined search; the OR'd ranking
+# favours some sub-queries, so each needs headroom to get its share
+OVERFETCH = 3
+ID_BATCH_SIZE = 200
+
+_VERSION_SUFFIX = re.compile(r"v\d+$")
+_FIELD_SYNTAX = re.compile(r"\b(?:ti|au|abs|co|jr|cat|rn|id|all):|\b(?:AND|OR|ANDNOT)\b")
+
+
+class _SizedClient(arxiv.Client):
+    """arxiv.Client whose requests ask for what the search still needs, up to page_size."""
+
+    def _format_url(self, search: arxiv.Search, start: int, page_size: int) -> str:
+        if search.max_results:
+            page_size = max(min(page_size, search.max_results - start), 1)
+        return super()._format_url(search, start, page_size)
+
+
+def field_query(query: str) -> str:
+    """
+    A sub-query as an arXiv field query: every significant term must appear.
+
+    Queries already written in arXiv syntax (ti:, abs:, AND, ...) are kept
+    as they are.
+    """
+    if _FIELD_SYNTAX.search(query):
+        return f"({query.strip()})"
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return ""
+    return "(" + " AND ".join(f"all:{term}" for term in terms) + ")"
+
+
+def submitted_after(since: datetime) -> str:
+    """arXiv clause matching papers submitted at or after `since` (UTC)."""
+    return f"submittedDate:[{since:%Y%m%d%H%M} TO {datetime.utcnow():%Y%m%d%H%M}]"
+
 
 # ===============================================================
 # ARXIV SEARCH TOOL
@@ -34,17 +91,24 @@ class ArxivSearchTool(BaseTool):
 
     Attributes:
         default_max_results: Default number of results to return
+        api_url: arXiv Atom query endpoint
     """
 
+    retry_policy = RetryPolicy(attempts=3, base_delay=1.0, max_delay=6.0)
+    circuit_breaker = True
+    coalesce = True
+
     def __init__(
         self,
         default_max_results: int = 5,
+        api_url: str | None = None,
     ) -> None:
         """
         Initialize the arXiv search tool.
 
         Args:
             default_max_results: Default max results per search
+            api_url: arXiv query endpoint (defaults to settings.arxiv_api_url)
         """
         super().__init__(
             name="arxiv_search",
@@ -54,12 +118,25 @@ class ArxivSearchTool(BaseTool):
             ),
         )
         self.default_max_results = default_max_results
-        self._client = arxiv.Client()
+        self.api_url = api_url or get_settings().arxiv_api_url
+        self._client = self._make_client(self.api_url)
+        self._mirror_url = get_settings().arxiv_mirror_url or self.api_url
+        self._mirror = self._client if self._mirror_url == self.api_url else self._make_client(self._mirror_url)
 
         logger.debug(
             f"ArxivSearchTool initialized with default_max={default_max_results}"
         )
 
+    @staticmethod
+    def _make_client(api_url: str) -> arxiv.Client:
+        # The client's own 3 s delay is per instance, so parallel reviews
+        # multiplied it; the shared scheduler spaces requests process-wide.
+        # Its immediate retries are replaced by retry_policy's backoff.
+        client = _SizedClient(page_size=MAX_PAGE_SIZE, delay_seconds=0, num_retries=0)
+        client.query_url_format = api_url + "?{}"
+        schedule_session(client._session)
+        return client
+
     # ===============================================================
     # SEARCH IMPLEMENTATION
     # ===============================================================
@@ -82,6 +159,9 @@ class ArxivSearchTool(BaseTool):
         Raises:
             ToolError: If the search fails
         """
+        return self._search(self._client, query, max_results)
+
+    def _search(self, client: arxiv.Client, query: str, max_results: int) -> list[dict]:
         capped_results = min(max_results, self.default_max_results)
         logger.info(f"Searching arXiv: query='{query}', max_results={capped_results}")
 
@@ -92,17 +172,7 @@ class ArxivSearchTool(BaseTool):
                 sort_by=arxiv.SortCriterion.Relevance,
             )
 
-            papers: list[dict] = []
-            for result in self._client.results(search):
-                papers.append(
-                    {
-                        "title": result.title,
-                        "authors": [a.name for a in result.authors],
-                        "published": result.published.strftime("%Y-%m-%d"),
-                        "summary": result.summary,
-                        "pdf_url": result.pdf_url,
-                    }
-                )
+            papers = [_format_result(result) for result in client.results(search)]
 
             logger.info(f"Found {len(papers)} papers for query: {query}")
             return papers
@@ -115,10 +185,147 @@ class ArxivSearchTool(BaseTool):
                 details={"query": query, "max_results": capped_results},
             ) from e
 
+    # ===============================================================
+    # MULTI-QUERY RETRIEVAL
+    # ===============================================================
+
+    def search_many(
+        self,
+        queries: Sequence[str],
+        max_results: int = 5,
+        published_after: datetime | None = None,
+    ) -> dict[str, list[dict]]:
+        """
+        Search several sub-queries in as few arXiv requests as possible.
+
+        Sub-queries are turned into field queries and OR'd together (as
+        many per request as fit in MAX_COMBINED_QUERY), and each request
+        asks for OVERFETCH times the results it needs. Results are then
+        assigned back to the sub-queries whose terms they contain, in
+        arXiv's relevance order. Sub-queries still short of max_results
+        get one more combined request of their own.
+
+        Args:
+            queries: Planner sub-queries
+            max_results: Results wanted per sub-query
+            published_after: Only papers submitted at or after this time (UTC)
+
+        Returns:
+            dict: Papers (with arxiv_id) per sub-query, in input order
+
+        Raises:
+            ToolError: If a request fails
+        """
+        clauses = {q: field_query(q) for q in dict.fromkeys(queries)}
+        results: dict[str, list[dict]] = {q: [] for q in clauses}
+        pending = [q for q, clause in clauses.items() if clause]
+        exhausted: set[str] = set()
+        for _round in range(2):
+            for group in self._groups(pending, clauses):
+                papers, complete = self._search_combined(group, clauses, max_results, published_after)
+                self._assign(papers, group, results, max_results)
+                if complete:
+                    # arXiv had nothing more for these; asking again would not help
+                    exhausted.update(group)
+            pending = [q for q in pending if len(results[q]) < max_results and q not in exhausted]
+            if not pending:
+                break
+        return results
+
+    def fetch_ids(self, arxiv_ids: Sequence[str]) -> list[dict]:
+        """
+        Look up known arXiv ids with id_list requests.
+
+        Args:
+            arxiv_ids: Ids such as "2106.15928" (versions allowed)
+
+        Returns:
+            list[dict]: Papers (with arxiv_id) for the ids arXiv knows, in
+            the order given
+
+        Raises:
+            ToolError: If a request fails
+        """
+        papers: list[dict] = []
+        ids = list(dict.fromkeys(arxiv_ids))
+        try:
+            for start in range(0, len(ids), ID_BATCH_SIZE):
+                chunk = ids[start : start + ID_BATCH_SIZE]
+                search = arxiv.Search(id_list=chunk, max_results=len(chunk))
+                papers.extend(_format_result(result, with_id=True) for result in self._client.results(search))
+        except Exception as e:
+            logger.error(f"arXiv id lookup failed: {e}")
+            raise ToolError(
+                f"Failed to look up arXiv ids: {e}",
+                tool_name=self.name,
+                details={"ids": len(ids)},
+            ) from e
+        return papers
+
+    def _groups(self, queries: list[str], clauses: dict[str, str]) -> list[list[str]]:
+        """Pack sub-queries into groups whose OR'd clauses fit one request."""
+        groups: list[list[str]] = []
+        length = 0
+        for query in queries:
+            cost = len(clauses[query]) + len(" OR ")
+            if not groups or length + cost > MAX_COMBINED_QUERY:
+                groups.append([])
+                length = 0
+            groups[-1].append(query)
+            length += cost
+        return groups
+
+    def _search_combined(
+        self, group: list[str], clauses: dict[str, str], max_results: int, published_after: datetime | None = None
+    ) -> tuple[list[dict], bool]:
+        """One OR'd request for a group; also says whether it returned every match."""
+        combined = " OR ".join(clauses[q] for q in group)
+        if published_after is not None:
+            combined = f"({combined}) AND {submitted_after(published_after)}"
+        wanted = min(len(group) * max_results * OVERFETCH, MAX_PAGE_SIZE)
+        logger.info(f"Searching arXiv for {len(group)} sub-queries in one request (max_results={wanted})")
+        try:
+            search = arxiv.Search(query=combined, max_results=wanted, sort_by=arxiv.SortCriterion.Relevance)
+            papers = [_format_result(result, with_id=True) for result in self._client.results(search)]
+            return papers, len(papers) < wanted
+        except Exception as e:
+            logger.error(f"arXiv combined search failed: {e}")
+            raise ToolError(
+                f"Failed to search arXiv: {e}",
+                tool_name=self.name,
+                details={"queries": group, "max_results": wanted},
+            ) from e
+
+    @staticmethod
+    def _assign(papers: list[dict], group: list[str], results: dict[str, list[dict]], max_results: int) -> None:
+        """
+        Split combined results back out per sub-query.
+
+        A paper goes to every sub-query whose terms all occur in its title
+        and abstract; one that matched through other fields (comments,
+        authors) goes to the sub-query it overlaps most.
+        """
+        terms = {q: set(tokenize(q)) for q in group}
+        for paper in papers:
+            words = set(tokenize(f"{paper['title']} {paper['summary']}"))
+            overlap = {q: len(terms[q] & words) for q in group}
+            owners = [q for q in group if terms[q] and overlap[q] == len(terms[q])]
+            if not owners:
+                best = max(group, key=lambda q: overlap[q])
+                owners = [best] if overlap[best] else []
+            for query in owners:
+                seen = {p["arxiv_id"] for p in results[query]}
+                if len(results[query]) < max_results and paper["arxiv_id"] not in seen:
+                    results[query].append(paper)
+
     # ===============================================================
     # TOOL INTERFACE
     # ===============================================================
 
+    def _hedge_target(self) -> tuple[Callable[..., list[dict]], str]:
+        """Slow searches are repeated against the mirror endpoint (settings.arxiv_mirror_url)."""
+        return functools.partial(self._search, self._mirror), urlsplit(self._mirror_url).hostname or ""
+
     def _get_tool_function(self) -> Callable[..., list[dict]]:
         """
         Get the search function for FunctionTool wrapping.
@@ -127,3 +334,17 @@ class ArxivSearchTool(BaseTool):
             Callable: The search method
         """
         return self.search
+
+
+def _format_result(result: arxiv.Result, with_id: bool = False) -> dict:
+    """Shape an arxiv.Result like the other search tools' results."""
+    paper = {
+        "title": result.title,
+        "authors": [a.name for a in result.authors],
+        "published": result.published.strftime("%Y-%m-%d"),
+        "summary": result.summary,
+        "pdf_url": result.pdf_url,
+    }
+    if with_id:
+        paper["arxiv_id"] = _VERSION_SUFFIX.sub("", result.get_short_id())
+    return paper
@@ -9,16 +9,52 @@ used by agents via AutoGen's FunctionTool.
 
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
+import threading
+import time
 from abc import ABC, abstractmethod
 from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
+import arxiv
+import httpx
+import requests
 from autogen_core.tools import FunctionTool
 
+from app.config.settings import get_settings
+from app.core.budget import get_budget
+from app.core.exceptions import ToolError
 from app.core.logging_config import get_logger
+from app.core.metrics import (
+    TOOL_CALL_DURATION,
+    TOOL_CALL_ERRORS,
+    TOOL_CALLS_COALESCED,
+    TOOL_RETRIES,
+)
+from app.core.replay import ReviewRecorder, ReviewReplayer, get_replay_session
+from app.core.resilience import (
+    RetryPolicy,
+    cancellable,
+    get_breaker,
+    remaining_time,
+    shared_call,
+)
+from app.core.tracing import start_span
+from app.core.usage import get_usage_tracker
+from app.tools.hedging import get_hedger
+from app.tools.scheduler import get_scheduler
+from app.tools.single_flight import SingleFlight, call_key
 
 logger = get_logger(__name__)
 
+# Calls in flight across all reviews, keyed by tool name and normalized arguments
+_single_flight = SingleFlight()
+
 
 # ===============================================================
 # BASE TOOL CLASS
@@ -35,8 +71,15 @@ class BaseTool(ABC):
     Attributes:
         name: Unique identifier for the tool
         description: Human-readable tool description
+        retry_policy: Retries for transient upstream failures; None disables
+        circuit_breaker: Whether calls go through the source's CircuitBreaker
+        coalesce: Whether identical concurrent calls share one upstream call
     """
 
+    retry_policy: RetryPolicy | None = None
+    circuit_breaker: bool = False
+    coalesce: bool = False
+
     def __init__(
         self,
         name: str,
@@ -69,6 +112,19 @@ class BaseTool(ABC):
         """
         pass
 
+    def _hedge_target(self) -> tuple[Callable[..., Any], str] | None:
+        """
+        The equivalent call slow requests may be hedged with, and its host.
+
+        Tools with a heavy-tailed upstream override this; None (the
+        default) means the tool is never hedged.
+
+        Returns:
+            tuple | None: Function with the tool function's signature and
+            the host it sends to
+        """
+        return None
+
     # ===============================================================
     # BUILD METHODS
     # ===============================================================
@@ -84,9 +140,318 @@ class BaseTool(ABC):
             return self._function_tool
 
         self._function_tool = FunctionTool(
-            self._get_tool_function(),
+            self._instrument(self._resilient(self._hedged(self._get_tool_function()))),
             description=self.description,
+            name=self.name,
         )
 
         logger.info(f"Built FunctionTool: {self.name}")
         return self._function_tool
+
+    def as_instrumented(self, func: Callable[..., Any], name: str, resilient: bool = True) -> Callable[..., Any]:
+        """
+        Wrap another method of this tool the way the tool function is wrapped.
+
+        For calls the orchestrator makes directly (multi-query search,
+        batch lookups): they share the source's retries and breaker and
+        are timed, traced, usage-tracked and recorded under `name`.
+
+        Args:
+            func: Sync method of this tool (or a function built on it)
+            name: Name to record calls under, e.g. "arxiv_search_many"
+            resilient: Apply retries and the breaker; off for functions
+                whose own requests already go through them
+
+        Returns:
+            Callable: Async wrapper with the same signature
+        """
+        return self._instrument(self._resilient(func) if resilient else func, name=name)
+
+    def _hedged(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Wrap the sync tool function so calls slower than usual are hedged.
+
+        Only applies when settings.hedging_enabled is set and the tool has
+        a _hedge_target; see hedging.py. Each retry attempt is hedged on
+        its own, and the breaker sees one outcome per attempt.
+
+        Args:
+            func: The function returned by _get_tool_function
+
+        Returns:
+            Callable: Sync wrapper with the same signature
+        """
+        target = self._hedge_target() if get_settings().hedging_enabled else None
+        if target is None:
+            return func
+        alternate, host = target
+
+        @functools.wraps(func)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            return get_hedger(self.name).call(
+                functools.partial(func, *args, **kwargs),
+                functools.partial(alternate, *args, **kwargs),
+                can_hedge=functools.partial(get_scheduler().has_capacity, host),
+            )
+
+        return call
+
+    def _resilient(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Wrap the sync tool function with this source's retry policy and breaker.
+
+        Transient failures (connection errors, timeouts, 429 and 5xx) are
+        retried with jittered backoff while the review deadline allows.
+        An open breaker fails the call at once with a message telling the
+        agent to use other sources. A review past its deadline makes no
+        more calls.
+
+        Args:
+            func: The function returned by _get_tool_function
+
+        Returns:
+            Callable: Sync wrapper with the same signature
+        """
+        if self.retry_policy is None and not self.circuit_breaker:
+            return func
+        policy = self.retry_policy or RetryPolicy(attempts=1)
+
+        @functools.wraps(func)
+        def call(*args: Any, **kwargs: Any) -> Any:
+            breaker = get_breaker(self.name) if self.circuit_breaker else None
+            for attempt in range(policy.attempts):
+                remaining = remaining_time()
+                if remaining is not None and remaining <= 0:
+                    raise ToolError("Review deadline exceeded; no time left for this call", tool_name=self.name)
+                if breaker is not None and not breaker.allow():
+                    raise ToolError(
+                        f"{self.name} is failing and is skipped for the next {breaker.retry_in():.0f}s; "
+                        "use the other sources",
+                        tool_name=self.name,
+                        details={"circuit": breaker.state},
+                    )
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    transient = is_transient(e)
+                    if breaker is not None:
+                        # An upstream that answers with a 4xx is still up
+                        breaker.record(not transient)
+                    if not transient or _is_timeout(e) or attempt + 1 >= policy.attempts:
+                        raise
+                    delay = policy.delay(attempt)
+                    remaining = remaining_time()
+                    if remaining is not None and delay >= remaining:
+                        raise
+                    TOOL_RETRIES.labels(self.name).inc()
+                    logger.info(f"{self.name} failed transiently ({e}); retry {attempt + 1} in {delay:.2f}s")
+                    time.sleep(delay)
+                else:
+                    if breaker is not None:
+                        breaker.record(True)
+                    return result
+
+        return call
+
+    def _instrument(self, func: Callable[..., Any], name: str | None = None) -> Callable[..., Any]:
+        """
+        Wrap the tool function so each invocation is timed and recorded.
+
+        Sync functions run on the dedicated tool thread pool with the
+        review's context copied along (see run_in_tool_thread). For tools
+        that coalesce, a call identical to one already in flight waits for
+        that call's result instead of running again (see single_flight.py);
+        the shared call runs without any one review's deadline or
+        cancellation, and each caller bounds only its own wait.
+        A bound ReviewRecorder captures the call; a bound ReviewReplayer
+        answers it from the recording instead of running the function.
+        Cancelling the review stops waiting for the call at once; a tool
+        thread already running finishes its current request but makes no
+        further retries (see resilience.remaining_time). Once the review's
+        budget is spent, calls are refused so the agent writes up what it
+        has (see app.core.budget).
+
+        Args:
+            func: The function returned by _get_tool_function
+            name: Name to record calls under (defaults to the tool's)
+
+        Returns:
+            Callable: Async wrapper with the same signature
+        """
+        name = name or self.name
+
+        @functools.wraps(func)
+        async def invoke(*args: Any, **kwargs: Any) -> Any:
+            budget = get_budget()
+            limit = budget.exhausted() if budget is not None else None
+            if limit is not None:
+                raise ToolError(
+                    f"The review's {budget.describe(limit)} is spent; write up the sources found so far",
+                    tool_name=name,
+                )
+            start = time.perf_counter()
+            session = get_replay_session()
+            request = {"args": list(args), **kwargs} if args else kwargs
+            result: Any = None
+            error: Exception | None = None
+            try:
+                with start_span(f"tool.{name}", **_span_attributes(kwargs)) as span:
+                    if isinstance(session, ReviewReplayer):
+                        entry = await cancellable(session.take("tool", name, request))
+                        if entry.error:
+                            raise ToolError(entry.error, tool_name=name)
+                        result = entry.response
+                    elif inspect.iscoroutinefunction(func):
+                        result = await cancellable(func(*args, **kwargs))
+                    elif self.coalesce:
+                        future, leader = _single_flight.join(
+                            (name, call_key(func, args, kwargs)),
+                            lambda: submit_to_tool_thread(shared_call(func), *args, **kwargs),
+                        )
+                        if not leader:
+                            TOOL_CALLS_COALESCED.labels(name).inc()
+                            if span is not None:
+                                span.attributes["coalesced"] = True
+                        result = await cancellable(_wait_shared(future, name))
+                    else:
+                        result = await cancellable(run_in_tool_thread(func, *args, **kwargs))
+                return result
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                TOOL_CALL_DURATION.labels(name).observe(elapsed)
+                if error is not None:
+                    TOOL_CALL_ERRORS.labels(name).inc()
+                tracker = get_usage_tracker()
+                if tracker is not None:
+                    tracker.record_tool_call(
+                        tool_name=name,
+                        duration_ms=elapsed * 1000,
+                        payload_bytes=_payload_size(result),
+                        error=error is not None,
+                    )
+                if isinstance(session, ReviewRecorder):
+                    session.record(
+                        "tool",
+                        name,
+                        request,
+                        result,
+                        start,
+                        error=getattr(error, "message", str(error)) if error is not None else None,
+                    )
+
+        return invoke
+
+
+# ===============================================================
+# TOOL THREAD POOL
+# ===============================================================
+
+_tool_executor: ThreadPoolExecutor | None = None
+_tool_executor_lock = threading.Lock()
+
+
+def get_tool_executor() -> ThreadPoolExecutor:
+    """
+    Thread pool for sync tool bodies, sized by settings.tool_workers.
+
+    Tools block while they wait for a per-host request slot (see
+    scheduler.py); on the loop's default executor (min(32, cpus + 4)
+    threads) a few queued arXiv calls would starve every other tool.
+    """
+    global _tool_executor
+    if _tool_executor is None:
+        with _tool_executor_lock:
+            if _tool_executor is None:
+                _tool_executor = ThreadPoolExecutor(
+                    max_workers=get_settings().tool_workers, thread_name_prefix="tool"
+                )
+    return _tool_executor
+
+
+async def _wait_shared(future: Future[Any], name: str) -> Any:
+    """Wait for a call other reviews may share, bounded by this review's deadline only."""
+    # Shielded: a cancelled caller must not cancel the call others wait on
+    shared = asyncio.shield(asyncio.wrap_future(future))
+    try:
+        done, _ = await asyncio.wait([shared], timeout=remaining_time())
+        if not done:
+            raise ToolError("Review deadline exceeded while waiting for this call", tool_name=name)
+        return shared.result()
+    finally:
+        if not shared.done():
+            shared.cancel()
+
+
+def submit_to_tool_thread(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future[Any]:
+    """Start func on the tool pool in a copy of the caller's context."""
+    context = contextvars.copy_context()
+    return get_tool_executor().submit(context.run, func, *args, **kwargs)
+
+
+async def run_in_tool_thread(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Like asyncio.to_thread, but on the tool pool; context variables are carried along."""
+    return await asyncio.wrap_future(submit_to_tool_thread(func, *args, **kwargs))
+
+
+# ===============================================================
+# FAILURE CLASSIFICATION
+# ===============================================================
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Whether an error (or the upstream error it wraps) is worth retrying.
+
+    Connection failures, timeouts, 429 and 5xx responses are transient;
+    other HTTP statuses and parse errors are not.
+    """
+    seen: set[int] = set()
+    current: BaseException | None = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, (httpx.TransportError, requests.ConnectionError, requests.Timeout, TimeoutError)):
+            return True
+        if isinstance(current, arxiv.UnexpectedEmptyPageError):
+            return True
+        status = _status_code(current)
+        if status is not None:
+            return status == 429 or status >= 500
+        current = current.__cause__ or current.__context__
+    return False
+
+
+def _status_code(error: BaseException) -> int | None:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code
+    if isinstance(error, arxiv.HTTPError):
+        return error.status
+    return None
+
+
+def _is_timeout(error: BaseException) -> bool:
+    """Scheduler queue and deadline timeouts: retrying would only wait longer."""
+    current: BaseException | None = error
+    while current is not None:
+        if type(current) is TimeoutError:
+            return True
+        current = current.__cause__
+    return False
+
+
+def _span_attributes(kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Tool arguments as span attributes, with long values clipped."""
+    return {k: v if isinstance(v, (int, float, bool)) else str(v)[:200] for k, v in kwargs.items()}
+
+
+def _payload_size(result: Any) -> int:
+    """Approximate size in bytes of a tool result as serialized for the LLM."""
+    if result is None:
+        return 0
+    if isinstance(result, str):
+        return len(result.encode("utf-8"))
+    return len(json.dumps(result, default=str).encode("utf-8"))
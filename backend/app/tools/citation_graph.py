@@ -0,0 +1,264 @@
+"""
+citation_graph.py
+=================
+Citation-graph expansion of a review's seed papers.
+
+Keyword search only finds papers that use the query's words. Expansion
+follows references and citations of the top seed papers on Semantic
+Scholar and keeps the neighbours that several seeds link to: a paper
+cited by (or citing) three of five seeds is almost certainly on topic,
+whatever its title says.
+
+Requests are batched (one /paper/batch for the links of a whole level,
+one for the metadata of the winners), breadth-first up to a bounded
+depth, and run under a strict time budget: when the budget runs out
+the stage returns nothing rather than delaying the review. Links and
+metadata are cached on disk per paper id, so seeds shared between
+reviews cost no requests at all.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from app.core.exceptions import ToolError
+from app.core.logging_config import get_logger
+from app.core.metrics import record_cache_lookup
+from app.core.resilience import use_deadline
+from app.tools.semantic_scholar_tool import RICH_FIELDS, SemanticScholarTool
+
+logger = get_logger(__name__)
+
+LINK_FIELDS = "references.paperId,citations.paperId"
+
+
+# ===============================================================
+# CACHE
+# ===============================================================
+
+
+@dataclass
+class PaperLinks:
+    """A paper's Semantic Scholar id, neighbours and (once fetched) metadata."""
+
+    key: str
+    paper_id: str | None = None
+    references: list[str] = field(default_factory=list)
+    citations: list[str] = field(default_factory=list)
+    paper: dict | None = None
+    linked: bool = False
+    fetched_at: float = field(default_factory=time.time)
+
+    @property
+    def neighbours(self) -> set[str]:
+        return set(self.references) | set(self.citations)
+
+
+class CitationCache:
+    """
+    On-disk PaperLinks per paper id, expiring after ttl seconds.
+
+    Keys are the ids papers were requested under ("ARXIV:..." for seeds,
+    Semantic Scholar ids for neighbours). Least recently used entries are
+    evicted once the store exceeds max_bytes.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int, ttl: float) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+    def get(self, key: str) -> PaperLinks | None:
+        path = self._path(key)
+        try:
+            entry = PaperLinks(**json.loads(path.read_text()))
+        except (OSError, ValueError, TypeError):
+            record_cache_lookup("citation_graph", hit=False)
+            return None
+        if entry.key != key or time.time() - entry.fetched_at > self.ttl:
+            record_cache_lookup("citation_graph", hit=False)
+            return None
+        record_cache_lookup("citation_graph", hit=True)
+        path.touch()
+        return entry
+
+    def put(self, entry: PaperLinks) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "w") as out:
+                json.dump(asdict(entry), out)
+            os.replace(tmp, self._path(entry.key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.prune(keep=self._path(entry.key))
+
+    def prune(self, keep: Path | None = None) -> None:
+        """Evict least recently used entries until the store fits max_bytes, sparing `keep`."""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+
+# ===============================================================
+# EXPANSION
+# ===============================================================
+
+
+class CitationExpander:
+    """
+    Breadth-first, co-citation-scored expansion around seed papers.
+
+    Attributes:
+        tool: Semantic Scholar tool the batch requests go through
+        cache: Per-paper link and metadata cache (None disables caching)
+        depth: Levels of links to follow (1: the seeds' own neighbours)
+        breadth: Papers expanded per level beyond the first
+        max_links: Neighbours kept per paper, per direction
+        min_overlap: Expanded papers a neighbour must be linked to
+        budget: Seconds the whole expansion may take
+    """
+
+    def __init__(
+        self,
+        tool: SemanticScholarTool,
+        cache: CitationCache | None = None,
+        depth: int = 1,
+        breadth: int = 5,
+        max_links: int = 200,
+        min_overlap: int = 2,
+        budget: float = 3.0,
+    ) -> None:
+        self.tool = tool
+        self.cache = cache
+        self.depth = depth
+        self.breadth = breadth
+        self.max_links = max_links
+        self.min_overlap = min_overlap
+        self.budget = budget
+
+    def expand(self, seeds: Sequence[str], limit: int = 5) -> list[dict]:
+        """
+        Papers linked to several seeds, best co-citation overlap first.
+
+        Args:
+            seeds: Seed ids as accepted by /paper/batch, e.g. "ARXIV:2106.15928"
+            limit: Most related papers to return
+
+        Returns:
+            list[dict]: Papers in the Semantic Scholar result shape plus
+            "co_citations" (how many expanded papers link to each); empty
+            when the budget runs out first
+        """
+        start = time.monotonic()
+        try:
+            with use_deadline(self.budget):
+                related = self._expand(list(dict.fromkeys(seeds)), limit)
+        except ToolError as e:
+            logger.info(f"Citation expansion stopped after {time.monotonic() - start:.2f}s: {e.message}")
+            return []
+        logger.info(f"Citation expansion found {len(related)} related papers in {time.monotonic() - start:.2f}s")
+        return related
+
+    def _expand(self, seeds: list[str], limit: int) -> list[dict]:
+        links = self._links(seeds)
+        expanded = {entry.paper_id for entry in links.values() if entry.paper_id}
+        scores: Counter[str] = Counter()
+        frontier = list(links.values())
+        for level in range(self.depth):
+            for entry in frontier:
+                scores.update(entry.neighbours - expanded)
+            if level + 1 == self.depth:
+                break
+            following = [pid for pid, _ in scores.most_common(self.breadth) if pid not in expanded]
+            frontier = list(self._links(following).values())
+            expanded.update(following)
+
+        chosen = [pid for pid, score in scores.most_common() if score >= self.min_overlap and pid not in expanded]
+        # Fetch a few more than needed, so citation count can break ties
+        papers = self._papers(chosen[: limit * 2])
+        ranked = sorted(
+            papers,
+            key=lambda p: (scores[p["paper_id"]], p.get("citation_count") or 0),
+            reverse=True,
+        )
+        return [{**paper, "co_citations": scores[paper["paper_id"]]} for paper in ranked[:limit]]
+
+    def _links(self, keys: list[str]) -> dict[str, PaperLinks]:
+        """References and citations for each key, from the cache or one batch request."""
+        found: dict[str, PaperLinks] = {}
+        missing: list[str] = []
+        for key in keys:
+            entry = self.cache.get(key) if self.cache else None
+            if entry is not None and entry.linked:
+                found[key] = entry
+            else:
+                missing.append(key)
+        if missing:
+            items = self.tool.batch_raw(missing, fields=LINK_FIELDS)
+            for key, item in zip(missing, items, strict=True):
+                if item is None:
+                    continue
+                entry = PaperLinks(
+                    key=key,
+                    paper_id=item.get("paperId"),
+                    references=_ids(item.get("references"))[: self.max_links],
+                    citations=_ids(item.get("citations"))[: self.max_links],
+                    linked=True,
+                )
+                found[key] = entry
+                if self.cache:
+                    self.cache.put(entry)
+        return found
+
+    def _papers(self, paper_ids: list[str]) -> list[dict]:
+        """Metadata for neighbours, from the cache or one batch request."""
+        papers: dict[str, dict] = {}
+        missing: list[str] = []
+        cached: dict[str, PaperLinks] = {}
+        for pid in paper_ids:
+            entry = self.cache.get(pid) if self.cache else None
+            if entry is not None and entry.paper is not None:
+                papers[pid] = entry.paper
+            else:
+                missing.append(pid)
+                if entry is not None:
+                    cached[pid] = entry
+        if missing:
+            for pid, paper in zip(missing, self.tool.batch(missing, fields=RICH_FIELDS), strict=True):
+                if paper is None:
+                    continue
+                papers[pid] = paper
+                if self.cache:
+                    entry = cached.get(pid) or PaperLinks(key=pid, paper_id=pid)
+                    entry.paper = paper
+                    self.cache.put(entry)
+        return [papers[pid] for pid in paper_ids if pid in papers]
+
+
+def _ids(items: list[dict] | None) -> list[str]:
+    return [item["paperId"] for item in items or [] if item and item.get("paperId")]
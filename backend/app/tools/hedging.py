@@ -0,0 +1,234 @@
+"""
+hedging.py
+==========
+Hedged requests for tools whose upstream latency has a heavy tail.
+
+A hedged call starts the request as usual and, if it has not answered
+by the source's recent p90 latency, sends a second, equivalent request
+(to a mirror where one exists) and returns whichever answers first.
+Hedges are paid for from a budget that grows by a fixed fraction of
+every call, so they never add more than that fraction of load, and a
+hedge is only sent when its host has a free request slot: one that
+would sit in the scheduler queue behind the slow call cannot win.
+
+Outcomes go to litrev_tool_hedges_total (won, lost, skipped, failed)
+and the time a winning hedge saved to litrev_tool_hedge_saved_seconds.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, TypeVar
+
+from app.config.settings import get_settings
+from app.core.logging_config import get_logger
+from app.core.metrics import TOOL_HEDGE_SAVED, TOOL_HEDGES
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+# ===============================================================
+# LATENCY AND BUDGET
+# ===============================================================
+
+
+class LatencyWindow:
+    """Latencies of the most recent successful calls to one source."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        """The q-quantile of the window, or None until min_samples calls have completed."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(math.ceil(q * len(ordered)) - 1, len(ordered) - 1)]
+
+
+class HedgeBudget:
+    """
+    Token budget that caps hedges at a fraction of calls.
+
+    Every call deposits `ratio` of a token (up to `burst` saved tokens);
+    a hedge spends a whole one.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 5.0) -> None:
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self.burst)
+
+    def spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1 - 1e-9:  # ten deposits of 0.1 sum to 0.999...
+                return False
+            self._tokens -= 1
+            return True
+
+
+# ===============================================================
+# HEDGER
+# ===============================================================
+
+
+class Hedger:
+    """
+    Races a slow call against an equivalent one for a single source.
+
+    Attributes:
+        name: Tool name, used for metric labels
+        quantile: Latency quantile after which a call is hedged
+        latencies: Recent successful call latencies
+        budget: Hedge budget shared by all calls to the source
+    """
+
+    def __init__(
+        self,
+        name: str,
+        quantile: float = 0.9,
+        latencies: LatencyWindow | None = None,
+        budget: HedgeBudget | None = None,
+    ) -> None:
+        self.name = name
+        self.quantile = quantile
+        self.latencies = latencies or LatencyWindow()
+        self.budget = budget or HedgeBudget()
+
+    def call(
+        self,
+        primary: Callable[[], T],
+        alternate: Callable[[], T],
+        can_hedge: Callable[[], bool] = lambda: True,
+    ) -> T:
+        """
+        Run primary; if it is slower than usual, race alternate against it.
+
+        Args:
+            primary: The call as requested
+            alternate: An equivalent call (mirror or duplicate)
+            can_hedge: Whether the alternate would start at once
+
+        Returns:
+            The first successful result; if both calls fail, primary's
+            error is raised
+        """
+        self.budget.deposit()
+        threshold = self.latencies.quantile(self.quantile)
+        if threshold is None:
+            return self._timed(primary)()
+
+        first = _submit(self._timed(primary))
+        try:
+            return first.result(timeout=threshold)
+        except FutureTimeout:
+            pass
+
+        if not can_hedge() or not self.budget.spend():
+            TOOL_HEDGES.labels(self.name, "skipped").inc()
+            return first.result()
+
+        logger.debug(f"{self.name} slower than p{self.quantile * 100:.0f} ({threshold:.2f}s); hedging")
+        second = _submit(alternate)
+        pending: set[Future[T]] = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # Prefer the original call when both finished together
+            for future in sorted(done, key=lambda f: f is not first):
+                if future.exception() is not None:
+                    continue
+                if future is second:
+                    TOOL_HEDGES.labels(self.name, "won").inc()
+                    answered = time.monotonic()
+                    saved = TOOL_HEDGE_SAVED.labels(self.name)
+                    first.add_done_callback(
+                        lambda _, saved=saved, answered=answered: saved.observe(time.monotonic() - answered)
+                    )
+                else:
+                    TOOL_HEDGES.labels(self.name, "lost").inc()
+                return future.result()
+        TOOL_HEDGES.labels(self.name, "failed").inc()
+        return first.result()
+
+    def _timed(self, func: Callable[[], T]) -> Callable[[], T]:
+        """func, recording its latency when it succeeds."""
+
+        def run() -> T:
+            start = time.monotonic()
+            result = func()
+            self.latencies.observe(time.monotonic() - start)
+            return result
+
+        return run
+
+
+_hedgers: dict[str, Hedger] = {}
+_hedgers_lock = threading.Lock()
+
+
+def get_hedger(name: str) -> Hedger:
+    """Process-wide hedger for a source, configured from settings."""
+    hedger = _hedgers.get(name)
+    if hedger is None:
+        with _hedgers_lock:
+            hedger = _hedgers.get(name)
+            if hedger is None:
+                settings = get_settings()
+                hedger = _hedgers[name] = Hedger(
+                    name,
+                    quantile=settings.hedge_quantile,
+                    latencies=LatencyWindow(settings.hedge_latency_window, settings.hedge_min_samples),
+                    budget=HedgeBudget(settings.hedge_budget),
+                )
+    return hedger
+
+
+# ===============================================================
+# HEDGE THREAD POOL
+# ===============================================================
+
+_hedge_executor: ThreadPoolExecutor | None = None
+_hedge_executor_lock = threading.Lock()
+
+
+def get_hedge_executor() -> ThreadPoolExecutor:
+    """
+    Thread pool that hedged calls run on.
+
+    Separate from the tool pool: a hedged call is already running on a
+    tool thread and waits for these, so sharing a pool could deadlock.
+    """
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _hedge_executor_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(
+                    max_workers=get_settings().tool_workers, thread_name_prefix="hedge"
+                )
+    return _hedge_executor
+
+
+def _submit(func: Callable[[], Any]) -> Future[Any]:
+    """Run func on the hedge pool in a copy of the caller's context (deadline, usage, trace)."""
+    return get_hedge_executor().submit(contextvars.copy_context().run, func)
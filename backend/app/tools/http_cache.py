@@ -0,0 +1,186 @@
+"""
+http_cache.py
+=============
+Bounded on-disk HTTP cache for fetched pages.
+
+Stores, per URL, the response validators (ETag, Last-Modified), the
+freshness lifetime from Cache-Control max-age (or Expires), and the text
+already extracted from the page. A fresh entry is served with no request
+at all; a stale one is revalidated with If-None-Match/If-Modified-Since,
+and a 304 reuses the stored text, skipping both transfer and parse.
+Responses marked no-store, or with neither validators nor a lifetime,
+are not kept.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# ===============================================================
+# CACHE POLICY
+# ===============================================================
+
+
+def parse_cache_control(value: str) -> dict[str, str | None]:
+    """Cache-Control directives, lowercased, e.g. {"max-age": "60", "no-cache": None}."""
+    directives: dict[str, str | None] = {}
+    for part in value.split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> float:
+    """
+    Seconds a response may be served without revalidation.
+
+    max-age wins over Expires; no-cache (or an unparseable value) means
+    the entry must always be revalidated.
+    """
+    directives = parse_cache_control(headers.get("cache-control", ""))
+    if "no-cache" in directives:
+        return 0.0
+    if directives.get("max-age") is not None:
+        try:
+            age = float(headers.get("age") or 0)
+            return max(float(directives["max-age"]) - age, 0.0)
+        except ValueError:
+            return 0.0
+    if headers.get("expires"):
+        try:
+            expires = parsedate_to_datetime(headers["expires"]).timestamp()
+            date = parsedate_to_datetime(headers["date"]).timestamp() if headers.get("date") else time.time()
+        except (TypeError, ValueError):
+            return 0.0
+        return max(expires - date, 0.0)
+    return 0.0
+
+
+def is_storable(headers: Mapping[str, str]) -> bool:
+    """Whether a 200 response is worth caching: not no-store, and revalidatable or fresh for a while."""
+    if "no-store" in parse_cache_control(headers.get("cache-control", "")):
+        return False
+    return bool(headers.get("etag") or headers.get("last-modified") or freshness_lifetime(headers) > 0)
+
+
+# ===============================================================
+# ENTRIES
+# ===============================================================
+
+
+@dataclass
+class CachedPage:
+    """Validators, freshness and extracted text for one URL."""
+
+    url: str
+    text: str
+    etag: str | None = None
+    last_modified: str | None = None
+    expires_at: float = 0.0
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def refresh(self, headers: Mapping[str, str]) -> None:
+        """Apply the headers of a 304: new lifetime and any updated validators."""
+        self.etag = headers.get("etag") or self.etag
+        self.last_modified = headers.get("last-modified") or self.last_modified
+        self.expires_at = time.time() + freshness_lifetime(headers)
+
+
+class HttpCache:
+    """
+    On-disk store of CachedPage entries, one JSON file per URL.
+
+    When the entries exceed max_bytes, the least recently used ones (by
+    mtime, refreshed on every hit) are evicted.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def get(self, url: str) -> CachedPage | None:
+        path = self._path(url)
+        try:
+            entry = CachedPage(**json.loads(path.read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+        if entry.url != url:
+            return None
+        path.touch()
+        return entry
+
+    def put(self, url: str, headers: Mapping[str, str], text: str) -> CachedPage | None:
+        """Store the text of a 200 response if its headers allow it."""
+        if not is_storable(headers):
+            return None
+        entry = CachedPage(
+            url=url,
+            text=text,
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            expires_at=time.time() + freshness_lifetime(headers),
+        )
+        self.save(entry)
+        self.prune(keep=self._path(url))
+        return entry
+
+    def save(self, entry: CachedPage) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "w") as out:
+                json.dump(asdict(entry), out)
+            os.replace(tmp, self._path(entry.url))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def delete(self, url: str) -> None:
+        self._path(url).unlink(missing_ok=True)
+
+    def prune(self, keep: Path | None = None) -> None:
+        """Evict least recently used entries until the store fits max_bytes, sparing `keep`."""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def _path(self, url: str) -> Path:
+        return self.directory / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
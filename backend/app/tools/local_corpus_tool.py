@@ -0,0 +1,345 @@
+"""
+local_corpus_tool.py
+====================
+Full-text search over papers earlier reviews already retrieved.
+
+Every candidate fetched from arXiv is added to a local index, and every
+review searches that index first: sub-queries it answers in full never
+reach the network, so warm topics get their candidates in milliseconds
+and upstream sources are only used to fill gaps.
+
+Two index backends share one interface:
+    - PostgresPaperIndex: the papers_catalog table's generated tsvector
+      column and GIN index (see app.db.models.PAPER_SEARCH_VECTOR)
+    - SqlitePaperIndex: a SQLite FTS5 file, the stand-in for tests and
+      local development without Postgres
+
+Both match every significant term of the query (stemmed, stopwords
+dropped) and rank title matches above abstract matches, optionally only
+among papers published on or after a given date.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Sequence
+from contextlib import closing
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func, select
+
+from app.config.settings import get_settings
+from app.core.exceptions import ToolError
+from app.core.logging_config import get_logger
+from app.db.models import PaperORM
+from app.db.paper_repository import PaperRepository, catalog_row, normalize_paper_id
+from app.tools.base import BaseTool
+from app.tools.passages import tokenize
+
+logger = get_logger(__name__)
+
+# Dates the agents could not resolve ("Unknown", a bare year) are never "published after" anything
+ISO_DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}"
+
+
+def _paper(
+    paper_id: str,
+    title: str,
+    authors: list[str] | None,
+    published: str | None,
+    summary: str | None,
+    pdf_url: str | None,
+) -> dict:
+    """A catalog row in the shape the arXiv tool returns, plus its catalog id."""
+    paper = {
+        "id": paper_id,
+        "title": title,
+        "authors": list(authors or []),
+        "published": published or "",
+        "summary": summary or "",
+        "pdf_url": pdf_url or "",
+    }
+    if paper_id.startswith("arxiv:"):
+        paper["arxiv_id"] = paper_id.removeprefix("arxiv:")
+    return paper
+
+
+# ===============================================================
+# INDEX BACKENDS
+# ===============================================================
+
+
+class PaperIndex(ABC):
+    """Full-text index over retrieved papers."""
+
+    @abstractmethod
+    async def search_many(
+        self, queries: Sequence[str], limit: int, published_after: date | None = None
+    ) -> dict[str, list[dict]]:
+        """Best matches for each query, most relevant first, published on or after `published_after`."""
+
+    @abstractmethod
+    async def add(self, papers: Sequence[dict]) -> None:
+        """Add papers to the index, filling in fields the ones already in it lack."""
+
+
+class PostgresPaperIndex(PaperIndex):
+    """Searches papers_catalog through its GIN-indexed tsvector column."""
+
+    def __init__(self, session_factory: Callable[..., Any] | None = None) -> None:
+        if session_factory is None:
+            from app.db.database import async_session_factory
+
+            session_factory = async_session_factory
+        self.session_factory = session_factory
+
+    async def search_many(
+        self, queries: Sequence[str], limit: int, published_after: date | None = None
+    ) -> dict[str, list[dict]]:
+        results: dict[str, list[dict]] = {}
+        async with self.session_factory() as session:
+            for query in queries:
+                tsquery = func.plainto_tsquery("english", query)
+                stmt = (
+                    select(
+                        PaperORM.id,
+                        PaperORM.title,
+                        PaperORM.authors,
+                        PaperORM.published,
+                        PaperORM.summary,
+                        PaperORM.pdf_url,
+                    )
+                    .where(PaperORM.search_vector.op("@@")(tsquery))
+                    .order_by(func.ts_rank_cd(PaperORM.search_vector, tsquery).desc(), PaperORM.id)
+                    .limit(limit)
+                )
+                if published_after is not None:
+                    stmt = stmt.where(
+                        PaperORM.published.regexp_match(ISO_DATE_PATTERN),
+                        PaperORM.published >= published_after.isoformat(),
+                    )
+                rows = await session.execute(stmt)
+                results[query] = [_paper(*row) for row in rows]
+        return results
+
+    async def add(self, papers: Sequence[dict]) -> None:
+        async with self.session_factory() as session:
+            await PaperRepository(session).upsert_papers(papers)
+            await session.commit()
+
+
+class SqlitePaperIndex(PaperIndex):
+    """
+    SQLite FTS5 stand-in for the Postgres index.
+
+    Papers live in a plain table keyed by catalog id; an external-content
+    FTS5 table over title and abstract is kept in sync by triggers.
+    """
+
+    SCHEMA = """
+        PRAGMA journal_mode = WAL;
+        CREATE TABLE IF NOT EXISTS papers (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            authors TEXT NOT NULL,
+            published TEXT,
+            summary TEXT,
+            pdf_url TEXT
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+            title, summary, content='papers', content_rowid='rowid', tokenize='porter unicode61'
+        );
+        CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+            INSERT INTO papers_fts(rowid, title, summary) VALUES (new.rowid, new.title, new.summary);
+        END;
+        CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+            INSERT INTO papers_fts(papers_fts, rowid, title, summary)
+            VALUES ('delete', old.rowid, old.title, old.summary);
+        END;
+        CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE ON papers BEGIN
+            INSERT INTO papers_fts(papers_fts, rowid, title, summary)
+            VALUES ('delete', old.rowid, old.title, old.summary);
+            INSERT INTO papers_fts(rowid, title, summary) VALUES (new.rowid, new.title, new.summary);
+        END;
+    """
+
+    SEARCH = """
+        SELECT p.id, p.title, p.authors, p.published, p.summary, p.pdf_url
+        FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid
+        WHERE papers_fts MATCH :match AND (
+            :since = ''
+            OR (p.published GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*' AND p.published >= :since)
+        )
+        ORDER BY bm25(papers_fts, 10.0, 1.0), p.id
+        LIMIT :limit
+    """
+
+    # Like the catalog upsert, only fills what a paper lacks (placeholders are stored as NULL)
+    UPSERT = """
+        INSERT INTO papers (id, title, authors, published, summary, pdf_url) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            authors = iif(authors = '[]', excluded.authors, authors),
+            published = coalesce(published, excluded.published),
+            summary = coalesce(summary, excluded.summary),
+            pdf_url = coalesce(pdf_url, excluded.pdf_url)
+        WHERE (authors = '[]' AND excluded.authors != '[]')
+            OR (published IS NULL AND excluded.published IS NOT NULL)
+            OR (summary IS NULL AND excluded.summary IS NOT NULL)
+            OR (pdf_url IS NULL AND excluded.pdf_url IS NOT NULL)
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._ready = False
+        self._lock = threading.Lock()
+
+    # Queries take well under a millisecond; asyncio's default executor keeps
+    # them from queueing behind slow network calls on the tool pool
+    async def search_many(
+        self, queries: Sequence[str], limit: int, published_after: date | None = None
+    ) -> dict[str, list[dict]]:
+        return await asyncio.to_thread(self._search_many, list(queries), limit, published_after)
+
+    async def add(self, papers: Sequence[dict]) -> None:
+        await asyncio.to_thread(self._add, list(papers))
+
+    def _search_many(self, queries: list[str], limit: int, published_after: date | None) -> dict[str, list[dict]]:
+        # ISO dates compare as strings; the rest are left out of date-limited searches
+        since = published_after.isoformat() if published_after else ""
+        results: dict[str, list[dict]] = {}
+        with closing(self._connect()) as conn:
+            for query in queries:
+                terms = list(dict.fromkeys(tokenize(query)))
+                if not terms:
+                    results[query] = []
+                    continue
+                # Quoted terms, implicitly AND'ed; quoting keeps FTS5 syntax out of user text
+                match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+                rows = conn.execute(self.SEARCH, {"match": match, "since": since, "limit": limit}).fetchall()
+                results[query] = [
+                    _paper(pid, title, json.loads(authors), published, summary, pdf_url)
+                    for pid, title, authors, published, summary, pdf_url in rows
+                ]
+        return results
+
+    def _add(self, papers: list[dict]) -> None:
+        rows: dict[str, tuple] = {}
+        for paper in papers:
+            if paper.get("title"):
+                pid = normalize_paper_id(paper)
+                if pid not in rows:
+                    row = catalog_row(pid, paper)
+                    rows[pid] = (
+                        pid,
+                        row["title"],
+                        json.dumps(row["authors"]),
+                        row["published"],
+                        row["summary"],
+                        row["pdf_url"],
+                    )
+        if not rows:
+            return
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(self.UPSERT, rows.values())
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            with self._lock:
+                if not self._ready:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    with closing(sqlite3.connect(self.path, timeout=10)) as conn:
+                        conn.executescript(self.SCHEMA)
+                    self._ready = True
+        return sqlite3.connect(self.path, timeout=10)
+
+
+_index: PaperIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_paper_index() -> PaperIndex:
+    """Process-wide index for the configured backend."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                settings = get_settings()
+                if settings.local_corpus_backend == "sqlite":
+                    _index = SqlitePaperIndex(settings.local_corpus_sqlite_path)
+                else:
+                    _index = PostgresPaperIndex()
+    return _index
+
+
+# ===============================================================
+# LOCAL CORPUS SEARCH TOOL
+# ===============================================================
+
+
+class LocalCorpusSearchTool(BaseTool):
+    """
+    Tool for searching papers that earlier reviews already retrieved.
+
+    Attributes:
+        index: Full-text index searched and added to
+        max_results: Cap on results per agent search
+    """
+
+    def __init__(self, index: PaperIndex | None = None, max_results: int = 10) -> None:
+        super().__init__(
+            name="local_corpus_search",
+            description=(
+                "Searches papers collected by earlier reviews and returns title, authors, "
+                "published date, summary and pdf_url. Instant and not rate limited: try it "
+                "before arxiv_search and search upstream sources only for what it misses."
+            ),
+        )
+        self.index = index or get_paper_index()
+        self.max_results = max_results
+
+    async def search(self, query: str, max_results: int = 5) -> list[dict]:
+        """Search the local corpus for the given query."""
+        results = await self.search_many([query], min(max_results, self.max_results))
+        return results.get(query, [])
+
+    async def search_many(
+        self, queries: Sequence[str], max_results: int = 5, published_after: date | None = None
+    ) -> dict[str, list[dict]]:
+        """
+        Local matches for several sub-queries at once.
+
+        Args:
+            queries: Sub-queries, searched independently
+            max_results: Most papers wanted per sub-query
+            published_after: Only papers published on or after this date
+
+        Returns:
+            dict: Papers per sub-query, most relevant first
+        """
+        try:
+            results = await self.index.search_many(list(dict.fromkeys(queries)), max_results, published_after)
+        except Exception as e:
+            raise ToolError(
+                f"Local corpus search failed: {e}",
+                tool_name=self.name,
+                details={"queries": len(queries)},
+            ) from e
+        found = sum(len(papers) for papers in results.values())
+        logger.info(f"Local corpus search: {found} papers for {len(results)} queries")
+        return results
+
+    async def add(self, papers: Sequence[dict]) -> None:
+        """Add retrieved papers to the local corpus."""
+        try:
+            await self.index.add(papers)
+        except Exception as e:
+            raise ToolError(f"Adding to the local corpus failed: {e}", tool_name=self.name) from e
+
+    def _get_tool_function(self) -> Callable[..., Any]:
+        return self.search
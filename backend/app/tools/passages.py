@@ -0,0 +1,164 @@
+"""
+passages.py
+===========
+Query-aware passage selection for long extracted documents.
+
+Text is split into passages of roughly equal size on line and sentence
+boundaries, the passages are scored against the query with Okapi BM25,
+and the best ones are returned in document order within a character
+budget. Tools use this to hand the agent the parts of a page that match
+what it is looking for instead of the first N characters.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+TOKEN_PATTERN = re.compile(r"\w+")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+PASSAGE_SEPARATOR = "\n[...]\n"
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were "
+    "which with we our their these those can how what when where who why".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens with stopwords and single characters removed."""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+# ===============================================================
+# PASSAGES
+# ===============================================================
+
+
+@dataclass
+class Passage:
+    """A contiguous slice of a document and its relevance score."""
+
+    index: int
+    text: str
+    score: float = 0.0
+
+
+def split_passages(text: str, size: int = 600) -> list[Passage]:
+    """
+    Split text into passages of about `size` characters.
+
+    Lines are packed together until the passage would exceed `size`;
+    longer lines are broken on sentence boundaries, and sentences longer
+    than `size` are hard-wrapped.
+
+    Args:
+        text: Newline-separated document text
+        size: Target passage length in characters
+
+    Returns:
+        list[Passage]: Passages in document order
+    """
+    pieces: list[str] = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if len(line) <= size:
+            pieces.append(line)
+            continue
+        for sentence in SENTENCE_BREAK.split(line):
+            pieces.extend(sentence[i : i + size] for i in range(0, len(sentence), size))
+
+    passages: list[Passage] = []
+    current: list[str] = []
+    length = 0
+    for piece in pieces:
+        if current and length + len(piece) + 1 > size:
+            passages.append(Passage(len(passages), "\n".join(current)))
+            current, length = [], 0
+        current.append(piece)
+        length += len(piece) + 1
+    if current:
+        passages.append(Passage(len(passages), "\n".join(current)))
+    return passages
+
+
+def score_passages(passages: list[Passage], query: str, k1: float = 1.5, b: float = 0.75) -> None:
+    """
+    Score passages in place against the query with Okapi BM25.
+
+    The passages themselves are the collection, so IDF rewards terms that
+    are specific to a few passages of this document.
+
+    Args:
+        passages: Passages to score
+        query: Free-text query (topic or sub-query)
+        k1: Term frequency saturation
+        b: Length normalisation
+    """
+    terms = set(tokenize(query))
+    if not passages or not terms:
+        return
+
+    docs = [Counter(tokenize(p.text)) for p in passages]
+    lengths = [sum(d.values()) for d in docs]
+    avg_length = (sum(lengths) / len(lengths)) or 1.0
+    n = len(docs)
+
+    idf = {}
+    for term in terms:
+        df = sum(1 for d in docs if term in d)
+        idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    for passage, doc, length in zip(passages, docs, lengths, strict=True):
+        score = 0.0
+        for term in terms:
+            tf = doc.get(term, 0)
+            if tf:
+                score += idf[term] * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / avg_length))
+        passage.score = score
+
+
+def select_passages(text: str, query: str, budget: int, passage_chars: int = 600) -> str | None:
+    """
+    Pick the passages that best match the query within a character budget.
+
+    Args:
+        text: Extracted document text
+        query: What the reader is looking for
+        budget: Maximum characters to return, separators included
+        passage_chars: Target passage length
+
+    Returns:
+        str | None: Top passages in document order, with "[...]" marking
+        skipped text, or None when no passage mentions any query term
+    """
+    passages = split_passages(text, min(passage_chars, budget))
+    score_passages(passages, query)
+
+    chosen: list[Passage] = []
+    used = 0
+    for passage in sorted(passages, key=lambda p: (-p.score, p.index)):
+        if passage.score <= 0:
+            break
+        cost = len(passage.text) + (len(PASSAGE_SEPARATOR) if chosen else 0)
+        if used + cost > budget:
+            continue
+        chosen.append(passage)
+        used += cost
+
+    if not chosen:
+        return None
+
+    parts: list[str] = []
+    previous = None
+    for passage in sorted(chosen, key=lambda p: p.index):
+        if previous is not None:
+            # Adjacent passages read on; gaps are marked
+            parts.append("\n" if passage.index == previous + 1 else PASSAGE_SEPARATOR)
+        parts.append(passage.text)
+        previous = passage.index
+    return "".join(parts)
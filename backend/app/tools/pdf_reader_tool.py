@@ -0,0 +1,507 @@
+"""
+pdf_reader_tool.py
+==================
+Tool for reading the full text of paper PDFs (arXiv and open access).
+
+PDFs are streamed into a content-addressed disk cache (keyed by the
+SHA-256 of the bytes, with a URL index in front), so a paper touched by
+several reviews is downloaded and parsed once. Text extraction runs in a
+shared process pool: pypdf is pure Python and CPU-bound, so in a thread
+it would hold the GIL against the event loop. Large files are opened
+with mmap so workers do not copy them into memory. The extracted
+text is split into sections and returned as section-aware excerpts
+within a character budget, ranked by the query when one is given.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from pypdf import PdfReader
+
+from app.config.settings import get_settings
+from app.core.exceptions import ToolError
+from app.core.logging_config import get_logger
+from app.core.metrics import record_cache_lookup
+from app.core.resilience import RetryPolicy
+from app.tools.base import BaseTool
+from app.tools.passages import Passage, score_passages, split_passages
+from app.tools.scheduler import scheduled_client
+
+logger = get_logger(__name__)
+
+PDF_CONTENT_TYPES = frozenset({"application/pdf", "application/x-pdf", "application/octet-stream"})
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+FRONT_MATTER = "Front matter"
+KNOWN_HEADINGS = frozenset(
+    {
+        "abstract", "introduction", "background", "related work", "method", "methods", "methodology",
+        "approach", "experiments", "experimental setup", "evaluation", "results", "discussion",
+        "limitations", "conclusion", "conclusions", "future work", "references", "bibliography",
+        "acknowledgments", "acknowledgements", "appendix",
+    }
+)
+SKIP_SECTIONS = frozenset({"references", "bibliography", "acknowledgments", "acknowledgements", "appendix"})
+PRIORITY_SECTIONS = ("abstract", "introduction", "conclusion", "conclusions", "results", "discussion")
+NUMBERED_HEADING = re.compile(r"^(?:\d{1,2}(?:\.\d{1,2})*\.?|[IVX]{1,4}\.)\s+([A-Z][^.!?]{2,70})$")
+
+
+# ===============================================================
+# EXTRACTION (runs in worker processes)
+# ===============================================================
+
+
+def extract_sections(path: str, max_pages: int = 60) -> list[tuple[str, str]]:
+    """
+    Extract a PDF's text and split it into (heading, text) sections.
+
+    Files of MMAP_THRESHOLD bytes or more are read through a read-only
+    memory map, so the OS pages them in on demand instead of the worker
+    copying the whole file.
+
+    Args:
+        path: Path of the cached PDF
+        max_pages: Pages read at most; later pages are appendices in practice
+
+    Returns:
+        list[tuple[str, str]]: Sections in document order
+    """
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        stream = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) if size >= MMAP_THRESHOLD else fh
+        try:
+            reader = PdfReader(stream)
+            text = "\n".join(page.extract_text() or "" for page in reader.pages[:max_pages])
+        finally:
+            if stream is not fh:
+                stream.close()
+    return split_sections(text)
+
+
+def split_sections(text: str) -> list[tuple[str, str]]:
+    """
+    Split paper text on section headings.
+
+    A heading is a short line that is either a well-known section name
+    ("Abstract", "Related Work") or numbered ("3.1 Training Setup",
+    "IV. Results"). Text before the first heading is front matter.
+    """
+    sections: list[tuple[str, list[str]]] = [(FRONT_MATTER, [])]
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        heading = _heading(line)
+        if heading:
+            sections.append((heading, []))
+        else:
+            sections[-1][1].append(line)
+    return [(heading, "\n".join(lines)) for heading, lines in sections if lines]
+
+
+def _heading(line: str) -> str | None:
+    if len(line) > 80:
+        return None
+    if line.rstrip(":").lower() in KNOWN_HEADINGS:
+        return line.rstrip(":")
+    match = NUMBERED_HEADING.match(line)
+    if match and not match.group(1).rstrip().endswith((",", ";")):
+        return line
+    return None
+
+
+def _section_key(heading: str) -> str:
+    """Heading without its number, lowercased: "3 Results" -> "results"."""
+    match = NUMBERED_HEADING.match(heading)
+    return (match.group(1) if match else heading).strip().lower()
+
+
+# ===============================================================
+# EXCERPTS
+# ===============================================================
+
+
+def excerpt_sections(
+    sections: list[tuple[str, str]],
+    budget: int,
+    query: str = "",
+    passage_chars: int = 600,
+) -> str:
+    """
+    Build section-labelled excerpts of a paper within a character budget.
+
+    With a query, BM25-ranked passages are taken from any section. Without
+    one (or when nothing matches), the abstract, introduction, results and
+    conclusion are shown first and the budget is shared across sections.
+    References, acknowledgements and appendices are always left out.
+
+    Args:
+        sections: (heading, text) pairs from extract_sections
+        budget: Maximum characters returned
+        query: Optional topic or question to rank passages by
+        passage_chars: Target passage length for ranking
+
+    Returns:
+        str: Excerpts under "## Heading" lines, in document order
+    """
+    sections = [(h, t) for h, t in sections if _section_key(h) not in SKIP_SECTIONS]
+    if not sections:
+        return ""
+
+    chosen: dict[int, list[str]] = {}
+    if query:
+        chosen = _ranked_excerpts(sections, budget, query, passage_chars)
+    if not chosen:
+        chosen = _leading_excerpts(sections, budget)
+
+    return "\n\n".join(
+        f"## {sections[i][0]}\n" + "\n[...]\n".join(chosen[i]) for i in sorted(chosen)
+    )
+
+
+def _ranked_excerpts(
+    sections: list[tuple[str, str]], budget: int, query: str, passage_chars: int
+) -> dict[int, list[str]]:
+    located: list[tuple[int, Passage]] = []
+    for index, (_, text) in enumerate(sections):
+        located.extend((index, p) for p in split_passages(text, min(passage_chars, budget)))
+    passages = [p for _, p in located]
+    score_passages(passages, query)
+
+    picked: list[tuple[int, int]] = []
+    used = 0
+    seen_sections: set[int] = set()
+    for position in sorted(range(len(located)), key=lambda i: -passages[i].score):
+        section, passage = located[position]
+        if passage.score <= 0:
+            break
+        cost = len(passage.text) + 8 + (0 if section in seen_sections else len(sections[section][0]) + 5)
+        if used + cost > budget:
+            continue
+        picked.append((section, position))
+        seen_sections.add(section)
+        used += cost
+
+    chosen: dict[int, list[str]] = {}
+    for section, position in sorted(picked, key=lambda item: item[1]):
+        chosen.setdefault(section, []).append(located[position][1].text)
+    return chosen
+
+
+def _leading_excerpts(sections: list[tuple[str, str]], budget: int) -> dict[int, list[str]]:
+    keys = [_section_key(h) for h, _ in sections]
+    order = sorted(
+        range(len(sections)),
+        key=lambda i: (PRIORITY_SECTIONS.index(keys[i]) if keys[i] in PRIORITY_SECTIONS else len(PRIORITY_SECTIONS), i),
+    )
+
+    chosen: dict[int, list[str]] = {}
+    remaining = budget
+    for rank, index in enumerate(order):
+        heading, text = sections[index]
+        overhead = len(heading) + 5
+        share = max(remaining // (len(order) - rank), 300) - overhead
+        if share <= 0 or remaining - overhead <= 0:
+            break
+        share = min(share, remaining - overhead)
+        excerpt = text if len(text) <= share else _clip(text, share)
+        chosen[index] = [excerpt]
+        remaining -= len(excerpt) + overhead
+    return chosen
+
+
+def _clip(text: str, limit: int) -> str:
+    """Cut text to at most limit characters, on a word boundary where possible."""
+    cut = text[: max(limit - 1, 0)]
+    space = cut.rfind(" ")
+    if space > limit // 2:
+        cut = cut[:space]
+    return cut + "…"
+
+
+# ===============================================================
+# CACHE
+# ===============================================================
+
+
+class PdfCache:
+    """
+    Content-addressed store for downloaded PDFs and their extracted text.
+
+    Layout under the cache directory:
+        pdf/<sha256>.pdf    the downloaded bytes
+        text/<sha256>.json  extracted sections
+        urls/<sha256(url)>  digest of the PDF last served at that URL
+
+    When the PDFs exceed max_bytes, the least recently used ones (by
+    mtime, refreshed on every hit) are evicted with their text.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def pdf_path(self, digest: str) -> Path:
+        return self.directory / "pdf" / f"{digest}.pdf"
+
+    def lookup(self, url: str) -> str | None:
+        """Digest of the cached PDF for url, if both index entry and blob exist."""
+        try:
+            digest = self._url_path(url).read_text().strip()
+        except OSError:
+            return None
+        path = self.pdf_path(digest)
+        if not path.exists():
+            return None
+        path.touch()
+        return digest
+
+    def store(self, url: str, chunks) -> str:
+        """
+        Write streamed chunks to the cache and index them under url.
+
+        Chunks go to a temporary file that is hashed as it is written and
+        renamed into place, so readers never see a partial PDF.
+
+        Returns:
+            str: SHA-256 hex digest of the content
+        """
+        for sub in ("pdf", "text", "urls"):
+            (self.directory / sub).mkdir(parents=True, exist_ok=True)
+        sha = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=self.directory / "pdf", suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in chunks:
+                    sha.update(chunk)
+                    out.write(chunk)
+            digest = sha.hexdigest()
+            os.replace(tmp, self.pdf_path(digest))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._url_path(url).write_text(digest)
+        self.prune(keep=self.pdf_path(digest))
+        return digest
+
+    def load_sections(self, digest: str) -> list[tuple[str, str]] | None:
+        try:
+            return [tuple(s) for s in json.loads((self.directory / "text" / f"{digest}.json").read_text())]
+        except (OSError, ValueError):
+            return None
+
+    def save_sections(self, digest: str, sections: list[tuple[str, str]]) -> None:
+        """Write extracted sections; concurrent extractions of one PDF each get their own temporary file."""
+        fd, tmp = tempfile.mkstemp(dir=self.directory / "text", suffix=".part")
+        try:
+            with os.fdopen(fd, "w") as out:
+                out.write(json.dumps(sections))
+            os.replace(tmp, self.directory / "text" / f"{digest}.json")
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def prune(self, keep: Path | None = None) -> None:
+        """Evict least recently used PDFs until the store fits max_bytes, sparing `keep`."""
+        entries = []
+        for path in (self.directory / "pdf").glob("*.pdf"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            (self.directory / "text" / f"{path.stem}.json").unlink(missing_ok=True)
+            total -= size
+
+    def _url_path(self, url: str) -> Path:
+        return self.directory / "urls" / hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+# ===============================================================
+# WORKER POOL
+# ===============================================================
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """
+    Process pool shared by every PdfReaderTool.
+
+    Workers are spawned rather than forked: the API process runs an event
+    loop and worker threads, which fork does not copy safely.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=get_settings().pdf_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown_pdf_executor() -> None:
+    """Stop the worker processes (called on application shutdown)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+# ===============================================================
+# TOOL
+# ===============================================================
+
+
+class PdfReaderTool(BaseTool):
+    """
+    Tool for reading the full text of a paper PDF.
+
+    Attributes:
+        max_chars: Characters of excerpts returned to the agent
+        max_bytes: Largest PDF downloaded; bigger files are refused
+        timeout: Per-request timeout in seconds
+        cache: Disk cache of PDFs and extracted sections
+    """
+
+    retry_policy = RetryPolicy(attempts=2, base_delay=0.5, max_delay=2.0)
+
+    def __init__(
+        self,
+        max_chars: int = 6000,
+        max_bytes: int = 50_000_000,
+        timeout: float = 30.0,
+        cache_dir: str | None = None,
+    ) -> None:
+        super().__init__(
+            name="read_pdf",
+            description=(
+                "Downloads a paper PDF (e.g. an arXiv or open-access pdf_url) and returns "
+                "excerpts of its full text, labelled by section. Pass the topic or sub-query "
+                "as `query` to get the passages most relevant to it."
+            ),
+        )
+        settings = get_settings()
+        self.max_chars = max_chars
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.cache = PdfCache(cache_dir or settings.pdf_cache_dir, settings.pdf_cache_max_mb * 1024 * 1024)
+        self._http = scheduled_client(
+            timeout=timeout,
+            follow_redirects=True,
+            headers={"User-Agent": "Mozilla/5.0 (compatible; LitRevBot/1.0)"},
+        )
+
+    def read(self, url: str, query: str = "") -> str:
+        """
+        Fetch a PDF and return section-aware excerpts of its text.
+
+        Args:
+            url: PDF URL
+            query: Optional topic or question to rank passages by
+
+        Returns:
+            str: At most max_chars characters of excerpts
+        """
+        logger.info(f"Reading PDF: {url}")
+
+        try:
+            sections = self._sections(url)
+        except ToolError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to read PDF {url}: {e}")
+            raise ToolError(
+                f"Failed to read PDF: {e}",
+                tool_name=self.name,
+                details={"url": url},
+            ) from e
+
+        if not sections:
+            raise ToolError("PDF has no extractable text", tool_name=self.name, details={"url": url})
+        return excerpt_sections(sections, self.max_chars, query)
+
+    def _sections(self, url: str) -> list[tuple[str, str]]:
+        """Sections for url, from the cache where possible."""
+        digest = self.cache.lookup(url)
+        record_cache_lookup("pdf", hit=digest is not None)
+        if digest is None:
+            digest = self._download(url)
+        else:
+            logger.debug(f"PDF cache hit for {url}")
+
+        sections = self.cache.load_sections(digest)
+        if sections is None:
+            try:
+                future = get_pdf_executor().submit(extract_sections, str(self.cache.pdf_path(digest)))
+                sections = future.result(timeout=self.timeout * 4)
+            except BrokenProcessPool:
+                # A crashed worker breaks the whole pool; start a fresh one next call
+                shutdown_pdf_executor()
+                raise
+            self.cache.save_sections(digest, sections)
+            logger.info(f"Extracted {len(sections)} sections from {url}")
+        return sections
+
+    def _download(self, url: str) -> str:
+        """
+        Stream a PDF into the cache.
+
+        Raises:
+            ToolError: If the response is not a PDF or exceeds max_bytes
+        """
+        with self._http.stream("GET", url) as resp:
+            resp.raise_for_status()
+
+            content_type = resp.headers.get("content-type", "application/pdf").split(";")[0].strip().lower()
+            if content_type not in PDF_CONTENT_TYPES:
+                raise ToolError(
+                    f"Unsupported content type: {content_type}",
+                    tool_name=self.name,
+                    details={"url": url, "content_type": content_type},
+                )
+            declared = int(resp.headers.get("content-length") or 0)
+            if declared > self.max_bytes:
+                raise self._too_large(url)
+
+            return self.cache.store(url, self._capped(resp.iter_bytes(), url))
+
+    def _capped(self, chunks, url: str):
+        size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            if size > self.max_bytes:
+                raise self._too_large(url)
+            yield chunk
+
+    def _too_large(self, url: str) -> ToolError:
+        return ToolError(
+            f"PDF exceeds {self.max_bytes} bytes",
+            tool_name=self.name,
+            details={"url": url, "max_bytes": self.max_bytes},
+        )
+
+    def _get_tool_function(self) -> Callable[..., str]:
+        return self.read
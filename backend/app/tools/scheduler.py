@@ -0,0 +1,396 @@
+"""
+scheduler.py
+============
+Per-host politeness scheduler for every outbound request the tools make.
+
+Each host gets a token bucket (sustained rate plus burst) and a cap on
+requests in flight. Callers that exceed either wait in a queue instead
+of failing, so parallel reviews share an upstream's limit rather than
+multiplying it. A 429 or 503 pauses the whole host for its Retry-After
+and the request is queued again, so a throttled upstream sees one
+polite retry per slot instead of a retry storm.
+
+Tools do not call the scheduler directly: httpx clients are built with
+scheduled_client() and requests sessions (arxiv, tavily) are wrapped
+with schedule_session(), so every request goes through a slot. Both
+also cut queueing and socket timeouts short at the review deadline
+(see app.core.resilience).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config.settings import get_settings
+from app.core.logging_config import get_logger
+from app.core.metrics import OUTBOUND_QUEUE_WAIT, OUTBOUND_THROTTLED
+from app.core.resilience import bounded_timeout, remaining_time
+
+logger = get_logger(__name__)
+
+THROTTLE_STATUSES = frozenset({429, 503})
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+
+# ===============================================================
+# POLICY
+# ===============================================================
+
+
+@dataclass(frozen=True)
+class HostPolicy:
+    """
+    Request limits for one upstream.
+
+    Attributes:
+        rate: Sustained requests per second
+        burst: Requests that may start back to back after an idle spell
+        in_flight: Requests allowed to run at once
+    """
+
+    rate: float
+    burst: int = 1
+    in_flight: int = 1
+
+    @classmethod
+    def from_dict(cls, values: Mapping[str, float]) -> HostPolicy:
+        return cls(
+            rate=float(values["rate"]),
+            burst=max(int(values.get("burst", 1)), 1),
+            in_flight=max(int(values.get("in_flight", 1)), 1),
+        )
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    current = now if now is not None else datetime.now(timezone.utc).timestamp()
+    return max(when.timestamp() - current, 0.0)
+
+
+# ===============================================================
+# PER-HOST STATE
+# ===============================================================
+
+
+class _HostState:
+    """Token bucket, in-flight count and pause window for one host."""
+
+    def __init__(self, name: str, policy: HostPolicy) -> None:
+        self.name = name
+        self.policy = policy
+        self.tokens = float(policy.burst)
+        self.last_refill = time.monotonic()
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: float) -> float:
+        """Block until a request may start; returns the seconds spent waiting."""
+        start = time.monotonic()
+        deadline = start + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._ready(now):
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    return now - start
+                if now >= deadline:
+                    raise TimeoutError(f"Timed out after {timeout:.0f}s waiting for a request slot on {self.name}")
+                if self.in_flight >= self.policy.in_flight:
+                    wait = deadline - now  # woken by release()
+                else:
+                    wait = max(self.paused_until - now, (1 - self.tokens) / self.policy.rate, 0.001)
+                self._cond.wait(min(wait, deadline - now))
+
+    def ready(self) -> bool:
+        """Whether a request could start right now without queueing."""
+        with self._cond:
+            return self._ready(time.monotonic())
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request to this host for `seconds`, then resume at the sustained rate."""
+        with self._cond:
+            until = time.monotonic() + seconds
+            if until > self.paused_until:
+                self.paused_until = until
+                self.tokens = min(self.tokens, 1.0)
+                self.last_refill = max(self.last_refill, until)
+            self._cond.notify_all()
+
+    def _ready(self, now: float) -> bool:
+        self._refill(now)
+        return self.in_flight < self.policy.in_flight and now >= self.paused_until and self.tokens >= 1
+
+    def _refill(self, now: float) -> None:
+        if now > self.last_refill:
+            self.tokens = min(float(self.policy.burst), self.tokens + (now - self.last_refill) * self.policy.rate)
+            self.last_refill = now
+
+
+# ===============================================================
+# SCHEDULER
+# ===============================================================
+
+
+class HostScheduler:
+    """
+    Hands out request slots per host under each host's HostPolicy.
+
+    Policies are looked up by exact host, then by parent domain
+    ("export.arxiv.org" falls back to "arxiv.org"), then the default.
+
+    Attributes:
+        policies: HostPolicy per host or domain
+        default: Policy for hosts not listed
+        queue_timeout: Longest a request waits for a slot
+        max_retry_after: Longest Retry-After that is waited out; longer
+            throttles are returned to the caller
+        max_requeues: Times one request is queued again after a throttle
+    """
+
+    def __init__(
+        self,
+        policies: Mapping[str, HostPolicy],
+        default: HostPolicy,
+        queue_timeout: float = 120.0,
+        max_retry_after: float = 30.0,
+        max_requeues: int = 2,
+    ) -> None:
+        self.policies = {host.lower(): policy for host, policy in policies.items()}
+        self.default = default
+        self.queue_timeout = queue_timeout
+        self.max_retry_after = max_retry_after
+        self.max_requeues = max_requeues
+        self._states: dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    def policy_for(self, host: str) -> tuple[str, HostPolicy]:
+        """The policy governing host and the key it was found under ("default" if none)."""
+        labels = host.lower().split(".")
+        for i in range(len(labels)):
+            candidate = ".".join(labels[i:])
+            if candidate in self.policies:
+                return candidate, self.policies[candidate]
+        return "default", self.default
+
+    def acquire(self, host: str) -> Callable[[], None]:
+        """
+        Wait for a slot on host; returns the function that releases it.
+
+        Raises:
+            TimeoutError: If no slot frees up within queue_timeout or
+                before the review deadline
+        """
+        timeout = bounded_timeout(self.queue_timeout)
+        if timeout <= 0:
+            raise TimeoutError(f"Review deadline exceeded before a request to {host}")
+        state = self._state(host)
+        waited = state.acquire(timeout)
+        OUTBOUND_QUEUE_WAIT.labels(self.policy_for(host)[0]).observe(waited)
+        if waited > 1.0:
+            logger.debug(f"Waited {waited:.1f}s for a request slot on {host}")
+        return state.release
+
+    @contextmanager
+    def slot(self, host: str) -> Iterator[None]:
+        """Hold a request slot on host for the duration of the block."""
+        release = self.acquire(host)
+        try:
+            yield
+        finally:
+            release()
+
+    def has_capacity(self, host: str) -> bool:
+        """Whether a request to host would start at once rather than queue."""
+        return self._state(host).ready()
+
+    def throttled(self, host: str, status: int, headers: Mapping[str, str], attempt: int) -> bool:
+        """
+        Record a response; on 429/503 pause the host and say whether to queue again.
+
+        Args:
+            host: Host the request went to
+            status: Response status code
+            headers: Response headers (for Retry-After)
+            attempt: How many times this request was already queued again
+
+        Returns:
+            bool: True if the caller should wait for a new slot and resend
+        """
+        if status not in THROTTLE_STATUSES:
+            return False
+        name, policy = self.policy_for(host)
+        OUTBOUND_THROTTLED.labels(name, str(status)).inc()
+        delay = parse_retry_after(headers.get("retry-after"))
+        if delay is None:
+            delay = 1.0 / policy.rate
+        self._state(host).pause(min(delay, self.max_retry_after))
+        requeue = attempt < self.max_requeues and delay <= self.max_retry_after
+        logger.warning(
+            f"{host} answered {status} (Retry-After {delay:.1f}s); "
+            + ("queued again" if requeue else "giving up")
+        )
+        return requeue
+
+    def _state(self, host: str) -> _HostState:
+        host = host.lower()
+        state = self._states.get(host)
+        if state is None:
+            with self._lock:
+                state = self._states.get(host)
+                if state is None:
+                    state = self._states[host] = _HostState(host, self.policy_for(host)[1])
+        return state
+
+
+_scheduler: HostScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> HostScheduler:
+    """Process-wide scheduler built from settings."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                settings = get_settings()
+                _scheduler = HostScheduler(
+                    {host: HostPolicy.from_dict(v) for host, v in settings.outbound_host_limits.items()},
+                    HostPolicy.from_dict(settings.outbound_default_limit),
+                    queue_timeout=settings.outbound_queue_timeout,
+                    max_retry_after=settings.outbound_max_retry_after,
+                )
+    return _scheduler
+
+
+# ===============================================================
+# CLIENT INTEGRATION
+# ===============================================================
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response body that gives the request slot back when it is closed."""
+
+    def __init__(self, stream: httpx.SyncByteStream, release: Callable[[], None]) -> None:
+        self._stream = stream
+        self._release: Callable[[], None] | None = release
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if self._release is not None:
+                self._release, release = None, self._release
+                release()
+
+
+class ScheduledTransport(httpx.BaseTransport):
+    """httpx transport that takes a scheduler slot per request and holds it until the body is closed."""
+
+    def __init__(self, scheduler: HostScheduler | None = None, transport: httpx.BaseTransport | None = None) -> None:
+        self.scheduler = scheduler or get_scheduler()
+        self._transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        attempt = 0
+        while True:
+            release = self.scheduler.acquire(host)
+            remaining = remaining_time()
+            if remaining is not None:
+                timeouts = request.extensions.get("timeout", {})
+                request.extensions["timeout"] = {
+                    key: max(min(value if value is not None else remaining, remaining), 0.001)
+                    for key, value in {**dict.fromkeys(("connect", "read", "write", "pool")), **timeouts}.items()
+                }
+            try:
+                response = self._transport.handle_request(request)
+            except BaseException:
+                release()
+                raise
+            if not self.scheduler.throttled(host, response.status_code, response.headers, attempt):
+                response.stream = _ReleasingStream(response.stream, release)
+                return response
+            response.close()
+            release()
+            attempt += 1
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class ScheduledAdapter(HTTPAdapter):
+    """requests adapter that sends every request through a scheduler slot."""
+
+    def __init__(self, scheduler: HostScheduler | None = None, **kwargs: Any) -> None:
+        self.scheduler = scheduler or get_scheduler()
+        super().__init__(**kwargs)
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        host = urlsplit(request.url).hostname or ""
+        attempt = 0
+        while True:
+            with self.scheduler.slot(host):
+                # arxiv sends without a timeout; never wait past the review deadline
+                kwargs["timeout"] = _bounded_requests_timeout(kwargs.get("timeout"))
+                response = super().send(request, **kwargs)
+                if not kwargs.get("stream"):
+                    _ = response.content  # read the body while the slot is held
+            if not self.scheduler.throttled(host, response.status_code, response.headers, attempt):
+                return response
+            response.close()
+            attempt += 1
+
+
+def _bounded_requests_timeout(timeout: Any) -> Any:
+    """A requests timeout (None, seconds or (connect, read)) cut to the review deadline."""
+    if isinstance(timeout, tuple):
+        return tuple(bounded_timeout(t if t is not None else DEFAULT_REQUEST_TIMEOUT) or 0.001 for t in timeout)
+    return bounded_timeout(timeout if timeout is not None else DEFAULT_REQUEST_TIMEOUT) or 0.001
+
+
+def scheduled_client(**kwargs: Any) -> httpx.Client:
+    """An httpx.Client whose requests go through the shared scheduler."""
+    return httpx.Client(transport=ScheduledTransport(), **kwargs)
+
+
+def schedule_session(session: requests.Session) -> requests.Session:
+    """Route a requests session (as used by arxiv and tavily) through the shared scheduler."""
+    adapter = ScheduledAdapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
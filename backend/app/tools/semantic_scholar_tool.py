@@ -6,22 +6,37 @@ Semantic Scholar search tool for fetching academic papers.
 Uses the free Semantic Scholar Graph API (no key required) alongside
 arXiv to broaden paper coverage. Semantic Scholar covers peer-reviewed
 venues and provides richer citation context not available on arXiv.
+
+Besides the agent-facing relevance search, the tool exposes the bulk
+endpoints for code that needs many papers at once: bulk_search() streams
+large candidate pools through /paper/search/bulk continuation tokens,
+and batch() enriches up to hundreds of known ids (citation counts,
+venue, external ids) per /paper/batch request.
 """
 
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any
+from urllib.parse import urlsplit
 
 import httpx
 
+from app.config.settings import get_settings
 from app.core.exceptions import ToolError
 from app.core.logging_config import get_logger
+from app.core.resilience import RetryPolicy
 from app.tools.base import BaseTool
+from app.tools.scheduler import scheduled_client
 
 logger = get_logger(__name__)
 
-_SS_API = "https://api.semanticscholar.org/graph/v1/paper/search"
 _FIELDS = "title,authors,year,abstract,openAccessPdf"
+RICH_FIELDS = _FIELDS + ",venue,citationCount,externalIds"
+
+# Documented per-request limits of the bulk endpoints
+BATCH_MAX_IDS = 500
+BULK_PAGE_SIZE = 1000
 
 
 # ===============================================================
@@ -39,17 +54,24 @@ class SemanticScholarTool(BaseTool):
 
     Attributes:
         default_max_results: Default number of results to return
+        api_url: Graph API base URL
     """
 
+    retry_policy = RetryPolicy(attempts=3, base_delay=1.0, max_delay=8.0)
+    circuit_breaker = True
+    coalesce = True
+
     def __init__(
         self,
         default_max_results: int = 5,
+        api_url: str | None = None,
     ) -> None:
         """
         Initialize the Semantic Scholar search tool.
 
         Args:
             default_max_results: Default max results per search
+            api_url: Graph API base URL (defaults to settings.semantic_scholar_api_url)
         """
         super().__init__(
             name="semantic_scholar_search",
@@ -59,6 +81,10 @@ class SemanticScholarTool(BaseTool):
             ),
         )
         self.default_max_results = default_max_results
+        self.api_url = (api_url or get_settings().semantic_scholar_api_url).rstrip("/")
+        self._http = scheduled_client(timeout=15)
+        # Bulk and batch requests get the same retries and breaker as the tool
+        self._request = self._resilient(self._send)
 
         logger.debug(
             f"SemanticScholarTool initialized with default_max={default_max_results}"
@@ -91,34 +117,13 @@ class SemanticScholarTool(BaseTool):
         logger.info(f"Searching Semantic Scholar: query='{query}', max_results={capped}")
 
         try:
-            response = httpx.get(
-                _SS_API,
+            response = self._http.get(
+                f"{self.api_url}/paper/search",
                 params={"query": query, "fields": _FIELDS, "limit": capped},
-                timeout=15,
             )
             response.raise_for_status()
 
-            papers: list[dict] = []
-            for item in response.json().get("data", []):
-                open_access = item.get("openAccessPdf") or {}
-                pdf_url = open_access.get("url") or (
-                    f"https://www.semanticscholar.org/paper/{item.get('paperId', '')}"
-                )
-
-                year = item.get("year")
-                published = f"{year}-01-01" if year else "Unknown"
-
-                authors = [a["name"] for a in item.get("authors", [])]
-
-                papers.append(
-                    {
-                        "title": item.get("title", ""),
-                        "authors": authors,
-                        "published": published,
-                        "summary": item.get("abstract") or "No abstract available.",
-                        "pdf_url": pdf_url,
-                    }
-                )
+            papers = [_format_paper(item) for item in response.json().get("data", [])]
 
             logger.info(
                 f"Found {len(papers)} papers on Semantic Scholar for: {query}"
@@ -140,10 +145,117 @@ class SemanticScholarTool(BaseTool):
                 details={"query": query},
             ) from e
 
+    # ===============================================================
+    # BULK RETRIEVAL
+    # ===============================================================
+
+    def bulk_search(
+        self,
+        query: str,
+        max_results: int = BULK_PAGE_SIZE,
+        year: str | None = None,
+        sort: str | None = None,
+        fields: str = RICH_FIELDS,
+    ) -> Iterator[dict]:
+        """
+        Stream papers matching the query from /paper/search/bulk.
+
+        Pages of up to 1000 papers are fetched lazily, following the
+        continuation token, until max_results papers have been yielded or
+        the result set ends. Bulk search matches on keywords (with +, |,
+        - and quoted phrases) rather than ranking by relevance.
+
+        Args:
+            query: Bulk search query
+            max_results: Most papers to yield
+            year: Publication year or range, e.g. "2019-" or "2016-2020"
+            sort: Sort order, e.g. "citationCount:desc"
+            fields: Fields to request for each paper
+
+        Yields:
+            dict: Paper metadata, with paper_id, venue, citation_count and
+            external_ids when requested
+
+        Raises:
+            ToolError: If a page request fails
+        """
+        params: dict[str, Any] = {"query": query, "fields": fields}
+        if year:
+            params["year"] = year
+        if sort:
+            params["sort"] = sort
+
+        yielded = 0
+        while yielded < max_results:
+            page = self._request("GET", "/paper/search/bulk", params=params)
+            for item in page.get("data") or []:
+                yield _format_paper(item, rich=True)
+                yielded += 1
+                if yielded >= max_results:
+                    return
+            token = page.get("token")
+            if not token:
+                return
+            params["token"] = token
+
+    def batch(self, paper_ids: Sequence[str], fields: str = RICH_FIELDS) -> list[dict | None]:
+        """
+        Fetch metadata for known papers from /paper/batch.
+
+        Ids may be Semantic Scholar ids or prefixed external ids such as
+        "ARXIV:2106.15928" or "DOI:10.1145/...". Lists longer than 500 are
+        sent in several requests.
+
+        Args:
+            paper_ids: Ids to look up
+            fields: Fields to request for each paper
+
+        Returns:
+            list[dict | None]: Paper metadata in the order of paper_ids,
+            None where the id is unknown
+
+        Raises:
+            ToolError: If a batch request fails
+        """
+        papers = [_format_paper(item, rich=True) if item else None for item in self.batch_raw(paper_ids, fields)]
+        logger.info(f"Fetched {sum(p is not None for p in papers)}/{len(paper_ids)} papers from Semantic Scholar batch")
+        return papers
+
+    def batch_raw(self, paper_ids: Sequence[str], fields: str) -> list[dict | None]:
+        """batch() without reshaping: Graph API items as returned, e.g. for nested fields like references.paperId."""
+        items: list[dict | None] = []
+        for start in range(0, len(paper_ids), BATCH_MAX_IDS):
+            chunk = list(paper_ids[start : start + BATCH_MAX_IDS])
+            items.extend(self._request("POST", "/paper/batch", params={"fields": fields}, json={"ids": chunk}))
+        return items
+
+    def _send(self, method: str, path: str, **kwargs: Any) -> Any:
+        """One Graph API request; called through _request, which adds retries and the breaker."""
+        try:
+            response = self._http.request(method, f"{self.api_url}{path}", **kwargs)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"Semantic Scholar {path} failed: {e}")
+            raise ToolError(
+                f"Semantic Scholar request failed: {e}",
+                tool_name=self.name,
+                details={"path": path},
+            ) from e
+
     # ===============================================================
     # TOOL INTERFACE
     # ===============================================================
 
+    def _hedge_target(self) -> tuple[Callable[..., list[dict]], str]:
+        """
+        Slow searches are repeated against the same API.
+
+        There is no mirror, so a hedge only goes out when the host policy
+        has a free slot (in_flight above 1, e.g. with an API key).
+        """
+        return self.semantic_scholar_search, urlsplit(self.api_url).hostname or ""
+
     def _get_tool_function(self) -> Callable[..., list[dict]]:
         """
         Get the search function for FunctionTool wrapping.
@@ -152,3 +264,30 @@ class SemanticScholarTool(BaseTool):
             Callable: The search method
         """
         return self.semantic_scholar_search
+
+
+def _format_paper(item: dict, rich: bool = False) -> dict:
+    """
+    Shape a Graph API paper like the other search tools' results.
+
+    With rich=True the Semantic Scholar id and whichever of venue,
+    citation count and external ids were requested are kept as well.
+    """
+    open_access = item.get("openAccessPdf") or {}
+    pdf_url = open_access.get("url") or (
+        f"https://www.semanticscholar.org/paper/{item.get('paperId', '')}"
+    )
+    year = item.get("year")
+    paper = {
+        "title": item.get("title", ""),
+        "authors": [a["name"] for a in item.get("authors") or []],
+        "published": f"{year}-01-01" if year else "Unknown",
+        "summary": item.get("abstract") or "No abstract available.",
+        "pdf_url": pdf_url,
+    }
+    if rich:
+        paper["paper_id"] = item.get("paperId")
+        for field, key in (("venue", "venue"), ("citationCount", "citation_count"), ("externalIds", "external_ids")):
+            if field in item:
+                paper[key] = item[field]
+    return paper
@@ -0,0 +1,86 @@
+"""
+single_flight.py
+================
+In-flight deduplication of identical tool calls.
+
+Parallel reviews on similar topics often send the same search at the
+same moment. A SingleFlight lets the first caller start the upstream
+call and hands every identical call that arrives while it runs the same
+future, so N concurrent callers cost one request. Calls are identical
+when their arguments match after defaults are filled in and strings are
+case-folded and whitespace-collapsed.
+
+Only calls that overlap are merged: the entry is dropped as soon as the
+call finishes, so nothing is cached and a failure is shared only with
+the callers that were already waiting for it.
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Any
+
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def call_key(func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> str:
+    """
+    Normalized identity of a call to func.
+
+    Arguments are bound to func's signature with defaults applied, so
+    search("GNN  survey") and search("gnn survey", max_results=5) match.
+    """
+    try:
+        bound = inspect.signature(func).bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments: Any = bound.arguments
+    except TypeError:
+        arguments = {"args": list(args), **kwargs}
+    return json.dumps(_normalize(arguments), sort_keys=True, default=str)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+class SingleFlight:
+    """Shares one running call among concurrent callers with the same key."""
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, Future[Any]] = {}
+        self._lock = threading.Lock()
+
+    def join(self, key: Hashable, start: Callable[[], Future[Any]]) -> tuple[Future[Any], bool]:
+        """
+        The in-flight future for key, starting one with `start` if there is none.
+
+        Returns:
+            tuple: The future, and True if this caller started it
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = start()
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future, True
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: Hashable, future: Future[Any]) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
@@ -10,9 +10,12 @@ from collections.abc import Callable
 
 from tavily import TavilyClient
 
+from app.config.settings import get_settings
 from app.core.exceptions import ToolError
 from app.core.logging_config import get_logger
+from app.core.resilience import RetryPolicy
 from app.tools.base import BaseTool
+from app.tools.scheduler import schedule_session
 
 logger = get_logger(__name__)
 
@@ -20,7 +23,11 @@ logger = get_logger(__name__)
 class TavilySearchTool(BaseTool):
     """Tool for searching the web using Tavily API."""
 
-    def __init__(self, api_key: str, max_results: int = 5) -> None:
+    retry_policy = RetryPolicy(attempts=2, base_delay=0.5, max_delay=2.0)
+    circuit_breaker = True
+    coalesce = True
+
+    def __init__(self, api_key: str, max_results: int = 5, api_url: str | None = None) -> None:
         super().__init__(
             name="web_search",
             description=(
@@ -29,7 +36,9 @@ class TavilySearchTool(BaseTool):
             ),
         )
         self.max_results = max_results
-        self._client = TavilyClient(api_key=api_key)
+        self.api_url = api_url or get_settings().tavily_api_url
+        self._client = TavilyClient(api_key=api_key, api_base_url=self.api_url)
+        schedule_session(self._client.session)
 
     def search(self, query: str, max_results: int = 5) -> list[dict]:
         """Search the web for the given query."""
@@ -2,6 +2,17 @@
 web_reader_tool.py
 ==================
 Tool for reading and extracting text content from web pages.
+
+Downloads are streamed and stop at a byte cap, non-text responses are
+rejected from their Content-Type before the body is read, and text is
+extracted with lxml, stopping once enough characters are collected.
+Given a query, read() scans much further into the page and returns the
+passages that best match it (BM25, see passages.py) instead of the
+first max_chars characters. Extracted text is kept in an HttpCache and
+revalidated with conditional requests (see http_cache.py), so a page
+read by many reviews is normally neither downloaded nor parsed again.
+Like every sync tool body, read() runs in a worker thread (see
+BaseTool._instrument), so parsing never blocks the event loop.
 """
 
 from __future__ import annotations
@@ -9,53 +20,161 @@ from __future__ import annotations
 from collections.abc import Callable
 
 import httpx
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 
+from app.config.settings import get_settings
 from app.core.exceptions import ToolError
 from app.core.logging_config import get_logger
+from app.core.metrics import record_cache_lookup
+from app.core.resilience import RetryPolicy
 from app.tools.base import BaseTool
+from app.tools.http_cache import HttpCache
+from app.tools.passages import select_passages
+from app.tools.scheduler import scheduled_client
 
 logger = get_logger(__name__)
 
+TEXT_CONTENT_TYPES = frozenset({"text/html", "application/xhtml+xml", "text/plain"})
+NOISE_TAGS = ("script", "style", "noscript", "nav", "footer", "header", "aside")
+
+
+# ===============================================================
+# EXTRACTION
+# ===============================================================
+
+
+def extract_text(
+    body: bytes,
+    encoding: str | None = None,
+    max_chars: int | None = None,
+    content_type: str = "text/html",
+) -> str:
+    """
+    Extract readable text from a downloaded page.
+
+    Args:
+        body: Raw response bytes (possibly cut off at the byte cap)
+        encoding: Charset from the Content-Type header; None lets lxml
+            detect it from the document
+        max_chars: Stop collecting text once this many characters are found
+        content_type: Response MIME type; text/plain skips HTML parsing
+
+    Returns:
+        str: Non-empty text lines joined by newlines
+    """
+    if content_type == "text/plain":
+        lines = body.decode(encoding or "utf-8", errors="replace").splitlines()
+        return _join_lines(lines, max_chars)
+
+    parser = lxml.html.HTMLParser(encoding=encoding, remove_comments=True, remove_pis=True)
+    try:
+        root = lxml.html.document_fromstring(body, parser=parser)
+    except (etree.ParserError, ValueError, LookupError):
+        return ""
+
+    for element in list(root.iter(*NOISE_TAGS)):
+        element.drop_tree()
+
+    return _join_lines(root.itertext(), max_chars)
+
+
+def _join_lines(chunks, max_chars: int | None) -> str:
+    parts: list[str] = []
+    size = 0
+    for chunk in chunks:
+        stripped = chunk.strip()
+        if not stripped:
+            continue
+        parts.append(stripped)
+        size += len(stripped) + 1
+        if max_chars is not None and size > max_chars:
+            break
+    return "\n".join(parts)
+
+
+# ===============================================================
+# TOOL
+# ===============================================================
+
 
 class WebReaderTool(BaseTool):
-    """Tool for reading web page content."""
+    """
+    Tool for reading web page content.
+
+    Attributes:
+        max_chars: Characters of text returned to the agent
+        max_bytes: Download cap; the body is cut off (not rejected) beyond it
+        timeout: Per-request timeout in seconds
+        scan_chars: Characters of page text searched for passages when a
+            query is given (and the text kept in the cache)
+        passage_chars: Target passage length for query-aware reads
+        cache: Conditional-request cache of extracted text, or None
+    """
 
-    def __init__(self, max_chars: int = 4000) -> None:
+    # Failures are per page, not per source, so there is no breaker
+    retry_policy = RetryPolicy(attempts=2, base_delay=0.25, max_delay=1.0)
+
+    def __init__(
+        self,
+        max_chars: int = 4000,
+        max_bytes: int = 2_000_000,
+        timeout: float = 15.0,
+        scan_chars: int = 200_000,
+        passage_chars: int = 600,
+        cache_dir: str | None = None,
+    ) -> None:
         super().__init__(
             name="read_webpage",
             description=(
                 "Fetches a URL and extracts its main text content. "
-                "Use this to read full articles, blog posts, or documentation pages."
+                "Use this to read full articles, blog posts, or documentation pages. "
+                "Pass the topic or sub-query as `query` to get the passages most "
+                "relevant to it rather than the start of the page."
             ),
         )
         self.max_chars = max_chars
+        self.scan_chars = scan_chars
+        self.passage_chars = passage_chars
+        settings = get_settings()
+        cache_dir = settings.web_cache_dir if cache_dir is None else cache_dir
+        self.cache = HttpCache(cache_dir, settings.web_cache_max_mb * 1024 * 1024) if cache_dir else None
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        # One pooled client per tool: building a client (and its SSL
+        # context) per request costs more than parsing a typical page
+        self._http = scheduled_client(
+            timeout=timeout,
+            follow_redirects=True,
+            headers={"User-Agent": "Mozilla/5.0 (compatible; LitRevBot/1.0)"},
+        )
 
-    def read(self, url: str) -> str:
-        """Fetch and extract text from a URL."""
-        logger.info(f"Reading webpage: {url}")
-
-        try:
-            resp = httpx.get(url, timeout=15, follow_redirects=True, headers={
-                "User-Agent": "Mozilla/5.0 (compatible; LitRevBot/1.0)"
-            })
-            resp.raise_for_status()
+    def read(self, url: str, query: str = "") -> str:
+        """
+        Fetch and extract text from a URL.
 
-            soup = BeautifulSoup(resp.text, "html.parser")
+        Args:
+            url: Page to read
+            query: Optional topic or question; when given, the passages
+                that best match it are returned instead of the page start
 
-            # Remove noise
-            for tag in soup(["script", "style", "nav", "footer", "header", "aside"]):
-                tag.decompose()
+        Returns:
+            str: At most about max_chars characters of page text
+        """
+        logger.info(f"Reading webpage: {url}")
 
-            text = soup.get_text(separator="\n", strip=True)
+        try:
+            text = self._page_text(url, query)
 
-            # Truncate to max_chars
             if len(text) > self.max_chars:
-                text = text[: self.max_chars] + "\n...[truncated]"
+                selected = select_passages(text, query, self.max_chars, self.passage_chars) if query else None
+                # Without a query (or any matching passage), keep the page start
+                text = selected or text[: self.max_chars] + "\n...[truncated]"
 
-            logger.info(f"Extracted {len(text)} chars from {url}")
             return text
 
+        except ToolError:
+            raise
         except Exception as e:
             logger.error(f"Failed to read {url}: {e}")
             raise ToolError(
@@ -64,5 +183,77 @@ class WebReaderTool(BaseTool):
                 details={"url": url},
             ) from e
 
+    def _page_text(self, url: str, query: str) -> str:
+        """
+        Extracted text of a page, from the cache when it is fresh or still valid.
+
+        Cached text is extracted up to scan_chars so it serves reads with
+        and without a query alike.
+        """
+        entry = self.cache.get(url) if self.cache else None
+        if entry is not None and entry.fresh:
+            logger.info(f"Serving {url} from cache")
+            record_cache_lookup("web", hit=True)
+            return entry.text
+
+        headers, page = self._fetch(url, entry.validators() if entry else None)
+        if page is None:
+            logger.info(f"Revalidated {url} (304), reusing cached text")
+            record_cache_lookup("web", hit=True, revalidated=True)
+            entry.refresh(headers)
+            self.cache.save(entry)
+            return entry.text
+        if self.cache:
+            record_cache_lookup("web", hit=False)
+
+        body, encoding, content_type = page
+        limit = self.scan_chars if query or self.cache else self.max_chars
+        text = extract_text(body, encoding, limit, content_type)
+        logger.info(f"Extracted {len(text)} chars from {len(body)} bytes at {url}")
+        if self.cache:
+            self.cache.put(url, headers, text)
+        return text
+
+    def _fetch(
+        self, url: str, validators: dict[str, str] | None = None
+    ) -> tuple[httpx.Headers, tuple[bytes, str | None, str] | None]:
+        """
+        Stream the response body up to max_bytes.
+
+        Args:
+            url: Page to fetch
+            validators: Conditional headers from a cached entry
+
+        Returns:
+            Tuple of (response headers, page) where page is (body bytes,
+            declared charset, MIME type), or None on 304 Not Modified
+
+        Raises:
+            ToolError: If the response is not a text document
+        """
+        with self._http.stream("GET", url, headers=validators) as resp:
+            if resp.status_code == 304 and validators:
+                return resp.headers, None
+            resp.raise_for_status()
+
+            content_type = resp.headers.get("content-type", "text/html").split(";")[0].strip().lower()
+            if content_type not in TEXT_CONTENT_TYPES:
+                raise ToolError(
+                    f"Unsupported content type: {content_type}",
+                    tool_name=self.name,
+                    details={"url": url, "content_type": content_type},
+                )
+
+            chunks: list[bytes] = []
+            size = 0
+            for chunk in resp.iter_bytes():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= self.max_bytes:
+                    logger.info(f"Stopped reading {url} at the {self.max_bytes} byte cap")
+                    break
+
+            return resp.headers, (b"".join(chunks)[: self.max_bytes], resp.charset_encoding, content_type)
+
     def _get_tool_function(self) -> Callable[..., str]:
         return self.read
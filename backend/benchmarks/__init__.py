@@ -0,0 +1,9 @@
+"""
+End-to-end review pipeline benchmarks.
+
+Drives full reviews against the offline fakes at several concurrency
+levels and records throughput, time-to-first-event and total review
+percentiles, database writes per review, peak RSS and per-stage span
+timings. Run with ``python -m benchmarks --help`` from the backend
+directory.
+"""
@@ -0,0 +1,210 @@
+"""
+Run the review pipeline benchmarks.
+
+    python -m benchmarks --mode orchestrator --concurrency 1,10,100
+    python -m benchmarks --mode http --baseline benchmarks/results/baseline.json
+    python -m benchmarks --mode orchestrator --record recordings/ --concurrency 10
+    python -m benchmarks --mode replay --recordings recordings/ --speed 4
+
+Results are written as JSON; with --baseline the run exits non-zero when
+any tracked metric regresses by more than --threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Review pipeline benchmarks")
+    parser.add_argument("--mode", choices=["orchestrator", "http", "replay"], default="orchestrator")
+    parser.add_argument("--concurrency", default="1,10,100", help="Comma-separated concurrency levels")
+    parser.add_argument("--min-reviews", type=int, default=5, help="Reviews per level when concurrency is lower")
+    parser.add_argument("--fakes-url", default=None, help="Use already running fakes instead of starting them")
+    parser.add_argument("--fakes-port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Fake scholarly API latency")
+    parser.add_argument("--llm-latency-ms", type=float, default=100.0, help="Fake completion latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--record", default=None, help="Orchestrator mode: save each review's recording here")
+    parser.add_argument("--recordings", default=None, help="Replay mode: recording file or directory")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay mode: timing speed-up, 0 for no delays")
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/<mode>-<time>.json)")
+    parser.add_argument("--baseline", default=None, help="Result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression")
+    return parser.parse_args()
+
+
+def start_fakes(args: argparse.Namespace) -> tuple[str, subprocess.Popen | None]:
+    """Start the fake upstreams in a subprocess unless a URL was given or replaying."""
+    if args.mode == "replay":
+        # Replays never touch the network; a closed port makes any leak fail fast
+        return "http://127.0.0.1:9", None
+    if args.fakes_url:
+        return args.fakes_url.rstrip("/"), None
+    url = f"http://127.0.0.1:{args.fakes_port}"
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "fakes",
+            "--port", str(args.fakes_port),
+            "--latency-ms", str(args.latency_ms),
+            "--llm-latency-ms", str(args.llm_latency_ms),
+            "--jitter-ms", str(args.jitter_ms),
+        ],
+        cwd=BACKEND_DIR,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"{url}/openapi.json", timeout=1).raise_for_status()
+            return url, process
+        except httpx.HTTPError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f"Fake servers did not start on {url}")
+
+
+def configure_environment(fakes_url: str) -> None:
+    """Point every upstream at the fakes; must run before app settings are loaded."""
+    cache_dir = Path(tempfile.mkdtemp(prefix="litrev-bench-"))
+    os.environ.update(
+        OPENAI_API_KEY="sk-benchmark",
+        OPENAI_BASE_URL=f"{fakes_url}/openai/v1",
+        ARXIV_API_URL=f"{fakes_url}/arxiv/api/query",
+        SEMANTIC_SCHOLAR_API_URL=f"{fakes_url}/s2/graph/v1",
+        TAVILY_API_KEY="tvly-benchmark",
+        TAVILY_API_URL=f"{fakes_url}/tavily",
+        # Every fake upstream shares one host; let it through unthrottled
+        OUTBOUND_HOST_LIMITS=json.dumps({"127.0.0.1": {"rate": 10000, "burst": 10000, "in_flight": 10000}}),
+        # Fresh caches and local corpus per run, so the first review of each topic starts cold
+        LOCAL_CORPUS_BACKEND="sqlite",
+        LOCAL_CORPUS_SQLITE_PATH=str(cache_dir / "corpus.sqlite3"),
+        PDF_CACHE_DIR=str(cache_dir / "pdf"),
+        WEB_CACHE_DIR=str(cache_dir / "web"),
+        CITATION_CACHE_DIR=str(cache_dir / "citations"),
+        # Reviews must run, not be answered from earlier runs of the same topic
+        TOPIC_CACHE_ENABLED="false",
+    )
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from benchmarks.harness import DbWriteCounter, SpanCollector, run_level
+    from benchmarks.scenarios import HttpScenario, OrchestratorScenario, ReplayScenario
+
+    from app.core.tracing import set_span_exporter
+
+    if args.mode == "http":
+        scenario = HttpScenario()
+    elif args.mode == "replay":
+        if not args.recordings:
+            raise SystemExit("--mode replay needs --recordings")
+        scenario = ReplayScenario(args.recordings, args.speed)
+    else:
+        scenario = OrchestratorScenario(args.record)
+    spans = SpanCollector()
+    set_span_exporter(spans)
+    db_counter = DbWriteCounter(scenario.engine) if scenario.engine is not None else None
+
+    levels: dict[str, dict] = {}
+    await scenario.start()
+    try:
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            total = max(concurrency, args.min_reviews)
+            print(f"[{scenario.name}] concurrency={concurrency} reviews={total} ...", flush=True)
+            result = await run_level(concurrency, total, scenario.run_one, spans, db_counter)
+            levels[str(concurrency)] = result.to_dict()
+            print(format_level(result.to_dict()), flush=True)
+    finally:
+        await scenario.stop()
+        set_span_exporter(None)
+
+    return {
+        "meta": {
+            "mode": args.mode,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "latency_ms": args.latency_ms,
+            "llm_latency_ms": args.llm_latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "recordings": args.recordings,
+            "speed": args.speed if args.mode == "replay" else None,
+        },
+        "levels": levels,
+    }
+
+
+def format_level(level: dict) -> str:
+    def fmt(value: float | None) -> str:
+        return "-" if value is None else f"{value:.1f}"
+
+    return (
+        f"  throughput={fmt(level['throughput_rpm'])}/min "
+        f"ttfe p50/p95/p99={fmt(level['ttfe_p50_ms'])}/{fmt(level['ttfe_p95_ms'])}/{fmt(level['ttfe_p99_ms'])}ms "
+        f"review p50/p95={fmt(level['review_p50_ms'])}/{fmt(level['review_p95_ms'])}ms "
+        f"db_writes/review={fmt(level['db_writes_per_review'])} "
+        f"peak_rss={fmt(level['peak_rss_mb'])}MB errors={level['errors']}"
+    )
+
+
+def main() -> None:
+    args = parse_args()
+    fakes_url, fakes_process = start_fakes(args)
+    try:
+        configure_environment(fakes_url)
+        results = asyncio.run(run(args))
+    finally:
+        if fakes_process is not None:
+            fakes_process.terminate()
+            fakes_process.wait()
+
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"{args.mode}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        from benchmarks.compare import find_regressions
+
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = find_regressions(results, baseline, args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold:.0%} vs {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} vs {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
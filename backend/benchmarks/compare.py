@@ -0,0 +1,54 @@
+"""
+compare.py
+==========
+Regression checks between two benchmark result files.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+# Metric name -> True when a larger value is better
+TRACKED_METRICS: dict[str, bool] = {
+    "throughput_rpm": True,
+    "ttfe_p50_ms": False,
+    "ttfe_p95_ms": False,
+    "ttfe_p99_ms": False,
+    "review_p50_ms": False,
+    "review_p95_ms": False,
+    "db_writes_per_review": False,
+    "peak_rss_mb": False,
+}
+
+
+def find_regressions(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[str]:
+    """
+    Compare results level by level.
+
+    Args:
+        current: Result document from this run
+        baseline: Result document to compare against
+        threshold: Allowed relative change in the bad direction (0.2 = 20%)
+
+    Returns:
+        One human-readable line per metric that regressed beyond the threshold
+    """
+    regressions: list[str] = []
+    for level, result in current.get("levels", {}).items():
+        base = baseline.get("levels", {}).get(level)
+        if base is None:
+            continue
+        if result.get("errors", 0) > base.get("errors", 0):
+            regressions.append(f"c={level} errors: {base.get('errors', 0)} -> {result['errors']}")
+        for metric, higher_is_better in TRACKED_METRICS.items():
+            now, before = result.get(metric), base.get(metric)
+            if now is None or before is None:
+                continue
+            if higher_is_better:
+                regressed = now < before * (1 - threshold)
+            else:
+                regressed = now > before * (1 + threshold)
+            if regressed:
+                change = (now - before) / before * 100 if before else float("inf")
+                regressions.append(f"c={level} {metric}: {before:.1f} -> {now:.1f} ({change:+.0f}%)")
+    return regressions
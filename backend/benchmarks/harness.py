@@ -0,0 +1,233 @@
+"""
+harness.py
+==========
+Measurement primitives for the pipeline benchmarks.
+
+Runs a scenario's reviews at a fixed concurrency and collects latency
+percentiles, throughput, database writes, peak RSS and per-stage span
+timings into a LevelResult.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import resource
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.tracing import Span, SpanExporter
+
+_WRITE_VERBS = ("INSERT", "UPDATE", "DELETE")
+
+
+# ===============================================================
+# STATISTICS
+# ===============================================================
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Linearly interpolated percentile (q in 0-100); None for no samples."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+# ===============================================================
+# COLLECTORS
+# ===============================================================
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process, falling back to the peak where /proc is missing."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """Samples process RSS in the background and keeps the peak."""
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self.interval = interval
+        self.peak_bytes = 0
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> RssSampler:
+        self.peak_bytes = current_rss_bytes()
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+    async def _run(self) -> None:
+        while True:
+            self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+            await asyncio.sleep(self.interval)
+
+    @property
+    def peak_mb(self) -> float:
+        return self.peak_bytes / (1024 * 1024)
+
+
+class DbWriteCounter:
+    """Counts INSERT/UPDATE/DELETE statements executed on an engine."""
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine.sync_engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip()[:6].upper() in _WRITE_VERBS:
+            self.count += 1
+
+    def __enter__(self) -> DbWriteCounter:
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+class SpanCollector(SpanExporter):
+    """In-memory exporter that aggregates span durations by name."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def reset(self) -> None:
+        self.spans = []
+
+    def stage_summary(self) -> dict[str, dict[str, float]]:
+        by_name: dict[str, list[float]] = {}
+        for span in self.spans:
+            by_name.setdefault(span.name, []).append(span.duration_ms)
+        return {
+            name: {
+                "count": len(durations),
+                "p50_ms": percentile(durations, 50),
+                "p95_ms": percentile(durations, 95),
+                "total_ms": sum(durations),
+            }
+            for name, durations in sorted(by_name.items())
+        }
+
+
+# ===============================================================
+# RESULTS
+# ===============================================================
+
+
+@dataclass
+class ReviewSample:
+    """Timings for one review run."""
+
+    total_ms: float
+    ttfe_ms: float | None = None
+    error: str | None = None
+
+
+@dataclass
+class LevelResult:
+    """Aggregated results for one concurrency level."""
+
+    concurrency: int
+    reviews: int
+    errors: int
+    wall_s: float
+    throughput_rpm: float
+    ttfe_p50_ms: float | None
+    ttfe_p95_ms: float | None
+    ttfe_p99_ms: float | None
+    review_p50_ms: float | None
+    review_p95_ms: float | None
+    review_p99_ms: float | None
+    db_writes_per_review: float | None
+    peak_rss_mb: float
+    stages: dict[str, dict[str, float]] = field(default_factory=dict)
+    error_samples: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+async def run_level(
+    concurrency: int,
+    total: int,
+    run_one: Callable[[int], Awaitable[ReviewSample]],
+    spans: SpanCollector,
+    db_counter: DbWriteCounter | None = None,
+) -> LevelResult:
+    """
+    Run `total` reviews with at most `concurrency` in flight.
+
+    Args:
+        concurrency: Maximum simultaneous reviews
+        total: Number of reviews to run
+        run_one: Coroutine factory running review number i
+        spans: Span collector installed as the tracing exporter
+        db_counter: Optional write counter for the database engine
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(i: int) -> ReviewSample:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                return await run_one(i)
+            except Exception as e:
+                return ReviewSample(total_ms=(time.perf_counter() - start) * 1000, error=f"{type(e).__name__}: {e}")
+
+    spans.reset()
+    writes = 0
+    async with RssSampler() as rss:
+        start = time.perf_counter()
+        if db_counter is not None:
+            with db_counter:
+                samples = await asyncio.gather(*(bounded(i) for i in range(total)))
+            writes = db_counter.count
+        else:
+            samples = await asyncio.gather(*(bounded(i) for i in range(total)))
+        wall = time.perf_counter() - start
+
+    ok = [s for s in samples if s.error is None]
+    ttfe = [s.ttfe_ms for s in ok if s.ttfe_ms is not None]
+    totals = [s.total_ms for s in ok]
+    return LevelResult(
+        concurrency=concurrency,
+        reviews=total,
+        errors=total - len(ok),
+        wall_s=wall,
+        throughput_rpm=len(ok) / wall * 60 if wall > 0 else 0.0,
+        ttfe_p50_ms=percentile(ttfe, 50),
+        ttfe_p95_ms=percentile(ttfe, 95),
+        ttfe_p99_ms=percentile(ttfe, 99),
+        review_p50_ms=percentile(totals, 50),
+        review_p95_ms=percentile(totals, 95),
+        review_p99_ms=percentile(totals, 99),
+        db_writes_per_review=writes / total if db_counter is not None and total else None,
+        peak_rss_mb=rss.peak_mb,
+        stages=spans.stage_summary(),
+        error_samples=sorted({s.error for s in samples if s.error})[:5],
+    )
@@ -0,0 +1,196 @@
+"""
+scenarios.py
+============
+Review workloads driven by the benchmark runner.
+
+OrchestratorScenario calls LitRevOrchestrator.run_review directly and
+measures the agent pipeline alone, optionally saving each review as a
+recording. ReplayScenario runs the orchestrator over saved recordings,
+so every run sees identical LLM and tool I/O. HttpScenario serves the
+FastAPI app in-process and goes through POST /reviews and the SSE
+stream, so it also covers auth, persistence and event serialisation
+(and needs a reachable DATABASE_URL).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+import uvicorn
+from benchmarks.harness import ReviewSample
+from fakes.corpus import load_corpus
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.replay import ReviewRecorder, ReviewReplayer
+from app.core.usage import UsageTracker
+from app.orchestrator.litrev_orchestrator import LitRevOrchestrator
+
+
+def corpus_topics() -> list[str]:
+    """Topics present in the fake corpus, so every review finds papers."""
+    return sorted({p["topic"] for p in load_corpus().papers})
+
+
+class OrchestratorScenario:
+    """Runs reviews straight through the orchestrator, without HTTP or a database."""
+
+    name = "orchestrator"
+    engine: AsyncEngine | None = None
+
+    def __init__(self, record_dir: str | None = None) -> None:
+        self.topics = corpus_topics()
+        self.record_dir = Path(record_dir) if record_dir else None
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def run_one(self, index: int) -> ReviewSample:
+        topic = self.topics[index % len(self.topics)]
+        recorder = ReviewRecorder(topic=topic) if self.record_dir else None
+        sample = await _timed_review(topic, recorder)
+        if recorder is not None:
+            recorder.save(self.record_dir / f"{index:04d}-{uuid.uuid4().hex[:8]}.jsonl.gz")
+        return sample
+
+
+class ReplayScenario:
+    """Replays saved review recordings through the orchestrator, with no network access."""
+
+    name = "replay"
+    engine: AsyncEngine | None = None
+
+    def __init__(self, recordings: str, speed: float = 1.0) -> None:
+        paths = sorted(Path(recordings).glob("*.jsonl.gz")) if Path(recordings).is_dir() else [Path(recordings)]
+        if not paths:
+            raise SystemExit(f"No recordings found in {recordings}")
+        self.replayers = [ReviewReplayer.load(p, speed) for p in paths]
+        self.mismatches = 0
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        if self.mismatches:
+            print(f"  {self.mismatches} replayed calls did not match their recorded request", flush=True)
+
+    async def run_one(self, index: int) -> ReviewSample:
+        replayer = self.replayers[index % len(self.replayers)].fork()
+        sample = await _timed_review(replayer.metadata["topic"], replayer)
+        self.mismatches += replayer.mismatches
+        return sample
+
+
+async def _timed_review(topic: str, session: ReviewRecorder | ReviewReplayer | None) -> ReviewSample:
+    start = time.perf_counter()
+    first_event: float | None = None
+    async for _ in LitRevOrchestrator().run_review(
+        topic,
+        usage_tracker=UsageTracker(),
+        trace_id=f"bench-{uuid.uuid4().hex[:12]}",
+        replay_session=session,
+    ):
+        if first_event is None:
+            first_event = time.perf_counter()
+    end = time.perf_counter()
+    return ReviewSample(total_ms=(end - start) * 1000, ttfe_ms=(first_event - start) * 1000 if first_event else None)
+
+
+class HttpScenario:
+    """Serves the API in-process and runs reviews through /reviews and /stream."""
+
+    name = "http"
+
+    def __init__(self) -> None:
+        from app.db.database import engine
+
+        self.topics = corpus_topics()
+        self.engine: AsyncEngine | None = engine
+        self._server: uvicorn.Server | None = None
+        self._task: asyncio.Task | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._token = ""
+
+    async def start(self) -> None:
+        from app.api.deps import check_rate_limit
+        from app.main import app
+
+        # Every benchmark review comes from one IP
+        app.dependency_overrides[check_rate_limit] = lambda: None
+
+        port = _free_port()
+        self._server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self._task = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            if self._task.done():
+                raise RuntimeError("API server failed to start; is DATABASE_URL reachable?")
+            await asyncio.sleep(0.05)
+
+        self._client = httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}/api/v1",
+            timeout=httpx.Timeout(600.0),
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=None),
+        )
+        response = await self._client.post(
+            "/auth/register",
+            json={"email": f"bench-{uuid.uuid4().hex[:12]}@example.com", "password": "benchmark-password"},
+        )
+        response.raise_for_status()
+        self._token = response.json()["access_token"]
+
+    async def stop(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._task is not None:
+            await self._task
+
+    async def run_one(self, index: int) -> ReviewSample:
+        """Create a review and consume its SSE stream; TTFE is measured from the POST."""
+        assert self._client is not None
+        topic = self.topics[index % len(self.topics)]
+        start = time.perf_counter()
+        response = await self._client.post(
+            "/reviews",
+            json={"topic": topic},
+            headers={"Authorization": f"Bearer {self._token}"},
+        )
+        response.raise_for_status()
+        review_id = response.json()["id"]
+
+        first_event: float | None = None
+        event_name = ""
+        error: str | None = None
+        async with self._client.stream(
+            "GET", f"/reviews/{review_id}/stream", params={"token": self._token}
+        ) as stream:
+            stream.raise_for_status()
+            async for line in stream.aiter_lines():
+                if line.startswith("event:"):
+                    event_name = line.split(":", 1)[1].strip()
+                    if first_event is None:
+                        first_event = time.perf_counter()
+                elif line.startswith("data:") and event_name in ("complete", "error"):
+                    if event_name == "error":
+                        error = line.split(":", 1)[1].strip()[:200]
+                    break
+        end = time.perf_counter()
+        return ReviewSample(
+            total_ms=(end - start) * 1000,
+            ttfe_ms=(first_event - start) * 1000 if first_event else None,
+            error=error,
+        )
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
@@ -0,0 +1,210 @@
+"""
+Benchmark WebReaderTool extraction over saved HTML pages.
+
+    python -m benchmarks.web_extraction
+    python -m benchmarks.web_extraction --pages path/to/html --repeat 20
+
+Compares the previous approach (whole body through BeautifulSoup's
+html.parser, then truncate) against the capped lxml extractor, first on
+parsing alone and then end to end through read() against a local HTTP
+server. A 10 MB page is synthesized from the corpus to exercise the cap.
+
+A second table measures query-aware reads: each probe is a paper title
+from past the first max_chars of a page, and a probe counts as a hit
+when the paper's abstract is in what read() returns. The lead-only read
+is compared with read(url, query=title).
+
+A third table times cached reads: a cold read, a stale read revalidated
+with If-None-Match (304), and a read within Cache-Control max-age.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import statistics
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+from app.tools.web_reader_tool import WebReaderTool, extract_text
+
+PAGES_DIR = Path(__file__).resolve().parent / "fixtures" / "html"
+LARGE_PAGE = "synthetic_10mb.html"
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:  # pragma: no cover - baseline is optional
+    BeautifulSoup = None
+
+
+def baseline_extract(body: bytes, max_chars: int) -> str:
+    """The original read(): parse everything with html.parser, then truncate."""
+    soup = BeautifulSoup(body.decode("utf-8", errors="replace"), "html.parser")
+    for tag in soup(["script", "style", "nav", "footer", "header", "aside"]):
+        tag.decompose()
+    return soup.get_text(separator="\n", strip=True)[:max_chars]
+
+
+def load_pages(directory: Path) -> dict[str, bytes]:
+    pages = {p.name: p.read_bytes() for p in sorted(directory.glob("*.html"))}
+    # Pad a real page past 10 MB with the kind of bloat that drives real pages that large
+    seed = max(pages.values(), key=len)
+    head, _, tail = seed.partition(b"</article>")
+    bloat = b"<div class='comment'><p>" + b"Reader comment text. " * 40 + b"</p></div>"
+    pages[LARGE_PAGE] = head + b"</article>" + bloat * (10 * 1024 * 1024 // len(bloat)) + tail
+    return pages
+
+
+def probes(text: str, start: int, limit: int = 5) -> list[tuple[str, str]]:
+    """(title, abstract) pairs that begin after `start` characters of the page."""
+    lines = text.splitlines()
+    found: list[tuple[str, str]] = []
+    offset = 0
+    for line, following in zip(lines, lines[1:], strict=False):
+        offset += len(line) + 1
+        if offset > start and following.startswith("We study") and not line.endswith("."):
+            found.append((line, following[:80]))
+    step = max(1, len(found) // limit)
+    return found[::step][:limit]
+
+
+def timed(func, repeat: int) -> float:
+    """Median wall time of func() in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def serve(pages: dict[str, bytes]) -> tuple[ThreadingHTTPServer, str]:
+    """
+    Serve the pages from memory on a free local port.
+
+    Every page carries an ETag and answers If-None-Match with 304;
+    ?max-age=N adds a Cache-Control lifetime.
+    """
+
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self) -> None:
+            parts = urlsplit(self.path)
+            body = pages.get(parts.path.lstrip("/"))
+            if body is None:
+                self.send_error(404)
+                return
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            max_age = parse_qs(parts.query).get("max-age", ["0"])[0]
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", f"max-age={max_age}")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"max-age={max_age}")
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the capped reader hangs up early
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(Handler))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="WebReaderTool extraction benchmark")
+    parser.add_argument("--pages", default=str(PAGES_DIR), help="Directory of saved .html pages")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", default=None, help="Optional JSON result file")
+    args = parser.parse_args()
+
+    pages = load_pages(Path(args.pages))
+    tool = WebReaderTool(cache_dir="")
+    cached_tool = WebReaderTool(cache_dir=tempfile.mkdtemp(prefix="web-cache-"))
+    server, base_url = serve(pages)
+    results: dict[str, dict] = {}
+
+    print(f"{'page':<24}{'bytes':>12}{'baseline ms':>14}{'parse ms':>10}{'read() ms':>11}{'speedup':>9}")
+    try:
+        for name, body in pages.items():
+            capped = body[: tool.max_bytes]
+            parse_ms = timed(lambda capped=capped: extract_text(capped, "utf-8", tool.max_chars), args.repeat)
+            read_ms = timed(lambda name=name: tool.read(f"{base_url}/{name}"), args.repeat)
+            baseline_ms = None
+            if BeautifulSoup is not None:
+                baseline_ms = timed(
+                    lambda name=name: baseline_extract(httpx.get(f"{base_url}/{name}").content, tool.max_chars),
+                    max(1, args.repeat // 5) if name == LARGE_PAGE else args.repeat,
+                )
+            speedup = baseline_ms / read_ms if baseline_ms else None
+            results[name] = {
+                "bytes": len(body),
+                "baseline_ms": baseline_ms,
+                "parse_ms": parse_ms,
+                "read_ms": read_ms,
+                "speedup": speedup,
+            }
+            print(
+                f"{name:<24}{len(body):>12}"
+                f"{baseline_ms if baseline_ms is not None else float('nan'):>14.1f}"
+                f"{parse_ms:>10.1f}{read_ms:>11.1f}"
+                f"{speedup if speedup is not None else float('nan'):>8.1f}x"
+            )
+
+        print(f"\n{'page':<24}{'probes':>8}{'lead hits':>11}{'query hits':>12}{'query read() ms':>17}")
+        for name, body in pages.items():
+            if name == LARGE_PAGE:
+                continue
+            url = f"{base_url}/{name}"
+            page_probes = probes(extract_text(body, "utf-8"), tool.max_chars)
+            if not page_probes:
+                continue
+            lead = tool.read(url)
+            lead_hits = sum(abstract in lead for _, abstract in page_probes)
+            query_hits = sum(abstract in tool.read(url, query=title) for title, abstract in page_probes)
+            title = page_probes[0][0]
+            query_ms = timed(lambda url=url, title=title: tool.read(url, query=title), args.repeat)
+            results[name].update(probes=len(page_probes), lead_hits=lead_hits, query_hits=query_hits, query_read_ms=query_ms)
+            print(f"{name:<24}{len(page_probes):>8}{lead_hits:>11}{query_hits:>12}{query_ms:>17.1f}")
+
+        print(f"\n{'page':<24}{'cold ms':>10}{'304 ms':>10}{'fresh ms':>10}")
+        for name in pages:
+            url = f"{base_url}/{name}"
+
+            def cold_read(url: str = url) -> None:
+                cached_tool.cache.delete(url)
+                cached_tool.read(url)
+
+            cold_ms = timed(cold_read, args.repeat)
+            revalidate_ms = timed(lambda url=url: cached_tool.read(url), args.repeat)
+            fresh_url = f"{base_url}/{name}?max-age=3600"
+            cached_tool.read(fresh_url)
+            fresh_ms = timed(lambda fresh_url=fresh_url: cached_tool.read(fresh_url), args.repeat)
+            results[name].update(cold_cached_ms=cold_ms, revalidated_ms=revalidate_ms, fresh_ms=fresh_ms)
+            print(f"{name:<24}{cold_ms:>10.1f}{revalidate_ms:>10.1f}{fresh_ms:>10.1f}")
+    finally:
+        server.shutdown()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+Offline fakes of the upstream services a review depends on.
+
+Serves a deterministic OpenAI-compatible chat endpoint plus arXiv,
+Semantic Scholar, Tavily and web-page endpoints over a fixture corpus,
+so reviews can run end to end without network access or API keys.
+
+Run with ``python -m fakes`` from the backend directory.
+"""
@@ -0,0 +1,61 @@
+"""
+Run all fake upstream services in one process.
+
+    python -m fakes --port 8100 --latency-ms 50 --jitter-ms 20
+
+Then point the backend at it:
+
+    OPENAI_BASE_URL=http://localhost:8100/openai/v1
+    ARXIV_API_URL=http://localhost:8100/arxiv/api/query
+    SEMANTIC_SCHOLAR_API_URL=http://localhost:8100/s2/graph/v1
+    TAVILY_API_URL=http://localhost:8100/tavily
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import uvicorn
+from fakes.corpus import load_corpus
+from fakes.openai_server import create_openai_app
+from fakes.scholarly_server import create_scholarly_app
+from fastapi import FastAPI
+
+
+def create_app(
+    script_path: str | None = None,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    llm_latency_ms: float | None = None,
+) -> FastAPI:
+    """Combined app: scholarly APIs at the root, OpenAI under /openai."""
+    corpus = load_corpus()
+    app = create_scholarly_app(corpus, latency_ms, jitter_ms)
+    app.mount(
+        "/openai",
+        create_openai_app(
+            corpus,
+            script_path,
+            latency_ms if llm_latency_ms is None else llm_latency_ms,
+            jitter_ms,
+        ),
+    )
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake OpenAI and scholarly API servers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean latency for every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform jitter around the mean")
+    parser.add_argument("--llm-latency-ms", type=float, default=None, help="Override latency for completions")
+    parser.add_argument("--script", default=None, help="JSON file of per-role scripted LLM replies")
+    args = parser.parse_args()
+
+    app = create_app(args.script, args.latency_ms, args.jitter_ms, args.llm_latency_ms)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
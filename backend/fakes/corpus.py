@@ -0,0 +1,69 @@
+"""
+corpus.py
+=========
+Fixture paper corpus shared by the fake upstream servers.
+
+Papers are loaded from fixtures/corpus.json and searched with a simple
+term-overlap score, which is enough to return stable, topic-relevant
+results for any AI/ML query.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+CORPUS_PATH = Path(__file__).parent / "fixtures" / "corpus.json"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_QUERY_NOISE = {"all", "ti", "abs", "au", "cat", "and", "or", "andnot", "the", "of", "in", "for", "a", "on", "to", "with"}
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric tokens with query-syntax noise removed."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _QUERY_NOISE]
+
+
+class Corpus:
+    """In-memory fixture corpus with keyword search and id lookups."""
+
+    def __init__(self, papers: list[dict[str, Any]]) -> None:
+        self.papers = papers
+        self.by_paper_id = {p["paper_id"]: p for p in papers}
+        self.by_arxiv_id = {p["arxiv_id"]: p for p in papers}
+        self._terms = [
+            set(tokenize(" ".join([p["title"], p["abstract"], *p["keywords"]]))) for p in papers
+        ]
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> tuple[list[dict[str, Any]], int]:
+        """
+        Rank papers by the number of query terms they contain.
+
+        Returns:
+            The requested page of papers and the total number of matches
+        """
+        terms = set(tokenize(query))
+        scored = [
+            (len(terms & doc_terms), -i, paper)
+            for i, (paper, doc_terms) in enumerate(zip(self.papers, self._terms, strict=True))
+        ]
+        matches = [s for s in scored if s[0] > 0]
+        matches.sort(key=lambda s: (s[0], s[1]), reverse=True)
+        ranked = [paper for _, _, paper in matches]
+        return ranked[offset : offset + limit], len(ranked)
+
+    def get(self, paper_id: str) -> dict[str, Any] | None:
+        """Look a paper up by Semantic Scholar id, arXiv id, or "ARXIV:"-prefixed id."""
+        if paper_id.upper().startswith("ARXIV:"):
+            return self.by_arxiv_id.get(paper_id.split(":", 1)[1])
+        return self.by_paper_id.get(paper_id) or self.by_arxiv_id.get(paper_id)
+
+
+@lru_cache
+def load_corpus(path: str | None = None) -> Corpus:
+    """Load and cache the fixture corpus."""
+    with open(path or CORPUS_PATH, encoding="utf-8") as f:
+        return Corpus(json.load(f)["papers"])
@@ -0,0 +1,358 @@
+"""
+openai_server.py
+================
+Deterministic fake of the OpenAI chat completions API.
+
+Recognises which agent is calling from its system prompt and returns a
+scripted reply in the shape that agent's caller expects:
+
+    planner       JSON array of sub-queries
+    selector      name of the next agent (search → summarize → critique)
+    search_agent  tool calls first, then a JSON list of the papers found
+    summarizer    Markdown review with linked citations
+    critic        scores followed by APPROVED
+
+A script file can override the built-in replies per role, e.g. to force
+a revision loop. Each entry is a string (message content) or an object
+with "content" or "tool_calls"; entries are cycled per role:
+
+    {"critic": ["Coverage: 2/5 — more sources needed.", "Coverage: 5/5\\nAPPROVED"]}
+"""
+
+from __future__ import annotations
+
+import ast
+import itertools
+import json
+import re
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+from fakes.corpus import Corpus, load_corpus
+from fakes.scholarly_server import Latency
+from fastapi import FastAPI, Request
+
+# Substrings of each agent's system prompt, checked in order
+ROLE_MARKERS = (
+    ("selector", "orchestrator of a research team"),
+    ("planner", "research planning expert"),
+    ("search_agent", "expert research assistant"),
+    ("summarizer", "specializing in literature reviews"),
+    ("critic", "peer reviewer"),
+)
+
+# Next speaker after each agent in the happy path
+NEXT_SPEAKER = {"user": "search_agent", "search_agent": "summarizer", "summarizer": "critic", "critic": "summarizer"}
+
+_SPEAKER_RE = re.compile(r"^(user|search_agent|summarizer|critic): ", re.MULTILINE)
+_JSON_LIST_RE = re.compile(r"\[.*\]", re.DOTALL)
+
+
+def detect_role(messages: list[dict[str, Any]]) -> str:
+    """Identify the calling agent from the first system message."""
+    system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+    if isinstance(system, list):
+        system = " ".join(part.get("text", "") for part in system if isinstance(part, dict))
+    for role, marker in ROLE_MARKERS:
+        if marker in system:
+            return role
+    return "unknown"
+
+
+class FakeOpenAI:
+    """
+    Produces chat completion responses for the review agents.
+
+    Attributes:
+        corpus: Fixture corpus used when a reply needs papers
+        script: Optional per-role scripted replies overriding the defaults
+    """
+
+    def __init__(self, corpus: Corpus | None = None, script: dict[str, list[Any]] | None = None) -> None:
+        self.corpus = corpus or load_corpus()
+        self._script = {role: itertools.cycle(replies) for role, replies in (script or {}).items() if replies}
+        self.calls: dict[str, int] = defaultdict(int)
+
+    def complete(self, body: dict[str, Any]) -> dict[str, Any]:
+        """Build a full chat.completion response for a request body."""
+        messages = body.get("messages", [])
+        role = detect_role(messages)
+        self.calls[role] += 1
+
+        if role in self._script:
+            reply = next(self._script[role])
+            message = _scripted_message(reply)
+        else:
+            message = self._default_reply(role, messages, body.get("tools") or [])
+
+        prompt_chars = sum(len(json.dumps(m.get("content") or "")) for m in messages)
+        completion_chars = len(message.get("content") or "") + len(json.dumps(message.get("tool_calls") or ""))
+        prompt_tokens, completion_tokens = max(1, prompt_chars // 4), max(1, completion_chars // 4)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+                    "logprobs": None,
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    # ===============================================================
+    # DEFAULT REPLIES
+    # ===============================================================
+
+    def _default_reply(self, role: str, messages: list[dict[str, Any]], tools: list[dict[str, Any]]) -> dict[str, Any]:
+        if role == "planner":
+            return _text(json.dumps(_sub_queries(_first_user_text(messages))))
+        if role == "selector":
+            return _text(_next_speaker(messages[0].get("content") or ""))
+        if role == "search_agent":
+            if messages and messages[-1].get("role") == "tool":
+                return _text(json.dumps(self._papers_from_tool_results(messages)))
+            return self._search_tool_calls(messages, tools)
+        if role == "summarizer":
+            return _text(self._review(messages))
+        if role == "critic":
+            return _text(
+                "**Coverage**: 4/5\n**Clarity**: 5/5\n**Relevance**: 5/5\n\n"
+                "- Consider adding one more recent benchmark paper.\n"
+                "- Group related methods under shared headings.\n\n"
+                "APPROVED"
+            )
+        return _text("OK")
+
+    def _search_tool_calls(self, messages: list[dict[str, Any]], tools: list[dict[str, Any]]) -> dict[str, Any]:
+        available = {t.get("function", {}).get("name") for t in tools}
+        task = _first_user_text(messages)
+        queries = _planned_queries(task) or [_topic(task)]
+        # Like a compliant model, skip arXiv searches the orchestrator already ran
+        candidates = _retrieved_candidates(task)
+        names = ("semantic_scholar_search",) if candidates else ("arxiv_search", "semantic_scholar_search")
+        calls = [
+            {
+                "id": f"call_{uuid.uuid4().hex[:16]}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps({"query": query, "max_results": 5})},
+            }
+            for query in queries[:3]
+            for name in names
+            if name in available
+        ]
+        if not calls:
+            papers = candidates[: _requested_count(task)] or self._corpus_papers(_topic(task))
+            return _text(json.dumps(papers))
+        return {"role": "assistant", "content": None, "tool_calls": calls}
+
+    def _papers_from_tool_results(self, messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Merge and deduplicate the retrieved candidates and papers from the preceding tool calls."""
+        task = _first_user_text(messages)
+        limit = _requested_count(task)
+        seen: set[str] = set()
+        papers: list[dict[str, Any]] = []
+        found = [_retrieved_candidates(task)] + [
+            _parse_list(m.get("content") or "") for m in messages if m.get("role") == "tool"
+        ]
+        for batch in found:
+            for paper in batch:
+                title = paper.get("title", "")
+                if title and title.lower() not in seen:
+                    seen.add(title.lower())
+                    papers.append(paper)
+        return papers[:limit] or self._corpus_papers(_topic(_first_user_text(messages)), limit)
+
+    def _review(self, messages: list[dict[str, Any]]) -> str:
+        papers: list[dict[str, Any]] = []
+        for m in reversed(messages):
+            papers = _parse_list(m.get("content") or "")
+            if papers:
+                break
+        if not papers:
+            papers = self._corpus_papers(_topic(_first_user_text(messages)))
+
+        lines = [
+            "## Literature Review\n",
+            "Recent work approaches the topic from several complementary directions, "
+            "summarised below.\n",
+        ]
+        for p in papers:
+            authors = p.get("authors") or []
+            author_text = ", ".join(authors[:3]) + (" et al." if len(authors) > 3 else "")
+            lines.append(
+                f"- [{p.get('title', 'Untitled')}]({p.get('pdf_url') or p.get('url', '#')}) — "
+                f"{author_text} ({p.get('published', 'n.d.')}). {(p.get('summary') or '')[:200]}"
+            )
+        lines.append(
+            "\n### Synthesis\n\nTaken together these papers show steady progress and "
+            "converging evaluation practice across the field."
+        )
+        return "\n".join(lines)
+
+    def _corpus_papers(self, query: str, limit: int = 5) -> list[dict[str, Any]]:
+        papers, _ = self.corpus.search(query, limit=limit)
+        if not papers:
+            papers = self.corpus.papers[:limit]
+        return [
+            {
+                "title": p["title"],
+                "authors": p["authors"],
+                "published": p["published"],
+                "summary": p["abstract"],
+                "pdf_url": f"http://arxiv.org/pdf/{p['arxiv_id']}v1",
+            }
+            for p in papers
+        ]
+
+
+# ===============================================================
+# PROMPT PARSING
+# ===============================================================
+
+
+def _text(content: str) -> dict[str, Any]:
+    return {"role": "assistant", "content": content}
+
+
+def _scripted_message(reply: Any) -> dict[str, Any]:
+    if isinstance(reply, str):
+        return _text(reply)
+    if reply.get("tool_calls"):
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:16]}",
+                    "type": "function",
+                    "function": {"name": c["name"], "arguments": json.dumps(c.get("arguments", {}))},
+                }
+                for c in reply["tool_calls"]
+            ],
+        }
+    return _text(reply.get("content", ""))
+
+
+def _first_user_text(messages: list[dict[str, Any]]) -> str:
+    for m in messages:
+        if m.get("role") == "user":
+            content = m.get("content") or ""
+            if isinstance(content, list):
+                content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+            return content
+    return ""
+
+
+def _topic(task: str) -> str:
+    for pattern in (r"Research topic: '([^']+)'", r"review on '([^']+)'", r"into sub-queries: (.+)"):
+        match = re.search(pattern, task)
+        if match:
+            return match.group(1).strip()[:200]
+    return task.strip()[:200]
+
+
+def _sub_queries(task: str) -> list[str]:
+    topic = _topic(task)
+    return [f"{topic} methods", f"{topic} benchmarks and evaluation", f"{topic} recent advances"]
+
+
+def _planned_queries(task: str) -> list[str]:
+    match = re.search(r"Planned sub-queries: (\[.*?\])", task)
+    if not match:
+        return []
+    try:
+        return [str(q) for q in json.loads(match.group(1))]
+    except json.JSONDecodeError:
+        return []
+
+
+def _retrieved_candidates(task: str) -> list[dict[str, Any]]:
+    """Papers the orchestrator retrieved up front, flattened across sub-queries."""
+    marker = task.lower().find("candidates already retrieved")
+    start = task.find("{", marker)
+    if marker < 0 or start < 0:
+        return []
+    try:
+        grouped, _ = json.JSONDecoder().raw_decode(task[start:])
+    except json.JSONDecodeError:
+        return []
+    return [paper for papers in grouped.values() for paper in papers if isinstance(paper, dict)]
+
+
+def _requested_count(task: str) -> int:
+    match = re.search(r"(?:return the|Return) (\d+)", task)
+    return int(match.group(1)) if match else 5
+
+
+def _parse_list(content: str) -> list[dict[str, Any]]:
+    """Parse a list of paper dicts from JSON or a Python repr (tool results)."""
+    match = _JSON_LIST_RE.search(content)
+    if not match:
+        return []
+    raw = match.group(0)
+    for parse in (json.loads, ast.literal_eval):
+        try:
+            value = parse(raw)
+        except (ValueError, SyntaxError):
+            continue
+        if isinstance(value, list):
+            return [v for v in value if isinstance(v, dict) and v.get("title")]
+    return []
+
+
+def _next_speaker(prompt: str) -> str:
+    """Follow the search → summarize → critique path over the selector history."""
+    history, _, tail = prompt.partition("Conversation so far:")[-1].partition("Rules:")
+    speakers = _SPEAKER_RE.findall(history)
+    participants = re.findall(r"'([a-z_]+)'", tail.rsplit("from", 1)[-1])
+    candidate = NEXT_SPEAKER.get(speakers[-1] if speakers else "user", "search_agent")
+    if participants and candidate not in participants:
+        return participants[0]
+    return candidate
+
+
+# ===============================================================
+# APP
+# ===============================================================
+
+
+def create_openai_app(
+    corpus: Corpus | None = None,
+    script_path: str | Path | None = None,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+) -> FastAPI:
+    """
+    Build the fake OpenAI app; point OPENAI_BASE_URL at its /v1 prefix.
+
+    Args:
+        corpus: Paper corpus used for generated replies
+        script_path: Optional JSON file of per-role scripted replies
+        latency_ms: Mean artificial latency per completion
+        jitter_ms: Uniform jitter applied around the mean
+    """
+    script = json.loads(Path(script_path).read_text(encoding="utf-8")) if script_path else None
+    fake = FakeOpenAI(corpus, script)
+    latency = Latency(latency_ms, jitter_ms)
+    app = FastAPI(title="Fake OpenAI")
+    app.state.fake = fake
+    app.state.latency = latency
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        await latency.wait()
+        return fake.complete(await request.json())
+
+    return app
@@ -0,0 +1,237 @@
+"""
+scholarly_server.py
+===================
+Fake arXiv, Semantic Scholar, Tavily and web endpoints over the fixture corpus.
+
+Routes mirror the real APIs closely enough for the production clients
+(the arxiv library, httpx calls in SemanticScholarTool, TavilyClient,
+WebReaderTool) to run unmodified:
+
+    GET  /arxiv/api/query                  arXiv Atom feed
+    GET  /s2/graph/v1/paper/search         Semantic Scholar relevance search
+    GET  /s2/graph/v1/paper/search/bulk    Semantic Scholar bulk search (continuation tokens)
+    POST /s2/graph/v1/paper/batch          Semantic Scholar batch lookup by id
+    POST /tavily/search                    Tavily web search
+    GET  /web/{paper_id}                   HTML landing page for a paper
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from html import escape
+from typing import Any
+from xml.sax.saxutils import escape as xml_escape
+
+from fakes.corpus import Corpus, load_corpus
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, Response
+
+
+class Latency:
+    """Configurable artificial latency applied to every fake response."""
+
+    def __init__(self, mean_ms: float = 0.0, jitter_ms: float = 0.0) -> None:
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+
+    async def wait(self) -> None:
+        delay = self.mean_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+
+def create_scholarly_app(
+    corpus: Corpus | None = None,
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    bulk_page_size: int = 1000,
+) -> FastAPI:
+    """
+    Build the fake scholarly API app.
+
+    Args:
+        corpus: Paper corpus to serve (defaults to the bundled fixture)
+        latency_ms: Mean artificial latency per request
+        jitter_ms: Uniform jitter applied around the mean
+        bulk_page_size: Papers per bulk search page (1000 upstream)
+    """
+    corpus = corpus or load_corpus()
+    latency = Latency(latency_ms, jitter_ms)
+    app = FastAPI(title="Fake scholarly APIs")
+    app.state.corpus = corpus
+    app.state.latency = latency
+
+    # ── arXiv ────────────────────────────────────────────────────────────────
+
+    @app.get("/arxiv/api/query")
+    async def arxiv_query(
+        search_query: str = "",
+        id_list: str = "",
+        start: int = 0,
+        max_results: int = 10,
+    ):
+        await latency.wait()
+        if id_list:
+            papers = [p for i in id_list.split(",") if (p := corpus.get(i.strip().split("v")[0]))]
+            total = len(papers)
+            papers = papers[start : start + max_results]
+        else:
+            papers, total = corpus.search(search_query, limit=max_results, offset=start)
+        return Response(_atom_feed(papers, total, start), media_type="application/atom+xml")
+
+    # ── Semantic Scholar ─────────────────────────────────────────────────────
+
+    @app.get("/s2/graph/v1/paper/search")
+    async def s2_search(
+        request: Request,
+        query: str,
+        fields: str = "title",
+        limit: int = Query(default=10, le=100),
+        offset: int = 0,
+    ):
+        await latency.wait()
+        papers, total = corpus.search(query, limit=limit, offset=offset)
+        base = str(request.base_url).rstrip("/")
+        data = [_s2_paper(p, fields, base) for p in papers]
+        return {"total": total, "offset": offset, "next": offset + len(data), "data": data}
+
+    @app.get("/s2/graph/v1/paper/search/bulk")
+    async def s2_bulk_search(request: Request, query: str, fields: str = "title", token: str = ""):
+        await latency.wait()
+        offset = int(token or 0)
+        papers, total = corpus.search(query, limit=bulk_page_size, offset=offset)
+        base = str(request.base_url).rstrip("/")
+        following = offset + len(papers)
+        return {
+            "total": total,
+            "token": str(following) if following < total else None,
+            "data": [_s2_paper(p, fields, base) for p in papers],
+        }
+
+    @app.post("/s2/graph/v1/paper/batch")
+    async def s2_batch(request: Request, fields: str = "title"):
+        await latency.wait()
+        ids = (await request.json()).get("ids") or []
+        if len(ids) > 500:
+            raise HTTPException(status_code=400, detail="Cannot process more than 500 ids at once")
+        base = str(request.base_url).rstrip("/")
+        return [_s2_paper(p, fields, base) if (p := corpus.get(i)) else None for i in ids]
+
+    # ── Tavily ───────────────────────────────────────────────────────────────
+
+    @app.post("/tavily/search")
+    async def tavily_search(request: Request):
+        await latency.wait()
+        body = await request.json()
+        papers, _ = corpus.search(body.get("query", ""), limit=body.get("max_results") or 5)
+        base = str(request.base_url).rstrip("/")
+        return {
+            "query": body.get("query", ""),
+            "results": [
+                {
+                    "title": f"{p['title']} — explained",
+                    "url": f"{base}/web/{p['paper_id']}",
+                    "content": p["abstract"][:300],
+                    "score": 0.9,
+                }
+                for p in papers
+            ],
+        }
+
+    # ── Web pages ────────────────────────────────────────────────────────────
+
+    @app.get("/web/{paper_id}", response_class=HTMLResponse)
+    async def web_page(paper_id: str):
+        await latency.wait()
+        paper = corpus.get(paper_id)
+        if paper is None:
+            raise HTTPException(status_code=404, detail="Not found")
+        return HTMLResponse(_landing_page(paper))
+
+    return app
+
+
+# ===============================================================
+# RESPONSE BUILDERS
+# ===============================================================
+
+
+def _atom_feed(papers: list[dict[str, Any]], total: int, start: int) -> str:
+    entries = []
+    for p in papers:
+        abs_url = f"http://arxiv.org/abs/{p['arxiv_id']}v1"
+        authors = "".join(f"<author><name>{xml_escape(a)}</name></author>" for a in p["authors"])
+        entries.append(
+            "<entry>"
+            f"<id>{abs_url}</id>"
+            f"<updated>{p['published']}T00:00:00Z</updated>"
+            f"<published>{p['published']}T00:00:00Z</published>"
+            f"<title>{xml_escape(p['title'])}</title>"
+            f"<summary>{xml_escape(p['abstract'])}</summary>"
+            f"{authors}"
+            f'<link href="{abs_url}" rel="alternate" type="text/html"/>'
+            f'<link title="pdf" href="http://arxiv.org/pdf/{p["arxiv_id"]}v1" rel="related" type="application/pdf"/>'
+            '<arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cs.LG"/>'
+            '<category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>'
+            "</entry>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+        "<title>Fake arXiv query results</title>"
+        f"<opensearch:totalResults>{total}</opensearch:totalResults>"
+        f"<opensearch:startIndex>{start}</opensearch:startIndex>"
+        f"<opensearch:itemsPerPage>{len(papers)}</opensearch:itemsPerPage>"
+        f"{''.join(entries)}"
+        "</feed>"
+    )
+
+
+def _s2_paper(p: dict[str, Any], fields: str, base_url: str) -> dict[str, Any]:
+    """Render a corpus paper with only the requested Semantic Scholar fields."""
+    full = {
+        "paperId": p["paper_id"],
+        "title": p["title"],
+        "authors": [{"authorId": str(abs(hash(a)) % 10**8), "name": a} for a in p["authors"]],
+        "year": p["year"],
+        "publicationDate": p["published"],
+        "abstract": p["abstract"],
+        "venue": p["venue"],
+        "citationCount": p["citation_count"],
+        "referenceCount": len(p["references"]),
+        "externalIds": {"ArXiv": p["arxiv_id"], "DOI": p["doi"]},
+        "openAccessPdf": {"url": f"{base_url}/web/{p['paper_id']}", "status": "GREEN"},
+        "url": f"{base_url}/web/{p['paper_id']}",
+        "references": [{"paperId": r} for r in p["references"]],
+        "citations": [{"paperId": c} for c in p["citations"]],
+    }
+    # Nested fields ("references.paperId") select the whole list; items only carry paperId here
+    wanted = {f.strip().split(".")[0] for f in fields.split(",") if f.strip()} | {"paperId"}
+    return {k: v for k, v in full.items() if k in wanted}
+
+
+def _landing_page(p: dict[str, Any]) -> str:
+    """A paper landing page wrapped in typical site boilerplate."""
+    cookie = (
+        "We use cookies to improve your experience. By continuing to browse you agree "
+        "to our use of cookies. Manage preferences in settings. "
+    ) * 4
+    body = "".join(
+        f"<h2>{escape(section)}</h2><p>{escape(p['abstract'])}</p>"
+        for section in ("Introduction", "Method", "Experiments", "Conclusion")
+    )
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>{escape(p['title'])}</title>"
+        "<script>window.analytics = {};</script><style>body{font-family:sans-serif}</style>"
+        "</head><body>"
+        "<header><nav><a href='/'>Home</a> <a href='/about'>About</a></nav></header>"
+        f"<div class='cookie-banner'>{cookie}</div>"
+        f"<main><article><h1>{escape(p['title'])}</h1>"
+        f"<p class='authors'>{escape(', '.join(p['authors']))}</p>"
+        f"<h2>Abstract</h2><p>{escape(p['abstract'])}</p>{body}</article></main>"
+        "<footer>Copyright Fake Scholarly Press</footer>"
+        "</body></html>"
+    )
@@ -7,6 +7,8 @@ Pytest configuration and shared fixtures.
 from __future__ import annotations
 
 import os
+import uuid
+from types import SimpleNamespace
 from unittest.mock import patch
 
 import pytest
@@ -49,3 +51,153 @@ def sample_papers():
             "pdf_url": "https://arxiv.org/pdf/test2.pdf",
         },
     ]
+
+
+# ===============================================================
+# REVIEW PIPELINE STUBS
+# ===============================================================
+
+
+class StubRepo:
+    """
+    Stands in for ReviewRepository, recording what the service writes.
+
+    Attributes:
+        review: What get_review returns
+        checkpoint: The review's checkpoint (updated by save_checkpoint)
+        reusable: What find_reusable_review returns (a cached review, or None)
+        reused: Messages reuse_results copies from the cached review
+    """
+
+    def __init__(self) -> None:
+        self.review = None
+        self.checkpoint: dict | None = None
+        self.reusable = None
+        self.reused: list = []
+        self.lookups: list[str] = []
+        self.created: list = []
+        self.messages: list[dict] = []
+        self.statuses: list[str] = []
+        self.summaries: list[str] = []
+        self.papers: list[dict] = []
+        self.deleted = 0
+
+    async def get_review(self, review_id, user_id=None):
+        return self.review
+
+    async def get_checkpoint(self, review_id):
+        return self.checkpoint
+
+    async def save_checkpoint(self, review_id, stage, data, lease_seconds=0.0):
+        self.checkpoint = data
+
+    async def delete_checkpoint(self, review_id):
+        self.deleted += 1
+
+    async def find_reusable_review(self, fingerprint, completed_after, exclude_id=None):
+        self.lookups.append(fingerprint)
+        return self.reusable
+
+    async def reuse_results(self, source, review_id):
+        return self.reused
+
+    async def create_review(self, topic, papers_limit, model, user_id, refresh_cached=False):
+        review = SimpleNamespace(id=uuid.uuid4(), topic=topic, papers_limit=papers_limit, model=model)
+        self.created.append(review)
+        return review
+
+    async def add_message(self, review_id, source, content, message_type="system"):
+        self.messages.append({"source": source, "content": content, "message_type": message_type})
+
+    async def update_status(self, review_id, status):
+        self.statuses.append(status)
+
+    async def replace_summary(self, review_id, content):
+        self.summaries.append(content)
+
+    async def add_papers(self, review_id, papers):
+        self.papers.extend(papers)
+
+    async def add_metrics(self, review_id, records):
+        pass
+
+
+class StubRetriever:
+    """
+    Stands in for CandidateRetriever, returning `results` for every retrieval.
+
+    Attributes:
+        results: Candidates per sub-query
+        calls: (queries, published_after) of each retrieval
+    """
+
+    def __init__(self) -> None:
+        self.results: dict[str, list[dict]] = {}
+        self.calls: list[tuple[list[str], object]] = []
+
+    async def retrieve(self, queries, published_after=None):
+        self.calls.append((list(queries), published_after))
+        return self.results
+
+    async def expand(self, results):
+        return []
+
+
+class StubOrchestrator:
+    """
+    Stands in for LitRevOrchestrator: streams `events`, then raises `error` if set.
+
+    Attributes:
+        events: Messages each run or refresh yields
+        error: Raised after the events, if set
+        calls: Keyword arguments of each run or refresh
+    """
+
+    def __init__(self) -> None:
+        self.events: list[str] = []
+        self.error: Exception | None = None
+        self.calls: list[dict] = []
+
+    def interrupt(self):
+        pass
+
+    async def run_review(self, **kwargs):
+        async for event in self._stream(kwargs):
+            yield event
+
+    async def refresh_review(self, **kwargs):
+        async for event in self._stream(kwargs):
+            yield event
+
+    async def _stream(self, kwargs):
+        self.calls.append(kwargs)
+        for event in self.events:
+            yield event
+        if self.error is not None:
+            raise self.error
+
+
+@pytest.fixture
+def stub_repo() -> StubRepo:
+    """An empty StubRepo; tests set its review, checkpoint or cached review."""
+    return StubRepo()
+
+
+@pytest.fixture
+def stub_retriever(monkeypatch) -> StubRetriever:
+    """A StubRetriever the orchestrator builds in place of CandidateRetriever."""
+    from app.orchestrator import litrev_orchestrator
+
+    retriever = StubRetriever()
+    monkeypatch.setattr(litrev_orchestrator, "CandidateRetriever", lambda settings: retriever)
+    return retriever
+
+
+@pytest.fixture
+def stub_orchestrator(monkeypatch) -> StubOrchestrator:
+    """A StubOrchestrator the review service builds in place of LitRevOrchestrator."""
+    from app.services import review_service
+
+    orchestrator = StubOrchestrator()
+    monkeypatch.setattr(review_service, "LitRevOrchestrator", lambda model=None: orchestrator)
+    return orchestrator
@@ -0,0 +1,54 @@
+"""
+test_benchmarks.py
+==================
+Unit tests for the benchmark harness and regression checks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from benchmarks.compare import find_regressions
+from benchmarks.harness import ReviewSample, SpanCollector, percentile, run_level
+
+
+class TestHarness:
+    """Tests for statistics and level aggregation."""
+
+    def test_percentile_interpolates(self):
+        """Test percentiles interpolate between samples."""
+        values = [10.0, 20.0, 30.0, 40.0]
+
+        assert percentile(values, 50) == 25.0
+        assert percentile(values, 100) == 40.0
+        assert percentile([], 95) is None
+
+    def test_run_level_counts_errors(self):
+        """Test failed reviews are excluded from latencies and throughput."""
+
+        async def run_one(i: int) -> ReviewSample:
+            if i == 0:
+                raise RuntimeError("boom")
+            return ReviewSample(total_ms=100.0, ttfe_ms=5.0)
+
+        result = asyncio.run(run_level(2, 4, run_one, SpanCollector()))
+
+        assert result.reviews == 4
+        assert result.errors == 1
+        assert result.ttfe_p50_ms == 5.0
+        assert result.db_writes_per_review is None
+        assert result.error_samples == ["RuntimeError: boom"]
+
+
+class TestRegressions:
+    """Tests for baseline comparison."""
+
+    def test_flags_only_changes_beyond_threshold(self):
+        """Test each metric is judged in its own direction."""
+        baseline = {"levels": {"10": {"throughput_rpm": 100.0, "ttfe_p95_ms": 50.0, "peak_rss_mb": 200.0}}}
+        current = {"levels": {"10": {"throughput_rpm": 70.0, "ttfe_p95_ms": 55.0, "peak_rss_mb": 150.0}}}
+
+        regressions = find_regressions(current, baseline, threshold=0.2)
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith("c=10 throughput_rpm")
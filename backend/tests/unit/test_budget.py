@@ -0,0 +1,134 @@
+"""
+test_budget.py
+==============
+Unit tests for per-review budgets and finalizing the draft when they run out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.messages import TextMessage
+from autogen_core import CancellationToken
+from autogen_ext.models.replay import ReplayChatCompletionClient
+
+from app.core.budget import BudgetTermination, ReviewBudget, use_budget
+from app.core.exceptions import ToolError
+from app.core.resilience import use_cancellation
+from app.core.usage import UsageTracker, get_usage_tracker, track_usage
+from app.teams.litrev_team import LitRevTeam
+from app.tools.base import BaseTool
+
+
+def _tracker(tokens: int = 0, llm_calls: int = 0, tool_calls: int = 0) -> UsageTracker:
+    tracker = UsageTracker()
+    for _ in range(llm_calls):
+        tracker.record_llm_call("team", "gpt-4o-mini", tokens // max(llm_calls, 1), 0, 10.0)
+    for _ in range(tool_calls):
+        tracker.record_tool_call("arxiv_search", 10.0, 100)
+    return tracker
+
+
+class TestReviewBudget:
+    """Tests for checking usage against the limits."""
+
+    def test_first_limit_reached_is_reported(self):
+        """Test each limit trips at its value and 0 leaves it off."""
+        budget = ReviewBudget(max_tokens=1000, max_llm_calls=5, max_tool_calls=3)
+
+        assert budget.exhausted(_tracker(tokens=900, llm_calls=4, tool_calls=2)) is None
+        assert budget.exhausted(_tracker(tokens=1000, llm_calls=2)) == "tokens"
+        assert budget.exhausted(_tracker(tokens=100, llm_calls=5)) == "llm_calls"
+        assert budget.exhausted(_tracker(tool_calls=3)) == "tool_calls"
+        assert ReviewBudget().exhausted(_tracker(tokens=10**6, llm_calls=100, tool_calls=100)) is None
+
+    def test_time_runs_out_with_the_review(self):
+        """Test a review with no time left is out of budget, whatever its usage."""
+        token = CancellationToken()
+        token.cancel()
+        with use_cancellation(token):
+            assert ReviewBudget().exhausted(_tracker()) == "time"
+
+    def test_termination_waits_for_a_draft(self):
+        """Test the team only stops on budget once the summarizer has written something."""
+        condition = BudgetTermination(draft_source="summarizer")
+
+        async def main():
+            search = [TextMessage(content="papers", source="search_agent")]
+            draft = [TextMessage(content="a review", source="summarizer")]
+            with track_usage(_tracker(tool_calls=1)), use_budget(ReviewBudget(max_tool_calls=1)):
+                return await condition(search), await condition(draft)
+
+        before_draft, after_draft = asyncio.run(main())
+
+        assert before_draft is None
+        assert after_draft is not None and after_draft.source == "BudgetTermination"
+        assert condition.limit == "tool_calls"
+
+
+class EchoTool(BaseTool):
+    def __init__(self) -> None:
+        super().__init__(name="echo_search", description="test tool")
+        self.requests: list[str] = []
+
+    def search(self, query: str) -> str:
+        self.requests.append(query)
+        return query
+
+    def _get_tool_function(self):
+        return self.search
+
+
+class TestToolGuard:
+    """Tests for refusing tool calls once the budget is spent."""
+
+    def test_calls_are_refused_without_being_recorded(self):
+        """Test the agent is told to write up, and the refused call neither runs nor counts."""
+        tool = EchoTool()
+        invoke = tool._instrument(tool.search)
+        tracker = _tracker()
+
+        async def main():
+            with track_usage(tracker), use_budget(ReviewBudget(max_tool_calls=1)):
+                assert await invoke(query="gnn") == "gnn"
+                with pytest.raises(ToolError, match="write up"):
+                    await invoke(query="more gnn")
+
+        asyncio.run(main())
+
+        assert tool.requests == ["gnn"]
+        assert tracker.totals()["tool_calls"] == 1
+
+
+class SearchClient(ReplayChatCompletionClient):
+    """Replays the search agent's answers, recording a tool call for each."""
+
+    async def create(self, *args, **kwargs):
+        get_usage_tracker().record_tool_call("arxiv_search", 10.0, 100)
+        return await super().create(*args, **kwargs)
+
+
+class TestTeamBudget:
+    """Tests for LitRevTeam finalizing the draft when the budget runs out."""
+
+    def test_summarizer_finalizes_once_budget_is_spent(self):
+        """Test the next turn goes to the summarizer and the team stops after its draft."""
+        team = LitRevTeam(model="gpt-4o-mini", api_key="test")
+        team._get_participants = lambda: [
+            AssistantAgent("search_agent", model_client=SearchClient(["papers"] * 5)),
+            AssistantAgent("summarizer", model_client=ReplayChatCompletionClient(["the review"] * 5)),
+            AssistantAgent("critic", model_client=ReplayChatCompletionClient(["more sources"] * 5)),
+        ]
+        # Left alone, the selector would keep searching
+        team._search_agent._build_llm_client = lambda stage: ReplayChatCompletionClient(["search_agent"] * 10)
+
+        async def main():
+            with track_usage(UsageTracker()), use_budget(ReviewBudget(max_tool_calls=1)):
+                return [msg async for msg in team.run_stream(task="review GNNs")]
+
+        messages = asyncio.run(main())
+
+        assert messages == ["user: review GNNs", "search_agent: papers", "summarizer: the review"]
+        assert team.budget_limit == "tool_calls"
@@ -0,0 +1,275 @@
+"""
+test_cancellation.py
+====================
+Unit tests for cancelling reviews and following them from SSE streams.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.teams import SelectorGroupChat
+from autogen_core import CancellationToken
+from autogen_ext.models.replay import ReplayChatCompletionClient
+from sqlalchemy.dialects import postgresql
+
+from app.config.settings import Settings
+from app.core.resilience import (
+    cancellable,
+    remaining_time,
+    use_cancellation,
+    use_deadline,
+)
+from app.db.review_repository import ReviewRepository
+from app.services import review_runner
+from app.services.review_runner import ReviewChannel, ReviewRunner
+
+
+class TestCancellationScope:
+    """Tests for calls linked to a review's cancellation token."""
+
+    def test_cancelling_the_token_stops_calls_in_other_tasks(self):
+        """Test a call awaited in another task, as AutoGen's runtime does, is cancelled with the review."""
+
+        async def main():
+            token = CancellationToken()
+            with use_cancellation(token):
+                # Tasks copy the context, like the runtime started inside a review
+                call = asyncio.create_task(cancellable(asyncio.sleep(10)))
+            await asyncio.sleep(0)
+            token.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+
+        asyncio.run(main())
+
+    def test_cancelled_review_has_no_time_left(self):
+        """Test retries and queue waits see no time left once the review is cancelled."""
+        token = CancellationToken()
+        with use_deadline(60), use_cancellation(token):
+            assert remaining_time() > 0
+            token.cancel()
+            assert remaining_time() == 0.0
+
+    def test_team_run_stops_without_further_model_calls(self):
+        """Test a cancelled review's group chat tears down at once instead of running to termination."""
+        calls: list[float] = []
+
+        class SlowClient(ReplayChatCompletionClient):
+            async def create(self, *args, **kwargs):
+                calls.append(time.monotonic())
+                await cancellable(asyncio.sleep(0.2))
+                return await super().create(*args, **kwargs)
+
+        agents = [AssistantAgent(name, model_client=SlowClient(["ok"] * 20)) for name in ("a1", "a2")]
+        team = SelectorGroupChat(
+            agents,
+            model_client=SlowClient(["a1", "a2"] * 20),
+            termination_condition=MaxMessageTermination(10),
+            allow_repeated_speaker=True,
+        )
+        token = CancellationToken()
+
+        async def consume():
+            with use_cancellation(token):
+                async for _ in team.run_stream(task="go"):
+                    pass
+
+        async def main():
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(0.3)
+            cancelled_at = time.monotonic()
+            token.cancel()
+            task.cancel()
+            await asyncio.wait([task], timeout=5)
+            return cancelled_at, time.monotonic() - cancelled_at
+
+        cancelled_at, teardown = asyncio.run(main())
+        assert teardown < 0.5
+        assert not [t for t in calls if t > cancelled_at]
+
+
+class TestReviewChannel:
+    """Tests for broadcasting a run's events."""
+
+    def test_late_subscriber_gets_earlier_events_then_live_ones(self):
+        """Test replay from the start, resuming after a seen index, and ending with the run."""
+        channel = ReviewChannel()
+
+        async def main():
+            channel.publish({"n": 0})
+            channel.publish({"n": 1})
+            everything = asyncio.create_task(_collect(channel.follow()))
+            resumed = asyncio.create_task(_collect(channel.follow(after=0)))
+            await asyncio.sleep(0)
+            channel.publish({"n": 2})
+            channel.close()
+            return await everything, await resumed
+
+        everything, resumed = asyncio.run(main())
+        assert everything == [(0, {"n": 0}), (1, {"n": 1}), (2, {"n": 2})]
+        assert resumed == [(1, {"n": 1}), (2, {"n": 2})]
+
+
+async def _collect(events) -> list:
+    return [item async for item in events]
+
+
+class StubSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class StubRepository:
+    """Stands in for ReviewRepository, recording cancelled reviews."""
+
+    cancelled: list[str] = []
+
+    def __init__(self, db) -> None:
+        pass
+
+    async def cancel_review(self, review_id):
+        StubRepository.cancelled.append(review_id)
+        return True
+
+
+@pytest.fixture
+def runner(monkeypatch) -> ReviewRunner:
+    StubRepository.cancelled = []
+    settings = Settings(openai_api_key="test", review_idle_cancel_seconds=0.05, review_cancel_wait_seconds=1)
+    monkeypatch.setattr(review_runner, "get_settings", lambda: settings)
+    monkeypatch.setattr(review_runner, "async_session_factory", StubSession)
+    monkeypatch.setattr(review_runner, "ReviewRepository", StubRepository)
+    return ReviewRunner()
+
+
+def _review(state: SimpleNamespace):
+    """A run that streams one message, then waits on a model call made in a task of its own."""
+
+    async def events(service):
+        yield {"source": "planner", "content": "[]", "message_type": "planning"}
+        call = asyncio.create_task(cancellable(asyncio.sleep(10)))
+        try:
+            await call
+        finally:
+            state.call = call
+        yield {"type": "complete"}
+
+    return events
+
+
+class TestReviewRunner:
+    """Tests for cancelling runs explicitly and when abandoned."""
+
+    def test_cancel_stops_in_flight_calls_and_marks_review(self, runner):
+        """Test a cancel request tears the run down, records the status and tells subscribers."""
+        state = SimpleNamespace(call=None)
+        review_id = str(uuid.uuid4())
+
+        async def main():
+            runner._spawn(review_id, _review(state))
+            follower = asyncio.create_task(_collect(runner.subscribe(review_id)))
+            await asyncio.sleep(0.01)
+            assert await runner.cancel(review_id)
+            return await follower
+
+        events = asyncio.run(main())
+
+        assert state.call.cancelled()
+        assert StubRepository.cancelled == [review_id]
+        assert [e.get("type") for _, e in events] == [None, "cancelled"]
+        assert events[-1][1]["reason"] == "requested"
+        assert not runner.is_running(review_id)
+
+    def test_abandoned_run_is_cancelled_after_grace(self, runner):
+        """Test a stream-started run is cancelled once its last subscriber has been gone for the grace period."""
+        review_id = str(uuid.uuid4())
+
+        async def main():
+            task = runner._spawn(review_id, _review(SimpleNamespace(call=None)), idle_cancel=True)
+            await _first(runner.subscribe(review_id))
+            await asyncio.sleep(0.02)
+            # A reconnect within the grace period keeps the run alive
+            await _first(runner.subscribe(review_id))
+            await asyncio.sleep(0.03)
+            assert not task.done()
+            await asyncio.wait([task], timeout=1)
+            return task
+
+        task = asyncio.run(main())
+        assert task.cancelled()
+        assert StubRepository.cancelled == [review_id]
+
+    def test_background_runs_are_not_cancelled_when_unwatched(self, runner):
+        """Test runs nobody started from a stream keep going without subscribers."""
+        review_id = str(uuid.uuid4())
+
+        async def main():
+            task = runner._spawn(review_id, _review(SimpleNamespace(call=None)))
+            await _first(runner.subscribe(review_id))
+            await asyncio.sleep(0.1)
+            done = task.done()
+            await runner.shutdown()
+            return done
+
+        assert asyncio.run(main()) is False
+        # Shutdown stops the run but leaves the review to resume
+        assert StubRepository.cancelled == []
+
+
+async def _first(events):
+    """Take one event from a subscription, then disconnect like a closed stream."""
+    async for item in events:
+        await events.aclose()
+        return item
+
+
+class RecordingSession:
+    """Stands in for AsyncSession, compiling each statement for Postgres."""
+
+    def __init__(self, rowcount: int) -> None:
+        self.rowcount = rowcount
+        self.statements: list[str] = []
+        self.added: list = []
+
+    async def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return SimpleNamespace(rowcount=self.rowcount)
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        pass
+
+
+class TestCancelReview:
+    """Tests for the cancelled status."""
+
+    def test_only_unfinished_reviews_are_cancelled(self):
+        """Test the status change is conditional and drops the checkpoint with a note."""
+        session = RecordingSession(rowcount=1)
+
+        assert asyncio.run(ReviewRepository(session).cancel_review(str(uuid.uuid4())))
+
+        update, delete = session.statements
+        assert update.startswith("UPDATE reviews SET status=")
+        assert "reviews.status IN" in update
+        assert delete.startswith("DELETE FROM review_checkpoints")
+        assert [m.content for m in session.added] == ["Review cancelled."]
+
+    def test_finished_review_is_left_alone(self):
+        """Test a review that finished first keeps its outcome."""
+        session = RecordingSession(rowcount=0)
+
+        assert not asyncio.run(ReviewRepository(session).cancel_review(str(uuid.uuid4())))
+        assert len(session.statements) == 1 and session.added == []
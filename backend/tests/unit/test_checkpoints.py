@@ -0,0 +1,354 @@
+"""
+test_checkpoints.py
+===================
+Unit tests for checkpointing reviews and resuming them after a restart.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.config.settings import Settings
+from app.core.exceptions import ReviewInterrupted
+from app.db.review_repository import ReviewRepository
+from app.orchestrator import litrev_orchestrator
+from app.orchestrator.litrev_orchestrator import LitRevOrchestrator
+from app.services import review_runner
+from app.services.review_runner import ReviewRunner
+from app.services.review_service import ReviewService
+
+PLAN = '["graph neural networks", "message passing"]'
+REVIEW = "A review. " * 20 + "[GNNs](https://arxiv.org/pdf/2401.00001)"
+SCRIPT = ["user: task", "search_agent: found papers", f"summarizer: {REVIEW}", "critic: APPROVED"]
+
+
+class StubTeam:
+    """Stands in for LitRevTeam, replaying SCRIPT one turn at a time."""
+
+    instances: list[StubTeam] = []
+
+    def __init__(self, **kwargs) -> None:
+        self.turns = 0
+        self.loaded: tuple | None = None
+        self.tasks: list[str | None] = []
+        self.stopped = False
+        self.budget_limit = None
+        StubTeam.instances.append(self)
+
+    async def load_state(self, state, turns=0, has_draft=False):
+        self.loaded = (state, turns)
+        self.turns = turns
+
+    async def save_state(self):
+        return {"turns": self.turns, "saved_at": datetime(2026, 1, 1)}
+
+    def stop(self):
+        self.stopped = True
+
+    async def run_stream(self, task, on_turn=None):
+        self.tasks.append(task)
+        for msg in SCRIPT[self.turns :]:
+            self.turns += 1
+            yield msg
+            if on_turn is not None and not msg.startswith("user:"):
+                await on_turn(await self.save_state())
+            if self.stopped:
+                return
+
+
+@pytest.fixture
+def orchestrator(monkeypatch, stub_retriever) -> LitRevOrchestrator:
+    StubTeam.instances = []
+    paper = {"title": "GNNs", "authors": ["A"], "published": "2024", "pdf_url": "u", "summary": ""}
+    stub_retriever.results = {"graph neural networks": [paper]}
+    monkeypatch.setattr(litrev_orchestrator, "LitRevTeam", StubTeam)
+    orchestrator = LitRevOrchestrator(settings=Settings(openai_api_key="test"))
+    orchestrator.plans = 0
+
+    async def plan_topic(topic):
+        orchestrator.plans += 1
+        return PLAN
+
+    orchestrator._plan_topic = plan_topic
+    return orchestrator
+
+
+def _run(orchestrator, resume_from=None, on_message=None, saved=None) -> tuple[list[str], list[tuple[str, dict]]]:
+    saved = [] if saved is None else saved
+
+    async def checkpoint(stage, state):
+        saved.append((stage, copy.deepcopy(state)))
+
+    async def collect():
+        events = []
+        async for event in orchestrator.run_review("graph learning", checkpoint=checkpoint, resume_from=resume_from):
+            events.append(event)
+            if on_message is not None:
+                on_message(event)
+        return events
+
+    return asyncio.run(collect()), saved
+
+
+class TestOrchestratorCheckpoints:
+    """Tests for checkpoints at stage boundaries and resuming from them."""
+
+    def test_each_stage_and_turn_is_checkpointed(self, orchestrator):
+        """Test plan, candidates and task, then team state after every agent turn."""
+        _, saved = _run(orchestrator)
+
+        assert [stage for stage, _ in saved] == ["planned", "retrieved", "team", "team", "team"]
+        assert saved[0][1] == {"plan": PLAN}
+        retrieved = saved[1][1]
+        assert list(retrieved["candidates"]) == ["graph neural networks"]
+        assert "GNNs" in retrieved["task"]
+        last = saved[-1][1]
+        assert last["turns"] == 4
+        assert last["team_state"]["turns"] == 4
+        assert last["summary"].startswith("A review.")
+
+    def test_resume_skips_finished_stages_and_continues_team(self, orchestrator, stub_retriever):
+        """Test a team checkpoint resumes without planning or retrieval, from the saved turn."""
+        _, saved = _run(orchestrator)
+        resume_from = saved[2][1]
+
+        events, _ = _run(orchestrator, resume_from=resume_from)
+
+        team = StubTeam.instances[-1]
+        assert orchestrator.plans == 1 and len(stub_retriever.calls) == 1
+        assert team.loaded == (resume_from["team_state"], 2)
+        assert team.tasks == [None]
+        assert [e for e in events if not e.startswith("progress:")] == SCRIPT[2:]
+
+    def test_interrupt_stops_after_turn_with_final_checkpoint(self, orchestrator):
+        """Test an interrupt lets the current turn finish, saves the stopped team and raises."""
+
+        def interrupt_after_search(event):
+            if event.startswith("search_agent:"):
+                orchestrator.interrupt()
+
+        saved: list[tuple[str, dict]] = []
+        with pytest.raises(ReviewInterrupted):
+            _run(orchestrator, on_message=interrupt_after_search, saved=saved)
+
+        assert StubTeam.instances[-1].stopped
+        assert [stage for stage, _ in saved] == ["planned", "retrieved", "team", "team"]
+        assert saved[-1][1]["turns"] == 2
+
+    def test_interrupt_before_team_keeps_candidates(self, orchestrator, stub_retriever):
+        """Test an interrupt during planning stops before retrieval, keeping the plan."""
+        saved: list = []
+
+        async def checkpoint(stage, state):
+            saved.append(stage)
+            orchestrator.interrupt()
+
+        async def collect():
+            return [e async for e in orchestrator.run_review("graph learning", checkpoint=checkpoint)]
+
+        with pytest.raises(ReviewInterrupted):
+            asyncio.run(collect())
+        assert saved == ["planned"]
+        assert len(stub_retriever.calls) == 0 and StubTeam.instances == []
+
+
+class RecordingSession:
+    """Stands in for AsyncSession, compiling each statement for Postgres."""
+
+    def __init__(self) -> None:
+        self.statements: list = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.statements.append(stmt.compile(dialect=postgresql.dialect()))
+        return SimpleNamespace(scalars=lambda: iter([]))
+
+    async def commit(self):
+        self.commits += 1
+
+
+class TestCheckpointStore:
+    """Tests for storing checkpoints."""
+
+    def test_checkpoint_is_one_json_upsert(self):
+        """Test a checkpoint replaces the previous one and datetimes become JSON strings."""
+        session = RecordingSession()
+
+        asyncio.run(
+            ReviewRepository(session).save_checkpoint(
+                str(uuid.uuid4()), "team", {"team_state": {"at": datetime(2026, 1, 1)}, "turns": 3}, lease_seconds=60
+            )
+        )
+
+        [stmt] = session.statements
+        assert "INSERT INTO review_checkpoints" in str(stmt)
+        assert "ON CONFLICT (review_id) DO UPDATE" in str(stmt)
+        assert stmt.params["data"] == {"team_state": {"at": "2026-01-01T00:00:00"}, "turns": 3}
+        assert stmt.params["lease_expires_at"] - stmt.params["updated_at"] == timedelta(seconds=60)
+        assert session.commits == 1
+
+    def test_claim_is_one_conditional_update(self):
+        """Test interrupted reviews are claimed by taking lapsed leases in a single UPDATE."""
+        session = RecordingSession()
+
+        claimed = asyncio.run(
+            ReviewRepository(session).claim_resumable_reviews(
+                checkpointed_after=datetime(2026, 1, 1), lease_until=datetime(2026, 1, 2)
+            )
+        )
+
+        [stmt] = session.statements
+        sql = str(stmt)
+        assert sql.startswith("UPDATE review_checkpoints SET updated_at=review_checkpoints.updated_at")
+        assert "lease_expires_at=%(lease_expires_at)s" in sql
+        assert "review_checkpoints.lease_expires_at IS NULL OR review_checkpoints.lease_expires_at <" in sql
+        assert "RETURNING review_checkpoints.review_id" in sql
+        assert claimed == [] and session.commits == 1
+
+
+class LeaseRepo:
+    """Stands in for ReviewRepository's checkpoint leases."""
+
+    def __init__(self, claimable: list, held_until: datetime | None = None) -> None:
+        self.claimable = claimable
+        self.held_until = held_until
+        self.renewed: list[tuple[list[str], datetime | None]] = []
+
+    async def claim_resumable_reviews(self, checkpointed_after, lease_until):
+        claimed, self.claimable = self.claimable, []
+        return claimed
+
+    async def next_checkpoint_lease_expiry(self, checkpointed_after):
+        return self.held_until
+
+    async def renew_checkpoint_leases(self, review_ids, lease_until):
+        self.renewed.append((list(review_ids), lease_until))
+
+
+@pytest.fixture
+def lease_repo(monkeypatch) -> LeaseRepo:
+    repo = LeaseRepo([SimpleNamespace(id="r1", topic="graph learning", papers_limit=5, model="gpt-4o")])
+
+    @asynccontextmanager
+    async def session_factory():
+        yield None
+
+    monkeypatch.setattr(review_runner, "async_session_factory", session_factory)
+    monkeypatch.setattr(review_runner, "ReviewRepository", lambda db: repo)
+    return repo
+
+
+class TestResumeClaims:
+    """Tests for resuming only the interrupted reviews this process claims."""
+
+    def test_claimed_reviews_resume_and_held_leases_are_retried(self, lease_repo):
+        """Test claimed reviews start, and claiming is retried once leases still held lapse."""
+        runner = ReviewRunner()
+        started: list[str] = []
+        runner.start = lambda review_id, *args: started.append(review_id)
+        lease_repo.held_until = datetime.utcnow()
+
+        async def main():
+            first = await runner.resume_interrupted()
+            lease_repo.claimable = [SimpleNamespace(id="r2", topic="rag", papers_limit=5, model="gpt-4o")]
+            lease_repo.held_until = None
+            await asyncio.wait_for(runner._resume_retry, timeout=5)
+            return first
+
+        assert asyncio.run(main()) == ["r1"]
+        assert started == ["r1", "r2"]
+
+    def test_shutdown_releases_the_leases_of_stopped_reviews(self, lease_repo):
+        """Test reviews stopped by shutdown can be claimed at once by the next process."""
+        runner = ReviewRunner()
+
+        async def forever(service):
+            await asyncio.Event().wait()
+            yield {}
+
+        async def main():
+            runner._spawn("r1", forever)
+            await asyncio.sleep(0)
+            await runner.shutdown()
+
+        asyncio.run(main())
+
+        assert lease_repo.renewed == [(["r1"], None)]
+
+
+class TestGracefulShutdown:
+    """Tests for interrupting running reviews on shutdown."""
+
+    def test_shutdown_interrupts_and_waits_for_checkpoint(self):
+        """Test running reviews are interrupted and given the grace period to stop."""
+        runner = ReviewRunner()
+        interrupted = asyncio.Event()
+        finished: list[str] = []
+
+        async def review():
+            with runner.interruptible("r1", interrupted.set):
+                await interrupted.wait()
+                await asyncio.sleep(0.01)  # final checkpoint
+                finished.append("r1")
+
+        async def main():
+            task = asyncio.create_task(review())
+            await asyncio.sleep(0)
+            assert runner.is_running("r1")
+            await runner.shutdown(grace=1.0)
+            await task
+
+        asyncio.run(main())
+        assert finished == ["r1"]
+        assert not runner.is_running("r1")
+
+
+class TestServiceResume:
+    """Tests for ReviewService resuming and keeping checkpoints."""
+
+    def _start(self, repo) -> list[dict]:
+        repo.checkpoint = {"plan": PLAN}
+        service = ReviewService(db=None)
+        service.repo = repo
+
+        async def reuse_cached_review(session_id):
+            raise AssertionError("a checkpointed review must not be answered from the topic cache")
+
+        service._reuse_cached_review = reuse_cached_review
+
+        async def collect():
+            return [e async for e in service.start_review(str(uuid.uuid4()), "graph learning", 5)]
+
+        return asyncio.run(collect())
+
+    def test_checkpointed_review_resumes_and_drops_checkpoint(self, stub_repo, stub_orchestrator):
+        """Test the checkpoint is handed to the orchestrator and dropped on completion."""
+        stub_orchestrator.events = ["progress: Resuming..."]
+
+        events = self._start(stub_repo)
+
+        [call] = stub_orchestrator.calls
+        assert call["resume_from"] == {"plan": PLAN}
+        assert call["checkpoint"] is not None
+        assert stub_repo.statuses == ["in_progress", "completed"]
+        assert stub_repo.deleted == 1
+        assert events[-1]["type"] == "complete"
+
+    def test_interrupted_review_stays_in_progress(self, stub_repo, stub_orchestrator):
+        """Test an interrupted review keeps its status and checkpoint for the restart."""
+        stub_orchestrator.events = ["progress: Resuming..."]
+        stub_orchestrator.error = ReviewInterrupted("stop", stage="team")
+
+        events = self._start(stub_repo)
+
+        assert stub_repo.statuses == ["in_progress"]
+        assert stub_repo.deleted == 0
+        assert "resumes" in events[-1]["content"]
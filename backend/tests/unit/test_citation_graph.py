@@ -0,0 +1,126 @@
+"""
+test_citation_graph.py
+======================
+Unit tests for citation-graph expansion and its per-paper cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+
+from fakes.corpus import load_corpus
+from fakes.scholarly_server import create_scholarly_app
+from fastapi.testclient import TestClient
+
+from app.config.settings import Settings
+from app.orchestrator.retrieval import CandidateRetriever
+from app.tools.arxiv_tool import ArxivSearchTool
+from app.tools.citation_graph import CitationCache, CitationExpander
+from app.tools.semantic_scholar_tool import SemanticScholarTool
+
+SEEDS = load_corpus().papers[:4]
+
+
+def _s2_tool(requests: list[str] | None = None, latency_ms: float = 0.0) -> SemanticScholarTool:
+    """SemanticScholarTool served by the fake API, recording each request path."""
+    tool = SemanticScholarTool(api_url="http://testserver/s2/graph/v1")
+    client = TestClient(create_scholarly_app(latency_ms=latency_ms))
+    original = client.request
+
+    def request(method, url, **kwargs):
+        if requests is not None:
+            requests.append(f"{method} {url.rsplit('/v1', 1)[-1]}")
+        return original(method, url, **kwargs)
+
+    client.request = request
+    tool._http = client
+    return tool
+
+
+def _seed_ids() -> list[str]:
+    return [f"ARXIV:{p['arxiv_id']}" for p in SEEDS]
+
+
+class TestCitationExpander:
+    """Tests for breadth-first, co-citation-scored expansion."""
+
+    def test_related_papers_ranked_by_co_citation(self):
+        """Test neighbours shared by several seeds are returned, best overlap first."""
+        requests: list[str] = []
+        expander = CitationExpander(_s2_tool(requests), min_overlap=2)
+
+        related = expander.expand(_seed_ids(), limit=3)
+
+        overlap = Counter()
+        for seed in SEEDS:
+            overlap.update(set(seed["references"]) | set(seed["citations"]))
+        seed_ids = {seed["paper_id"] for seed in SEEDS}
+        assert related
+        assert all(p["paper_id"] not in seed_ids for p in related)
+        assert [p["co_citations"] for p in related] == sorted((p["co_citations"] for p in related), reverse=True)
+        assert all(p["co_citations"] == overlap[p["paper_id"]] >= 2 for p in related)
+        # One batch for the seeds' links, one for the winners' metadata
+        assert requests == ["POST /paper/batch", "POST /paper/batch"]
+
+    def test_cached_papers_need_no_requests(self, tmp_path):
+        """Test a second expansion over the same seeds is served from the cache."""
+        cache = CitationCache(tmp_path, max_bytes=10_000_000, ttl=3600)
+        requests: list[str] = []
+        expander = CitationExpander(_s2_tool(requests), cache=cache)
+
+        first = expander.expand(_seed_ids())
+        requests.clear()
+        second = expander.expand(_seed_ids())
+
+        assert second == first
+        assert requests == []
+
+    def test_depth_bounds_levels(self):
+        """Test each extra level costs one more batch request."""
+        requests: list[str] = []
+        expander = CitationExpander(_s2_tool(requests), depth=2, breadth=3)
+
+        expander.expand(_seed_ids())
+
+        assert len(requests) == 3
+
+    def test_over_budget_returns_nothing(self):
+        """Test the stage gives up at its budget instead of delaying the review."""
+        expander = CitationExpander(_s2_tool(latency_ms=500), budget=0.2)
+        start = time.monotonic()
+
+        assert expander.expand(_seed_ids()) == []
+        assert time.monotonic() - start < 1.0
+
+
+class TestRelatedPapers:
+    """Tests for completing related papers from arXiv."""
+
+    def test_arxiv_papers_are_completed_in_one_lookup(self):
+        """Test related papers on arXiv get its abstract and PDF, and the others are left as they are."""
+        lookups: list[list[str]] = []
+        arxiv_tool = ArxivSearchTool()
+
+        def fetch_ids(arxiv_ids):
+            lookups.append(list(arxiv_ids))
+            return [{"arxiv_id": "2402.00001", "summary": "From arXiv.", "pdf_url": "https://arxiv.org/pdf/2402.00001"}]
+
+        arxiv_tool.fetch_ids = fetch_ids
+        settings = Settings(local_corpus_enabled=False, citation_expansion_enabled=True)
+        retriever = CandidateRetriever(settings, arxiv_tool=arxiv_tool)
+        related = [
+            {"paper_id": "s1", "summary": "No abstract available.", "external_ids": {"ArXiv": "2402.00001"}},
+            {"paper_id": "s2", "summary": "Journal only.", "external_ids": {"DOI": "10.1/x"}},
+        ]
+
+        async def expand(seeds, limit):
+            return related
+
+        retriever._expand = expand
+
+        papers = asyncio.run(retriever.expand({"gnn": [{"arxiv_id": "2401.00001"}]}))
+
+        assert lookups == [["2402.00001"]]
+        assert [(p["paper_id"], p["summary"]) for p in papers] == [("s1", "From arXiv."), ("s2", "Journal only.")]
@@ -0,0 +1,90 @@
+"""
+test_fakes.py
+=============
+Unit tests for the offline fake upstream servers.
+"""
+
+from __future__ import annotations
+
+import json
+
+from fakes.openai_server import create_openai_app
+from fakes.scholarly_server import create_scholarly_app
+from fastapi.testclient import TestClient
+
+from app.agents.planner_agent import PlannerAgent
+from app.teams.litrev_team import LitRevTeam
+
+
+def _chat(client: TestClient, messages: list[dict], **body) -> dict:
+    response = client.post("/v1/chat/completions", json={"model": "gpt-4o-mini", "messages": messages, **body})
+    assert response.status_code == 200
+    return response.json()["choices"][0]["message"]
+
+
+class TestFakeOpenAI:
+    """Tests for role detection and scripted replies."""
+
+    def test_planner_returns_json_array(self):
+        """Test the planner reply parses as a list of sub-queries for the topic."""
+        client = TestClient(create_openai_app())
+        message = _chat(
+            client,
+            [
+                {"role": "system", "content": PlannerAgent.DEFAULT_SYSTEM_MESSAGE},
+                {"role": "user", "content": "Decompose this research topic into sub-queries: diffusion models"},
+            ],
+        )
+
+        queries = json.loads(message["content"])
+        assert len(queries) == 3
+        assert all(q.startswith("diffusion models") for q in queries)
+
+    def test_selector_follows_review_pipeline(self):
+        """Test the selector picks the agent after the last speaker."""
+        client = TestClient(create_openai_app())
+        prompt = LitRevTeam.SELECTOR_PROMPT.format(
+            roles="search_agent: searches\nsummarizer: writes\ncritic: reviews",
+            history="user: Research topic: 'x'\n\nsearch_agent: [{\"title\": \"A\"}]",
+            participants="['summarizer', 'critic']",
+        )
+
+        message = _chat(client, [{"role": "system", "content": prompt}])
+
+        assert message["content"] == "summarizer"
+
+    def test_script_overrides_role(self, tmp_path):
+        """Test scripted replies are cycled for their role."""
+        script = tmp_path / "script.json"
+        script.write_text(json.dumps({"planner": ['["a"]', '["b"]']}))
+        client = TestClient(create_openai_app(script_path=script))
+        messages = [{"role": "system", "content": PlannerAgent.DEFAULT_SYSTEM_MESSAGE}]
+
+        replies = [_chat(client, messages)["content"] for _ in range(3)]
+
+        assert replies == ['["a"]', '["b"]', '["a"]']
+
+
+class TestFakeScholarly:
+    """Tests for the fake scholarly APIs."""
+
+    def test_semantic_scholar_fields(self):
+        """Test only requested fields (plus paperId) are returned."""
+        client = TestClient(create_scholarly_app())
+        response = client.get(
+            "/s2/graph/v1/paper/search",
+            params={"query": "graph neural networks", "fields": "title,year", "limit": 3},
+        )
+
+        data = response.json()["data"]
+        assert len(data) == 3
+        assert set(data[0]) == {"paperId", "title", "year"}
+
+    def test_arxiv_feed_paginates(self):
+        """Test the Atom feed reports totals and honours max_results."""
+        client = TestClient(create_scholarly_app())
+        response = client.get("/arxiv/api/query", params={"search_query": "all:retrieval", "max_results": 2})
+
+        assert response.headers["content-type"].startswith("application/atom+xml")
+        assert response.text.count("<entry>") == 2
+        assert "<opensearch:totalResults>" in response.text
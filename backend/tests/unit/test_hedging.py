@@ -0,0 +1,114 @@
+"""
+test_hedging.py
+===============
+Unit tests for hedged tool calls.
+"""
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app.core.metrics import TOOL_HEDGES
+from app.tools.hedging import HedgeBudget, Hedger, LatencyWindow
+
+
+def _hedger(name: str, p90: float = 0.05, budget: float = 1.0) -> Hedger:
+    """A hedger that has already seen calls taking `p90` seconds."""
+    latencies = LatencyWindow(size=10, min_samples=10)
+    for _ in range(10):
+        latencies.observe(p90)
+    hedger = Hedger(name, quantile=0.9, latencies=latencies, budget=HedgeBudget(budget))
+    hedger.budget.deposit()  # start with one hedge saved up
+    return hedger
+
+
+def _answer(value: str, delay: float = 0.0, error: Exception | None = None):
+    def call() -> str:
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return value
+
+    return call
+
+
+def _outcome(name: str, outcome: str) -> float:
+    return TOOL_HEDGES.labels(name, outcome).value
+
+
+class TestHedger:
+    """Tests for racing slow calls against a hedge."""
+
+    def test_no_hedge_while_warming_up(self):
+        """Test calls run directly until enough latencies are known."""
+        hedger = Hedger("warmup", latencies=LatencyWindow(min_samples=3))
+        alternate_calls = []
+
+        for _ in range(3):
+            assert hedger.call(_answer("primary"), lambda: alternate_calls.append(1)) == "primary"
+
+        assert alternate_calls == []
+        assert hedger.latencies.quantile(0.9) is not None
+
+    def test_fast_call_is_not_hedged(self):
+        """Test a call answering within the p90 never sends a hedge."""
+        hedger = _hedger("fast_source", p90=0.5)
+        alternate_calls = []
+
+        assert hedger.call(_answer("primary"), lambda: alternate_calls.append(1)) == "primary"
+        assert alternate_calls == []
+
+    def test_slow_call_is_won_by_hedge(self):
+        """Test a hedge sent at the p90 answers before a straggler."""
+        hedger = _hedger("slow_source", p90=0.05)
+        start = time.monotonic()
+
+        result = hedger.call(_answer("primary", delay=1.0), _answer("hedge"))
+
+        assert result == "hedge"
+        assert time.monotonic() - start < 0.5
+        assert _outcome("slow_source", "won") == 1
+
+    def test_budget_limits_hedges(self):
+        """Test slow calls are not hedged once the budget is spent."""
+        hedger = _hedger("budget_source", p90=0.01, budget=0.0)
+        alternate_calls = []
+
+        assert hedger.call(_answer("primary", delay=0.05), lambda: alternate_calls.append(1)) == "primary"
+        assert alternate_calls == []
+        assert _outcome("budget_source", "skipped") == 1
+
+    def test_failed_hedge_falls_back_to_primary(self):
+        """Test a failing hedge does not fail a call whose primary succeeds."""
+        hedger = _hedger("failing_mirror", p90=0.01)
+
+        result = hedger.call(_answer("primary", delay=0.1), _answer("", error=ConnectionError("mirror down")))
+
+        assert result == "primary"
+        assert _outcome("failing_mirror", "lost") == 1
+
+    def test_both_failing_raises_primary_error(self):
+        """Test the original call's error is raised when the hedge fails too."""
+        hedger = _hedger("both_down", p90=0.01)
+
+        with pytest.raises(TimeoutError):
+            hedger.call(
+                _answer("", delay=0.05, error=TimeoutError("primary")),
+                _answer("", error=ConnectionError("mirror")),
+            )
+
+
+class TestHedgeBudget:
+    """Tests for the hedge token budget."""
+
+    def test_hedges_capped_at_ratio_of_calls(self):
+        """Test a 10% budget allows one hedge per ten calls."""
+        budget = HedgeBudget(ratio=0.1, burst=5)
+        hedges = 0
+        for _ in range(100):
+            budget.deposit()
+            hedges += budget.spend()
+
+        assert hedges == 10
@@ -0,0 +1,139 @@
+"""
+test_local_corpus.py
+====================
+Unit tests for the local full-text corpus and local-first retrieval.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+
+from app.config.settings import Settings
+from app.orchestrator.retrieval import CandidateRetriever
+from app.tools.arxiv_tool import ArxivSearchTool
+from app.tools.local_corpus_tool import LocalCorpusSearchTool, SqlitePaperIndex
+
+
+def _paper(arxiv_id: str, title: str, summary: str = "An abstract.") -> dict:
+    return {
+        "title": title,
+        "authors": ["A. Author"],
+        "published": "2024-01-01",
+        "summary": summary,
+        "pdf_url": f"https://arxiv.org/pdf/{arxiv_id}v1",
+        "arxiv_id": arxiv_id,
+    }
+
+
+PAPERS = [
+    _paper("2401.00001", "Graph neural networks for molecules"),
+    _paper("2401.00002", "Diffusion models for image synthesis"),
+    _paper("2401.00003", "Scaling message passing", summary="Graph neural network training on large graphs."),
+]
+
+
+def _index(tmp_path, papers: list[dict] = PAPERS) -> SqlitePaperIndex:
+    index = SqlitePaperIndex(tmp_path / "corpus.sqlite3")
+    asyncio.run(index.add(papers))
+    return index
+
+
+class TestSqlitePaperIndex:
+    """Tests for the SQLite FTS5 stand-in index."""
+
+    def test_all_terms_must_match_and_titles_rank_first(self, tmp_path):
+        """Test stemmed AND matching, with title matches above abstract matches."""
+        index = _index(tmp_path)
+
+        results = asyncio.run(index.search_many(["graph neural network", "diffusion graph"], limit=5))
+
+        assert [p["arxiv_id"] for p in results["graph neural network"]] == ["2401.00001", "2401.00003"]
+        assert results["diffusion graph"] == []
+        assert results["graph neural network"][0]["id"] == "arxiv:2401.00001"
+
+    def test_add_only_fills_missing_fields(self, tmp_path):
+        """Test re-adding a paper keeps what the index has and fills only what it lacked."""
+        undated = {**PAPERS[1], "published": "Unknown"}
+        index = _index(tmp_path, [PAPERS[0], undated, PAPERS[2]])
+        rewritten = {**PAPERS[1], "pdf_url": "https://arxiv.org/pdf/2401.00002v2", "summary": "Paraphrased."}
+        asyncio.run(index.add([rewritten]))
+
+        [paper] = asyncio.run(index.search_many(["diffusion"], limit=5))["diffusion"]
+
+        assert paper["summary"] == "An abstract."
+        assert paper["pdf_url"] == "https://arxiv.org/pdf/2401.00002v1"
+        assert paper["published"] == "2024-01-01"
+
+    def test_published_after_filters_older_papers(self, tmp_path):
+        """Test a date limit keeps only papers published on or after it."""
+        newer = {**_paper("2503.00001", "Graph neural networks revisited"), "published": "2025-03-01"}
+        index = _index(tmp_path, PAPERS + [newer])
+
+        results = asyncio.run(index.search_many(["graph neural network"], limit=5, published_after=date(2025, 3, 1)))
+
+        assert [p["arxiv_id"] for p in results["graph neural network"]] == ["2503.00001"]
+
+    def test_undated_papers_are_not_published_after_anything(self, tmp_path):
+        """Test papers without an ISO date are left out of date-limited searches only."""
+        undated = [
+            {**_paper("2503.00002", "Graph neural networks for molecules"), "published": "Unknown"},
+            {**_paper("2503.00003", "Graph neural networks at scale"), "published": "recent"},
+        ]
+        index = _index(tmp_path, PAPERS + undated)
+
+        limited = asyncio.run(index.search_many(["graph neural network"], limit=5, published_after=date(2025, 3, 1)))
+        unlimited = asyncio.run(index.search_many(["graph neural network"], limit=5))
+
+        assert limited["graph neural network"] == []
+        assert {"2503.00002", "2503.00003"} <= {p["arxiv_id"] for p in unlimited["graph neural network"]}
+
+    def test_query_syntax_is_not_interpreted(self, tmp_path):
+        """Test FTS5 operators in a query are searched as plain words."""
+        index = _index(tmp_path)
+
+        results = asyncio.run(index.search_many(['graph" OR "diffusion', "NEAR(title: *)"], limit=5))
+
+        assert results['graph" OR "diffusion'] == []
+        assert results["NEAR(title: *)"] == []
+
+
+class TestLocalFirstRetrieval:
+    """Tests for CandidateRetriever searching the local corpus before arXiv."""
+
+    def _retriever(self, tmp_path, papers: list[dict], per_query: int = 2) -> tuple[CandidateRetriever, list]:
+        arxiv_calls: list[list[str]] = []
+        arxiv_tool = ArxivSearchTool()
+
+        def search_many(queries, max_results):
+            arxiv_calls.append(list(queries))
+            return {q: [_paper(f"2402.0000{i}", f"{q} study {i}") for i in range(max_results)] for q in queries}
+
+        arxiv_tool.search_many = search_many
+        settings = Settings(candidates_per_query=per_query, citation_expansion_enabled=False)
+        local_tool = LocalCorpusSearchTool(_index(tmp_path, papers))
+        return CandidateRetriever(settings, arxiv_tool=arxiv_tool, local_tool=local_tool), arxiv_calls
+
+    def test_only_gaps_go_upstream_and_are_remembered(self, tmp_path):
+        """Test filled sub-queries skip arXiv, and a repeat review is served locally."""
+        retriever, arxiv_calls = self._retriever(tmp_path, PAPERS)
+
+        first = asyncio.run(retriever.retrieve(["graph neural networks", "protein folding"]))
+
+        assert arxiv_calls == [["protein folding"]]
+        assert [p["arxiv_id"] for p in first["graph neural networks"]] == ["2401.00001", "2401.00003"]
+        assert len(first["protein folding"]) == 2
+
+        second = asyncio.run(retriever.retrieve(["graph neural networks", "protein folding"]))
+
+        assert arxiv_calls == [["protein folding"]]
+        assert second == {q: [{**p, "id": f"arxiv:{p['arxiv_id']}"} for p in papers] for q, papers in first.items()}
+
+    def test_partial_local_results_are_topped_up(self, tmp_path):
+        """Test local matches come first and arXiv fills the rest without duplicates."""
+        retriever, arxiv_calls = self._retriever(tmp_path, PAPERS, per_query=3)
+
+        results = asyncio.run(retriever.retrieve(["diffusion models"]))
+
+        assert arxiv_calls == [["diffusion models"]]
+        assert [p["arxiv_id"] for p in results["diffusion models"]] == ["2401.00002", "2402.00000", "2402.00001"]
@@ -0,0 +1,61 @@
+"""
+test_metrics.py
+===============
+Unit tests for the Prometheus-style metrics registry.
+"""
+
+from __future__ import annotations
+
+from app.core.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """Tests for metric types and text exposition."""
+
+    def test_counter_with_labels(self):
+        """Test labelled counters render one sample per label set."""
+        registry = MetricsRegistry()
+        errors = registry.register(Counter("tool_errors_total", "Tool errors", ["tool"]))
+
+        errors.labels("arxiv_search").inc()
+        errors.labels(tool="arxiv_search").inc(2)
+        errors.labels("web_search").inc()
+
+        text = registry.render()
+
+        assert "# TYPE tool_errors_total counter" in text
+        assert 'tool_errors_total{tool="arxiv_search"} 3.0' in text
+        assert 'tool_errors_total{tool="web_search"} 1.0' in text
+
+    def test_unlabelled_gauge_defaults_to_zero(self):
+        """Test unlabelled gauges are exported before first use."""
+        registry = MetricsRegistry()
+        registry.register(Gauge("sse_open", "Open streams"))
+
+        assert "sse_open 0.0" in registry.render()
+
+    def test_gauge_function_evaluated_at_scrape(self):
+        """Test callback gauges read their value on render."""
+        registry = MetricsRegistry()
+        pool = registry.register(Gauge("pool_checked_out", "Checked out"))
+        pool.set_function(lambda: 7)
+
+        assert "pool_checked_out 7.0" in registry.render()
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count."""
+        registry = MetricsRegistry()
+        latency = registry.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)))
+
+        latency.observe(0.05)
+        latency.observe(0.1)
+        latency.observe(0.5)
+        latency.observe(3.0)
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{le="1.0"} 3' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+        assert "latency_seconds_count 4" in text
+        assert "latency_seconds_sum 3.65" in text
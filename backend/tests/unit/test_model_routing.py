@@ -0,0 +1,195 @@
+"""
+test_model_routing.py
+=====================
+Unit tests for per-role model routing and falling back on timeouts and 429s.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+from autogen_core.models import CreateResult, RequestUsage, UserMessage
+from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+from app.agents.model_client import build_model_client
+from app.agents.planner_agent import PlannerAgent
+from app.config.settings import Settings
+from app.core.exceptions import ConfigurationError
+from app.core.metrics import LLM_FALLBACKS
+from app.core.replay import ReviewRecorder, ReviewReplayer, use_replay_session
+from app.core.usage import UsageTracker, track_usage
+
+MESSAGES = [UserMessage(content="Decompose: graph learning", source="user")]
+LLAMA_INFO = {
+    "vision": False,
+    "function_calling": True,
+    "json_output": True,
+    "family": "unknown",
+    "structured_output": False,
+}
+
+
+def _settings(**kwargs) -> Settings:
+    return Settings(openai_api_key="test", **kwargs)
+
+
+def _rate_limited() -> openai.RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return openai.RateLimitError("Rate limit reached", response=httpx.Response(429, request=request), body=None)
+
+
+class TestRoutes:
+    """Tests for choosing each role's model and endpoint."""
+
+    def test_roles_follow_their_routes(self):
+        """Test routed roles get their model and the rest keep the review's."""
+        settings = _settings(
+            model_routes={"selector": "gpt-4o-mini"},
+            model_endpoints={"gpt-4o-mini": {"base_url": "http://fast.local/v1"}},
+        )
+
+        selector = build_model_client("selector", "gpt-4o", "test", settings=settings)
+        summarizer = build_model_client("summarizer", "gpt-4o", "test", "http://default.local/v1", settings=settings)
+
+        assert (selector.model, str(selector._client.base_url)) == ("gpt-4o-mini", "http://fast.local/v1/")
+        assert (summarizer.model, str(summarizer._client.base_url)) == ("gpt-4o", "http://default.local/v1/")
+        assert selector.stage == "selector"
+
+    def test_other_providers_get_their_own_key_and_model_info(self, monkeypatch):
+        """Test a non-OpenAI model is built with its endpoint's key and info, never the OpenAI key."""
+        monkeypatch.setenv("GROQ_API_KEY", "groq-key")
+        settings = _settings(
+            model_routes={"planner": "llama-3.1-8b-instant", "selector": "qwen3"},
+            model_endpoints={
+                "llama-3.1-8b-instant": {
+                    "base_url": "https://api.groq.com/openai/v1",
+                    "api_key_env": "GROQ_API_KEY",
+                    "model_info": LLAMA_INFO,
+                },
+                "qwen3": {"base_url": "http://localhost:11434/v1", "model_info": LLAMA_INFO},
+            },
+        )
+
+        planner = build_model_client("planner", "gpt-4o", "openai-key", settings=settings)
+        selector = build_model_client("selector", "gpt-4o", "openai-key", settings=settings)
+
+        assert (planner.model, planner._client.api_key) == ("llama-3.1-8b-instant", "groq-key")
+        assert str(planner._client.base_url) == "https://api.groq.com/openai/v1/"
+        assert planner.model_info["function_calling"] is True
+        assert selector._client.api_key != "openai-key"
+
+    def test_missing_endpoint_key_is_a_configuration_error(self, monkeypatch):
+        """Test an endpoint whose key variable is unset fails instead of sending another key."""
+        monkeypatch.delenv("GROQ_API_KEY", raising=False)
+        settings = _settings(
+            model_routes={"planner": "llama-3.1-8b-instant"},
+            model_endpoints={
+                "llama-3.1-8b-instant": {"base_url": "https://api.groq.com/openai/v1", "api_key_env": "GROQ_API_KEY"}
+            },
+        )
+
+        with pytest.raises(ConfigurationError, match="GROQ_API_KEY"):
+            build_model_client("planner", "gpt-4o", "openai-key", settings=settings)
+
+    def test_fallback_chain_stops_at_a_cycle(self):
+        """Test fallbacks chain, the primary leaves retries to its fallback, and cycles end."""
+        settings = _settings(model_fallbacks={"gpt-4o": "gpt-4o-mini", "gpt-4o-mini": "gpt-4o"})
+
+        client = build_model_client("summarizer", "gpt-4o", "test", settings=settings)
+
+        assert client.fallback.model == "gpt-4o-mini"
+        assert client.fallback.fallback is None
+        assert client._client.max_retries == 0
+        assert client._client.timeout == settings.llm_timeout_seconds
+
+    def test_agents_route_by_name(self, monkeypatch):
+        """Test an agent's client follows its role's route, not the model it was given."""
+        settings = _settings(model_routes={"planner": "gpt-4o-mini"})
+        monkeypatch.setattr("app.agents.model_client.get_settings", lambda: settings)
+
+        planner = PlannerAgent(model="gpt-4o", api_key="test")
+
+        assert planner._build_llm_client().model == "gpt-4o-mini"
+
+
+@pytest.fixture
+def flaky_primary(monkeypatch) -> list[str]:
+    """gpt-4o is rate limited and gpt-4o-mini answers; returns the models called."""
+    called: list[str] = []
+
+    async def create(self, *args, **kwargs):
+        called.append(self.model)
+        if self.model == "gpt-4o":
+            raise _rate_limited()
+        if self.model == "gpt-4.1":
+            raise ValueError("bad request")
+        return CreateResult(
+            finish_reason="stop",
+            content='["graph neural networks"]',
+            usage=RequestUsage(prompt_tokens=10, completion_tokens=5),
+            cached=False,
+        )
+
+    monkeypatch.setattr(OpenAIChatCompletionClient, "create", create)
+    return called
+
+
+class TestFallback:
+    """Tests for retrying calls on the fallback model."""
+
+    def test_rate_limited_call_falls_back(self, flaky_primary):
+        """Test a 429 is answered by the fallback, with both calls recorded."""
+        client = build_model_client(
+            "summarizer", "gpt-4o", "test", settings=_settings(model_fallbacks={"gpt-4o": "gpt-4o-mini"})
+        )
+        tracker = UsageTracker()
+        before = LLM_FALLBACKS.labels("summarizer", "gpt-4o", "rate_limited").value
+
+        async def main():
+            with track_usage(tracker):
+                return await client.create(MESSAGES)
+
+        result = asyncio.run(main())
+
+        assert result.content == '["graph neural networks"]'
+        assert flaky_primary == ["gpt-4o", "gpt-4o-mini"]
+        assert [(r.name, r.error) for r in tracker.records] == [("gpt-4o", True), ("gpt-4o-mini", False)]
+        assert LLM_FALLBACKS.labels("summarizer", "gpt-4o", "rate_limited").value == before + 1
+
+    def test_other_errors_do_not_fall_back(self, flaky_primary):
+        """Test failures a second model would not fix are raised as they are."""
+        client = build_model_client(
+            "summarizer", "gpt-4.1", "test", settings=_settings(model_fallbacks={"gpt-4.1": "gpt-4o-mini"})
+        )
+
+        with pytest.raises(ValueError):
+            asyncio.run(client.create(MESSAGES))
+        assert flaky_primary == ["gpt-4.1"]
+
+    def test_recorded_fallback_replays(self, flaky_primary):
+        """Test a review that fell back replays from its recording without calling either model."""
+        settings = _settings(model_fallbacks={"gpt-4o": "gpt-4o-mini"})
+        recorder = ReviewRecorder()
+
+        async def call(session):
+            with use_replay_session(session):
+                return await build_model_client("summarizer", "gpt-4o", "test", settings=settings).create(MESSAGES)
+
+        recorded = asyncio.run(call(recorder))
+
+        assert flaky_primary == ["gpt-4o", "gpt-4o-mini"]
+        [failed, answered] = recorder.entries
+        assert failed.error.startswith("RateLimitError") and failed.response is None
+        assert answered.error is None and answered.response is not None
+
+        flaky_primary.clear()
+        replayer = ReviewReplayer(recorder.metadata, recorder.entries, speed=0)
+        before = LLM_FALLBACKS.labels("summarizer", "gpt-4o", "rate_limited").value
+
+        assert asyncio.run(call(replayer)).content == recorded.content
+        assert flaky_primary == []
+        assert replayer.remaining == 0
+        assert LLM_FALLBACKS.labels("summarizer", "gpt-4o", "rate_limited").value == before + 1
@@ -0,0 +1,100 @@
+"""
+test_paper_catalog.py
+=====================
+Unit tests for the shared paper catalog and its upserts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+from sqlalchemy.dialects import postgresql
+
+from app.db.paper_repository import PaperRepository, catalog_row, normalize_paper_id
+from app.db.review_repository import ReviewRepository
+
+
+class RecordingSession:
+    """Stands in for AsyncSession, compiling each statement for Postgres."""
+
+    def __init__(self, last_rank: int | None = None) -> None:
+        self.last_rank = last_rank
+        self.statements: list = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.statements.append(stmt.compile(dialect=postgresql.dialect()))
+
+    async def scalar(self, stmt):
+        return self.last_rank
+
+    async def commit(self):
+        self.commits += 1
+
+
+class TestNormalizePaperId:
+    """Tests for source-independent catalog ids."""
+
+    def test_arxiv_versions_and_sources_agree(self):
+        """Test arXiv URLs, ids and Semantic Scholar external ids map to one id."""
+        ids = {
+            normalize_paper_id({"pdf_url": "https://arxiv.org/pdf/2106.15928v2.pdf"}),
+            normalize_paper_id({"pdf_url": "http://arxiv.org/abs/2106.15928"}),
+            normalize_paper_id({"arxiv_id": "2106.15928v1"}),
+            normalize_paper_id({"paper_id": "abc123", "external_ids": {"ArXiv": "2106.15928"}}),
+        }
+        assert ids == {"arxiv:2106.15928"}
+
+    def test_fallbacks(self):
+        """Test DOI, then Semantic Scholar id, then a folded title hash."""
+        assert normalize_paper_id({"external_ids": {"DOI": "10.1145/ABC"}, "paper_id": "x"}) == "doi:10.1145/abc"
+        assert normalize_paper_id({"url": "https://doi.org/10.1145/abc"}) == "doi:10.1145/abc"
+        assert normalize_paper_id({"paper_id": "x", "pdf_url": "https://example.org/x.pdf"}) == "s2:x"
+        assert normalize_paper_id({"title": "Graph  Neural Networks!"}) == normalize_paper_id(
+            {"title": "graph neural networks"}
+        )
+
+
+class TestPaperUpserts:
+    """Tests for catalog and review link upserts."""
+
+    def test_catalog_upsert_is_one_statement_without_duplicates(self, sample_papers):
+        """Test repeated papers are sent once and only rows missing a field are rewritten."""
+        session = RecordingSession()
+        papers = [sample_papers[0], sample_papers[1], {**sample_papers[0], "summary": "newer"}]
+
+        ids = asyncio.run(PaperRepository(session).upsert_papers(papers))
+
+        assert ids == ["arxiv:test1", "arxiv:test2", "arxiv:test1"]
+        [stmt] = session.statements
+        sql = str(stmt)
+        assert "INSERT INTO papers_catalog" in sql
+        assert "ON CONFLICT (id) DO UPDATE" in sql
+        assert "papers_catalog.summary IS NULL" in sql
+        assert "THEN excluded.summary ELSE papers_catalog.summary END" in sql
+        assert session.commits == 0
+        assert stmt.params["summary_m0"] == sample_papers[0]["summary"]
+        assert "id_m2" not in stmt.params
+
+    def test_placeholders_are_stored_as_missing(self):
+        """Test a source's stand-in values are never stored, so real ones can fill them later."""
+        row = catalog_row(
+            "s2:x", {"title": "T", "authors": None, "published": "Unknown", "summary": "No abstract available."}
+        )
+
+        assert row == {"id": "s2:x", "title": "T", "authors": [], "published": None, "summary": None, "pdf_url": None}
+
+    def test_review_links_ranked_after_existing(self, sample_papers):
+        """Test new links continue the review's ranking and carry relevance."""
+        session = RecordingSession(last_rank=3)
+        papers = [{**sample_papers[0], "relevance": 0.9}, sample_papers[1]]
+
+        asyncio.run(ReviewRepository(session).add_papers(str(uuid.uuid4()), papers))
+
+        catalog, links = session.statements
+        assert "INSERT INTO review_papers" in str(links)
+        assert "ON CONFLICT (review_id, paper_id) DO UPDATE" in str(links)
+        assert (links.params["rank_m0"], links.params["rank_m1"]) == (4, 5)
+        assert (links.params["relevance_m0"], links.params["relevance_m1"]) == (0.9, None)
+        assert session.commits == 1
@@ -0,0 +1,121 @@
+"""
+test_resilience.py
+==================
+Unit tests for tool retries, review deadlines and circuit breakers.
+"""
+
+from __future__ import annotations
+
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.core.exceptions import ToolError
+from app.core.resilience import (
+    CircuitBreaker,
+    RetryPolicy,
+    remaining_time,
+    use_deadline,
+)
+from app.tools.base import BaseTool, is_transient
+
+
+class FlakyTool(BaseTool):
+    """Tool whose calls fail with the queued errors before succeeding."""
+
+    retry_policy = RetryPolicy(attempts=3, base_delay=0.01, max_delay=0.01)
+
+    def __init__(self, errors: list[Exception]) -> None:
+        super().__init__(name="flaky_search", description="test tool")
+        self.errors = errors
+        self.calls = 0
+
+    def search(self, query: str) -> str:
+        self.calls += 1
+        if self.errors:
+            raise ToolError("upstream failed", tool_name=self.name) from self.errors.pop(0)
+        return f"results for {query}"
+
+    def _get_tool_function(self):
+        return self.search
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://api.example.org/search")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status, request=request))
+
+
+class TestRetries:
+    """Tests for the retry wrapper around sync tool functions."""
+
+    def test_transient_errors_are_retried(self):
+        """Test connection errors and 5xx are retried until the call succeeds."""
+        tool = FlakyTool([httpx.ConnectError("refused"), _status_error(503)])
+
+        assert tool._resilient(tool.search)("gnn") == "results for gnn"
+        assert tool.calls == 3
+
+    def test_client_errors_are_not_retried(self):
+        """Test a 4xx fails on the first attempt."""
+        tool = FlakyTool([_status_error(404)])
+
+        with pytest.raises(ToolError):
+            tool._resilient(tool.search)("gnn")
+        assert tool.calls == 1
+
+    def test_classification(self):
+        """Test 429 and timeouts count as transient, parse errors do not."""
+        assert is_transient(_status_error(429))
+        assert is_transient(httpx.ReadTimeout("slow"))
+        assert not is_transient(ValueError("bad json"))
+
+    def test_no_calls_after_deadline(self):
+        """Test a review past its deadline makes no further tool calls."""
+        tool = FlakyTool([])
+
+        with use_deadline(0.01):
+            time.sleep(0.02)
+            with pytest.raises(ToolError, match="deadline"):
+                tool._resilient(tool.search)("gnn")
+        assert tool.calls == 0
+
+    def test_nested_deadline_never_extends(self):
+        """Test an inner deadline is capped by the outer one."""
+        with use_deadline(1):
+            with use_deadline(100):
+                assert remaining_time() <= 1
+        assert remaining_time() is None
+
+
+class TestCircuitBreaker:
+    """Tests for breaker state transitions."""
+
+    def test_opens_on_error_rate_and_recovers(self):
+        """Test the breaker opens, lets one trial through, and closes on success."""
+        breaker = CircuitBreaker("test_source", failure_rate=0.5, min_calls=4, open_seconds=0.05)
+        for success in (True, False, False, True):
+            assert breaker.allow()
+            breaker.record(success)
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+        time.sleep(0.06)
+        assert breaker.allow()
+        assert not breaker.allow()  # only one trial while half-open
+        breaker.record(True)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_open_breaker_fails_tool_calls_fast(self):
+        """Test calls to a source with an open breaker never reach it."""
+        tool = FlakyTool([])
+        tool.circuit_breaker = True
+        breaker = CircuitBreaker("flaky_search", min_calls=1, open_seconds=60)
+        breaker.record(False)
+
+        with patch("app.tools.base.get_breaker", return_value=breaker):
+            with pytest.raises(ToolError, match="use the other sources"):
+                tool._resilient(tool.search)("gnn")
+        assert tool.calls == 0
@@ -0,0 +1,186 @@
+"""
+test_review_refresh.py
+======================
+Unit tests for incremental refreshes of completed reviews.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app.config.settings import Settings
+from app.core.budget import get_budget
+from app.core.exceptions import AgentError
+from app.orchestrator.litrev_orchestrator import LitRevOrchestrator
+from app.orchestrator.retrieval import new_candidates
+from app.services.review_service import ReviewService
+
+UPDATED_REVIEW = "An updated review of graph learning. " * 5 + "[New paper](https://arxiv.org/pdf/2610.00002)"
+
+
+def _paper(arxiv_id: str, title: str) -> dict:
+    return {
+        "title": title,
+        "authors": ["A. Author"],
+        "published": "2026-10-18",
+        "summary": "An abstract.",
+        "pdf_url": f"https://arxiv.org/pdf/{arxiv_id}",
+        "arxiv_id": arxiv_id,
+    }
+
+
+class TestNewCandidates:
+    """Tests for diffing candidates against a review's papers."""
+
+    def test_known_papers_dropped_round_robin_and_limited(self):
+        """Test known ids are skipped and sub-queries take turns up to the limit."""
+        results = {
+            "gnn": [_paper("2610.00001", "a"), _paper("2610.00002", "b"), _paper("2610.00003", "c")],
+            "rag": [_paper("2610.00002", "b"), _paper("2610.00004", "d")],
+        }
+
+        papers = new_candidates(results, known_ids={"arxiv:2610.00001"}, limit=2)
+
+        assert [p["arxiv_id"] for p in papers] == ["2610.00002", "2610.00004"]
+
+
+class TestOrchestratorRefresh:
+    """Tests for LitRevOrchestrator.refresh_review."""
+
+    def _refresh(
+        self, retriever, results: dict, updated: str = UPDATED_REVIEW, **settings
+    ) -> tuple[list[str], list]:
+        retriever.results = results
+        orchestrator = LitRevOrchestrator(
+            settings=Settings(openai_api_key="test", refresh_lookback_hours=24, **settings)
+        )
+        write_ups: list = []
+        self.budgets = []
+
+        async def update_summary(topic, summary, papers):
+            write_ups.append(papers)
+            self.budgets.append(get_budget())
+            return updated
+
+        orchestrator._update_summary = update_summary
+
+        async def collect():
+            return [
+                event
+                async for event in orchestrator.refresh_review(
+                    topic="graph learning",
+                    sub_queries=["gnn", "rag"],
+                    summary="The old review.",
+                    known_ids={"arxiv:2610.00001"},
+                    completed_at=datetime(2026, 10, 10),
+                )
+            ]
+
+        return asyncio.run(collect()), write_ups
+
+    def test_only_new_papers_are_written_up(self, stub_retriever):
+        """Test retrieval is date-limited and only unseen papers reach the summarizer."""
+        results = {"gnn": [_paper("2610.00001", "Known"), _paper("2610.00002", "New")]}
+
+        events, write_ups = self._refresh(stub_retriever, results)
+
+        assert stub_retriever.calls == [(["gnn", "rag"], datetime(2026, 10, 9))]
+        assert [[p["arxiv_id"] for p in papers] for papers in write_ups] == [["2610.00002"]]
+        search, summary = [e for e in events if not e.startswith("progress:")]
+        assert [p["arxiv_id"] for p in json.loads(search.removeprefix("search_agent: "))] == ["2610.00002"]
+        assert summary == f"summarizer: {UPDATED_REVIEW}"
+
+    def test_nothing_new_skips_the_summarizer(self, stub_retriever):
+        """Test a refresh with no new papers makes no LLM call and reports only progress."""
+        events, write_ups = self._refresh(stub_retriever, {"gnn": [_paper("2610.00001", "Known")]})
+
+        assert write_ups == []
+        assert all(e.startswith("progress:") for e in events)
+
+    def test_refresh_runs_within_the_review_budget(self, stub_retriever):
+        """Test the write-up runs with the review budget bound, like a full review."""
+        self._refresh(stub_retriever, {"gnn": [_paper("2610.00002", "New")]}, review_max_llm_calls=3)
+
+        assert [budget.max_llm_calls for budget in self.budgets] == [3]
+
+    def test_invalid_update_is_not_reported(self, stub_retriever):
+        """Test a write-up failing the guardrail raises before any paper is reported."""
+        with pytest.raises(AgentError):
+            self._refresh(stub_retriever, {"gnn": [_paper("2610.00002", "New")]}, updated="Too short.")
+
+
+def _completed_review() -> SimpleNamespace:
+    start = datetime(2026, 10, 10)
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        topic="graph learning",
+        status="completed",
+        completed_at=start,
+        model="gpt-4o-mini",
+        papers_limit=5,
+        messages=[
+            SimpleNamespace(message_type="planning", content='["gnn", "rag"]', timestamp=start),
+            SimpleNamespace(message_type="summary", content="The old review.", timestamp=start),
+        ],
+        papers=[SimpleNamespace(paper_id="arxiv:2610.00001")],
+    )
+
+
+class TestServiceRefresh:
+    """Tests for ReviewService.refresh_review."""
+
+    def _refresh(self, repo) -> list[dict]:
+        service = ReviewService(db=None)
+        repo.review = repo.review or _completed_review()
+        service.repo = repo
+
+        async def collect():
+            return [event async for event in service.refresh_review(str(repo.review.id))]
+
+        return asyncio.run(collect())
+
+    def test_new_papers_added_and_summary_replaced(self, stub_repo, stub_orchestrator):
+        """Test new papers are linked, the summary is rewritten in place and completion moves on."""
+        new = _paper("2610.00002", "New")
+        stub_orchestrator.events = [f"search_agent: {json.dumps([new])}", f"summarizer: {UPDATED_REVIEW}"]
+
+        events = self._refresh(stub_repo)
+
+        [call] = stub_orchestrator.calls
+        assert call["sub_queries"] == ["gnn", "rag"]
+        assert call["summary"] == "The old review."
+        assert call["known_ids"] == {"arxiv:2610.00001"}
+        assert call["completed_at"] == stub_repo.review.completed_at
+        assert stub_repo.papers == [new]
+        assert stub_repo.summaries == [UPDATED_REVIEW]
+        assert [m["message_type"] for m in stub_repo.messages] == ["search", "system"]
+        assert stub_repo.statuses == ["completed"]
+        assert events[-1]["type"] == "complete"
+
+    def test_failure_keeps_previous_results(self, stub_repo, stub_orchestrator):
+        """Test a failed refresh stores nothing but an error and leaves the completion time alone."""
+        stub_orchestrator.error = AgentError("boom")
+
+        events = self._refresh(stub_repo)
+
+        assert stub_repo.summaries == [] and stub_repo.papers == []
+        assert stub_repo.statuses == []
+        assert [m["message_type"] for m in stub_repo.messages] == ["error"]
+        assert events[-1]["type"] == "error"
+
+    def test_only_completed_reviews_refresh(self, stub_repo, stub_orchestrator):
+        """Test a review that has not completed is refused without running anything."""
+        stub_repo.review = _completed_review()
+        stub_repo.review.status = "in_progress"
+        stub_repo.review.completed_at = datetime.utcnow() - timedelta(hours=1)
+
+        events = self._refresh(stub_repo)
+
+        assert [e["type"] for e in events] == ["error"]
+        assert stub_orchestrator.calls == []
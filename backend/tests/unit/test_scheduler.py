@@ -0,0 +1,121 @@
+"""
+test_scheduler.py
+=================
+Unit tests for the per-host outbound request scheduler.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.tools.scheduler import (
+    HostPolicy,
+    HostScheduler,
+    ScheduledTransport,
+    parse_retry_after,
+)
+
+
+def _scheduler(**policies: HostPolicy) -> HostScheduler:
+    return HostScheduler(
+        {host.replace("_", "."): policy for host, policy in policies.items()},
+        default=HostPolicy(rate=1000, burst=1000, in_flight=1000),
+        queue_timeout=5,
+    )
+
+
+class TestHostScheduler:
+    """Tests for token buckets, in-flight caps and throttling."""
+
+    def test_policy_falls_back_to_parent_domain(self):
+        """Test subdomains use their parent's policy and unknown hosts the default."""
+        scheduler = _scheduler(arxiv_org=HostPolicy(rate=1))
+
+        assert scheduler.policy_for("export.arxiv.org")[0] == "arxiv.org"
+        assert scheduler.policy_for("example.com")[0] == "default"
+
+    def test_rate_spaces_requests_after_burst(self):
+        """Test requests beyond the burst wait for tokens instead of failing."""
+        scheduler = _scheduler(api_example_org=HostPolicy(rate=20, burst=2, in_flight=10))
+        start = time.monotonic()
+
+        for _ in range(4):
+            with scheduler.slot("api.example.org"):
+                pass
+
+        # Two from the burst, then two more at 20/s
+        assert 0.08 <= time.monotonic() - start < 0.5
+
+    def test_in_flight_cap_queues_concurrent_requests(self):
+        """Test no more than in_flight requests run at once per host."""
+        scheduler = _scheduler(api_example_org=HostPolicy(rate=1000, burst=1000, in_flight=2))
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def request():
+            nonlocal running, peak
+            with scheduler.slot("api.example.org"):
+                with lock:
+                    running += 1
+                    peak = max(peak, running)
+                time.sleep(0.02)
+                with lock:
+                    running -= 1
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak == 2
+
+    def test_retry_after_pauses_host_and_requeues(self):
+        """Test a 429 is waited out for its Retry-After and the request resent."""
+        responses = iter(
+            [httpx.Response(429, headers={"retry-after": "0.1"}), httpx.Response(200, text="ok")]
+        )
+        transport = ScheduledTransport(_scheduler(), httpx.MockTransport(lambda request: next(responses)))
+        client = httpx.Client(transport=transport)
+        start = time.monotonic()
+
+        response = client.get("https://api.example.org/search")
+
+        assert response.text == "ok"
+        assert time.monotonic() - start >= 0.1
+
+    def test_long_retry_after_is_returned_to_caller(self):
+        """Test throttles longer than max_retry_after are not waited out."""
+        scheduler = _scheduler()
+        scheduler.max_retry_after = 1
+        transport = ScheduledTransport(
+            scheduler, httpx.MockTransport(lambda request: httpx.Response(429, headers={"retry-after": "60"}))
+        )
+
+        response = httpx.Client(transport=transport).get("https://api.example.org/search")
+
+        assert response.status_code == 429
+
+    def test_queue_timeout(self):
+        """Test a request that cannot get a slot in time raises TimeoutError."""
+        scheduler = _scheduler(api_example_org=HostPolicy(rate=1000, burst=1, in_flight=1))
+        scheduler.queue_timeout = 0.05
+
+        with scheduler.slot("api.example.org"):
+            with pytest.raises(TimeoutError):
+                scheduler.acquire("api.example.org")
+
+
+class TestRetryAfter:
+    """Tests for Retry-After parsing."""
+
+    def test_seconds_and_http_date(self):
+        """Test both Retry-After forms."""
+        assert parse_retry_after("7") == 7.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0) == 10.0
+        assert parse_retry_after("soon") is None
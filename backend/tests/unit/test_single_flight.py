@@ -0,0 +1,142 @@
+"""
+test_single_flight.py
+=====================
+Unit tests for coalescing identical in-flight tool calls.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+from autogen_core import CancellationToken
+
+from app.core.exceptions import ToolError
+from app.core.metrics import TOOL_CALLS_COALESCED
+from app.core.resilience import remaining_time, use_cancellation, use_deadline
+from app.tools.base import BaseTool
+from app.tools.single_flight import call_key
+
+
+class SlowSearchTool(BaseTool):
+    """Tool whose calls block until released, counting upstream requests."""
+
+    coalesce = True
+
+    def __init__(self, name: str, fail: bool = False) -> None:
+        super().__init__(name=name, description="test tool")
+        self.release = threading.Event()
+        self.fail = fail
+        self.requests: list[str] = []
+
+    def search(self, query: str, max_results: int = 5) -> list[str]:
+        self.requests.append(query)
+        self.release.wait(5)
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise ToolError("Review deadline exceeded", tool_name=self.name)
+        if self.fail:
+            raise ToolError("upstream down", tool_name=self.name)
+        return [f"{query}:{i}" for i in range(max_results)]
+
+    def _get_tool_function(self):
+        return self.search
+
+
+async def _gather_released(tool: SlowSearchTool, *calls: dict) -> list:
+    """Start the calls together, let them queue up, then release the upstream."""
+    invoke = tool._instrument(tool.search)
+    tasks = [asyncio.create_task(invoke(**call)) for call in calls]
+    await asyncio.sleep(0.05)
+    tool.release.set()
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class TestSingleFlight:
+    """Tests for in-flight deduplication in the tool wrapper."""
+
+    def test_call_key_normalizes_arguments(self):
+        """Test defaults, case and whitespace do not change the key."""
+        tool = SlowSearchTool("key_search")
+
+        assert call_key(tool.search, ("Graph  Neural Nets",), {}) == call_key(
+            tool.search, (), {"query": "graph neural nets", "max_results": 5}
+        )
+        assert call_key(tool.search, ("gnn",), {}) != call_key(tool.search, ("gnn",), {"max_results": 3})
+
+    def test_identical_concurrent_calls_share_one_request(self):
+        """Test N identical calls in flight cost one upstream request."""
+        tool = SlowSearchTool("shared_search")
+
+        results = asyncio.run(_gather_released(tool, *[{"query": "GNN survey"}] * 3, {"query": "gnn  survey"}))
+
+        assert tool.requests == ["GNN survey"]
+        assert all(result == results[0] for result in results)
+        assert TOOL_CALLS_COALESCED.labels("shared_search").value == 3
+
+    def test_different_calls_are_not_merged(self):
+        """Test calls with different arguments each reach the upstream."""
+        tool = SlowSearchTool("distinct_search")
+
+        asyncio.run(_gather_released(tool, {"query": "gnn"}, {"query": "gnn", "max_results": 2}))
+
+        assert len(tool.requests) == 2
+
+    def test_failure_is_shared_but_not_remembered(self):
+        """Test waiters share a failure and a later call goes upstream again."""
+        tool = SlowSearchTool("failing_search", fail=True)
+
+        results = asyncio.run(_gather_released(tool, {"query": "gnn"}, {"query": "gnn"}))
+        assert all(isinstance(r, ToolError) for r in results)
+
+        with pytest.raises(ToolError):
+            asyncio.run(tool._instrument(tool.search)(query="gnn"))
+        assert len(tool.requests) == 2
+
+    def test_first_caller_cancelled_does_not_fail_the_others(self):
+        """Test a shared call outlives the cancelled review that started it."""
+        tool = SlowSearchTool("cancelled_search")
+        invoke = tool._instrument(tool.search)
+        token = CancellationToken()
+
+        async def call(cancellation: CancellationToken | None):
+            with use_deadline(60), use_cancellation(cancellation):
+                return await invoke(query="gnn")
+
+        async def main():
+            first = asyncio.create_task(call(token))
+            await asyncio.sleep(0.05)
+            second = asyncio.create_task(call(None))
+            await asyncio.sleep(0.05)
+            token.cancel()
+            await asyncio.sleep(0.05)
+            tool.release.set()
+            return await asyncio.gather(first, second, return_exceptions=True)
+
+        first, second = asyncio.run(main())
+
+        assert isinstance(first, asyncio.CancelledError)
+        assert second == [f"gnn:{i}" for i in range(5)]
+        assert tool.requests == ["gnn"]
+
+    def test_each_caller_waits_only_until_its_own_deadline(self):
+        """Test a caller out of time stops waiting while the shared call goes on for the others."""
+        tool = SlowSearchTool("deadline_search")
+        invoke = tool._instrument(tool.search)
+
+        async def call(seconds: float):
+            with use_deadline(seconds):
+                return await invoke(query="gnn")
+
+        async def main():
+            short = asyncio.create_task(call(0.05))
+            long = asyncio.create_task(call(60))
+            await asyncio.wait([short], timeout=1)
+            tool.release.set()
+            return await asyncio.gather(short, long, return_exceptions=True)
+
+        short, long = asyncio.run(main())
+
+        assert isinstance(short, ToolError)
+        assert long == [f"gnn:{i}" for i in range(5)]
@@ -6,10 +6,32 @@ Unit tests for tool classes.
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
-from app.tools.arxiv_tool import ArxivSearchTool
+import arxiv
+import httpx
+import pytest
+from fakes.scholarly_server import create_scholarly_app
+from fastapi.testclient import TestClient
+
+from app.core.exceptions import ToolError
+from app.core.metrics import CACHE_REQUESTS
+from app.tools.arxiv_tool import ArxivSearchTool, field_query
+from app.tools.http_cache import HttpCache
+from app.tools.passages import select_passages, split_passages
+from app.tools.pdf_reader_tool import PdfReaderTool, excerpt_sections, split_sections
+from app.tools.semantic_scholar_tool import SemanticScholarTool
+from app.tools.web_reader_tool import WebReaderTool, extract_text
+
+
+def _cache_lookups(cache: str) -> dict[str, float]:
+    return {result: CACHE_REQUESTS.labels(cache, result).value for result in ("hit", "revalidated", "miss")}
+
+
+def _new_lookups(cache: str, before: dict[str, float]) -> dict[str, float]:
+    return {result: count - before[result] for result, count in _cache_lookups(cache).items()}
 
 
 class TestArxivSearchTool:
@@ -67,3 +89,431 @@ class TestArxivSearchTool:
         results = tool.search("nonexistent topic")
 
         assert results == []
+
+
+def _arxiv_result(arxiv_id: str, title: str, summary: str = "") -> arxiv.Result:
+    return arxiv.Result(
+        entry_id=f"http://arxiv.org/abs/{arxiv_id}v2",
+        title=title,
+        summary=summary or title,
+        authors=[arxiv.Result.Author("A. Author")],
+        published=datetime(2024, 1, 15),
+    )
+
+
+def _arxiv_tool_answering(answer) -> tuple[ArxivSearchTool, list[arxiv.Search]]:
+    """ArxivSearchTool whose client answers each Search with answer(search)."""
+    tool = ArxivSearchTool()
+    searches: list[arxiv.Search] = []
+    tool._client = MagicMock()
+
+    def results(search):
+        searches.append(search)
+        return iter(answer(search)[: search.max_results])
+
+    tool._client.results.side_effect = results
+    return tool, searches
+
+
+class TestArxivMultiQuery:
+    """Tests for combined multi-query search and id lookups."""
+
+    CORPUS = [
+        _arxiv_result("2401.00001", "Graph neural networks for molecules"),
+        _arxiv_result("2401.00002", "Diffusion models for image synthesis"),
+        _arxiv_result("2401.00003", "Graph neural networks at scale"),
+        _arxiv_result("2401.00004", "Retrieval augmented generation survey"),
+    ]
+
+    def test_field_query(self):
+        """Test sub-queries become AND'd field queries and arXiv syntax is kept."""
+        assert field_query("Graph neural networks for molecules") == (
+            "(all:graph AND all:neural AND all:networks AND all:molecules)"
+        )
+        assert field_query("ti:transformer AND cat:cs.LG") == "(ti:transformer AND cat:cs.LG)"
+
+    def test_sub_queries_share_one_request(self):
+        """Test sub-queries are OR'd into one request and results split back out."""
+        tool, searches = _arxiv_tool_answering(lambda search: self.CORPUS)
+
+        results = tool.search_many(["graph neural networks", "diffusion models", "retrieval augmented"], 2)
+
+        assert len(searches) == 1
+        assert searches[0].query.count(" OR ") == 2
+        assert searches[0].max_results == 3 * 2 * 3
+        assert [p["arxiv_id"] for p in results["graph neural networks"]] == ["2401.00001", "2401.00003"]
+        assert [p["arxiv_id"] for p in results["diffusion models"]] == ["2401.00002"]
+        assert [p["arxiv_id"] for p in results["retrieval augmented"]] == ["2401.00004"]
+
+    def test_starved_sub_queries_get_one_more_request(self):
+        """Test only sub-queries left short by a truncated result set are asked again."""
+
+        def answer(search):
+            if "all:graph" in search.query:
+                return self.CORPUS[:3] * 10  # full page dominated by two topics
+            return [self.CORPUS[1], self.CORPUS[3]]
+
+        tool, searches = _arxiv_tool_answering(answer)
+
+        results = tool.search_many(["graph neural networks", "diffusion models", "retrieval augmented"], 2)
+
+        assert len(searches) == 2
+        assert "all:retrieval" in searches[1].query and "all:graph" not in searches[1].query
+        assert [p["arxiv_id"] for p in results["graph neural networks"]] == ["2401.00001", "2401.00003"]
+        assert [p["arxiv_id"] for p in results["retrieval augmented"]] == ["2401.00004"]
+
+    def test_published_after_limits_submission_date(self):
+        """Test a date limit is AND'ed onto the combined query."""
+        tool, searches = _arxiv_tool_answering(lambda search: self.CORPUS)
+
+        tool.search_many(["graph neural networks", "diffusion models"], 2, published_after=datetime(2026, 1, 2, 3, 4))
+
+        assert searches[0].query.startswith("((all:graph")
+        assert ") AND submittedDate:[202601020304 TO " in searches[0].query
+
+    def test_fetch_ids_uses_id_list(self):
+        """Test known ids are looked up in one id_list request."""
+        tool, searches = _arxiv_tool_answering(lambda search: self.CORPUS[:2])
+
+        papers = tool.fetch_ids(["2401.00001", "2401.00002v3", "2401.00001"])
+
+        assert searches[0].id_list == ["2401.00001", "2401.00002v3"]
+        assert searches[0].max_results == 2
+        assert [p["arxiv_id"] for p in papers] == ["2401.00001", "2401.00002"]
+
+    def test_page_size_matches_need(self):
+        """Test a request asks for the results wanted, not the client's default page."""
+        tool = ArxivSearchTool()
+        url = tool._client._format_url(arxiv.Search(query="gnn", max_results=5), 0, tool._client.page_size)
+
+        assert "max_results=5" in url
+
+
+def _s2_tool(**app_options) -> SemanticScholarTool:
+    """SemanticScholarTool served by the fake Semantic Scholar API."""
+    tool = SemanticScholarTool(api_url="http://testserver/s2/graph/v1")
+    tool._http = TestClient(create_scholarly_app(**app_options))
+    return tool
+
+
+class TestSemanticScholarBulk:
+    """Tests for Semantic Scholar bulk search and batch lookup."""
+
+    def test_bulk_search_follows_continuation_tokens(self):
+        """Test pages are fetched until max_results papers were yielded."""
+        tool = _s2_tool(bulk_page_size=2)
+        pages = []
+        original = tool._http.request
+
+        def counting(method, url, **kwargs):
+            pages.append(kwargs["params"].get("token"))
+            return original(method, url, **kwargs)
+
+        tool._http.request = counting
+        papers = list(tool.bulk_search("graph neural networks", max_results=5))
+
+        assert len(papers) == 5
+        assert len({p["paper_id"] for p in papers}) == 5
+        assert pages == [None, "2", "4"]
+        assert {"venue", "citation_count", "external_ids"} <= set(papers[0])
+
+    def test_batch_keeps_order_and_unknown_ids(self):
+        """Test batch lookups return papers in id order with None for unknown ids."""
+        tool = _s2_tool()
+        known = list(tool.bulk_search("graph neural networks", max_results=2))
+        ids = [known[1]["paper_id"], "missing", f"ARXIV:{known[0]['external_ids']['ArXiv']}"]
+
+        papers = tool.batch(ids)
+
+        assert papers[0]["paper_id"] == known[1]["paper_id"]
+        assert papers[1] is None
+        assert papers[2]["paper_id"] == known[0]["paper_id"]
+
+    def test_batch_splits_long_id_lists(self):
+        """Test more than 500 ids are sent as several requests."""
+        tool = _s2_tool()
+        sizes = []
+        original = tool._http.request
+
+        def counting(method, url, **kwargs):
+            sizes.append(len(kwargs["json"]["ids"]))
+            return original(method, url, **kwargs)
+
+        tool._http.request = counting
+        papers = tool.batch([f"missing-{i}" for i in range(1200)])
+
+        assert sizes == [500, 500, 200]
+        assert papers == [None] * 1200
+
+
+def _reader_with(handler, **kwargs) -> WebReaderTool:
+    """WebReaderTool whose HTTP client is served by handler."""
+    kwargs.setdefault("cache_dir", "")
+    tool = WebReaderTool(**kwargs)
+    tool._http = httpx.Client(transport=httpx.MockTransport(handler))
+    return tool
+
+
+class TestWebReaderTool:
+    """Tests for WebReaderTool download limits and extraction."""
+
+    def test_extracts_text_without_boilerplate(self):
+        """Test scripts, navigation and footers are dropped."""
+        page = (
+            b"<html><head><script>var x = 1;</script></head><body>"
+            b"<nav>Home | About</nav><main><h1>Title</h1><p>Body text.</p></main>"
+            b"<footer>Copyright</footer></body></html>"
+        )
+        tool = _reader_with(lambda request: httpx.Response(200, content=page, headers={"content-type": "text/html"}))
+
+        assert tool.read("https://example.org/post") == "Title\nBody text."
+
+    def test_rejects_binary_content(self):
+        """Test non-text responses are refused before the body is parsed."""
+        tool = _reader_with(
+            lambda request: httpx.Response(200, content=b"%PDF-1.7", headers={"content-type": "application/pdf"})
+        )
+
+        with pytest.raises(ToolError, match="Unsupported content type"):
+            tool.read("https://example.org/paper.pdf")
+
+    def test_stops_at_byte_cap(self):
+        """Test oversized bodies are cut off at max_bytes."""
+        page = b"<html><body>" + b"<p>word</p>" * 100_000 + b"</body></html>"
+        tool = _reader_with(
+            lambda request: httpx.Response(200, content=page, headers={"content-type": "text/html"}),
+            max_bytes=1000,
+        )
+
+        _, (body, _, _) = tool._fetch("https://example.org/huge")
+
+        assert len(body) == 1000
+        assert tool.read("https://example.org/huge").startswith("word")
+
+    def test_query_selects_matching_passages(self):
+        """Test a query returns the relevant passage from deep in the page, not the lead."""
+        filler = "".join(f"<p>Cookie notice and site news item {i} about unrelated matters.</p>" for i in range(200))
+        page = (
+            f"<html><body>{filler}<p>Contrastive pretraining improves retrieval recall.</p>{filler}</body></html>"
+        ).encode()
+        tool = _reader_with(
+            lambda request: httpx.Response(200, content=page, headers={"content-type": "text/html"}),
+            max_chars=500,
+        )
+
+        lead = tool.read("https://example.org/post")
+        selected = tool.read("https://example.org/post", query="contrastive pretraining for retrieval")
+
+        assert "Contrastive" not in lead
+        assert "Contrastive pretraining improves retrieval recall." in selected
+        assert len(selected) <= 500
+
+
+class TestPassages:
+    """Tests for BM25 passage selection."""
+
+    def test_split_respects_size(self):
+        """Test passages stay near the target size and keep document order."""
+        text = "\n".join(f"Line number {i} of the document." for i in range(100))
+
+        passages = split_passages(text, size=200)
+
+        assert all(len(p.text) <= 200 for p in passages)
+        assert [p.index for p in passages] == list(range(len(passages)))
+        assert passages[0].text.startswith("Line number 0")
+
+    def test_no_matching_terms_returns_none(self):
+        """Test callers can fall back when nothing matches the query."""
+        assert select_passages("alpha beta\ngamma delta", "transformers", budget=100) is None
+
+    def test_selection_is_in_document_order(self):
+        """Test the best passages are returned in the order they appear."""
+        text = "\n".join(["graph networks intro", "unrelated filler"] * 5 + ["graph neural networks message passing"])
+
+        result = select_passages(text, "graph neural networks", budget=100, passage_chars=40)
+
+        assert result.endswith("graph neural networks message passing")
+        assert result.index("graph networks intro") < result.index("message passing")
+
+
+def _pdf(lines: list[str]) -> bytes:
+    """Minimal single-page PDF with one text line per entry."""
+    ops = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+    for line in lines:
+        escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        ops.append(f"({escaped}) Tj T*")
+    ops.append("ET")
+    stream = "\n".join(ops).encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+PAPER = _pdf(
+    [
+        "Sparse Attention for Long Documents",
+        "Abstract",
+        "We study sparse attention patterns for long document transformers.",
+        "1 Introduction",
+        "Transformers scale quadratically with sequence length.",
+        "2 Method",
+        "Block sparse kernels reduce memory traffic on accelerators.",
+        "3 Conclusion",
+        "Sparse attention matches dense quality at a fraction of the cost.",
+        "References",
+        "[1] Vaswani et al. Attention is all you need.",
+    ]
+)
+
+
+def _pdf_reader_with(handler, tmp_path, **kwargs) -> PdfReaderTool:
+    """PdfReaderTool caching under tmp_path whose HTTP client is served by handler."""
+    tool = PdfReaderTool(cache_dir=str(tmp_path), **kwargs)
+    tool._http = httpx.Client(transport=httpx.MockTransport(handler))
+    return tool
+
+
+@pytest.fixture
+def inline_pdf_pool():
+    """Run extraction in a thread instead of spawning worker processes."""
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with patch("app.tools.pdf_reader_tool.get_pdf_executor", return_value=pool):
+            yield pool
+
+
+class TestPdfReaderTool:
+    """Tests for PdfReaderTool caching and section-aware excerpts."""
+
+    def test_second_read_is_served_from_cache(self, tmp_path, inline_pdf_pool):
+        """Test a repeated read neither downloads nor re-extracts."""
+        requests = []
+
+        def handler(request):
+            requests.append(request.url)
+            return httpx.Response(200, content=PAPER, headers={"content-type": "application/pdf"})
+
+        before = _cache_lookups("pdf")
+        tool = _pdf_reader_with(handler, tmp_path)
+        first = tool.read("https://arxiv.org/pdf/2401.00001")
+
+        with patch("app.tools.pdf_reader_tool.extract_sections") as extract:
+            second = _pdf_reader_with(handler, tmp_path).read("https://arxiv.org/pdf/2401.00001")
+
+        assert first == second
+        assert len(requests) == 1
+        extract.assert_not_called()
+        assert _new_lookups("pdf", before) == {"hit": 1, "revalidated": 0, "miss": 1}
+        assert "## Abstract" in first
+        assert "Vaswani" not in first
+
+    def test_content_addressed_across_urls(self, tmp_path, inline_pdf_pool):
+        """Test the same PDF under two URLs is stored once."""
+        tool = _pdf_reader_with(
+            lambda request: httpx.Response(200, content=PAPER, headers={"content-type": "application/pdf"}),
+            tmp_path,
+        )
+
+        tool.read("https://arxiv.org/pdf/2401.00001")
+        tool.read("https://example.org/mirror/sparse.pdf")
+
+        assert len(list((tmp_path / "pdf").glob("*.pdf"))) == 1
+
+    def test_rejects_oversized_pdf(self, tmp_path):
+        """Test downloads beyond max_bytes fail and leave nothing in the cache."""
+        tool = _pdf_reader_with(
+            lambda request: httpx.Response(200, content=PAPER, headers={"content-type": "application/pdf"}),
+            tmp_path,
+            max_bytes=100,
+        )
+
+        with pytest.raises(ToolError, match="exceeds"):
+            tool.read("https://arxiv.org/pdf/2401.00001")
+        assert list(tmp_path.rglob("*.pdf*")) == []
+
+    def test_query_ranks_sections(self):
+        """Test a query pulls the matching section ahead of the lead sections."""
+        sections = split_sections(
+            "Title\nAbstract\n" + "Overview of the field. " * 20 + "\n2 Method\nBlock sparse kernels on GPUs."
+        )
+
+        excerpt = excerpt_sections(sections, budget=120, query="block sparse kernels")
+
+        assert excerpt.startswith("## 2 Method")
+        assert len(excerpt) <= 120
+
+
+class TestWebReaderCache:
+    """Tests for WebReaderTool conditional requests and the HTTP cache."""
+
+    PAGE = b"<html><body><p>Cached page text.</p></body></html>"
+
+    def test_revalidates_with_etag_and_reuses_text_on_304(self, tmp_path):
+        """Test a stale entry is revalidated and a 304 skips the transfer."""
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers.get("if-none-match"))
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304, headers={"etag": '"v1"'})
+            return httpx.Response(200, content=self.PAGE, headers={"content-type": "text/html", "etag": '"v1"'})
+
+        tool = _reader_with(handler, cache_dir=str(tmp_path))
+        before = _cache_lookups("web")
+
+        with patch("app.tools.web_reader_tool.extract_text", wraps=extract_text) as extract:
+            first = tool.read("https://example.org/post")
+            second = tool.read("https://example.org/post")
+
+        assert first == second == "Cached page text."
+        assert seen == [None, '"v1"']
+        assert extract.call_count == 1
+        assert _new_lookups("web", before) == {"hit": 0, "revalidated": 1, "miss": 1}
+
+    def test_fresh_entry_skips_the_request(self, tmp_path):
+        """Test max-age responses are served without contacting the server."""
+        seen = []
+
+        def handler(request):
+            seen.append(request.url)
+            return httpx.Response(
+                200, content=self.PAGE, headers={"content-type": "text/html", "cache-control": "max-age=600"}
+            )
+
+        tool = _reader_with(handler, cache_dir=str(tmp_path))
+        before = _cache_lookups("web")
+        tool.read("https://example.org/post")
+        tool.read("https://example.org/post")
+
+        assert len(seen) == 1
+        assert _new_lookups("web", before) == {"hit": 1, "revalidated": 0, "miss": 1}
+
+    def test_no_store_is_not_cached(self, tmp_path):
+        """Test no-store responses are fetched every time."""
+        cache = HttpCache(tmp_path, max_bytes=1_000_000)
+
+        assert cache.put("https://example.org/a", {"cache-control": "no-store", "etag": '"x"'}, "text") is None
+        assert cache.get("https://example.org/a") is None
+
+    def test_store_is_bounded(self, tmp_path):
+        """Test least recently used entries are evicted past max_bytes."""
+        cache = HttpCache(tmp_path, max_bytes=1500)
+        for i in range(5):
+            cache.put(f"https://example.org/{i}", {"etag": f'"{i}"'}, "x" * 500)
+
+        assert len(list(tmp_path.glob("*.json"))) == 2
+        assert cache.get("https://example.org/4") is not None
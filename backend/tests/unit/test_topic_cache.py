@@ -0,0 +1,142 @@
+"""
+test_topic_cache.py
+===================
+Unit tests for topic normalization and reuse of recent reviews.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.core.topics import normalize_topic, topic_fingerprint
+from app.services import review_service
+from app.services.review_service import ReviewService
+
+
+class TestNormalizeTopic:
+    """Tests for topic fingerprints."""
+
+    def test_near_identical_topics_share_a_fingerprint(self):
+        """Test abbreviations, filler words, plurals and word order are folded."""
+        topics = [
+            "LLM agents",
+            "large language model agents",
+            "A survey of Large Language Model Agents",
+            "agents, large language models",
+        ]
+        assert len({normalize_topic(t) for t in topics}) == 1
+        assert len({topic_fingerprint(t) for t in topics}) == 1
+
+    def test_different_topics_differ(self):
+        """Test topics with different content words keep different fingerprints."""
+        assert topic_fingerprint("graph neural networks") != topic_fingerprint("graph databases")
+        assert topic_fingerprint("LLM agents") != topic_fingerprint("LLM evaluation")
+
+    def test_framing_words_inside_a_topic_are_kept(self):
+        """Test words like review, state or survey only fold away where they frame the topic."""
+        assert topic_fingerprint("code review automation") != topic_fingerprint("code automation")
+        assert topic_fingerprint("state space models") != topic_fingerprint("space models")
+        assert topic_fingerprint("survey of survey methodology") != topic_fingerprint("methodology")
+        assert normalize_topic("peer review") == "peer review"
+
+    def test_framing_phrases_at_either_end_are_ignored(self):
+        """Test leading and trailing framing phrases fold into the bare topic."""
+        topics = [
+            "Recent advances in LLM agents",
+            "State of the art in LLM agents",
+            "LLM agents: state of the art",
+            "LLM agents - a review",
+            "A systematic literature review of LLM agents",
+        ]
+        assert {normalize_topic(t) for t in topics} == {normalize_topic("LLM agents")}
+
+
+def _pending_review(refresh_cached: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        topic="LLM agents",
+        topic_fingerprint=topic_fingerprint("LLM agents"),
+        papers_limit=5,
+        model="gpt-4o-mini",
+        user_id=uuid.uuid4(),
+        refresh_cached=refresh_cached,
+    )
+
+
+def _cached(stub_repo, source: SimpleNamespace | None, refresh_cached: bool = False):
+    """stub_repo holding a pending review, with `source` as the cached review of its topic."""
+    stub_repo.review = _pending_review(refresh_cached)
+    stub_repo.reusable = source
+    stub_repo.reused = [SimpleNamespace(source="summarizer", content="The summary.", message_type="summary")]
+    return stub_repo
+
+
+class StubRunner:
+    def __init__(self) -> None:
+        self.started: list[tuple] = []
+
+    def start(self, review_id, topic, papers_limit, model):
+        self.started.append((review_id, topic, papers_limit, model))
+
+
+def _source() -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(), topic="large language model agents", completed_at=datetime.utcnow() - timedelta(minutes=30)
+    )
+
+
+def _stream(service: ReviewService, review_id: str) -> list[dict]:
+    async def collect():
+        return [event async for event in service.start_review(review_id, "LLM agents", 5)]
+
+    return asyncio.run(collect())
+
+
+class TestReviewReuse:
+    """Tests for ReviewService answering from a cached review."""
+
+    def test_hit_streams_note_summary_and_completes(self, monkeypatch, stub_repo):
+        """Test a cache hit skips the agents and streams the reused summary."""
+        runner = StubRunner()
+        monkeypatch.setattr(review_service, "get_review_runner", lambda: runner)
+        service = ReviewService(db=None)
+        service.repo = _cached(stub_repo, _source())
+
+        events = _stream(service, str(service.repo.review.id))
+
+        assert [e.get("message_type", e.get("type")) for e in events] == ["system", "summary", "complete"]
+        assert "30 minutes ago" in events[0]["content"]
+        assert events[1]["content"] == "The summary."
+        assert service.repo.lookups == [topic_fingerprint("large language model agents")]
+        assert runner.started == []
+        # The agents never ran
+        assert service.repo.statuses == []
+
+    def test_refresh_starts_fresh_review_in_background(self, monkeypatch, stub_repo):
+        """Test a refresh reuses the cached results and also queues a fresh run."""
+        runner = StubRunner()
+        monkeypatch.setattr(review_service, "get_review_runner", lambda: runner)
+        service = ReviewService(db=None)
+        service.repo = _cached(stub_repo, _source(), refresh_cached=True)
+
+        events = _stream(service, str(service.repo.review.id))
+
+        [fresh] = service.repo.created
+        assert runner.started == [(str(fresh.id), "LLM agents", 5, "gpt-4o-mini")]
+        assert str(fresh.id) in events[0]["content"]
+        assert service.repo.messages[0]["content"] == events[0]["content"]
+        assert service.repo.statuses == []
+
+    def test_miss_falls_through_to_the_agents(self, monkeypatch, stub_repo):
+        """Test a cache miss runs the review as usual."""
+        monkeypatch.setattr(review_service, "get_review_runner", StubRunner)
+        service = ReviewService(db=None)
+        service.repo = _cached(stub_repo, None)
+
+        reused = asyncio.run(service._reuse_cached_review(str(service.repo.review.id)))
+
+        assert reused is None
+        assert service.repo.messages == []
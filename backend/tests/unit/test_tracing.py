@@ -0,0 +1,101 @@
+"""
+test_tracing.py
+===============
+Unit tests for span tracing and the waterfall view.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.core.tracing import (
+    JsonFileSpanExporter,
+    build_waterfall,
+    set_span_exporter,
+    start_span,
+    trace,
+)
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    """Route spans to a JSON-file exporter in a temp directory."""
+    exporter = JsonFileSpanExporter(tmp_path)
+    set_span_exporter(exporter)
+    yield exporter
+    set_span_exporter(None)
+
+
+class TestTracing:
+    """Tests for span propagation and export."""
+
+    def test_no_spans_outside_trace(self, exporter, tmp_path):
+        """Test spans are a no-op when no trace is bound."""
+        with start_span("orphan") as span:
+            assert span is None
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_spans_nest_through_async_generators(self, exporter):
+        """Test parent/child links survive yields and spawned tasks."""
+
+        async def stage():
+            with start_span("review.team"):
+                for i in range(2):
+                    yield i
+
+        async def tool_call():
+            with start_span("tool.arxiv_search"):
+                await asyncio.sleep(0)
+
+        async def run():
+            with trace("review-1"), start_span("review"):
+                async for _ in stage():
+                    await asyncio.create_task(tool_call())
+
+        asyncio.run(run())
+
+        spans = {s["name"]: s for s in exporter.load("review-1")}
+        assert spans["review"]["parent_id"] is None
+        assert spans["review.team"]["parent_id"] == spans["review"]["span_id"]
+        assert spans["tool.arxiv_search"]["parent_id"] == spans["review.team"]["span_id"]
+
+    def test_error_status_recorded(self, exporter):
+        """Test a raising block marks its span as errored."""
+        with pytest.raises(ValueError), trace("review-2"), start_span("tool.read_webpage"):
+            raise ValueError("boom")
+
+        [span] = exporter.load("review-2")
+        assert span["status"] == "error"
+        assert "boom" in span["attributes"]["error"]
+
+    def test_spans_are_written_once_their_root_ends(self, exporter, tmp_path):
+        """Test a running trace touches no file yet still loads, and is written when its root ends."""
+        path = tmp_path / "review-3.jsonl"
+
+        with trace("review-3"), start_span("review"):
+            with start_span("review.plan"):
+                pass
+            assert not path.exists()
+            assert [s["name"] for s in exporter.load("review-3")] == ["review.plan"]
+        exporter.flush()
+
+        assert len(path.read_text().splitlines()) == 2
+        assert [s["name"] for s in exporter.load("review-3")] == ["review.plan", "review"]
+
+    def test_build_waterfall_orders_depth_first(self):
+        """Test waterfall depth and offsets."""
+        spans = [
+            {"span_id": "c", "parent_id": "a", "name": "tool", "start": 12.0, "end": 13.0},
+            {"span_id": "a", "parent_id": None, "name": "review", "start": 10.0, "end": 20.0},
+            {"span_id": "b", "parent_id": "a", "name": "plan", "start": 10.5, "end": 11.0},
+        ]
+
+        waterfall = build_waterfall(spans)
+
+        assert [s["name"] for s in waterfall] == ["review", "plan", "tool"]
+        assert [s["depth"] for s in waterfall] == [0, 1, 1]
+        assert waterfall[2]["offset_ms"] == 2000.0
+        assert waterfall[2]["duration_ms"] == 1000.0
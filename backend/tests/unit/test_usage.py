@@ -0,0 +1,77 @@
+"""
+test_usage.py
+=============
+Unit tests for per-review usage accounting.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+from autogen_core import CancellationToken
+
+from app.core.usage import UsageTracker, estimate_cost, get_usage_tracker, track_usage
+from app.tools.arxiv_tool import ArxivSearchTool
+
+
+class TestUsageTracker:
+    """Tests for UsageTracker and cost estimation."""
+
+    def test_estimate_cost_known_and_snapshot_models(self):
+        """Test dated snapshots are priced as their base model."""
+        base = estimate_cost("gpt-4o-mini", 1_000_000, 1_000_000)
+        snapshot = estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000, 1_000_000)
+
+        assert base == snapshot == 0.75
+        assert estimate_cost("unknown-model", 1000, 1000) == 0.0
+
+    def test_totals(self):
+        """Test totals sum LLM tokens and count tool calls separately."""
+        tracker = UsageTracker()
+        tracker.record_llm_call("planner", "gpt-4o-mini", 100, 20, 350.0)
+        tracker.record_llm_call("critic", "gpt-4o-mini", 200, 40, 500.0)
+        tracker.record_tool_call("arxiv_search", 1200.0, payload_bytes=2048)
+
+        totals = tracker.totals()
+
+        assert totals["prompt_tokens"] == 300
+        assert totals["completion_tokens"] == 60
+        assert totals["llm_calls"] == 2
+        assert totals["tool_calls"] == 1
+
+    def test_track_usage_binds_and_resets(self):
+        """Test the tracker is only visible inside the block."""
+        tracker = UsageTracker()
+
+        with track_usage(tracker):
+            assert get_usage_tracker() is tracker
+
+        assert get_usage_tracker() is None
+
+
+class TestToolInstrumentation:
+    """Tests for tool calls recorded through as_function_tool."""
+
+    def test_tool_call_is_recorded(self):
+        """Test a tool invocation records latency and payload size."""
+        tool = ArxivSearchTool()
+        tool._client = MagicMock()
+        tool._client.results.return_value = []
+        func_tool = tool.as_function_tool()
+        tracker = UsageTracker()
+
+        async def run():
+            with track_usage(tracker):
+                args = func_tool.args_type()(query="graph neural networks")
+                return await func_tool.run(args, CancellationToken())
+
+        result = asyncio.run(run())
+
+        assert result == []
+        assert len(tracker.records) == 1
+        record = tracker.records[0]
+        assert record.kind == "tool"
+        assert record.stage == "arxiv_search"
+        assert record.payload_bytes == 2
+        assert record.error is False
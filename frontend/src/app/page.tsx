@@ -6,7 +6,7 @@ import { Card, ConfigProvider, Layout, Alert, Button, Skeleton, theme as antdThe
 import { LogOut, MessageSquarePlus, Moon, Sun } from 'lucide-react'
 import { SearchForm } from '@/components/search/SearchForm'
 import type { ChatHistoryItem, ChatSession, CreateReviewRequest, ReviewResponse } from '@/lib/types/api'
-import { createReview, deleteReview, listReviews } from '@/lib/api/reviews'
+import { cancelReview, createReview, deleteReview, listReviews } from '@/lib/api/reviews'
 import { useReviewStream } from '@/lib/hooks/useReviewStream'
 import { HistorySidebar } from '@/components/chat/HistorySidebar'
 import { useAuth } from '@/lib/context/AuthContext'
@@ -140,10 +140,20 @@ export default function Home() {
   // ── Clear stream state on completion ──
   useEffect(() => {
     if (!streamReviewId) return
-    if (streamStatus !== 'completed' && streamStatus !== 'failed') return
+    if (streamStatus !== 'completed' && streamStatus !== 'failed' && streamStatus !== 'cancelled') return
     setStreamReviewId(null)
   }, [streamReviewId, streamStatus])
 
+  // ── Stop the running review; the stream reports the cancellation ──
+  const handleCancel = useCallback(async () => {
+    if (!streamReviewId) return
+    try {
+      await cancelReview(streamReviewId)
+    } catch (err: any) {
+      setError(err.response?.data?.detail || 'Failed to cancel review')
+    }
+  }, [streamReviewId])
+
   // ── New chat = just show composer ──
   const handleNewChat = useCallback(() => {
     setActiveChatId(null)
@@ -271,7 +281,11 @@ export default function Home() {
                   )}
 
                   {displayMessages.length > 0 && (
-                    <MessageDisplay messages={displayMessages} status={displayStatus} />
+                    <MessageDisplay
+                      messages={displayMessages}
+                      status={displayStatus}
+                      onCancel={isActiveStreaming ? handleCancel : undefined}
+                    />
                   )}
 
                   {displayStatus === 'completed' && displayMessages.length > 0 && displayReviewId && (
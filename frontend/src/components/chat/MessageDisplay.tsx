@@ -10,6 +10,7 @@ type ResearchStage = 'planning' | 'searching' | 'summarizing' | 'critiquing' | '
 interface MessageDisplayProps {
   messages: Message[]
   status: ReviewStatus
+  onCancel?: () => void
 }
 
 const STAGE_CONFIG: Record<ResearchStage, { label: string; description: string }> = {
@@ -177,7 +178,7 @@ function CritiqueCard({ critique }: { critique: Message }) {
 }
 
 // ── Main component ──
-export function MessageDisplay({ messages, status }: MessageDisplayProps) {
+export function MessageDisplay({ messages, status, onCancel }: MessageDisplayProps) {
   const [stage, setStage] = useState<ResearchStage>('planning')
 
   const plannerMessages = useMemo(() => messages.filter(isPlannerMessage), [messages])
@@ -285,6 +286,22 @@ export function MessageDisplay({ messages, status }: MessageDisplayProps) {
     )
   }
 
+  // ── CANCELLED ──
+  if (status === 'cancelled') {
+    return (
+      <Card className="chat-card">
+        <Space align="center" size="middle">
+          <AlertCircle className="h-5 w-5 text-muted-foreground" />
+          <div>
+            <Typography.Text strong>Research cancelled</Typography.Text>
+            <div className="text-xs text-muted-foreground">Start a new review to try again.</div>
+          </div>
+          <Tag>Cancelled</Tag>
+        </Space>
+      </Card>
+    )
+  }
+
   // ── IN PROGRESS ──
   if (status === 'in_progress') {
     const currentStageIdx = STAGE_ORDER.indexOf(stage)
@@ -301,6 +318,7 @@ export function MessageDisplay({ messages, status }: MessageDisplayProps) {
                 <div className="text-xs text-muted-foreground">{STAGE_CONFIG[stage].description}</div>
               </div>
               <Tag color="blue">In progress</Tag>
+              {onCancel && <Button size="small" onClick={onCancel}>Stop</Button>}
             </Space>
 
             {/* Stepper */}
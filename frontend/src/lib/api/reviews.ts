@@ -15,6 +15,16 @@ export async function getReview(reviewId: string): Promise<ReviewResponse> {
   return response.data
 }
 
+export async function refreshReview(reviewId: string): Promise<ReviewResponse> {
+  const response = await apiClient.post<ReviewResponse>(`/api/v1/reviews/${reviewId}/refresh`)
+  return response.data
+}
+
+export async function cancelReview(reviewId: string): Promise<ReviewResponse> {
+  const response = await apiClient.post<ReviewResponse>(`/api/v1/reviews/${reviewId}/cancel`)
+  return response.data
+}
+
 export async function deleteReview(reviewId: string): Promise<void> {
   await apiClient.delete(`/api/v1/reviews/${reviewId}`)
 }
@@ -90,6 +90,12 @@ export function useReviewStream(
       stopStream()
     })
 
+    eventSource.addEventListener('cancelled', () => {
+      setStatus('cancelled')
+      setIsStreaming(false)
+      stopStream()
+    })
+
     eventSource.addEventListener('error', (e: any) => {
       try {
         if (e.data) {
@@ -2,7 +2,7 @@
  * API types matching backend models
  */
 
-export type ReviewStatus = 'pending' | 'in_progress' | 'completed' | 'failed'
+export type ReviewStatus = 'pending' | 'in_progress' | 'completed' | 'failed' | 'cancelled'
 
 export type MessageType = 'search' | 'summary' | 'critique' | 'planning' | 'system' | 'error' | 'progress' | 'guardrail'
 
@@ -28,6 +28,7 @@ export interface ChatSession extends ChatHistoryItem {
 }
 
 export interface Paper {
+  id?: string
   title: string
   authors: string[]
   published: string
@@ -37,6 +38,7 @@ export interface Paper {
 
 export interface CreateReviewRequest {
   topic: string
+  refresh?: boolean
 }
 
 export interface ReviewResponse {
@@ -51,6 +53,7 @@ export interface ReviewResponse {
   papers: Paper[]
   created_at: string
   completed_at: string | null
+  reused_from?: string | null
 }
 
 export interface SSEMessageEvent {
@@ -72,7 +75,14 @@ export interface SSEErrorEvent {
   timestamp: string
 }
 
-export type SSEEvent = SSEMessageEvent | SSECompleteEvent | SSEErrorEvent
+export interface SSECancelledEvent {
+  type: 'cancelled'
+  session_id: string
+  reason?: 'requested' | 'abandoned'
+  timestamp: string
+}
+
+export type SSEEvent = SSEMessageEvent | SSECompleteEvent | SSEErrorEvent | SSECancelledEvent
 
 // ── Auth ──────────────────────────────────────────────────────────────────────
 